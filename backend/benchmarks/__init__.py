@@ -0,0 +1 @@
+"""Micro-benchmarks for the learning hot path (pytest-benchmark)."""
@@ -0,0 +1,148 @@
+"""
+Compare a pytest-benchmark run with the committed baseline.
+
+The baseline keeps only what the comparison needs (min, median and mean per
+benchmark, plus the machine it was recorded on), so it stays small and
+readable in diffs. Minimums are compared: noise from other processes, GC
+pauses and frequency scaling only ever adds time, so the fastest round is
+the most repeatable measure of the code itself.
+
+When both runs include the calibration benchmark (a fixed pure-Python loop),
+current times are scaled by the ratio of the two calibration times first, so
+a baseline recorded on a faster or slower machine still compares fairly.
+
+Usage:
+    python -m benchmarks.compare results.json              # report, exit 1 on regression
+    python -m benchmarks.compare results.json --threshold 0.5
+    python -m benchmarks.compare results.json --update     # rewrite the baseline
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+# A benchmark regresses when its minimum is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.25
+CALIBRATION = "test_calibration_loop"
+
+
+def summarize(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Baseline entry from a pytest-benchmark JSON report (times in microseconds)."""
+    machine = results.get("machine_info", {})
+    return {
+        "machine": {
+            "python": machine.get("python_version"),
+            "cpu": machine.get("cpu", {}).get("brand_raw"),
+            "system": machine.get("system"),
+        },
+        "benchmarks": {
+            bench["name"]: {
+                "min_us": round(bench["stats"]["min"] * 1e6, 3),
+                "median_us": round(bench["stats"]["median"] * 1e6, 3),
+                "mean_us": round(bench["stats"]["mean"] * 1e6, 3),
+                "rounds": bench["stats"]["rounds"],
+            }
+            for bench in sorted(results["benchmarks"], key=lambda b: b["name"])
+        },
+    }
+
+
+def machine_scale(baseline: Dict[str, Any], current: Dict[str, Any]) -> float:
+    """Factor bringing current times to the baseline machine's speed (1.0 without calibration)."""
+    before = baseline["benchmarks"].get(CALIBRATION)
+    after = current["benchmarks"].get(CALIBRATION)
+    if not before or not after or not after["min_us"]:
+        return 1.0
+    return before["min_us"] / after["min_us"]
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    One row per benchmark: baseline and current minimums, relative change
+    (normalized by the calibration loop), status.
+
+    Status is "regression" past the threshold, "faster" past it the other way,
+    "new" or "missing" when a benchmark is only on one side, "ok" otherwise.
+    """
+    rows = []
+    scale = machine_scale(baseline, current)
+    names = sorted((set(baseline["benchmarks"]) | set(current["benchmarks"])) - {CALIBRATION})
+    for name in names:
+        before = baseline["benchmarks"].get(name)
+        after = current["benchmarks"].get(name)
+        row = {
+            "name": name,
+            "baseline_us": before["min_us"] if before else None,
+            "current_us": after["min_us"] if after else None,
+            "change": None,
+        }
+        if before is None:
+            row["status"] = "new"
+        elif after is None:
+            row["status"] = "missing"
+        else:
+            change = after["min_us"] * scale / before["min_us"] - 1 if before["min_us"] else 0.0
+            row["change"] = round(change, 4)
+            if change > threshold:
+                row["status"] = "regression"
+            elif change < -threshold:
+                row["status"] = "faster"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def format_report(rows: List[Dict[str, Any]], threshold: float, scale: float = 1.0) -> str:
+    def us(value):
+        return f"{value:>12,.1f}" if value is not None else f"{'-':>12}"
+
+    lines = [
+        f"{'benchmark':<32} {'baseline µs':>12} {'current µs':>12} {'change':>8}  status",
+        "-" * 76,
+    ]
+    for row in rows:
+        change = f"{row['change']:+.0%}" if row["change"] is not None else "-"
+        lines.append(f"{row['name']:<32} {us(row['baseline_us'])} {us(row['current_us'])} {change:>8}  {row['status']}")
+    regressions = sum(row["status"] == "regression" for row in rows)
+    lines.append("-" * 76)
+    if scale != 1.0:
+        lines.append(f"Changes normalized by the calibration loop (this machine x{1 / scale:.2f} vs baseline)")
+    lines.append(f"{regressions} regression(s) over +{threshold:.0%} on the minimum")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare benchmark results with the baseline")
+    parser.add_argument("results", help="pytest-benchmark JSON (--benchmark-json)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown of the minimum (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--update", action="store_true", help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    with open(args.results, encoding="utf-8") as f:
+        current = summarize(json.load(f))
+
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline} ({len(current['benchmarks'])} benchmarks)")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    rows = compare(baseline, current, args.threshold)
+    if baseline.get("machine") != current["machine"]:
+        print(f"Note: baseline recorded on {baseline.get('machine')}, comparing on {current['machine']}\n")
+    print(format_report(rows, args.threshold, machine_scale(baseline, current)))
+    return 1 if any(row["status"] == "regression" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Fixtures for the learning hot-path benchmarks.
+
+Every fixture is seeded and runs on a VirtualClock, so two runs of the suite
+measure exactly the same work.
+"""
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.clock import VirtualClock
+
+START = datetime(2025, 3, 3, 8, 0)
+USER_ID = "bench_user"
+TOPICS = ["conjugaison", "grammaire", "vocabulaire", "orthographe"]
+# Answers replayed before measuring: about three weeks of daily practice
+WARMUP_ANSWERS = 240
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock(START)
+
+
+@pytest.fixture
+def engine(tmp_path, clock):
+    """Engine with one user warmed up on every topic."""
+    from learning_engine.learning_engine_lean import LeanLearningEngine
+
+    engine = LeanLearningEngine(db_path=str(tmp_path / "bench.db"), clock=clock)
+    rng = random.Random(42)
+    random.seed(42)
+    for index in range(WARMUP_ANSWERS):
+        topic = TOPICS[index % len(TOPICS)]
+        params = engine.get_next_question(USER_ID, topic, min(90, index // 3))
+        engine.process_answer(USER_ID, topic, rng.random() < 0.75, rng.uniform(5, 40), params.difficulty)
+        clock.advance(hours=2)
+    return engine
+
+
+@pytest.fixture
+def detector(clock):
+    """Cognitive load detector mid-session (30 answers)."""
+    from utils.cognitive_load import CognitiveLoadDetector
+
+    detector = CognitiveLoadDetector(clock=clock)
+    rng = random.Random(7)
+    for _ in range(30):
+        detector.add_response(
+            response_time=int(rng.uniform(8, 45)),
+            is_correct=rng.random() < 0.7,
+            difficulty=rng.choice(["easy", "medium", "hard"]),
+            confidence=rng.random(),
+        )
+        clock.advance(seconds=40)
+    return detector
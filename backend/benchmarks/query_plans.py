@@ -0,0 +1,452 @@
+"""
+Query-plan regression check for the SQL issued by the database modules.
+
+1. capture: run the test suite with this module as a pytest plugin; every
+   statement going through utils.metrics.count_queries (all managers) is
+   recorded, normalized to a fingerprint (literals -> ?), with one example
+   and a call count.
+2. plan: each database is rebuilt from its real migrations in a scratch
+   directory and seeded with synthetic rows (`--rows` per growing table,
+   at most 1,000 in bounded tables such as profiles and reference data).
+   Values seen in the captured statements (user_id = 'default', ...) are
+   mixed into the seeded columns so lookups hit real rows.
+3. check: `EXPLAIN QUERY PLAN` on every example. A full table scan (bare
+   `SCAN table`, not `SCAN ... USING INDEX`) of a growing table and any
+   `USE TEMP B-TREE` on a statement touching one are flagged. The issues are
+   compared with benchmarks/query_plans.json: a statement that gains an
+   issue is a regression (exit 1); known issues are listed, not failed.
+
+`--timings 10000,100000,1000000` also seeds each scale and reports the
+median execution time of every read statement (writes run in a rolled-back
+transaction).
+
+Usage:
+    python -m benchmarks.query_plans                      # capture + check
+    python -m benchmarks.query_plans --statements .benchmarks/statements.json
+    python -m benchmarks.query_plans --update             # accept current plans
+    python -m benchmarks.query_plans --timings 10000,100000,1000000 --top 20
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).parent / "query_plans.json"
+CAPTURE_PATH = BACKEND_DIR / ".benchmarks" / "statements.json"
+CAPTURE_ENV = "QUERY_PLANS_CAPTURE"
+DEFAULT_ROWS = 10_000
+# Bounded by design (one row per user/day/skill...): seeded small, scans allowed
+SMALL_TABLES = {
+    "categories", "projects", "user_health_profile", "ai_daily_summary",
+    "user_chronotype", "user_learning_style", "user_generation_stats", "user_interleaving_stats",
+    "lean_user_states", "skills", "skill_relations", "skill_aliases", "domain_maps", "domain_map_skills",
+    "tutor_profiles", "tutor_time_patterns", "tutor_weekly_patterns", "tutor_hint_effectiveness",
+    "tutor_error_patterns", "schema_version",
+}
+SMALL_ROWS = 1_000
+PLANNED_VERBS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+# Distinct values per seeded TEXT column: primes, so column pairs rarely collide
+_CARDINALITIES = (97, 211, 499, 997, 1009, 2003)
+_SEED_START = datetime(2024, 1, 1)
+
+
+# ═══════════════════════════════════════════════════════════════
+# CAPTURE
+# ═══════════════════════════════════════════════════════════════
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.])")
+# A None parameter is expanded to NULL: same shape as any other value
+_NULL_VALUE = re.compile(r"([(,=]\s*)NULL\b", re.I)
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+_ATTACHED = re.compile(r"\blegacy\.\w+")
+
+
+def fingerprint(sql: str) -> str:
+    """Statement shape: literals become ?, IN lists collapse, whitespace is normalized."""
+    normalized = _STRING.sub("?", sql)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _NULL_VALUE.sub(r"\1?", normalized)
+    normalized = _IN_LIST.sub("(?...)", normalized)
+    return _SPACES.sub(" ", normalized).strip().rstrip(";")
+
+
+def is_planned(sql: str) -> bool:
+    # One-shot imports from an ATTACHed file (databases.legacy_migrator) have no seeded counterpart
+    return sql.lstrip().upper().startswith(PLANNED_VERBS) and not _ATTACHED.search(sql)
+
+
+class StatementCapture:
+    """Listener for utils.metrics: {db: {fingerprint: {"example", "count"}}}."""
+
+    def __init__(self):
+        self.statements: Dict[str, Dict[str, Dict]] = {}
+
+    def __call__(self, db: str, sql: str):
+        if not is_planned(sql):
+            return
+        entry = self.statements.setdefault(db, {}).setdefault(fingerprint(sql), {"example": sql, "count": 0})
+        entry["count"] += 1
+
+    def dump(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.statements, f, indent=2, sort_keys=True, ensure_ascii=False)
+
+
+_capture: Optional[StatementCapture] = None
+
+
+def pytest_configure(config):
+    """Plugin entry point (`-p benchmarks.query_plans`): active when QUERY_PLANS_CAPTURE is set."""
+    global _capture
+    if os.environ.get(CAPTURE_ENV):
+        from utils.metrics import add_statement_listener
+
+        _capture = StatementCapture()
+        add_statement_listener(_capture)
+
+
+def pytest_unconfigure(config):
+    if _capture is not None:
+        from utils.metrics import remove_statement_listener
+
+        remove_statement_listener(_capture)
+        _capture.dump(Path(os.environ[CAPTURE_ENV]))
+
+
+def capture_statements(path: Path = CAPTURE_PATH, pytest_args: Iterable[str] = ("tests",)) -> Dict:
+    """Run the test suite (failures are ignored) and return the captured statements."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = {**os.environ, CAPTURE_ENV: str(path), "DATA_DIR": data_dir}
+        env.setdefault("OPENAI_API_KEY", "sk-test")
+        subprocess.run(
+            [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-p", "benchmarks.query_plans", *pytest_args],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+    if not path.exists():
+        raise RuntimeError(f"pytest did not write {path}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+# ═══════════════════════════════════════════════════════════════
+# SEEDED DATABASES
+# ═══════════════════════════════════════════════════════════════
+
+def _schema_builders() -> Dict[str, Callable[[str], None]]:
+    """db label (as in count_queries) -> applies that database's migrations to a path."""
+    import importlib
+
+    from databases import skill_graph_db, tutor_profile_db
+    from databases.health_db import HealthDatabase
+    from databases.learning_db import LearningDatabase
+    from databases.review_events import ReviewEventLog
+    from databases.schema import SchemaGuard
+    from databases.tasks_db import TasksDatabase
+    from utils.optimal_difficulty import CalibrationStore
+
+    lean = importlib.import_module("learning_engine.learning_engine_lean")
+    managers = {
+        "tasks": TasksDatabase, "health": HealthDatabase, "learning": LearningDatabase,
+        "engine": lambda path: lean.LeanLearningEngine(db_path=path),
+    }
+    builders = {label: (lambda path, make=make: make(path)._schema.ensure(path)) for label, make in managers.items()}
+    builders["skill_graph"] = lambda path: SchemaGuard("skill_graph", skill_graph_db.MIGRATIONS).ensure(path)
+    builders["tutor_profile"] = lambda path: SchemaGuard(
+        "tutor_profile", tutor_profile_db._schema.migrations).ensure(path)
+    builders["difficulty"] = lambda path: CalibrationStore(path)._schema.ensure(path)
+    builders["review_events"] = lambda path: ReviewEventLog(path)._schema.ensure(path)
+    return builders
+
+
+def literal_pools(examples: Iterable[str]) -> Dict[str, List[str]]:
+    """Values compared to a column in the captured statements (`col = 'value'`)."""
+    pools: Dict[str, Set[str]] = {}
+    for sql in examples:
+        for column, value in re.findall(r"\b(\w+)\s*=\s*'((?:[^']|'')*)'", sql):
+            pools.setdefault(column.lower(), set()).add(value.replace("''", "'"))
+    return {column: sorted(values) for column, values in pools.items()}
+
+
+def _column_value(column: Dict, index: int, pools: Dict[str, List[str]]):
+    name, declared = column["name"].lower(), column["type"].upper()
+    if column["pk"] and "INT" in declared:
+        return None  # rowid
+    if column["pk"]:
+        return f"{name}_{index}"
+    pool = pools.get(name)
+    if pool and index % 4 == 0:
+        return pool[(index // 4) % len(pool)]
+    if "TIME" in declared or "DATE" in declared or name.endswith(("_at", "date", "timestamp", "_review")):
+        moment = _SEED_START + timedelta(minutes=7 * index)
+        return moment.strftime("%Y-%m-%d") if name == "date" else moment.strftime("%Y-%m-%d %H:%M:%S")
+    if "BOOL" in declared:
+        return index % 2
+    if "INT" in declared:
+        return index % 100
+    if "REAL" in declared:
+        return (index % 1000) / 1000
+    cardinality = _CARDINALITIES[zlib.crc32(name.encode()) % len(_CARDINALITIES)]
+    return f"{name}_{index % cardinality}"
+
+
+def seed_table(conn: sqlite3.Connection, table: str, rows: int, pools: Dict[str, List[str]]) -> int:
+    """Insert `rows` synthetic rows (duplicates on UNIQUE columns are skipped); returns the table size."""
+    columns = [
+        {"name": row[1], "type": row[2] or "", "pk": row[5]}
+        for row in conn.execute(f"PRAGMA table_info({table})")
+    ]
+    columns = [c for c in columns if not (c["pk"] and "INT" in c["type"].upper())]
+    names = ", ".join(c["name"] for c in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    conn.executemany(
+        f"INSERT OR IGNORE INTO {table} ({names}) VALUES ({placeholders})",
+        ([_column_value(c, index, pools) for c in columns] for index in range(rows)),
+    )
+    conn.commit()
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def build_database(label: str, path: str, rows: int, pools: Dict[str, List[str]], builders=None) -> Dict[str, int]:
+    """Apply the real migrations for `label`, seed every table; returns {table: size}."""
+    (builders or _schema_builders())[label](path)
+    conn = sqlite3.connect(path)
+    try:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+        return {
+            table: seed_table(conn, table, min(rows, SMALL_ROWS) if table in SMALL_TABLES else rows, pools)
+            for table in tables if table != "schema_version"
+        }
+    finally:
+        conn.close()
+
+
+# ═══════════════════════════════════════════════════════════════
+# PLANS
+# ═══════════════════════════════════════════════════════════════
+
+_KEYWORDS = (
+    "WHERE", "ON", "SET", "JOIN", "LEFT", "INNER", "CROSS", "NATURAL", "ORDER", "GROUP", "HAVING", "LIMIT",
+    "VALUES", "SELECT", "USING", "UNION", "EXCEPT", "INTERSECT", "RETURNING", "DEFAULT", "WINDOW",
+)
+_TABLE_REF = re.compile(
+    rf"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:{'|'.join(_KEYWORDS)})\b)(\w+))?", re.I)
+
+
+def table_aliases(sql: str) -> Dict[str, str]:
+    """alias (or table name) -> table name, as EXPLAIN QUERY PLAN reports aliases."""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table.lower()] = table.lower()
+        if alias:
+            aliases[alias.lower()] = table.lower()
+    return aliases
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> List[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def plan_issues(plan: List[str], sql: str, large_tables: Set[str]) -> List[str]:
+    """Full scans of large tables and temp B-trees on statements touching one."""
+    aliases = table_aliases(sql)
+    touched = set(aliases.values()) & large_tables
+    issues = []
+    for detail in plan:
+        scan = re.match(r"SCAN (\w+)$", detail)
+        if scan and aliases.get(scan.group(1).lower(), scan.group(1).lower()) in large_tables:
+            issues.append(f"full scan {aliases.get(scan.group(1).lower(), scan.group(1).lower())}")
+        elif detail.startswith("USE TEMP B-TREE") and touched:
+            issues.append(detail.replace("USE ", "").lower())
+    return sorted(set(issues))
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Connection with the application-defined SQL functions the statements may call."""
+    from databases.learning_db import register_sql_functions
+
+    conn = sqlite3.connect(path)
+    register_sql_functions(conn)
+    return conn
+
+
+def check_plans(statements: Dict, rows: int = DEFAULT_ROWS, workdir: Optional[str] = None) -> Dict[str, Dict]:
+    """{fingerprint: {"db", "count", "plan", "issues"} or {"error"}} on databases seeded with `rows`."""
+    builders = _schema_builders()
+    results = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for label, by_fingerprint in sorted(statements.items()):
+            if label not in builders:
+                continue
+            path = str(Path(tmp) / f"{label}.db")
+            sizes = build_database(label, path, rows, literal_pools(e["example"] for e in by_fingerprint.values()), builders)
+            large = {table for table, size in sizes.items() if table not in SMALL_TABLES}
+            conn = _connect(path)
+            try:
+                for key, entry in sorted(by_fingerprint.items()):
+                    result = {"db": label, "count": entry["count"]}
+                    try:
+                        result["plan"] = explain(conn, entry["example"])
+                        result["issues"] = plan_issues(result["plan"], entry["example"], large)
+                    except sqlite3.Error as e:
+                        result["error"] = str(e)
+                    results[key] = result
+            finally:
+                conn.close()
+    return results
+
+
+def compare(baseline: Dict[str, Dict], current: Dict[str, Dict]) -> List[Dict]:
+    """
+    One row per current statement. Status: "regression" when it has an issue
+    the baseline did not record, "fixed" when it lost all its issues, "new"
+    when it is not in the baseline, "known" (issues already in the baseline),
+    "error" when it cannot be planned, "ok" otherwise.
+    """
+    rows = []
+    for key, result in sorted(current.items(), key=lambda item: -item[1]["count"]):
+        before = baseline.get(key)
+        issues = result.get("issues", [])
+        if "error" in result:
+            status = "error"
+        elif before is None:
+            status = "new"
+        elif set(issues) - set(before.get("issues", [])):
+            status = "regression"
+        elif before.get("issues") and not issues:
+            status = "fixed"
+        else:
+            status = "known" if issues else "ok"
+        rows.append({"fingerprint": key, "db": result["db"], "count": result["count"], "issues": issues,
+                     "error": result.get("error"), "status": status})
+    return rows
+
+
+def format_report(rows: List[Dict], top: int = 25) -> str:
+    flagged = [row for row in rows if row["issues"] or row["status"] in ("regression", "error")]
+    lines = [f"{'db':<13} {'calls':>6}  {'status':<10} statement / issues", "-" * 100]
+    for row in flagged[:top]:
+        lines.append(f"{row['db']:<13} {row['count']:>6}  {row['status']:<10} {row['fingerprint'][:70]}")
+        detail = row["error"] or ", ".join(row["issues"])
+        lines.append(f"{'':<32}-> {detail}")
+    if len(flagged) > top:
+        lines.append(f"... {len(flagged) - top} more flagged statement(s) (--top)")
+    counts = {status: sum(row["status"] == status for row in rows) for status in
+              ("ok", "known", "new", "fixed", "regression", "error")}
+    lines.append("-" * 100)
+    lines.append(f"{len(rows)} statements: " + ", ".join(f"{count} {status}" for status, count in counts.items()))
+    return "\n".join(lines)
+
+
+# ═══════════════════════════════════════════════════════════════
+# TIMINGS
+# ═══════════════════════════════════════════════════════════════
+
+def time_statement(conn: sqlite3.Connection, sql: str, repeat: int = 3) -> float:
+    """Median milliseconds; writes are rolled back so every run sees the same data."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+        if conn.in_transaction:
+            conn.rollback()
+    return statistics.median(samples)
+
+
+def measure_timings(statements: Dict, scales: List[int], top: int = 25) -> Dict[str, Dict[int, Optional[float]]]:
+    """{fingerprint: {rows: median ms}} for the `top` most called statements at every scale."""
+    hottest = sorted(
+        ((key, label, entry) for label, entries in statements.items() for key, entry in entries.items()),
+        key=lambda item: -item[2]["count"],
+    )[:top]
+    builders = _schema_builders()
+    timings: Dict[str, Dict[int, Optional[float]]] = {key: {} for key, _, _ in hottest}
+    for rows in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            for label in sorted({label for _, label, _ in hottest}):
+                if label not in builders:
+                    continue
+                path = str(Path(tmp) / f"{label}.db")
+                build_database(label, path, rows, literal_pools(e["example"] for e in statements[label].values()), builders)
+                conn = _connect(path)
+                try:
+                    for key, entry_label, entry in hottest:
+                        if entry_label != label:
+                            continue
+                        try:
+                            timings[key][rows] = round(time_statement(conn, entry["example"]), 3)
+                        except sqlite3.Error:
+                            timings[key][rows] = None
+                finally:
+                    conn.close()
+    return timings
+
+
+def format_timings(timings: Dict[str, Dict[int, Optional[float]]], scales: List[int]) -> str:
+    header = f"{'statement':<70}" + "".join(f"{f'{rows:,} rows ms':>17}" for rows in scales)
+    lines = [header, "-" * len(header)]
+    for key, by_scale in timings.items():
+        cells = "".join(
+            f"{by_scale[rows]:>17.3f}" if by_scale.get(rows) is not None else f"{'-':>17}" for rows in scales)
+        lines.append(f"{key[:69]:<70}{cells}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN regression check for captured SQL")
+    parser.add_argument("--statements", help="Reuse a capture instead of running the tests")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help=f"Rows per growing table (default: {DEFAULT_ROWS:,})")
+    parser.add_argument("--update", action="store_true", help="Rewrite the baseline with the current plans")
+    parser.add_argument("--strict", action="store_true", help="Also fail on new statements with issues")
+    parser.add_argument("--timings", help="Comma-separated row counts, e.g. 10000,100000,1000000")
+    parser.add_argument("--top", type=int, default=25, help="Rows in the reports (default: 25)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    if args.statements:
+        statements = json.loads(Path(args.statements).read_text(encoding="utf-8"))
+    else:
+        statements = capture_statements()
+        print(f"Captured {sum(len(v) for v in statements.values())} statements -> {CAPTURE_PATH}")
+
+    current = check_plans(statements, rows=args.rows)
+    if args.update:
+        baseline = {key: {"db": r["db"], "plan": r["plan"], "issues": r["issues"]}
+                    for key, r in sorted(current.items()) if "error" not in r}
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH} ({len(baseline)} statements)")
+        return 0
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+    rows = compare(baseline, current)
+    print(format_report(rows, top=args.top))
+
+    if args.timings:
+        scales = [int(value) for value in args.timings.split(",")]
+        print()
+        print(format_timings(measure_timings(statements, scales, top=args.top), scales))
+
+    failed = [row for row in rows if row["status"] == "regression"
+              or (args.strict and row["status"] == "new" and row["issues"])]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Import-time profile of the backend, and time until it answers /health.
+
+The desktop shell starts `python main.py` and waits for the backend, so
+cold-start latency is user-visible. This report shows where it goes:
+
+- import: `python -X importtime -c "import main"` in a fresh interpreter,
+  slowest first-party modules and third-party packages (cumulative time)
+- ready: `python main.py` until the first 200 on /health (DEBUG off,
+  so without the reloader process)
+- deferred: heavy packages that must stay out of startup (imported lazily
+  through utils.lazy); the report flags any that is imported eagerly again
+
+Both runs use a throwaway DATA_DIR, so the real databases are not touched.
+
+Usage:
+    python -m benchmarks.startup                  # report
+    python -m benchmarks.startup --budget-ms 1500 # exit 1 if the import is slower
+    python -m benchmarks.startup --json startup.json --no-ready
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FIRST_PARTY = ("main", "config", "database", "databases", "routes", "services", "utils", "learning_engine", "models")
+# Loaded on first use only: importing them at startup is a regression
+DEFERRED = ("openai", "docker")
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".", 1)[0]
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Records from `-X importtime` stderr (other lines are ignored)."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            records.append(ImportRecord(
+                name=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(name.lstrip())) // 2,
+            ))
+        except ValueError:
+            continue
+    return records
+
+
+def _env(data_dir: str, **extra) -> Dict[str, str]:
+    env = {**os.environ, "DATA_DIR": data_dir, "DEBUG": "false", "PYTHONDONTWRITEBYTECODE": "1", **extra}
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def profile_import(module: str = "main") -> List[ImportRecord]:
+    with tempfile.TemporaryDirectory() as data_dir:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=BACKEND_DIR, env=_env(data_dir), capture_output=True, text=True, timeout=120,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_ready(timeout: float = 60.0) -> float:
+    """Milliseconds from `python main.py` to the first 200 on /health."""
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as data_dir:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "main.py"],
+            cwd=BACKEND_DIR, env=_env(data_dir, HOST="127.0.0.1", PORT=str(port)),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while time.perf_counter() - start < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"main.py exited with code {process.returncode}")
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                        if response.status == 200:
+                            return (time.perf_counter() - start) * 1000
+                except (urllib.error.URLError, ConnectionError, OSError):
+                    time.sleep(0.02)
+            raise TimeoutError(f"/health not ready after {timeout}s")
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def summarize(records: List[ImportRecord], module: str = "main", top: int = 15) -> Dict:
+    root = next((r for r in records if r.name == module and r.depth == 0), None)
+    # `import a.b` can log a.b twice (as a submodule, then from the importer): keep the largest
+    first_party_by_name: Dict[str, ImportRecord] = {}
+    for record in records:
+        if record.package in FIRST_PARTY and record.name != module:
+            known = first_party_by_name.get(record.name)
+            if known is None or record.cumulative_us > known.cumulative_us:
+                first_party_by_name[record.name] = record
+    first_party = sorted(first_party_by_name.values(), key=lambda r: r.cumulative_us, reverse=True)
+    packages: Dict[str, int] = {}
+    for record in records:
+        if record.package not in FIRST_PARTY and "." not in record.name:
+            packages[record.name] = max(packages.get(record.name, 0), record.cumulative_us)
+    return {
+        "import_ms": round(root.cumulative_us / 1000, 1) if root else None,
+        "modules": len(records),
+        "first_party": [asdict(r) for r in first_party[:top]],
+        "third_party": [
+            {"name": name, "cumulative_us": us}
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+        "eager_deferred": sorted({r.package for r in records if r.package in DEFERRED}),
+    }
+
+
+def format_report(summary: Dict, ready_ms: Optional[float] = None) -> str:
+    lines = [f"import main: {summary['import_ms']} ms ({summary['modules']} modules)"]
+    if ready_ms is not None:
+        lines.append(f"python main.py -> /health 200: {ready_ms:.0f} ms")
+    for title, rows in (("first-party modules", summary["first_party"]), ("third-party packages", summary["third_party"])):
+        lines += ["", f"{'slowest ' + title:<52} {'cumulative ms':>14}", "-" * 67]
+        lines += [f"{row['name']:<52} {row['cumulative_us'] / 1000:>14.1f}" for row in rows]
+    lines.append("")
+    if summary["eager_deferred"]:
+        lines.append(f"WARNING: imported at startup, should be lazy: {', '.join(summary['eager_deferred'])}")
+    else:
+        lines.append(f"Deferred until first use: {', '.join(DEFERRED)}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backend import-time profile")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table (default: 15)")
+    parser.add_argument("--json", help="Also write the summary to this file")
+    parser.add_argument("--no-ready", action="store_true", help="Skip the python main.py -> /health measurement")
+    parser.add_argument("--budget-ms", type=float, help="Exit 1 if importing main takes longer")
+    args = parser.parse_args()
+
+    summary = summarize(profile_import(), top=args.top)
+    ready_ms = None if args.no_ready else measure_ready()
+    summary["ready_ms"] = round(ready_ms, 1) if ready_ms is not None else None
+    print(format_report(summary, ready_ms))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+            f.write("\n")
+
+    over_budget = args.budget_ms is not None and (summary["import_ms"] or 0) > args.budget_ms
+    if over_budget:
+        print(f"\nImport over budget: {summary['import_ms']} ms > {args.budget_ms:.0f} ms")
+    return 1 if over_budget or summary["eager_deferred"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
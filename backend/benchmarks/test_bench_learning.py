@@ -0,0 +1,100 @@
+"""
+Benchmarks for the code that runs on every answer.
+
+Run with `make bench` (compares with benchmarks/baseline.json) or
+`make bench-baseline` (records a new baseline).
+"""
+import random
+from datetime import timedelta
+
+import pytest
+
+from .conftest import START, TOPICS, USER_ID
+
+pytest.importorskip("pytest_benchmark")
+
+
+def reference_loop() -> int:
+    total = 0
+    for i in range(2000):
+        total += i * i % 7
+    return total
+
+
+class TestCalibration:
+    """Pure-Python reference work: the comparison divides by it to factor out machine speed."""
+
+    def test_calibration_loop(self, benchmark):
+        benchmark(reference_loop)
+
+
+class TestEngine:
+    """LeanLearningEngine entry points, on a warmed-up user."""
+
+    def test_get_next_question(self, benchmark, engine):
+        benchmark(engine.get_next_question, USER_ID, "grammaire", 60)
+
+    def test_process_answer(self, benchmark, engine, clock):
+        """
+        Includes the state save (one SQLite commit per answer).
+
+        Each answer grows the user's history, so the number of rounds is
+        fixed: every run measures the same 200 answers.
+        """
+        rng = random.Random(3)
+
+        def answer():
+            clock.advance(minutes=1)
+            engine.process_answer(USER_ID, rng.choice(TOPICS), rng.random() < 0.75, rng.uniform(5, 40), 3)
+
+        benchmark.pedantic(answer, rounds=200, warmup_rounds=5)
+
+    def test_assess_user_state(self, benchmark, engine):
+        state = engine._get_user_state(USER_ID)
+        benchmark(engine._assess_user_state, state)
+
+
+class TestAlgorithms:
+    """Scheduling and scoring primitives."""
+
+    def test_fsrs_review(self, benchmark, engine):
+        from utils.fsrs_algorithm import FSRS
+
+        fsrs = FSRS()
+        card = engine._get_user_state(USER_ID)["fsrs_cards"]["grammaire"]
+        benchmark(fsrs.review, card, 3, START + timedelta(days=30))
+
+    def test_cognitive_load_assess(self, benchmark, detector):
+        benchmark(detector.assess)
+
+    def test_calculate_next_review(self, benchmark):
+        from utils.sm2_algorithm import calculate_next_review
+
+        benchmark(calculate_next_review, 4, 2.3, 12, 5, skip_days=2, consecutive_skips=1)
+
+    def test_calculate_xp_reward(self, benchmark):
+        from utils.sm2_algorithm import calculate_xp_reward
+
+        benchmark(calculate_xp_reward, True, "medium", 12, True)
+
+
+class TestTextMatching:
+    """Keyword grading of free-text answers."""
+
+    ANSWER = (
+        "Le subjonctif s'emploie après les verbes de volonté et de sentiment, "
+        "par exemple je veux qu'il vienne ou je suis content que tu sois là. "
+        "Il exprime une action envisagée plutôt qu'un fait réel, contrairement "
+        "à l'indicatif qui décrit des faits certains."
+    )
+
+    def test_fuzzy_keyword_exact(self, benchmark):
+        from databases.learning_db import fuzzy_keyword_match
+
+        assert benchmark(fuzzy_keyword_match, "indicatif", self.ANSWER)
+
+    def test_fuzzy_keyword_typo(self, benchmark):
+        """Worst case: no exact or stem match, falls through to Levenshtein."""
+        from databases.learning_db import fuzzy_keyword_match
+
+        benchmark(fuzzy_keyword_match, "conditionnel", self.ANSWER)
@@ -1,6 +1,7 @@
 """
 Configuration centrale pour le backend adaptatif
 """
+from pathlib import Path
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -10,6 +11,9 @@ class Settings(BaseSettings):
     
     # API Keys (à définir dans .env)
     OPENAI_API_KEY: Optional[str] = None
+    # Serveur compatible OpenAI (ex: http://127.0.0.1:8100/v1 pour le stub local)
+    OPENAI_BASE_URL: Optional[str] = None
+    OPENAI_MAX_RETRIES: int = 2  # Retries internes du SDK, en plus de tenacity
     
     # Algorithme SM-2++
     MIN_EASE_FACTOR: float = 1.3
@@ -17,7 +21,54 @@ class Settings(BaseSettings):
     SKIP_PENALTY: float = 0.1  # Pénalité par jour de skip
     MAX_SKIP_PENALTY: float = 1.0  # Max -1 point de qualité
     DIFFICULTY_DECAY_RATE: float = 0.05  # 5% de baisse par jour
-    
+
+    # Dossier des bases SQLite (learning, tasks, health, tutor_profiles)
+    DATA_DIR: str = str(Path(__file__).parent / "data")
+
+    # Cache du contenu IA généré (micro-leçons, mnémoniques, explications...)
+    CONTENT_CACHE_MAX_ENTRIES: int = 512
+    CONTENT_CACHE_TTL_SECONDS: int = 86400  # 24h
+
+    # Calibration de la difficulté par utilisateur (utils.optimal_difficulty)
+    CALIBRATION_CACHE_MAX_USERS: int = 1000  # Au-delà, les moins récents sont évincés de la mémoire
+    CALIBRATION_FLUSH_EVERY: int = 20  # Réponses entre deux écritures groupées
+
+    # Journal des réponses (databases.review_events), écrit par lots
+    REVIEW_LOG_BATCH_SIZE: int = 200
+    REVIEW_LOG_FLUSH_SECONDS: float = 5  # Lot écrit au plus tard à la réponse suivante après ce délai
+
+    # Snapshot analytics par utilisateur (GET /analytics), recalculé en arrière-plan
+    ANALYTICS_REFRESH_EVERY: int = 20  # Réponses nouvelles avant recalcul
+
+    # Messages de conversation langue : table chaude bornée, le reste compacté dans l'archive
+    MESSAGE_HOT_KEEP: int = 200  # Messages récents gardés par cours
+    MESSAGE_COMPACTION_EVERY: int = 100  # Messages écrits par cours entre deux compactions
+
+    # Exécution de code (pool de containers chauds)
+    CODE_RUNTIME: str = "docker"  # "docker" | "local" (sous-processus, tests/dev uniquement)
+    CODE_POOL_SIZE: int = 2  # Containers chauds par langage
+    CODE_POOL_MAX_RUNS: int = 20  # Recyclage après N exécutions
+    CODE_EXEC_TIMEOUT: int = 10  # Secondes
+    CODE_MAX_OUTPUT_BYTES: int = 512 * 1024  # Au-delà, sortie coupée et programme arrêté
+    CODE_BUILD_TIMEOUT: int = 30  # Secondes (compilation cpp/rust/go/java)
+    CODE_ARTIFACT_DIR: str = str(Path(__file__).parent / "data" / "build_artifacts")
+    CODE_ARTIFACT_MAX_ENTRIES: int = 256
+    CODE_TOOLCHAIN_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # Par compilateur (GOCACHE), puis vidé
+
+    # Terminal interactif (WebSocket -> container)
+    TERMINAL_MAX_SESSIONS: int = 200
+    TERMINAL_IDLE_TIMEOUT: int = 900  # Secondes sans entrée ni sortie avant arrêt du container
+    TERMINAL_FRAME_INTERVAL_MS: int = 10  # Fenêtre de regroupement des rafales de sortie
+    TERMINAL_MAX_FRAME_BYTES: int = 16 * 1024
+
+    # Traçage des requêtes (Server-Timing, /health/perf)
+    TRACING_ENABLED: bool = True
+    TRACING_SLOW_MS: float = 500  # Au-delà, la requête est gardée dans le ring buffer
+    TRACING_BUFFER_SIZE: int = 100
+    OTEL_EXPORTER_OTLP_ENDPOINT: Optional[str] = None  # ex: http://localhost:4318 (collecteur local)
+    OTEL_SERVICE_NAME: str = "newmars-backend"
+    METRICS_ENABLED: bool = True  # /metrics au format Prometheus
+
     # Serveur
     HOST: str = "0.0.0.0"
     PORT: int = 8000
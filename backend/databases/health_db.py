@@ -9,29 +9,47 @@ from typing import List, Dict, Any, Optional
 from pathlib import Path
 import logging
 
+from config import settings
+from databases.schema import Migration, SchemaGuard, create_indexes
+from utils import clock
+from utils.metrics import DB_OPERATION_DURATION, count_queries, time_methods
+from utils.tracing import trace_methods
+
 logger = logging.getLogger(__name__)
 
-DB_PATH = Path(__file__).parent.parent / "data" / "health.db"
+DB_PATH = Path(settings.DATA_DIR) / "health.db"
+
+# Migrations après le schéma initial (_init_db) : ne jamais modifier une migration livrée
+MIGRATIONS = [
+    Migration(2, "index par utilisateur et date", create_indexes(
+        ("idx_meals_user_date", "meals", "user_id, date"),
+        ("idx_meal_foods_meal", "meal_foods", "meal_id"),
+        ("idx_hydration_user_date", "hydration_entries", "user_id, date"),
+    )),
+]
 
 
+@trace_methods("db.health")
+@time_methods(DB_OPERATION_DURATION, "health")
 class HealthDatabase:
     """Manager pour la base de données santé"""
 
     def __init__(self, db_path: str = None):
         self.db_path = db_path or str(DB_PATH)
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self._init_db()
+        # Migrations appliquées au premier accès, pas à l'import
+        self._schema = SchemaGuard("health", [Migration(1, "schéma initial", self._init_db), *MIGRATIONS])
 
     def _get_connection(self):
-        """Crée une connexion à la base de données"""
-        conn = sqlite3.connect(self.db_path)
+        """Crée une connexion à la base de données (migrations appliquées au premier appel)"""
+        self._schema.ensure(self.db_path)
+        conn = count_queries(sqlite3.connect(self.db_path), "health")
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON")
         return conn
 
-    def _init_db(self):
-        """Initialise les tables"""
-        conn = self._get_connection()
+    def _init_db(self, conn: sqlite3.Connection):
+        """Schéma initial (migration 1)"""
         cursor = conn.cursor()
 
         # Table: weight_entries
@@ -116,7 +134,6 @@ class HealthDatabase:
         """)
 
         conn.commit()
-        conn.close()
         logger.info(f"✅ Health DB initialized at {self.db_path}")
 
     # ═══════════════════════════════════════════════════════════════
@@ -329,7 +346,7 @@ class HealthDatabase:
         cursor = conn.cursor()
 
         if not date:
-            date = datetime.now().strftime('%Y-%m-%d')
+            date = clock.now().strftime('%Y-%m-%d')
 
         cursor.execute("""
             SELECT
@@ -360,9 +377,9 @@ class HealthDatabase:
         cursor = conn.cursor()
 
         if not date:
-            date = datetime.now().strftime('%Y-%m-%d')
+            date = clock.now().strftime('%Y-%m-%d')
         if not time:
-            time = datetime.now().strftime('%H:%M')
+            time = clock.now().strftime('%H:%M')
 
         try:
             cursor.execute("""
@@ -387,7 +404,7 @@ class HealthDatabase:
         cursor = conn.cursor()
 
         if not date:
-            date = datetime.now().strftime('%Y-%m-%d')
+            date = clock.now().strftime('%Y-%m-%d')
 
         cursor.execute("""
             SELECT
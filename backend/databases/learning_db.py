@@ -5,14 +5,213 @@ Base: learning.db
 
 import sqlite3
 import json
+import contextvars
+import sys
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
 from pathlib import Path
 import logging
 
+from config import settings
+from databases.schema import Migration, SchemaGuard, add_column, chain, create_indexes, drop_indexes
+from utils import clock
+from utils.metrics import DB_OPERATION_DURATION, count_queries, time_methods
+from utils.tracing import trace_methods
+
 logger = logging.getLogger(__name__)
 
-DB_PATH = Path(__file__).parent.parent / "data" / "learning.db"
+DB_PATH = Path(settings.DATA_DIR) / "learning.db"
+
+def _create_analytics_table(conn: sqlite3.Connection):
+    """Snapshot analytics + compteur de réponses ; le watermark marque les réponses déjà prises en compte"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS learning_analytics (
+            user_id TEXT PRIMARY KEY,
+            snapshot TEXT,
+            answers INTEGER NOT NULL DEFAULT 0,
+            watermark INTEGER NOT NULL DEFAULT 0,
+            computed_at TIMESTAMP
+        )
+    """)
+    # Réponses déjà enregistrées : snapshot recalculé à la prochaine lecture ou réponse
+    conn.execute("""
+        INSERT OR IGNORE INTO learning_analytics (user_id, answers)
+        SELECT user_id, SUM(total_attempts) FROM session_performance_by_hour GROUP BY user_id
+    """)
+    conn.commit()
+
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+def _normalize_success_by_difficulty(conn: sqlite3.Connection):
+    """Compteurs par difficulté en colonnes, repris du JSON success_by_difficulty"""
+    for difficulty in DIFFICULTIES:
+        add_column(conn, "user_mastery", f"{difficulty}_correct", "INTEGER NOT NULL DEFAULT 0")
+        add_column(conn, "user_mastery", f"{difficulty}_total", "INTEGER NOT NULL DEFAULT 0")
+
+    updates = []
+    for row_id, raw in conn.execute("SELECT id, success_by_difficulty FROM user_mastery").fetchall():
+        try:
+            stats = json.loads(raw) if raw else {}
+        except json.JSONDecodeError:
+            continue
+        counters = [
+            int((stats.get(difficulty) or {}).get(key, 0) or 0) if isinstance(stats, dict) else 0
+            for difficulty in DIFFICULTIES for key in ("correct", "total")
+        ]
+        if any(counters):
+            updates.append((*counters, row_id))
+
+    conn.executemany("""
+        UPDATE user_mastery
+        SET easy_correct = ?, easy_total = ?, medium_correct = ?, medium_total = ?,
+            hard_correct = ?, hard_total = ?
+        WHERE id = ?
+    """, updates)
+    conn.commit()
+    if updates:
+        logger.info(f"🔄 Migration: success_by_difficulty repris pour {len(updates)} maîtrises")
+
+
+_SUCCESS_COUNTERS = ", ".join(f"{d}_correct, {d}_total" for d in DIFFICULTIES)
+
+
+def mastery_success_rates(mastery: Dict[str, Any]) -> Dict[str, float]:
+    """Success rates par difficulté depuis une ligne user_mastery (colonnes compteurs)"""
+    return {
+        difficulty: (mastery[f"{difficulty}_correct"] / mastery[f"{difficulty}_total"]
+                     if mastery[f"{difficulty}_total"] else 0.0)
+        for difficulty in DIFFICULTIES
+    }
+
+
+def sm2_review(ease_factor: float, interval: int, repetitions: int, quality: int) -> tuple:
+    """SM-2++ : (ease_factor, interval, repetitions, mastery_level) après une révision de qualité 0-5"""
+    ease_factor = max(1.3, ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
+
+    if quality < 3:
+        interval = 0
+        repetitions = 0
+    else:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = int(interval * ease_factor)
+        repetitions += 1
+
+    return ease_factor, interval, repetitions, min(100, repetitions * 15 + quality * 5)
+
+
+# Échéance de révision d'un concept (julianday) : dernière référence + mastery/10 jours (min 1).
+# Même texte dans l'index et dans les requêtes (databases.review_queue) pour que SQLite l'utilise.
+CONCEPT_DUE_SQL = "julianday(last_referenced) + max(1, mastery_level / 10.0)"
+
+
+def register_sql_functions(conn: sqlite3.Connection):
+    """Fonctions SQL utilisées par les requêtes de learning.db"""
+    conn.create_function("zlib_compress", 1, lambda text: zlib.compress(text.encode("utf-8")), deterministic=True)
+
+
+def _move_to_archive(conn: sqlite3.Connection, where: str, params: tuple) -> int:
+    """
+    Déplace les messages `where` de language_messages vers language_messages_archive
+    (contenu compressé zlib, id conservé) : deux requêtes ensemblistes, sans transit
+    des lignes par Python. La transaction est laissée à l'appelant.
+    """
+    register_sql_functions(conn)
+    conn.execute(f"""
+        INSERT OR REPLACE INTO language_messages_archive (id, course_id, user_id, role, content, timestamp)
+        SELECT id, course_id, user_id, role, zlib_compress(content), timestamp
+        FROM language_messages WHERE {where}
+    """, params)
+    return conn.execute(f"DELETE FROM language_messages WHERE {where}", params).rowcount
+
+
+def _create_message_archive(conn: sqlite3.Connection):
+    """Table froide des messages archivés ; reprise des lignes marquées archived = 1"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS language_messages_archive (
+            id INTEGER PRIMARY KEY,
+            course_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content BLOB NOT NULL,
+            timestamp TIMESTAMP
+        )
+    """)
+    # Pagination par curseur : WHERE course_id AND id < ? ORDER BY id DESC
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_language_archive_course ON language_messages_archive(course_id)")
+    moved = _move_to_archive(conn, "archived = 1", ())
+    conn.commit()
+    if moved:
+        logger.info(f"🔄 Migration: {moved} messages déplacés vers l'archive")
+
+
+def _mastery_dates_to_utc(conn: sqlite3.Connection):
+    """
+    user_mastery.next_review / last_reviewed : isoformat local ('T') -> texte SQL UTC.
+
+    Même format que vocabulary et que sql_now() : comparaisons texte et tri de la
+    file de révision cohérents. Le modificateur 'utc' de SQLite lit l'heure locale.
+    """
+    for column in ("next_review", "last_reviewed"):
+        converted = conn.execute(f"""
+            UPDATE user_mastery SET {column} = datetime({column}, 'utc')
+            WHERE {column} LIKE '____-__-__T%'
+        """).rowcount
+        if converted:
+            logger.info(f"🔄 Migration: {converted} user_mastery.{column} convertis en UTC")
+    conn.commit()
+
+
+# Migrations après le schéma initial (_init_db) : ne jamais modifier une migration livrée
+MIGRATIONS = [
+    Migration(2, "colonne user_mastery.success_by_difficulty", lambda conn: add_column(
+        conn, "user_mastery", "success_by_difficulty",
+        "TEXT DEFAULT '{\"easy\": {\"correct\": 0, \"total\": 0}, \"medium\": {\"correct\": 0, \"total\": 0}, \"hard\": {\"correct\": 0, \"total\": 0}}'"
+    )),
+    Migration(3, "index des listes triées", chain(
+        create_indexes(
+            # get_user_sessions : WHERE user_id ORDER BY started_at DESC
+            ("idx_sessions_user_started", "learning_sessions", "user_id, started_at"),
+            # get_recent_language_messages / archive_old_language_messages : WHERE course_id ORDER BY timestamp
+            ("idx_language_messages_course_ts", "language_messages", "course_id, timestamp"),
+            # get_ai_recent_calls : ORDER BY timestamp DESC
+            ("idx_ai_usage_timestamp", "ai_usage", "timestamp"),
+        ),
+        # Redondants : préfixe user_id de UNIQUE(user_id, topic_id) et de idx_sessions_user_started
+        drop_indexes("idx_mastery_user", "idx_sessions_user"),
+    )),
+    Migration(4, "table learning_analytics (snapshot analytics par utilisateur)", _create_analytics_table),
+    # La colonne JSON success_by_difficulty n'est plus écrite après cette migration
+    Migration(5, "compteurs user_mastery par difficulté", _normalize_success_by_difficulty),
+    # File de révision (databases.review_queue) : WHERE user_id ORDER BY next_review
+    Migration(6, "index des échéances de révision", create_indexes(
+        ("idx_mastery_user_next_review", "user_mastery", "user_id, next_review"),
+        ("idx_vocabulary_user_next_review", "vocabulary", "user_id, next_review"),
+        ("idx_concepts_course_due", "concepts", f"course_id, {CONCEPT_DUE_SQL}"),
+    )),
+    # Pagination par curseur (iter_language_messages, iter_vocabulary) : WHERE ... AND id < ? ORDER BY id DESC,
+    # l'index se termine implicitement par le rowid
+    Migration(7, "index de pagination messages et vocabulaire", create_indexes(
+        ("idx_language_messages_course_archived", "language_messages", "course_id, archived"),
+        ("idx_vocabulary_course_user", "vocabulary", "course_id, user_id"),
+    )),
+    # language_messages ne garde que les messages chauds (archived = 0), voir archive_old_language_messages
+    Migration(8, "table language_messages_archive (messages archivés compressés)", _create_message_archive),
+    # Écrites par clock.to_sql() depuis cette migration
+    Migration(9, "échéances user_mastery en texte SQL UTC", _mastery_dates_to_utc),
+]
+
+# Lignes lues par page dans les itérateurs paginés (une connexion courte par page)
+KEYSET_PAGE_SIZE = 500
+
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -121,23 +320,133 @@ def fuzzy_keyword_match(keyword: str, text: str, threshold: float = 0.75) -> boo
     return False
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# 📊 ANALYTICS - Résultats par défaut et moment optimal
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _unknown_chronotype(data_points: int) -> Dict[str, Any]:
+    """Chronotype tant qu'il n'y a pas assez de données"""
+    return {
+        "chronotype": "unknown",
+        "best_hours": [],
+        "worst_hours": [],
+        "optimal_session_length": 25,
+        "confidence": 0.0,
+        "data_points": data_points,
+        "recommendation": "Continue à pratiquer pour que je puisse détecter tes heures optimales!"
+    }
+
+
+def _mixed_format(style_scores: Dict[str, float], confidence: float) -> Dict[str, Any]:
+    """Format recommandé tant que le style d'apprentissage n'est pas détecté"""
+    return {
+        "recommended_format": "mixed",
+        "style_scores": style_scores,
+        "confidence": confidence,
+        "formats": ["text", "code", "diagram"],
+        "suggestion": "Continue à pratiquer pour que je détecte ton style optimal!"
+    }
+
+
+def optimal_learning_time(best_hours: List[int], worst_hours: List[int], confidence: float) -> Dict[str, Any]:
+    """Est-ce un bon moment pour apprendre, d'après les heures d'un chronotype (sans accès base)"""
+    current_hour = clock.now().hour
+
+    if confidence < 0.3:
+        return {
+            "is_optimal": True,  # Pas assez de données, ne pas décourager
+            "current_hour": current_hour,
+            "message": "Continue à pratiquer pour que je détecte tes heures optimales!",
+            "suggestion": None
+        }
+
+    if current_hour in best_hours:
+        return {
+            "is_optimal": True,
+            "current_hour": current_hour,
+            "message": f"🌟 C'est ton meilleur moment pour apprendre! ({current_hour}h)",
+            "suggestion": None
+        }
+    elif current_hour in worst_hours:
+        best_hour = best_hours[0] if best_hours else 10
+        return {
+            "is_optimal": False,
+            "current_hour": current_hour,
+            "message": f"😴 Ce n'est pas ton heure la plus productive ({current_hour}h)",
+            "suggestion": f"Tu serais plus efficace vers {best_hour}h"
+        }
+    else:
+        return {
+            "is_optimal": True,
+            "current_hour": current_hour,
+            "message": "Bon moment pour apprendre!",
+            "suggestion": None
+        }
+
+
+@trace_methods("db.learning")
+@time_methods(DB_OPERATION_DURATION, "learning")
 class LearningDatabase:
     """Manager pour la base de données apprentissage"""
 
     def __init__(self, db_path: str = None):
         self.db_path = db_path or str(DB_PATH)
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self._init_db()
+        # Migrations appliquées au premier accès, pas à l'import
+        self._schema = SchemaGuard("learning", [Migration(1, "schéma initial", self._init_db), *MIGRATIONS])
+        # Tâches d'arrière-plan (snapshots analytics, compaction des messages) : thread créé au premier besoin
+        self._background_lock = threading.Lock()
+        self._background_executor: Optional[ThreadPoolExecutor] = None
+        self._background_jobs: Dict[tuple, Future] = {}
+        self._hot_message_writes: Dict[str, int] = {}
 
     def _get_connection(self):
-        """Crée une connexion à la base de données"""
-        conn = sqlite3.connect(self.db_path)
+        """Crée une connexion à la base de données (migrations appliquées au premier appel)"""
+        self._schema.ensure(self.db_path)
+        conn = count_queries(sqlite3.connect(self.db_path), "learning")
         conn.row_factory = sqlite3.Row
         return conn
 
-    def _init_db(self):
-        """Initialise les tables"""
-        conn = self._get_connection()
+    def _submit_background(self, key: tuple, job, *args) -> Future:
+        """Exécute job(*args) sur le thread d'arrière-plan ; une seule tâche en cours par clé"""
+        with self._background_lock:
+            running = self._background_jobs.get(key)
+            if running is not None:
+                return running
+            if self._background_executor is None:
+                self._background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="learning-db")
+            # Contexte copié : la tâche voit la même horloge (utils.clock) que l'appelant
+            future = self._background_executor.submit(
+                contextvars.copy_context().run, self._run_background, key, job, *args
+            )
+            self._background_jobs[key] = future
+            return future
+
+    def _run_background(self, key: tuple, job, *args):
+        try:
+            job(*args)
+        except Exception as e:
+            logger.error(f"❌ Erreur tâche d'arrière-plan {key}: {e}")
+        finally:
+            with self._background_lock:
+                self._background_jobs.pop(key, None)
+
+    def wait_background_jobs(self, timeout: Optional[float] = None) -> None:
+        """Attend la fin des tâches d'arrière-plan en cours puis arrête le thread (tests, arrêt)"""
+        with self._background_lock:
+            futures = list(self._background_jobs.values())
+        for future in futures:
+            future.result(timeout=timeout)
+        with self._background_lock:
+            # Recréé à la prochaine tâche
+            executor = None if self._background_jobs else self._background_executor
+            if executor is not None:
+                self._background_executor = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _init_db(self, conn: sqlite3.Connection):
+        """Schéma initial (migration 1)"""
         cursor = conn.cursor()
 
         # Table: concepts (Knowledge Base)
@@ -311,12 +620,6 @@ class LearningDatabase:
             )
         """)
 
-        # Migration: ajouter la colonne si elle n'existe pas
-        try:
-            cursor.execute("ALTER TABLE user_mastery ADD COLUMN success_by_difficulty TEXT DEFAULT '{\"easy\": {\"correct\": 0, \"total\": 0}, \"medium\": {\"correct\": 0, \"total\": 0}, \"hard\": {\"correct\": 0, \"total\": 0}}'")
-        except sqlite3.OperationalError:
-            pass  # La colonne existe déjà
-
         # Index pour recherche par user_id
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_mastery_user ON user_mastery(user_id)
@@ -520,7 +823,6 @@ class LearningDatabase:
         """)
 
         conn.commit()
-        conn.close()
         logger.info(f"✅ Learning DB initialized at {self.db_path}")
 
     # ═══════════════════════════════════════════════════════════════
@@ -694,6 +996,7 @@ class LearningDatabase:
 
             conn.commit()
             conn.close()
+            self._count_hot_messages(course_id, 1)
             return True
         except Exception as e:
             logger.error(f"Error saving language message: {e}")
@@ -718,46 +1021,126 @@ class LearningDatabase:
 
         conn.commit()
         conn.close()
+        self._count_hot_messages(course_id, saved_count)
         return saved_count
 
+    def _count_hot_messages(self, course_id: str, count: int):
+        """Compaction en arrière-plan tous les MESSAGE_COMPACTION_EVERY messages écrits par cours"""
+        with self._background_lock:
+            written = self._hot_message_writes.get(course_id, 0) + count
+            due = written >= settings.MESSAGE_COMPACTION_EVERY
+            self._hot_message_writes[course_id] = 0 if due else written
+        if due:
+            self._submit_background(
+                ("compact", course_id), self.archive_old_language_messages, course_id, settings.MESSAGE_HOT_KEEP
+            )
+
     def archive_old_language_messages(self, course_id: str, keep_recent: int = 100) -> int:
-        """Archive les anciens messages"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        """
+        Déplace vers l'archive compressée tout sauf les `keep_recent` messages les plus récents.
 
-        cursor.execute("""
-            UPDATE language_messages
-            SET archived = 1
-            WHERE course_id = ? AND id NOT IN (
+        La borne est lue dans l'index (course_id, archived, id) en keep_recent pas,
+        puis les messages plus anciens sont déplacés en bloc (une transaction).
+        """
+        conn = self._get_connection()
+        try:
+            row = conn.execute("""
                 SELECT id FROM language_messages
-                WHERE course_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            )
-        """, (course_id, course_id, keep_recent))
-
-        archived_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+                WHERE course_id = ? AND archived = 0
+                ORDER BY id DESC
+                LIMIT 1 OFFSET ?
+            """, (course_id, keep_recent)).fetchone()
+            if row is None:
+                return 0
+            archived_count = _move_to_archive(conn, "course_id = ? AND archived = 0 AND id <= ?", (course_id, row["id"]))
+            conn.commit()
+        finally:
+            conn.close()
 
         return archived_count
 
     def get_recent_language_messages(self, course_id: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Récupère les messages récents"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        return list(self.iter_language_messages(course_id, archived=False, limit=limit))
 
-        cursor.execute("""
-            SELECT * FROM language_messages
-            WHERE course_id = ? AND archived = 0
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (course_id, limit))
+    def get_archived_language_messages(
+        self,
+        course_id: str,
+        limit: int = 100,
+        before_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Récupère l'historique archivé, du plus récent au plus ancien"""
+        return list(self.iter_language_messages(course_id, archived=True, before_id=before_id, limit=limit))
 
-        rows = cursor.fetchall()
-        conn.close()
+    def iter_language_messages(
+        self,
+        course_id: str,
+        archived: bool = False,
+        before_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Messages du plus récent au plus ancien, lus page par page (mémoire constante).
 
-        return [dict(row) for row in rows]
+        Args:
+            before_id: Curseur : messages d'id strictement inférieur
+            limit: Nombre maximum de messages (None = tous)
+        """
+        if not archived:
+            return self._iter_keyset(
+                "SELECT * FROM language_messages WHERE course_id = ? AND archived = 0",
+                (course_id,), before_id, limit
+            )
+        return self._iter_archived_messages(course_id, before_id, limit)
+
+    def _iter_archived_messages(
+        self,
+        course_id: str,
+        before_id: Optional[int],
+        limit: Optional[int]
+    ) -> Iterator[Dict[str, Any]]:
+        rows = self._iter_keyset(
+            """
+            SELECT id, course_id, user_id, role, content, timestamp, 1 AS archived
+            FROM language_messages_archive WHERE course_id = ?
+            """,
+            (course_id,), before_id, limit
+        )
+        for message in rows:
+            message["content"] = zlib.decompress(message["content"]).decode("utf-8")
+            yield message
+
+    def _iter_keyset(
+        self,
+        query: str,
+        params: tuple,
+        before_id: Optional[int],
+        limit: Optional[int]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Pagination par curseur (id décroissant) : chaque page est une recherche
+        d'index `id < curseur`, au même coût quelle que soit la profondeur
+        (contrairement à OFFSET). Aucune connexion n'est gardée entre deux pages.
+        """
+        cursor_id = before_id if before_id is not None else sys.maxsize
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = KEYSET_PAGE_SIZE if remaining is None else min(KEYSET_PAGE_SIZE, remaining)
+            conn = self._get_connection()
+            try:
+                rows = conn.execute(
+                    f"{query} AND id < ? ORDER BY id DESC LIMIT ?", (*params, cursor_id, size)
+                ).fetchall()
+            finally:
+                conn.close()
+
+            for row in rows:
+                yield dict(row)
+            if len(rows) < size:
+                return
+            cursor_id = rows[-1]["id"]
+            if remaining is not None:
+                remaining -= len(rows)
 
     def get_language_message_stats(self, course_id: str) -> Dict[str, Any]:
         """Statistiques sur les messages"""
@@ -766,17 +1149,14 @@ class LearningDatabase:
 
         cursor.execute("""
             SELECT
-                COUNT(*) as total,
-                SUM(CASE WHEN archived = 0 THEN 1 ELSE 0 END) as recent,
-                SUM(CASE WHEN archived = 1 THEN 1 ELSE 0 END) as archived
-            FROM language_messages
-            WHERE course_id = ?
-        """, (course_id,))
+                (SELECT COUNT(*) FROM language_messages WHERE course_id = ? AND archived = 0) as recent,
+                (SELECT COUNT(*) FROM language_messages_archive WHERE course_id = ?) as archived
+        """, (course_id, course_id))
 
-        row = cursor.fetchone()
+        row = dict(cursor.fetchone())
         conn.close()
 
-        return dict(row) if row else {}
+        return {"total": row["recent"] + row["archived"], **row}
 
     # ═══════════════════════════════════════════════════════════════
     # VOCABULARY (SM-2++)
@@ -791,7 +1171,7 @@ class LearningDatabase:
             cursor.execute("""
                 INSERT INTO vocabulary
                 (course_id, user_id, word, translation, pronunciation, example, context, next_review)
-                VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 course_id,
                 user_id,
@@ -800,6 +1180,7 @@ class LearningDatabase:
                 word_data.get('pronunciation'),
                 word_data.get('example'),
                 word_data.get('context'),
+                clock.sql_now(),
             ))
 
             conn.commit()
@@ -812,20 +1193,20 @@ class LearningDatabase:
 
     def get_vocabulary(self, course_id: str, user_id: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Récupère le vocabulaire d'un cours"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        return list(self.iter_vocabulary(course_id, user_id, limit=limit))
 
-        cursor.execute("""
-            SELECT * FROM vocabulary
-            WHERE course_id = ? AND user_id = ?
-            ORDER BY added_at DESC
-            LIMIT ?
-        """, (course_id, user_id, limit))
-
-        rows = cursor.fetchall()
-        conn.close()
-
-        return [dict(row) for row in rows]
+    def iter_vocabulary(
+        self,
+        course_id: str,
+        user_id: str,
+        before_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Vocabulaire du plus récent au plus ancien (ordre d'ajout), lu page par page"""
+        return self._iter_keyset(
+            "SELECT * FROM vocabulary WHERE course_id = ? AND user_id = ?",
+            (course_id, user_id), before_id, limit
+        )
 
     def get_due_vocabulary(self, course_id: str, user_id: str) -> List[Dict[str, Any]]:
         """Récupère les mots à réviser (SM-2++)"""
@@ -835,10 +1216,10 @@ class LearningDatabase:
         cursor.execute("""
             SELECT * FROM vocabulary
             WHERE course_id = ? AND user_id = ?
-            AND (next_review IS NULL OR next_review <= datetime('now'))
+            AND (next_review IS NULL OR next_review <= ?)
             ORDER BY next_review ASC
             LIMIT 20
-        """, (course_id, user_id))
+        """, (course_id, user_id, clock.sql_now()))
 
         rows = cursor.fetchall()
         conn.close()
@@ -847,52 +1228,69 @@ class LearningDatabase:
 
     def update_vocabulary_review(self, word_id: str, quality: int) -> bool:
         """Met à jour un mot après révision (SM-2++)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        return bool(self.update_vocabulary_reviews([(word_id, quality)]))
 
-        cursor.execute("SELECT * FROM vocabulary WHERE id = ?", (word_id,))
-        word = cursor.fetchone()
-
-        if not word:
-            conn.close()
-            return False
-
-        # Calcul SM-2++
-        ease_factor = word['ease_factor']
-        interval = word['interval']
-        repetitions = word['repetitions']
-
-        ease_factor = max(1.3, ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
-
-        if quality < 3:
-            interval = 0
-            repetitions = 0
-        else:
-            if repetitions == 0:
-                interval = 1
-            elif repetitions == 1:
-                interval = 6
-            else:
-                interval = int(interval * ease_factor)
-            repetitions += 1
+    def update_vocabulary_reviews(self, reviews: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Applique un lot de révisions (word_id, quality) : une lecture, un executemany,
+        une transaction. Un mot révisé plusieurs fois est mis à jour dans l'ordre du lot.
 
-        mastery_level = min(100, repetitions * 15 + quality * 5)
-        next_review = datetime.now() + timedelta(days=interval)
+        Returns:
+            Nouveau planning de chaque révision appliquée (mots inconnus ignorés)
+        """
+        ids = sorted({str(word_id) for word_id, _ in reviews})
+        if not ids:
+            return []
 
-        cursor.execute("""
-            UPDATE vocabulary
-            SET ease_factor = ?,
-                interval = ?,
-                repetitions = ?,
-                mastery_level = ?,
-                next_review = ?,
-                last_reviewed = datetime('now')
-            WHERE id = ?
-        """, (ease_factor, interval, repetitions, mastery_level, next_review, word_id))
+        conn = self._get_connection()
+        try:
+            state = {}
+            for start in range(0, len(ids), 500):  # Sous la limite de variables SQLite
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for row in conn.execute(f"""
+                    SELECT id, ease_factor, interval, repetitions FROM vocabulary WHERE id IN ({placeholders})
+                """, chunk):
+                    state[str(row["id"])] = (row["ease_factor"], row["interval"], row["repetitions"])
+
+            now = clock.now()
+            reviewed_at = clock.sql_now()
+            schedule = []
+            for word_id, quality in reviews:
+                word_id = str(word_id)
+                if word_id not in state:
+                    continue
+                ease_factor, interval, repetitions, mastery_level = sm2_review(*state[word_id], quality)
+                state[word_id] = (ease_factor, interval, repetitions)
+                schedule.append({
+                    "word_id": word_id,
+                    "quality": quality,
+                    "ease_factor": ease_factor,
+                    "interval": interval,
+                    "repetitions": repetitions,
+                    "mastery_level": mastery_level,
+                    "next_review": clock.to_sql(now + timedelta(days=interval)),
+                })
+
+            conn.executemany("""
+                UPDATE vocabulary
+                SET ease_factor = ?,
+                    interval = ?,
+                    repetitions = ?,
+                    mastery_level = ?,
+                    next_review = ?,
+                    last_reviewed = ?
+                WHERE id = ?
+            """, [
+                (item["ease_factor"], item["interval"], item["repetitions"], item["mastery_level"],
+                 item["next_review"], reviewed_at, item["word_id"])
+                for item in schedule
+            ])
+            conn.commit()
+        finally:
+            conn.close()
 
-        conn.commit()
-        conn.close()
-        return True
+        return schedule
 
     def get_vocabulary_stats(self, course_id: str, user_id: str) -> Dict[str, Any]:
         """Statistiques sur le vocabulaire"""
@@ -904,10 +1302,10 @@ class LearningDatabase:
                 COUNT(*) as total,
                 AVG(mastery_level) as avg_mastery,
                 SUM(CASE WHEN mastery_level >= 80 THEN 1 ELSE 0 END) as mastered,
-                COUNT(CASE WHEN next_review <= datetime('now') THEN 1 END) as due_for_review
+                COUNT(CASE WHEN next_review <= ? THEN 1 END) as due_for_review
             FROM vocabulary
             WHERE course_id = ? AND user_id = ?
-        """, (course_id, user_id))
+        """, (clock.sql_now(), course_id, user_id))
 
         row = cursor.fetchone()
         conn.close()
@@ -967,7 +1365,7 @@ class LearningDatabase:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = clock.now().strftime("%Y-%m-%d")
 
         try:
             # Enregistrer l'utilisation
@@ -1021,7 +1419,7 @@ class LearningDatabase:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = clock.now().strftime("%Y-%m-%d")
 
         cursor.execute("""
             SELECT * FROM ai_daily_summary WHERE date = ?
@@ -1062,7 +1460,7 @@ class LearningDatabase:
 
     def get_ai_usage_this_week(self) -> Dict[str, Any]:
         """Récupère les stats de la semaine en cours"""
-        today = datetime.now()
+        today = clock.now()
         week_start = (today - timedelta(days=today.weekday())).strftime("%Y-%m-%d")
         today_str = today.strftime("%Y-%m-%d")
 
@@ -1084,7 +1482,7 @@ class LearningDatabase:
 
     def get_ai_usage_this_month(self) -> Dict[str, Any]:
         """Récupère les stats du mois en cours"""
-        today = datetime.now()
+        today = clock.now()
         month_start = today.replace(day=1).strftime("%Y-%m-%d")
         today_str = today.strftime("%Y-%m-%d")
 
@@ -1153,7 +1551,7 @@ class LearningDatabase:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        start_date = (clock.now() - timedelta(days=days)).strftime("%Y-%m-%d")
 
         cursor.execute("""
             SELECT
@@ -1283,7 +1681,7 @@ class LearningDatabase:
                 "course_id": course_id,
                 "topic_id": topic_id,
                 "topic_name": topic_name,
-                "started_at": datetime.now().isoformat(),
+                "started_at": clock.now().isoformat(),
                 "questions_answered": 0,
                 "correct_answers": 0,
                 "xp_earned": 0,
@@ -1411,7 +1809,7 @@ class LearningDatabase:
         """Termine une session"""
         return self.update_session(session_id, {
             "status": "completed",
-            "ended_at": datetime.now().isoformat()
+            "ended_at": clock.now().isoformat()
         })
 
     def get_user_sessions(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
@@ -1448,14 +1846,7 @@ class LearningDatabase:
 
         if row:
             conn.close()
-            result = dict(row)
-            # Parser success_by_difficulty JSON
-            if result.get("success_by_difficulty"):
-                try:
-                    result["success_by_difficulty"] = json.loads(result["success_by_difficulty"])
-                except json.JSONDecodeError:
-                    result["success_by_difficulty"] = {"easy": {"correct": 0, "total": 0}, "medium": {"correct": 0, "total": 0}, "hard": {"correct": 0, "total": 0}}
-            return result
+            return self._with_success_counters(dict(row))
 
         # Créer une nouvelle entrée
         cursor.execute("""
@@ -1474,9 +1865,16 @@ class LearningDatabase:
         conn.close()
 
         logger.info(f"✅ Mastery créé: user={user_id}, topic={topic_id}")
-        result = dict(row)
-        result["success_by_difficulty"] = {"easy": {"correct": 0, "total": 0}, "medium": {"correct": 0, "total": 0}, "hard": {"correct": 0, "total": 0}}
-        return result
+        return self._with_success_counters(dict(row))
+
+    @staticmethod
+    def _with_success_counters(mastery: Dict[str, Any]) -> Dict[str, Any]:
+        """success_by_difficulty (format historique) reconstruit depuis les colonnes compteurs"""
+        mastery["success_by_difficulty"] = {
+            difficulty: {"correct": mastery[f"{difficulty}_correct"], "total": mastery[f"{difficulty}_total"]}
+            for difficulty in DIFFICULTIES
+        }
+        return mastery
 
     def update_mastery_data(
         self,
@@ -1522,72 +1920,50 @@ class LearningDatabase:
         Returns:
             Dict avec les success rates: {"easy": 0.8, "medium": 0.5, "hard": 0.2}
         """
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"Difficulté inconnue: {difficulty}")
+
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        # Récupérer les données actuelles
-        cursor.execute("""
-            SELECT success_by_difficulty FROM user_mastery
+        # Incrément atomique (pas de lecture-modification-écriture côté Python)
+        cursor.execute(f"""
+            UPDATE user_mastery
+            SET {difficulty}_total = {difficulty}_total + 1,
+                {difficulty}_correct = {difficulty}_correct + ?,
+                updated_at = CURRENT_TIMESTAMP
             WHERE user_id = ? AND topic_id = ?
-        """, (user_id, topic_id))
+        """, (1 if is_correct else 0, user_id, topic_id))
 
-        row = cursor.fetchone()
-        if not row:
+        if cursor.rowcount == 0:
             conn.close()
             return {"easy": 0.0, "medium": 0.0, "hard": 0.0}
 
-        # Parser le JSON
-        try:
-            stats = json.loads(row["success_by_difficulty"]) if row["success_by_difficulty"] else {}
-        except json.JSONDecodeError:
-            stats = {}
-
-        # Initialiser si nécessaire
-        default_stat = {"correct": 0, "total": 0}
-        for d in ["easy", "medium", "hard"]:
-            if d not in stats:
-                stats[d] = default_stat.copy()
-
-        # Mettre à jour
-        stats[difficulty]["total"] += 1
-        if is_correct:
-            stats[difficulty]["correct"] += 1
-
-        # Sauvegarder
-        cursor.execute("""
-            UPDATE user_mastery
-            SET success_by_difficulty = ?, updated_at = CURRENT_TIMESTAMP
+        # Relu dans la même transaction
+        cursor.execute(f"""
+            SELECT {_SUCCESS_COUNTERS} FROM user_mastery
             WHERE user_id = ? AND topic_id = ?
-        """, (json.dumps(stats), user_id, topic_id))
+        """, (user_id, topic_id))
+        rates = mastery_success_rates(cursor.fetchone())
 
         conn.commit()
         conn.close()
 
-        # Calculer les success rates
-        success_rates = {}
-        for d in ["easy", "medium", "hard"]:
-            total = stats[d].get("total", 0)
-            correct = stats[d].get("correct", 0)
-            success_rates[d] = correct / total if total > 0 else 0.0
-
-        logger.debug(f"📊 Success by difficulty updated: {success_rates}")
-        return success_rates
+        logger.debug(f"📊 Success by difficulty updated: {rates}")
+        return rates
 
     def get_success_rates_by_difficulty(self, user_id: str, topic_id: str) -> Dict[str, float]:
-        """Récupère les success rates par difficulté"""
-        mastery = self.get_or_create_mastery(user_id, topic_id)
-        stats = mastery.get("success_by_difficulty", {})
-
-        success_rates = {}
-        for d in ["easy", "medium", "hard"]:
-            if d in stats:
-                total = stats[d].get("total", 0)
-                correct = stats[d].get("correct", 0)
-                success_rates[d] = correct / total if total > 0 else 0.0
-            else:
-                success_rates[d] = 0.0
+        """Récupère les success rates par difficulté (lecture seule, 0.0 si pas de maîtrise)"""
+        conn = self._get_connection()
+        row = conn.execute(f"""
+            SELECT {_SUCCESS_COUNTERS} FROM user_mastery
+            WHERE user_id = ? AND topic_id = ?
+        """, (user_id, topic_id)).fetchone()
+        conn.close()
 
-        return success_rates
+        if not row:
+            return {difficulty: 0.0 for difficulty in DIFFICULTIES}
+        return mastery_success_rates(row)
 
     def get_user_all_mastery(self, user_id: str) -> List[Dict[str, Any]]:
         """Récupère toutes les données de maîtrise d'un utilisateur"""
@@ -1613,10 +1989,10 @@ class LearningDatabase:
         cursor.execute("""
             SELECT * FROM user_mastery
             WHERE user_id = ?
-            AND (next_review IS NULL OR next_review <= datetime('now'))
+            AND (next_review IS NULL OR next_review <= ?)
             ORDER BY next_review ASC
             LIMIT ?
-        """, (user_id, limit))
+        """, (user_id, clock.sql_now(), limit))
 
         rows = cursor.fetchall()
         conn.close()
@@ -1682,7 +2058,7 @@ class LearningDatabase:
         Enregistre la performance d'une réponse pour l'analyse chronotype.
         Appelé après chaque réponse pour construire le profil temporel.
         """
-        now = datetime.now()
+        now = clock.now()
         hour = now.hour
         day_of_week = now.weekday()  # 0=Lundi, 6=Dimanche
 
@@ -1708,9 +2084,23 @@ class LearningDatabase:
             1 if is_correct else 0, response_time, mastery_change
         ))
 
+        # Compteur de réponses du snapshot analytics (même transaction)
+        cursor.execute("""
+            INSERT INTO learning_analytics (user_id, answers) VALUES (?, 1)
+            ON CONFLICT(user_id) DO UPDATE SET answers = answers + 1
+        """, (user_id,))
+        cursor.execute("""
+            SELECT answers - watermark, computed_at FROM learning_analytics WHERE user_id = ?
+        """, (user_id,))
+        pending, computed_at = cursor.fetchone()
+
         conn.commit()
         conn.close()
 
+        # Premier snapshot dès la première réponse, puis tous les ANALYTICS_REFRESH_EVERY
+        if computed_at is None or pending >= settings.ANALYTICS_REFRESH_EVERY:
+            self.schedule_analytics_refresh(user_id)
+
     def calculate_chronotype(self, user_id: str) -> Dict[str, Any]:
         """
         Calcule le chronotype de l'utilisateur basé sur ses performances.
@@ -1747,15 +2137,7 @@ class LearningDatabase:
 
         if len(rows) < 3:
             # Pas assez de données
-            return {
-                "chronotype": "unknown",
-                "best_hours": [],
-                "worst_hours": [],
-                "optimal_session_length": 25,
-                "confidence": 0.0,
-                "data_points": sum(r["attempts"] for r in rows) if rows else 0,
-                "recommendation": "Continue à pratiquer pour que je puisse détecter tes heures optimales!"
-            }
+            return _unknown_chronotype(sum(r["attempts"] for r in rows) if rows else 0)
 
         # Calculer le score de performance pour chaque heure
         # Score = (success_rate * 0.5) + (mastery_per_attempt * 0.3) + (speed_score * 0.2)
@@ -1887,43 +2269,106 @@ class LearningDatabase:
                 "suggestion": None ou "Tu serais 15% plus efficace à 10h"
             }
         """
-        current_hour = datetime.now().hour
         chronotype = self.get_chronotype(user_id)
 
-        if not chronotype or chronotype.get("confidence_score", 0) < 0.3:
-            return {
-                "is_optimal": True,  # Pas assez de données, ne pas décourager
-                "current_hour": current_hour,
-                "message": "Continue à pratiquer pour que je détecte tes heures optimales!",
-                "suggestion": None
-            }
+        if not chronotype:
+            return optimal_learning_time([], [], 0.0)
+        return optimal_learning_time(
+            chronotype.get("best_hours", []),
+            chronotype.get("worst_hours", []),
+            chronotype.get("confidence_score", 0)
+        )
 
-        best_hours = chronotype.get("best_hours", [])
-        worst_hours = chronotype.get("worst_hours", [])
+    # ═══════════════════════════════════════════════════════════════════════════
+    # 📊 ANALYTICS SNAPSHOT - Dashboard précalculé
+    # ═══════════════════════════════════════════════════════════════════════════
 
-        if current_hour in best_hours:
-            return {
-                "is_optimal": True,
-                "current_hour": current_hour,
-                "message": f"🌟 C'est ton meilleur moment pour apprendre! ({current_hour}h)",
-                "suggestion": None
-            }
-        elif current_hour in worst_hours:
-            best_hour = best_hours[0] if best_hours else 10
-            return {
-                "is_optimal": False,
-                "current_hour": current_hour,
-                "message": f"😴 Ce n'est pas ton heure la plus productive ({current_hour}h)",
-                "suggestion": f"Tu serais plus efficace vers {best_hour}h"
+    def get_analytics_snapshot(self, user_id: str) -> Dict[str, Any]:
+        """
+        Snapshot analytics de l'utilisateur : une seule lecture, aucune écriture.
+
+        Returns:
+            {
+                "chronotype": {...}, "learning_style": {...}, "stats": {...}, "top_topics": [...],
+                "freshness": {"computed_at": "...", "pending_answers": 3}
             }
+        """
+        conn = self._get_connection()
+        row = conn.execute("""
+            SELECT snapshot, answers, watermark, computed_at FROM learning_analytics WHERE user_id = ?
+        """, (user_id,)).fetchone()
+        conn.close()
+
+        pending = row["answers"] - row["watermark"] if row else 0
+        if row and row["snapshot"]:
+            snapshot = json.loads(row["snapshot"])
         else:
-            return {
-                "is_optimal": True,
-                "current_hour": current_hour,
-                "message": "Bon moment pour apprendre!",
-                "suggestion": None
+            # Réponses antérieures au snapshot (migration) : calculé en arrière-plan
+            if pending:
+                self.schedule_analytics_refresh(user_id)
+            snapshot = {
+                "chronotype": _unknown_chronotype(pending),
+                "learning_style": _mixed_format(
+                    {"visual": 0.25, "auditory": 0.25, "reading": 0.25, "kinesthetic": 0.25}, 0
+                ),
+                "stats": {"topics_studied": 0, "average_mastery": 0, "total_attempts": 0, "overall_accuracy": 0.0},
+                "top_topics": []
             }
 
+        snapshot["freshness"] = {
+            "computed_at": row["computed_at"] if row else None,
+            "pending_answers": pending
+        }
+        return snapshot
+
+    def refresh_analytics_snapshot(self, user_id: str) -> Dict[str, Any]:
+        """Recalcule et enregistre le snapshot analytics (chronotype, style, progression)"""
+        conn = self._get_connection()
+        row = conn.execute("SELECT answers FROM learning_analytics WHERE user_id = ?", (user_id,)).fetchone()
+        conn.close()
+        # Lu avant le calcul : les réponses arrivées pendant le calcul restent en attente
+        watermark = row["answers"] if row else 0
+
+        chronotype = self.calculate_chronotype(user_id)
+        learning_style = self.get_recommended_format(user_id)
+        all_mastery = self.get_user_all_mastery(user_id)
+
+        total_mastery = sum(m.get("mastery_level", 0) for m in all_mastery)
+        avg_mastery = total_mastery / len(all_mastery) if all_mastery else 0
+        total_attempts = sum(m.get("total_attempts", 0) for m in all_mastery)
+        total_correct = sum(m.get("correct_attempts", 0) for m in all_mastery)
+
+        snapshot = {
+            "chronotype": chronotype,
+            "learning_style": learning_style,
+            "stats": {
+                "topics_studied": len(all_mastery),
+                "average_mastery": round(avg_mastery, 1),
+                "total_attempts": total_attempts,
+                "overall_accuracy": round(total_correct / max(1, total_attempts) * 100, 1)
+            },
+            # get_user_all_mastery est trié par mastery_level décroissant
+            "top_topics": all_mastery[:5]
+        }
+
+        conn = self._get_connection()
+        conn.execute("""
+            INSERT INTO learning_analytics (user_id, snapshot, watermark, computed_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                snapshot = excluded.snapshot,
+                watermark = excluded.watermark,
+                computed_at = excluded.computed_at
+        """, (user_id, json.dumps(snapshot, ensure_ascii=False), watermark, clock.sql_now()))
+        conn.commit()
+        conn.close()
+
+        return snapshot
+
+    def schedule_analytics_refresh(self, user_id: str) -> Future:
+        """Recalcul du snapshot en arrière-plan (un seul à la fois par utilisateur)"""
+        return self._submit_background(("analytics", user_id), self.refresh_analytics_snapshot, user_id)
+
     # ═══════════════════════════════════════════════════════════════════════════
     # 🧠 KNOWLEDGE GRAPH - Prerequisites & Dependencies
     # ═══════════════════════════════════════════════════════════════════════════
@@ -2286,29 +2731,19 @@ class LearningDatabase:
 
         dominant = style.get("dominant_style", "unknown")
         confidence = style.get("confidence_score", 0)
+        style_scores = {
+            "visual": style.get("visual_score", 0.25),
+            "auditory": style.get("auditory_score", 0.25),
+            "reading": style.get("reading_score", 0.25),
+            "kinesthetic": style.get("kinesthetic_score", 0.25)
+        }
 
         if dominant == "unknown" or confidence < 0.2:
-            return {
-                "recommended_format": "mixed",
-                "style_scores": {
-                    "visual": style.get("visual_score", 0.25),
-                    "auditory": style.get("auditory_score", 0.25),
-                    "reading": style.get("reading_score", 0.25),
-                    "kinesthetic": style.get("kinesthetic_score", 0.25)
-                },
-                "confidence": confidence,
-                "formats": ["text", "code", "diagram"],
-                "suggestion": "Continue à pratiquer pour que je détecte ton style optimal!"
-            }
+            return _mixed_format(style_scores, confidence)
 
         return {
             "recommended_format": dominant,
-            "style_scores": {
-                "visual": style.get("visual_score", 0.25),
-                "auditory": style.get("auditory_score", 0.25),
-                "reading": style.get("reading_score", 0.25),
-                "kinesthetic": style.get("kinesthetic_score", 0.25)
-            },
+            "style_scores": style_scores,
             "confidence": confidence,
             "formats": format_mapping.get(dominant, ["text"]),
             "suggestion": suggestions.get(dominant, "")
@@ -0,0 +1,150 @@
+"""
+Legacy Migrator - Reprise unique de database.db dans les bases par domaine
+Bases: database.db (ancien Database monolithique) -> tasks.db, health.db, learning.db
+
+L'ancien module database.py écrivait les mêmes tables que databases/*_db.py
+dans un fichier à part. Cette reprise les fusionne une fois pour toutes :
+- une requête INSERT ... SELECT par table (base legacy attachée), sans transit
+  des lignes par Python
+- ids TEXT (tâches, projets...) conservés, doublons ignorés
+- ids entiers décalés au-delà du max existant (références meal_foods.meal_id
+  décalées d'autant) ; contraintes UNIQUE : la ligne déjà présente est gardée
+- messages langue archivés écrits directement dans language_messages_archive
+- une transaction par base, marquée "legacy_import" dans schema_version :
+  relancer la reprise ne duplique rien
+
+Usage:
+    python -m databases.legacy_migrator [chemin/vers/database.db]
+"""
+
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from databases.learning_db import register_sql_functions
+from databases.schema import get_schema_version, set_schema_version
+from databases.tasks_db import EFFORT_TO_LEVEL
+
+logger = logging.getLogger(__name__)
+
+LEGACY_DB_PATH = Path(__file__).parent.parent / "database.db"
+MARKER = "legacy_import"
+
+
+# Tables de l'ancien Database par base cible, dans l'ordre des références
+TABLES = {
+    "tasks": ["projects", "tasks", "subtasks", "task_relations", "categories", "pomodoro_sessions"],
+    "health": ["weight_entries", "meals", "meal_foods", "hydration_entries", "user_health_profile"],
+    "learning": ["concepts", "course_messages", "language_messages", "vocabulary", "completed_exercises"],
+}
+
+# Colonnes entières qui référencent l'id d'une autre table reprise
+INTEGER_REFERENCES = {"meal_foods": {"meal_id": "meals"}}
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> Dict[str, str]:
+    return {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+
+
+def _max_id(conn: sqlite3.Connection, *tables: str) -> int:
+    return max(conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM main.{table}").fetchone()[0] for table in tables)
+
+
+def _copy_table(conn: sqlite3.Connection, table: str, offsets: Dict[str, int]) -> int:
+    """Copie legacy.table -> main.table ; retourne le nombre de lignes reprises"""
+    legacy = _columns(conn, "legacy", table)
+    target = _columns(conn, "main", table)
+    if not legacy or not target:
+        return 0
+    columns = [name for name in legacy if name in target]
+
+    expressions = {name: name for name in columns}
+    if target.get("id") == "INTEGER":
+        archive = ("language_messages_archive",) if table == "language_messages" else ()
+        offsets[table] = _max_id(conn, table, *archive)
+        expressions["id"] = f"id + {offsets[table]}"
+    for column, parent in INTEGER_REFERENCES.get(table, {}).items():
+        expressions[column] = f"{column} + {offsets.get(parent, 0)}"
+
+    def insert(into: str, where: str = "1", overrides: Optional[Dict[str, str]] = None) -> int:
+        selected = {**expressions, **(overrides or {})}
+        into_columns = _columns(conn, "main", into)
+        names = [name for name in columns if name in into_columns]
+        return conn.execute(f"""
+            INSERT OR IGNORE INTO main.{into} ({", ".join(names)})
+            SELECT {", ".join(selected[name] for name in names)} FROM legacy.{table} WHERE {where}
+        """).rowcount
+
+    # Drapeau d'archivage selon la version de l'ancien schéma (absent des plus anciennes)
+    flag = next((name for name in ("archived", "is_archived") if name in legacy), None)
+    if table != "language_messages" or flag is None:
+        return insert(table)
+
+    # Messages archivés : directement dans la table froide (contenu compressé)
+    hot = insert(table, f"COALESCE({flag}, 0) = 0")
+    return hot + insert("language_messages_archive", f"{flag} = 1", {"content": "zlib_compress(content)"})
+
+
+def _import_store(conn: sqlite3.Connection, label: str, legacy_path: str) -> Dict[str, int]:
+    if get_schema_version(conn, MARKER):
+        return {}
+    register_sql_functions(conn)
+    conn.execute("ATTACH DATABASE ? AS legacy", (legacy_path,))
+    try:
+        offsets: Dict[str, int] = {}
+        copied = {table: _copy_table(conn, table, offsets) for table in TABLES[label]}
+        if label == "tasks" and _columns(conn, "legacy", "tasks"):
+            # tasks.level n'existe pas dans l'ancien schéma : déduit de effort (comme la migration 2)
+            conn.executemany(
+                "UPDATE main.tasks SET level = ? WHERE effort = ? AND id IN (SELECT id FROM legacy.tasks)",
+                [(level, effort) for effort, level in EFFORT_TO_LEVEL.items()]
+            )
+        set_schema_version(conn, MARKER, 1)  # Même transaction que les copies
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("DETACH DATABASE legacy")
+    return copied
+
+
+def migrate_legacy_database(
+    legacy_path: Optional[str] = None,
+    stores: Optional[Dict[str, Any]] = None
+) -> Dict[str, Dict[str, int]]:
+    """
+    Fusionne database.db dans les bases par domaine (une seule fois par base).
+
+    Args:
+        legacy_path: Ancienne base (défaut : backend/database.db)
+        stores: {"tasks" | "health" | "learning": manager} (défaut : instances globales)
+
+    Returns:
+        Lignes reprises par base et par table ({} si rien à reprendre)
+    """
+    legacy_path = str(legacy_path or LEGACY_DB_PATH)
+    if not Path(legacy_path).exists():
+        return {}
+    if stores is None:
+        from databases import health_db, learning_db, tasks_db
+        stores = {"tasks": tasks_db, "health": health_db, "learning": learning_db}
+
+    report = {}
+    for label, store in stores.items():
+        conn = store._get_connection()
+        try:
+            copied = _import_store(conn, label, legacy_path)
+        finally:
+            conn.close()
+        if copied:
+            report[label] = copied
+            logger.info(f"🔄 Reprise database.db -> {label}: {sum(copied.values())} lignes")
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for label, copied in migrate_legacy_database(sys.argv[1] if len(sys.argv) > 1 else None).items():
+        print(f"{label}: " + ", ".join(f"{table}={count}" for table, count in copied.items()))
@@ -0,0 +1,320 @@
+"""
+Review Events - Journal append-only des réponses (user, topic, date, rating, temps, difficulté)
+Base: learning.db (tables review_events, review_keys)
+
+L'historique des réponses est sinon éparpillé (JSON success_by_difficulty,
+compteurs par heure, 500 dernières tutor_interactions, state["responses"] en
+mémoire) : ce journal garde TOUTES les réponses, en lignes compactes :
+- user_id / topic_id encodés en entiers (dictionnaire review_keys)
+- date en ms epoch, temps de réponse en ms, rating FSRS (1-4), difficulté (1-5)
+- Écrites par lots (REVIEW_LOG_BATCH_SIZE réponses ou REVIEW_LOG_FLUSH_SECONDS)
+
+Lecture en colonnes (tableaux typés, sans dict par ligne) pour le chronotype,
+le style d'apprentissage, l'ajustement FSRS et les dashboards ; export en
+fichiers binaires bruts lisibles par numpy.memmap / numpy.fromfile.
+
+Usage:
+    review_events.append("u1", "python", rating=3, response_time=12.5, difficulty=3)
+    columns = review_events.scan(user_id="u1")
+    hours = [datetime.fromtimestamp(ts / 1000).hour for ts in columns.ts]
+"""
+
+import atexit
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from databases.schema import Migration, SchemaGuard, create_indexes
+from utils import clock
+from utils.metrics import count_queries
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(settings.DATA_DIR) / "learning.db"
+
+# nom de colonne -> (typecode array, dtype numpy little-endian)
+COLUMNS: Dict[str, Tuple[str, str]] = {
+    "ts": ("q", "<i8"),           # ms epoch
+    "user": ("i", "<i4"),         # clé review_keys
+    "topic": ("i", "<i4"),        # clé review_keys
+    "rating": ("b", "|i1"),       # Rating FSRS 1-4
+    "response_ms": ("i", "<i4"),
+    "difficulty": ("b", "|i1"),   # Niveau 1-5
+}
+_SELECT = "SELECT ts, user_key, topic_key, rating, response_ms, difficulty FROM review_events"
+_FETCH_SIZE = 10_000
+
+
+def _create_tables(conn: sqlite3.Connection):
+    """Tables du journal (migration 1)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS review_keys (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS review_events (
+            id INTEGER PRIMARY KEY,
+            ts INTEGER NOT NULL,
+            user_key INTEGER NOT NULL,
+            topic_key INTEGER NOT NULL,
+            rating INTEGER NOT NULL,
+            response_ms INTEGER NOT NULL,
+            difficulty INTEGER NOT NULL
+        )
+    """)
+    conn.commit()
+
+
+MIGRATIONS = [
+    Migration(1, "tables review_events et review_keys", _create_tables),
+    # scan(user_id, since) : WHERE user_key = ? AND ts >= ?
+    Migration(2, "index review_events par utilisateur", create_indexes(
+        ("idx_review_events_user_ts", "review_events", "user_key, ts"),
+    )),
+]
+
+
+@dataclass
+class ReviewColumns:
+    """Réponses en colonnes (une entrée par réponse, par date pour un utilisateur)"""
+    ts: array = field(default_factory=lambda: array(COLUMNS["ts"][0]))
+    user: array = field(default_factory=lambda: array(COLUMNS["user"][0]))
+    topic: array = field(default_factory=lambda: array(COLUMNS["topic"][0]))
+    rating: array = field(default_factory=lambda: array(COLUMNS["rating"][0]))
+    response_ms: array = field(default_factory=lambda: array(COLUMNS["response_ms"][0]))
+    difficulty: array = field(default_factory=lambda: array(COLUMNS["difficulty"][0]))
+    # clé -> user_id / topic_id, pour les clés présentes
+    names: Dict[int, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def extend(self, rows: List[tuple]):
+        for name, values in zip(COLUMNS, zip(*rows)):
+            getattr(self, name).extend(values)
+
+
+class ReviewEventLog:
+    """
+    Journal append-only des réponses, écrit par lots.
+
+    Thread-safe. Les lectures (scan, count, export) écrivent d'abord le lot en
+    attente : un appelant relit toujours ses propres réponses.
+    """
+
+    def __init__(self, db_path: str = None, batch_size: int = None, flush_seconds: float = None):
+        self.db_path = db_path or str(DB_PATH)
+        self.batch_size = batch_size or settings.REVIEW_LOG_BATCH_SIZE
+        self.flush_seconds = flush_seconds if flush_seconds is not None else settings.REVIEW_LOG_FLUSH_SECONDS
+
+        self._buffer: List[tuple] = []
+        self._buffer_since = 0.0
+        self._keys: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._exit_hook = False
+
+        # Tables créées au premier accès, pas à l'import
+        self._schema = SchemaGuard("review_events", MIGRATIONS)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._schema.ensure(self.db_path)
+        return count_queries(sqlite3.connect(self.db_path), "review_events")
+
+    # ═══════════════════════════════════════════════════════════════
+    # ÉCRITURE
+    # ═══════════════════════════════════════════════════════════════
+
+    def append(
+        self,
+        user_id: str,
+        topic_id: str,
+        rating: int,
+        response_time: float,
+        difficulty: int,
+        at: Optional[datetime] = None
+    ) -> None:
+        """
+        Ajoute une réponse au lot en attente.
+
+        Args:
+            rating: Rating FSRS (1=Again ... 4=Easy)
+            response_time: Temps de réponse en secondes
+            difficulty: Niveau 1-5
+            at: Date de la réponse (défaut: maintenant)
+        """
+        ts = int((at or clock.now()).timestamp() * 1000)
+        event = (ts, user_id, topic_id, int(rating), int(round(response_time * 1000)), int(difficulty))
+        with self._lock:
+            if not self._buffer:
+                self._buffer_since = time.monotonic()
+            self._buffer.append(event)
+            if not self._exit_hook:
+                atexit.register(self.flush)
+                self._exit_hook = True
+            if len(self._buffer) >= self.batch_size or time.monotonic() - self._buffer_since >= self.flush_seconds:
+                self.flush()
+
+    @property
+    def pending(self) -> int:
+        """Réponses en attente d'écriture"""
+        return len(self._buffer)
+
+    def flush(self) -> int:
+        """Écrit le lot en attente en une transaction ; retourne le nombre de réponses écrites"""
+        with self._lock:
+            if not self._buffer:
+                return 0
+            batch, self._buffer = self._buffer, []
+            try:
+                conn = self._get_connection()
+                try:
+                    keys = self._intern(conn, {name for event in batch for name in event[1:3]})
+                    conn.executemany(
+                        "INSERT INTO review_events (ts, user_key, topic_key, rating, response_ms, difficulty) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [(ts, keys[user], keys[topic], rating, ms, level) for ts, user, topic, rating, ms, level in batch]
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                # Gardées pour le prochain flush (le journal ne perd pas de réponses sur une erreur passagère)
+                logger.error(f"❌ Erreur écriture review_events ({len(batch)} réponses): {e}")
+                self._keys.clear()  # Clés éventuellement annulées avec la transaction
+                self._buffer = batch + self._buffer
+                return 0
+            return len(batch)
+
+    def _intern(self, conn: sqlite3.Connection, names: set) -> Dict[str, int]:
+        """Clés entières des user_id / topic_id (créées au besoin)"""
+        missing = [name for name in names if name not in self._keys]
+        if missing:
+            conn.executemany("INSERT OR IGNORE INTO review_keys (name) VALUES (?)", [(name,) for name in missing])
+            placeholders = ",".join("?" * len(missing))
+            self._keys.update(
+                (name, key) for key, name in
+                conn.execute(f"SELECT id, name FROM review_keys WHERE name IN ({placeholders})", missing)
+            )
+        return self._keys
+
+    # ═══════════════════════════════════════════════════════════════
+    # LECTURE
+    # ═══════════════════════════════════════════════════════════════
+
+    def _query(self, conn: sqlite3.Connection, user_id: Optional[str], since: Optional[datetime]) -> Optional[sqlite3.Cursor]:
+        clauses, params = [], []
+        if user_id is not None:
+            row = conn.execute("SELECT id FROM review_keys WHERE name = ?", (user_id,)).fetchone()
+            if row is None:
+                return None
+            clauses.append("user_key = ?")
+            params.append(row[0])
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(int(since.timestamp() * 1000))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        # Par utilisateur : ordre de l'index (user_key, ts, id), sans tri temporaire
+        order = "ts, id" if user_id is not None else "id"
+        return conn.execute(f"{_SELECT}{where} ORDER BY {order}", params)
+
+    def _chunks(self, user_id: Optional[str], since: Optional[datetime]) -> Iterator[List[tuple]]:
+        self.flush()
+        conn = self._get_connection()
+        try:
+            cursor = self._query(conn, user_id, since)
+            while cursor is not None:
+                rows = cursor.fetchmany(_FETCH_SIZE)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def _names(self, keys: set) -> Dict[int, str]:
+        names: Dict[int, str] = {}
+        if not keys:
+            return names
+        keys = sorted(keys)
+        conn = self._get_connection()
+        try:
+            for start in range(0, len(keys), 500):  # Sous la limite de variables SQLite
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                names.update(conn.execute(f"SELECT id, name FROM review_keys WHERE id IN ({placeholders})", chunk))
+        finally:
+            conn.close()
+        return names
+
+    def scan(self, user_id: Optional[str] = None, since: Optional[datetime] = None) -> ReviewColumns:
+        """Réponses (d'un utilisateur, depuis une date) en colonnes typées"""
+        columns = ReviewColumns()
+        for rows in self._chunks(user_id, since):
+            columns.extend(rows)
+        columns.names = self._names(set(columns.user) | set(columns.topic))
+        return columns
+
+    def count(self, user_id: Optional[str] = None) -> int:
+        self.flush()
+        conn = self._get_connection()
+        try:
+            if user_id is None:
+                return conn.execute("SELECT COUNT(*) FROM review_events").fetchone()[0]
+            return conn.execute("""
+                SELECT COUNT(*) FROM review_events
+                WHERE user_key = (SELECT id FROM review_keys WHERE name = ?)
+            """, (user_id,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def export_columns(self, directory, user_id: Optional[str] = None, since: Optional[datetime] = None) -> Dict:
+        """
+        Exporte le journal en un fichier binaire par colonne (little-endian) + manifest.json.
+
+        Écrit par blocs de 10 000 lignes (mémoire constante). Lecture :
+            np.memmap(directory / "ts.bin", dtype=manifest["columns"]["ts"]["dtype"], mode="r")
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        files = {name: open(directory / f"{name}.bin", "wb") for name in COLUMNS}
+        rows_written, keys = 0, set()
+        try:
+            for rows in self._chunks(user_id, since):
+                chunk = ReviewColumns()
+                chunk.extend(rows)
+                keys.update(chunk.user)
+                keys.update(chunk.topic)
+                for name in COLUMNS:
+                    values = getattr(chunk, name)
+                    if sys.byteorder == "big":
+                        values.byteswap()
+                    values.tofile(files[name])
+                rows_written += len(rows)
+        finally:
+            for handle in files.values():
+                handle.close()
+
+        manifest = {
+            "rows": rows_written,
+            "columns": {name: {"file": f"{name}.bin", "dtype": dtype} for name, (_, dtype) in COLUMNS.items()},
+            "keys": {str(key): name for key, name in self._names(keys).items()},
+            "exported_at": clock.now().isoformat(),
+        }
+        (directory / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        logger.info(f"📤 review_events exporté: {rows_written} réponses -> {directory}")
+        return manifest
+
+
+# Instance globale
+review_events = ReviewEventLog()
@@ -0,0 +1,131 @@
+"""
+Review Queue - File unique des révisions dues (topics, vocabulaire, concepts)
+Base: learning.db (user_mastery, vocabulary, concepts)
+
+Chaque source est lue dans l'ordre de son index d'échéance (migration 6) :
+- user_mastery : (user_id, next_review)
+- vocabulary : (user_id, next_review)
+- concepts : (course_id, échéance calculée), voir CONCEPT_DUE_SQL
+
+Les trois curseurs, déjà triés, sont fusionnés (heapq.merge) par échéance
+julianday calculée par SQLite : aucun tri global ni parsing de dates en Python.
+Jamais révisé (next_review NULL) = le plus prioritaire.
+
+Usage:
+    items = review_queue.next_items("default", limit=20, course_id="spanish")
+    for item in review_queue.iter_due("default"):
+        ...
+"""
+
+import heapq
+import sqlite3
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from databases.learning_db import CONCEPT_DUE_SQL, LearningDatabase, learning_db
+from utils import clock
+
+
+NEVER_REVIEWED = float("-inf")
+
+
+@dataclass
+class DueItem:
+    """Un élément à réviser"""
+    kind: str                 # "topic" | "vocabulary" | "concept"
+    item_id: str
+    label: str
+    course_id: Optional[str]
+    mastery_level: int
+    due: Optional[float]      # julianday de l'échéance (None = jamais révisé)
+    overdue_days: Optional[float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# kind -> requête (échéance en 1re colonne, dans l'ordre de l'index)
+_SOURCES = {
+    "topic": """
+        SELECT julianday(next_review), topic_id, topic_id, NULL, mastery_level
+        FROM user_mastery
+        WHERE user_id = :user_id AND (next_review IS NULL OR next_review <= :now)
+        ORDER BY next_review
+        LIMIT :limit
+    """,
+    "vocabulary": """
+        SELECT julianday(next_review), id, word, course_id, mastery_level
+        FROM vocabulary
+        WHERE user_id = :user_id AND (:course_id IS NULL OR course_id = :course_id)
+        AND (next_review IS NULL OR next_review <= :now)
+        ORDER BY next_review
+        LIMIT :limit
+    """,
+    "concept": f"""
+        SELECT {CONCEPT_DUE_SQL}, id, concept, course_id, mastery_level
+        FROM concepts
+        WHERE course_id = :course_id AND {CONCEPT_DUE_SQL} <= julianday(:now)
+        ORDER BY {CONCEPT_DUE_SQL}
+        LIMIT :limit
+    """,
+}
+
+
+class ReviewQueue:
+    """Révisions dues d'un utilisateur, toutes sources confondues, par échéance"""
+
+    def __init__(self, db: LearningDatabase):
+        self.db = db
+
+    def _source(self, conn: sqlite3.Connection, kind: str, params: Dict[str, Any], now_jd: float) -> Iterator[DueItem]:
+        for due, item_id, label, course_id, mastery in conn.execute(_SOURCES[kind], params):
+            yield DueItem(
+                kind=kind,
+                item_id=str(item_id),
+                label=label,
+                course_id=course_id,
+                mastery_level=mastery or 0,
+                due=due,
+                overdue_days=round(now_jd - due, 3) if due is not None else None,
+            )
+
+    def iter_due(
+        self,
+        user_id: str,
+        course_id: Optional[str] = None,
+        limit: int = 20
+    ) -> Iterator[DueItem]:
+        """
+        Révisions dues, de la plus en retard à la plus récente.
+
+        Args:
+            course_id: Restreint le vocabulaire à ce cours et ajoute ses concepts
+                (les concepts n'ont pas d'utilisateur, seulement un cours)
+            limit: Éléments lus au plus par source
+        """
+        now = clock.sql_now()
+        params = {"user_id": user_id, "course_id": course_id, "now": now, "limit": limit}
+        kinds = ["topic", "vocabulary"] + (["concept"] if course_id is not None else [])
+
+        conn = self.db._get_connection()
+        try:
+            now_jd = conn.execute("SELECT julianday(?)", (now,)).fetchone()[0]
+            sources = [self._source(conn, kind, params, now_jd) for kind in kinds]
+            yield from heapq.merge(
+                *sources, key=lambda item: NEVER_REVIEWED if item.due is None else item.due
+            )
+        finally:
+            conn.close()
+
+    def next_items(self, user_id: str, limit: int = 20, course_id: Optional[str] = None) -> List[DueItem]:
+        """Les `limit` prochaines révisions, toutes sources confondues"""
+        items = []
+        for item in self.iter_due(user_id, course_id=course_id, limit=limit):
+            items.append(item)
+            if len(items) == limit:
+                break
+        return items
+
+
+# Instance globale
+review_queue = ReviewQueue(learning_db)
@@ -0,0 +1,194 @@
+"""
+Schema - Migrations versionnées des schémas SQLite
+
+Au lieu de rejouer tous les CREATE TABLE IF NOT EXISTS (et de sonder les
+colonnes avec des ALTER TABLE en try/except) à chaque démarrage :
+- Chaque composant (tasks, health, learning, engine, skill_graph...) déclare une
+  liste ordonnée de migrations ; la première est le schéma initial
+- La table schema_version retient la dernière version appliquée par composant :
+  une fois à jour, un processus ne fait qu'une lecture d'une ligne par base
+- Les migrations sont appliquées au premier accès à la base, pas à l'import
+- Modifier un schéma = AJOUTER une migration (ne jamais modifier une migration
+  déjà livrée : les bases existantes ne la rejoueraient pas)
+
+Une migration doit être idempotente (IF NOT EXISTS, add_column) : SQLite
+n'annule pas le DDL d'une migration interrompue, elle sera rejouée.
+
+Usage:
+    MIGRATIONS = [
+        Migration(2, "colonne tasks.level", _add_level_column),
+        Migration(3, "index par utilisateur", create_indexes(
+            ("idx_tasks_user_created", "tasks", "user_id, created_at"),
+        )),
+    ]
+
+    self._schema = SchemaGuard("tasks", [Migration(1, "schéma initial", self._init_db), *MIGRATIONS])
+
+    def _get_connection(self):
+        self._schema.ensure(self.db_path)
+        return sqlite3.connect(self.db_path)
+"""
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, Set, Tuple
+
+from utils import clock
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_TABLE = "schema_version"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Étape de schéma : apply(conn) reçoit la connexion du runner."""
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def get_schema_version(conn: sqlite3.Connection, component: str) -> int:
+    """Version appliquée d'un composant (0 si jamais appliqué)."""
+    try:
+        row = conn.execute(
+            f"SELECT version FROM {SCHEMA_TABLE} WHERE component = ?", (component,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return 0  # Table absente : base antérieure au suivi des versions
+    return row[0] if row else 0
+
+
+def set_schema_version(conn: sqlite3.Connection, component: str, version: int):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} (
+            component TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+    conn.execute(f"""
+        INSERT INTO {SCHEMA_TABLE} (component, version, applied_at) VALUES (?, ?, ?)
+        ON CONFLICT(component) DO UPDATE SET version = excluded.version, applied_at = excluded.applied_at
+    """, (component, version, clock.now().isoformat()))
+    conn.commit()
+
+
+# ═══════════════════════════════════════════════════════════════
+# BRIQUES DE MIGRATION
+# ═══════════════════════════════════════════════════════════════
+
+def add_column(conn: sqlite3.Connection, table: str, column: str, definition: str) -> bool:
+    """
+    Ajoute une colonne si elle manque.
+
+    Les bases créées après l'ajout de la colonne au schéma initial l'ont déjà :
+    la migration est alors sans effet. Retourne True si la colonne a été ajoutée.
+    """
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column in columns:
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    logger.info(f"🔄 Migration: colonne {table}.{column} ajoutée")
+    return True
+
+
+def create_indexes(*indexes: Tuple[str, str, str]) -> Callable[[sqlite3.Connection], None]:
+    """
+    Migration créant des index (nom, table, colonnes).
+
+    Un index par transaction courte : les écritures des autres connexions ne
+    sont bloquées que le temps d'un index, pas de toute la migration.
+    """
+    def apply(conn: sqlite3.Connection):
+        for name, table, columns in indexes:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+            conn.commit()
+    return apply
+
+
+def drop_indexes(*names: str) -> Callable[[sqlite3.Connection], None]:
+    """Migration supprimant des index devenus redondants."""
+    def apply(conn: sqlite3.Connection):
+        for name in names:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.commit()
+    return apply
+
+
+def chain(*steps: Callable[[sqlite3.Connection], None]) -> Callable[[sqlite3.Connection], None]:
+    """Enchaîne plusieurs briques dans une même migration."""
+    def apply(conn: sqlite3.Connection):
+        for step in steps:
+            step(conn)
+    return apply
+
+
+# ═══════════════════════════════════════════════════════════════
+# RUNNER
+# ═══════════════════════════════════════════════════════════════
+
+class SchemaGuard:
+    """
+    Applique les migrations en attente d'un composant, une fois par fichier de base.
+
+    Thread-safe. Une migration qui rouvre une connexion du manager repasse par
+    ensure() : l'appel imbriqué (même thread) retourne immédiatement.
+    """
+
+    def __init__(self, component: str, migrations: Sequence[Migration]):
+        versions = [m.version for m in migrations]
+        if not versions or versions != list(range(1, len(versions) + 1)):
+            raise ValueError(f"{component}: migrations must be numbered 1..n in order, got {versions}")
+        self.component = component
+        self.migrations: List[Migration] = list(migrations)
+        self._ready: Set[str] = set()
+        self._applying: Set[str] = set()
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        """Version cible (dernière migration)."""
+        return self.migrations[-1].version
+
+    def ensure(self, db_path) -> None:
+        key = str(db_path)
+        if key in self._ready:
+            return
+        with self._lock:
+            if key in self._ready or key in self._applying:
+                return
+            self._applying.add(key)
+            try:
+                conn = sqlite3.connect(key)
+                try:
+                    self._migrate(conn, key)
+                finally:
+                    conn.close()
+                self._ready.add(key)
+            finally:
+                self._applying.discard(key)
+
+    def _migrate(self, conn: sqlite3.Connection, key: str):
+        current = get_schema_version(conn, self.component)
+        if current > self.version:
+            logger.warning(
+                f"⚠️ Schéma {self.component} v{current} plus récent que ce code (v{self.version}) : {key}"
+            )
+            return
+        for migration in self.migrations[current:]:
+            started = time.perf_counter()
+            migration.apply(conn)
+            set_schema_version(conn, self.component, migration.version)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info(
+                f"🗂️ Schéma {self.component} v{migration.version} ({migration.description}) "
+                f"appliqué en {elapsed_ms:.0f} ms ({key})"
+            )
+
+    def reset(self):
+        """Oublie les bases vérifiées (le prochain accès relit schema_version)."""
+        with self._lock:
+            self._ready.clear()
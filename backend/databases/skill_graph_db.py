@@ -24,6 +24,10 @@ from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 
+from databases.schema import Migration, SchemaGuard, add_column, chain, create_indexes
+from utils import clock
+from utils.metrics import count_queries
+
 logger = logging.getLogger(__name__)
 
 # Database path
@@ -102,15 +106,20 @@ class SkillGap:
 # ============================================================================
 
 def get_connection() -> sqlite3.Connection:
-    """Get database connection with row factory."""
-    conn = sqlite3.connect(str(DB_PATH))
+    """Get database connection with row factory (migrations applied on first call)."""
+    _schema.ensure(DB_PATH)
+    conn = count_queries(sqlite3.connect(str(DB_PATH)), "skill_graph")
     conn.row_factory = sqlite3.Row
     return conn
 
 
 def init_db():
-    """Initialize database schema."""
-    conn = get_connection()
+    """Initialize database schema (applies pending migrations)."""
+    _schema.ensure(DB_PATH)
+
+
+def _create_tables(conn: sqlite3.Connection):
+    """Initial schema and seed data (migration 1)."""
     cursor = conn.cursor()
 
     # Skills table
@@ -188,19 +197,6 @@ def init_db():
         )
     """)
 
-    # Migration: Add tier and domain columns if missing
-    try:
-        cursor.execute("SELECT tier FROM skills LIMIT 1")
-    except sqlite3.OperationalError:
-        cursor.execute("ALTER TABLE skills ADD COLUMN tier INTEGER DEFAULT 0")
-        logger.info("Migration: Added 'tier' column to skills table")
-
-    try:
-        cursor.execute("SELECT domain FROM skills LIMIT 1")
-    except sqlite3.OperationalError:
-        cursor.execute("ALTER TABLE skills ADD COLUMN domain TEXT DEFAULT ''")
-        logger.info("Migration: Added 'domain' column to skills table")
-
     # Indexes
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_user_skills_user
@@ -214,33 +210,26 @@ def init_db():
         CREATE INDEX IF NOT EXISTS idx_skills_category
         ON skills (category)
     """)
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_skills_domain
-        ON skills (domain)
-    """)
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_domain_maps_user
         ON domain_maps (user_id)
     """)
 
     conn.commit()
-    conn.close()
 
     # Seed initial skills if empty
-    _seed_initial_skills()
+    _seed_initial_skills(conn)
 
     logger.info("Skill Graph DB initialized")
 
 
-def _seed_initial_skills():
+def _seed_initial_skills(conn: sqlite3.Connection):
     """Seed database with common programming skills."""
-    conn = get_connection()
     cursor = conn.cursor()
 
     # Check if already seeded
     cursor.execute("SELECT COUNT(*) FROM skills")
     if cursor.fetchone()[0] > 0:
-        conn.close()
         return
 
     # Common skills with relations
@@ -290,7 +279,7 @@ def _seed_initial_skills():
         cursor.execute("""
             INSERT INTO skills (id, name, category, level, keywords, created_at)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, (skill_id, name, category, level, json.dumps(keywords), datetime.now().isoformat()))
+        """, (skill_id, name, category, level, json.dumps(keywords), clock.now().isoformat()))
 
         # Add aliases
         for kw in keywords:
@@ -363,10 +352,21 @@ def _seed_initial_skills():
         """, (skill_id, related_id, rel_type))
 
     conn.commit()
-    conn.close()
     logger.info("Seeded initial skills and relations")
 
 
+# Migrations after the initial schema: never edit a shipped migration, add a new one
+MIGRATIONS = [
+    Migration(1, "initial schema", _create_tables),
+    # Databases created before tiers/domains: add the columns, then index them
+    Migration(2, "skills.tier and skills.domain", chain(
+        lambda conn: add_column(conn, "skills", "tier", "INTEGER DEFAULT 0"),
+        lambda conn: add_column(conn, "skills", "domain", "TEXT DEFAULT ''"),
+        create_indexes(("idx_skills_domain", "skills", "domain")),
+    )),
+]
+
+
 # ============================================================================
 # SKILL CRUD
 # ============================================================================
@@ -390,7 +390,7 @@ def get_skill(skill_id: str) -> Optional[Skill]:
         level=row["level"],
         description=row["description"] or "",
         keywords=json.loads(row["keywords"]) if row["keywords"] else [],
-        created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else datetime.now()
+        created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else clock.now()
     )
 
 
@@ -618,7 +618,7 @@ def get_user_skill(user_id: str, skill_id: str) -> Optional[UserSkill]:
         user_id=row["user_id"],
         skill_id=row["skill_id"],
         mastery=row["mastery"],
-        last_practiced=datetime.fromisoformat(row["last_practiced"]) if row["last_practiced"] else datetime.now(),
+        last_practiced=datetime.fromisoformat(row["last_practiced"]) if row["last_practiced"] else clock.now(),
         practice_count=row["practice_count"],
         decay_rate=row["decay_rate"]
     )
@@ -641,7 +641,7 @@ def get_user_skills(user_id: str) -> Dict[str, UserSkill]:
             user_id=row["user_id"],
             skill_id=row["skill_id"],
             mastery=row["mastery"],
-            last_practiced=datetime.fromisoformat(row["last_practiced"]) if row["last_practiced"] else datetime.now(),
+            last_practiced=datetime.fromisoformat(row["last_practiced"]) if row["last_practiced"] else clock.now(),
             practice_count=row["practice_count"],
             decay_rate=row["decay_rate"]
         )
@@ -658,7 +658,7 @@ def calculate_decayed_mastery(user_skill: UserSkill) -> float:
     if not user_skill.last_practiced:
         return user_skill.mastery
 
-    days_since = (datetime.now() - user_skill.last_practiced).days
+    days_since = (clock.now() - user_skill.last_practiced).days
     if days_since <= 0:
         return user_skill.mastery
 
@@ -692,7 +692,7 @@ def update_user_skill(
     """, (user_id, skill_id))
     row = cursor.fetchone()
 
-    now = datetime.now()
+    now = clock.now()
 
     if row:
         current_mastery = row["mastery"]
@@ -953,7 +953,7 @@ def get_user_skill_summary(user_id: str) -> Dict[str, Any]:
             "name": skill.name,
             "mastery": round(current_mastery, 1),
             "raw_mastery": round(user_skill.mastery, 1),
-            "days_since_practice": (datetime.now() - user_skill.last_practiced).days if user_skill.last_practiced else 999
+            "days_since_practice": (clock.now() - user_skill.last_practiced).days if user_skill.last_practiced else 999
         })
 
         if current_mastery > strongest_mastery:
@@ -1037,7 +1037,7 @@ def save_domain_map(
 
     # Générer ID unique
     domain_map_id = f"dm_{domain.lower().replace(' ', '_')}_{user_id}_{uuid.uuid4().hex[:8]}"
-    now = datetime.now().isoformat()
+    now = clock.now().isoformat()
 
     # Supprimer l'ancienne carte si elle existe
     cursor.execute("""
@@ -1352,5 +1352,5 @@ def get_next_skills_to_learn(user_id: str, domain: str, limit: int = 5) -> List[
     return recommendations[:limit]
 
 
-# Initialize on import
-init_db()
+# Migrations applied on first connection, tracked in schema_version (not on import)
+_schema = SchemaGuard("skill_graph", MIGRATIONS)
@@ -10,15 +10,48 @@ from typing import List, Dict, Any, Optional
 from pathlib import Path
 import logging
 
+from config import settings
+from databases.schema import Migration, SchemaGuard, add_column, create_indexes
+from utils import clock
+from utils.metrics import DB_OPERATION_DURATION, count_queries, time_methods
+from utils.tracing import trace_methods
+
 logger = logging.getLogger(__name__)
 
 # Mapping pour conversion effort <-> level
 EFFORT_TO_LEVEL = {"XS": 1, "S": 2, "M": 3, "L": 4, "XL": 5}
 LEVEL_TO_EFFORT = {1: "XS", 2: "S", 3: "M", 4: "L", 5: "XL"}
 
-DB_PATH = Path(__file__).parent.parent / "data" / "tasks.db"
+DB_PATH = Path(settings.DATA_DIR) / "tasks.db"
+
+
+def _migrate_add_level_column(conn: sqlite3.Connection):
+    """Migration: ajoute la colonne level et migre les données depuis effort"""
+    if add_column(conn, "tasks", "level", "INTEGER DEFAULT 2"):
+        # Migrer les données effort → level
+        conn.executemany(
+            "UPDATE tasks SET level = ? WHERE effort = ?",
+            [(level, effort) for effort, level in EFFORT_TO_LEVEL.items()]
+        )
+
+
+# Migrations après le schéma initial (_init_db) : ne jamais modifier une migration livrée
+MIGRATIONS = [
+    Migration(2, "colonne tasks.level", _migrate_add_level_column),
+    Migration(3, "index des listes par utilisateur", create_indexes(
+        ("idx_projects_user_updated", "projects", "user_id, updated_at"),
+        ("idx_tasks_user_created", "tasks", "user_id, created_at"),
+        ("idx_tasks_project", "tasks", "project_id"),
+        ("idx_subtasks_task", "subtasks", "task_id"),
+        ("idx_task_relations_from", "task_relations", "from_task_id"),
+        ("idx_task_relations_to", "task_relations", "to_task_id"),
+        ("idx_pomodoro_user_date", "pomodoro_sessions", "user_id, date"),
+    )),
+]
 
 
+@trace_methods("db.tasks")
+@time_methods(DB_OPERATION_DURATION, "tasks")
 class TasksDatabase:
     """Manager pour la base de données des tâches"""
 
@@ -26,18 +59,19 @@ class TasksDatabase:
         self.db_path = db_path or str(DB_PATH)
         # Créer le dossier data si nécessaire
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self._init_db()
+        # Migrations appliquées au premier accès, pas à l'import
+        self._schema = SchemaGuard("tasks", [Migration(1, "schéma initial", self._init_db), *MIGRATIONS])
 
     def _get_connection(self):
-        """Crée une connexion à la base de données"""
-        conn = sqlite3.connect(self.db_path)
+        """Crée une connexion à la base de données (migrations appliquées au premier appel)"""
+        self._schema.ensure(self.db_path)
+        conn = count_queries(sqlite3.connect(self.db_path), "tasks")
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON")
         return conn
 
-    def _init_db(self):
-        """Initialise les tables"""
-        conn = self._get_connection()
+    def _init_db(self, conn: sqlite3.Connection):
+        """Schéma initial (migration 1)"""
         cursor = conn.cursor()
 
         # Table: projects
@@ -90,9 +124,6 @@ class TasksDatabase:
             )
         """)
 
-        # Migration: ajouter colonne level si elle n'existe pas
-        self._migrate_add_level_column(cursor)
-
         # Table: subtasks
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS subtasks (
@@ -155,27 +186,8 @@ class TasksDatabase:
         """)
 
         conn.commit()
-        conn.close()
         logger.info(f"✅ Tasks DB initialized at {self.db_path}")
 
-    def _migrate_add_level_column(self, cursor):
-        """Migration: ajoute la colonne level et migre les données depuis effort"""
-        # Vérifier si la colonne existe déjà
-        cursor.execute("PRAGMA table_info(tasks)")
-        columns = [row[1] for row in cursor.fetchall()]
-
-        if "level" not in columns:
-            logger.info("🔄 Migration: ajout de la colonne 'level' à la table tasks...")
-            cursor.execute("ALTER TABLE tasks ADD COLUMN level INTEGER DEFAULT 2")
-
-            # Migrer les données effort → level
-            for effort, level in EFFORT_TO_LEVEL.items():
-                cursor.execute(
-                    "UPDATE tasks SET level = ? WHERE effort = ?",
-                    (level, effort)
-                )
-            logger.info("✅ Migration terminée: colonne 'level' ajoutée et données migrées")
-
     # ═══════════════════════════════════════════════════════════════
     # PROJECTS
     # ═══════════════════════════════════════════════════════════════
@@ -534,7 +546,7 @@ class TasksDatabase:
             return None
 
         new_status = not row['completed']
-        completed_at = datetime.now().isoformat() if new_status else None
+        completed_at = clock.now().isoformat() if new_status else None
 
         cursor.execute("""
             UPDATE tasks SET completed = ?, completed_at = ?, updated_at = CURRENT_TIMESTAMP
@@ -765,8 +777,9 @@ class TasksDatabase:
                 data.get('actual_duration'),
                 data.get('session_type', 'focus'),
                 data.get('started_at'),
-                data.get('completed_at', datetime.now().isoformat()),
-                data.get('date', datetime.now().strftime('%Y-%m-%d')),
+                # `or` et non un défaut de get() : la route transmet les champs absents à None
+                data.get('completed_at') or clock.now().isoformat(),
+                data.get('date') or clock.now().strftime('%Y-%m-%d'),
                 data.get('interrupted', False),
                 data.get('interruptions', 0),
                 data.get('notes')
@@ -791,7 +804,7 @@ class TasksDatabase:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        today = datetime.now().strftime('%Y-%m-%d')
+        today = clock.now().strftime('%Y-%m-%d')
 
         cursor.execute("""
             SELECT
@@ -833,6 +846,36 @@ class TasksDatabase:
         conn.close()
         return stats
 
+    def get_daily_stats(self, user_id: str = 'default', days: int = 7) -> List[Dict[str, Any]]:
+        """Statistiques journalières sur N jours (aujourd'hui en premier)"""
+        today = clock.now()
+        dates = [(today - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days)]
+        if not dates:
+            return []
+
+        conn = self._get_connection()
+        try:
+            # Une requête groupée par métrique plutôt que deux par jour
+            completed = dict(conn.execute("""
+                SELECT DATE(completed_at), COUNT(*)
+                FROM tasks
+                WHERE user_id = ? AND completed_at >= ?
+                GROUP BY DATE(completed_at)
+            """, (user_id, dates[-1])).fetchall())
+            focus = dict(conn.execute("""
+                SELECT date, COALESCE(SUM(actual_duration), 0)
+                FROM pomodoro_sessions
+                WHERE user_id = ? AND date >= ? AND session_type = 'focus'
+                GROUP BY date
+            """, (user_id, dates[-1])).fetchall())
+        finally:
+            conn.close()
+
+        return [
+            {'date': date, 'tasks_completed': completed.get(date, 0), 'focus_minutes': focus.get(date, 0)}
+            for date in dates
+        ]
+
     def get_health_check(self) -> Dict[str, Any]:
         """Vérifie l'état de la base avec détails"""
         import os
@@ -20,22 +20,32 @@ from typing import Dict, List, Optional, Any
 from pathlib import Path
 import logging
 
+from config import settings
+from databases.schema import Migration, SchemaGuard
+from utils import clock
+from utils.metrics import count_queries
+
 logger = logging.getLogger(__name__)
 
-DB_PATH = Path(__file__).parent.parent / "data" / "tutor_profiles.db"
+DB_PATH = Path(settings.DATA_DIR) / "tutor_profiles.db"
 
 
 def get_connection():
-    """Get database connection with row factory."""
+    """Get database connection with row factory (migrations applied on first call)."""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+    _schema.ensure(DB_PATH)
+    conn = count_queries(sqlite3.connect(str(DB_PATH)), "tutor_profile")
     conn.row_factory = sqlite3.Row
     return conn
 
 
 def init_db():
-    """Initialize all tables."""
-    conn = get_connection()
+    """Initialize all tables (applies pending migrations)."""
+    get_connection().close()
+
+
+def _create_tables(conn: sqlite3.Connection):
+    """Initial schema (migration 1)."""
     cursor = conn.cursor()
 
     # Profil principal
@@ -152,7 +162,6 @@ def init_db():
     """)
 
     conn.commit()
-    conn.close()
     logger.info("✅ Tutor profiles database initialized")
 
 
@@ -171,7 +180,7 @@ def get_or_create_profile(user_id: str) -> Dict:
     if row:
         profile = dict(row)
     else:
-        now = datetime.now().isoformat()
+        now = clock.now().isoformat()
         cursor.execute("""
             INSERT INTO tutor_profiles (user_id, created_at, updated_at, last_session_at)
             VALUES (?, ?, ?, ?)
@@ -204,7 +213,7 @@ def update_profile(user_id: str, updates: Dict):
     conn = get_connection()
     cursor = conn.cursor()
 
-    updates["updated_at"] = datetime.now().isoformat()
+    updates["updated_at"] = clock.now().isoformat()
 
     set_clause = ", ".join(f"{k} = ?" for k in updates.keys())
     values = list(updates.values()) + [user_id]
@@ -373,7 +382,7 @@ def update_topic_mastery(user_id: str, topic: str, is_correct: bool):
     """, (user_id, topic))
 
     row = cursor.fetchone()
-    now = datetime.now().isoformat()
+    now = clock.now().isoformat()
 
     if row:
         total = row["total_attempts"] + 1
@@ -518,7 +527,7 @@ def record_interaction(
     conn = get_connection()
     cursor = conn.cursor()
 
-    now = datetime.now()
+    now = clock.now()
     hour = hour_override if hour_override is not None else now.hour
     day_of_week = now.weekday()
 
@@ -595,7 +604,7 @@ def update_error_pattern(user_id: str, pattern_type: str, topics: List[str]):
     """, (user_id, pattern_type))
 
     row = cursor.fetchone()
-    now = datetime.now().isoformat()
+    now = clock.now().isoformat()
 
     if row:
         existing_topics = json.loads(row["topics_affected"]) if row["topics_affected"] else []
@@ -620,7 +629,7 @@ def get_active_error_patterns(user_id: str, minutes: int = 10) -> List[Dict]:
     conn = get_connection()
     cursor = conn.cursor()
 
-    cutoff = (datetime.now() - timedelta(minutes=minutes)).isoformat()
+    cutoff = (clock.now() - timedelta(minutes=minutes)).isoformat()
 
     cursor.execute("""
         SELECT pattern_type, frequency, last_seen, topics_affected
@@ -698,5 +707,6 @@ def get_full_profile_summary(user_id: str) -> Dict:
     }
 
 
-# Initialize on import
-init_db()
+# Migrations applied on first connection, tracked in schema_version (not on import).
+# Never edit a shipped migration: append a new one.
+_schema = SchemaGuard("tutor_profile", [Migration(1, "initial schema", _create_tables)])
@@ -12,10 +12,18 @@ Usage:
 
 CLI:
     python -m e2e --user human --days 7
+    python -m e2e --population 1000 --days 14
+    python -m e2e --retention 1000 --days 90
+    python -m e2e --loadtest --stages 1,4,16 --budget e2e/loadtest_budget.json
+    python -m e2e.llm_stub --port 8100   # then OPENAI_BASE_URL=http://127.0.0.1:8100/v1
 """
 
 from .adapter import UniversalAdapter
 from .autonomous_user import AutonomousUser, UserProfile, PROFILES
+from .llm_stub import LLMStubConfig, StubServer
+from .loadtest import LoadTestConfig, LoadTester, check_budget
+from .population import PopulationConfig, PopulationSimulator
+from .virtual_time import EventScheduler, RetentionConfig, RetentionSimulation
 
 __version__ = "5.0"
 
@@ -28,6 +36,16 @@ __all__ = [
     "AutonomousUser",
     "UserProfile",
     "PROFILES",
+    "LLMStubConfig",
+    "StubServer",
+    "LoadTestConfig",
+    "LoadTester",
+    "check_budget",
+    "PopulationConfig",
+    "PopulationSimulator",
+    "EventScheduler",
+    "RetentionConfig",
+    "RetentionSimulation",
     "DEFAULT_TOPICS",
     "DIFFICULTY_RANGE",
 ]
@@ -295,7 +295,7 @@ class UniversalAdapter:
 
     def _route_learning(self, method: str, path: str, data: Dict = None, params: Dict = None) -> Dict:
         """Route to learning engine"""
-        from services.learning_engine_lean import lean_engine
+        from learning_engine.learning_engine_lean import lean_engine
 
         # GET /api/learning/engine-info
         if method == "GET" and path.endswith("/engine-info"):
@@ -320,13 +320,13 @@ class UniversalAdapter:
 
     def start_session(self, user_id: str, topics: List[str]) -> Dict:
         """Start a learning session"""
-        from services.learning_engine_lean import lean_engine
+        from learning_engine.learning_engine_lean import lean_engine
         lean_engine._get_user_state(user_id)
         return {"success": True, "user_id": user_id}
 
     def get_next_question(self, user_id: str, topic_id: str, mastery: int) -> Dict:
         """Get next question parameters with ALL learning engine features"""
-        from services.learning_engine_lean import lean_engine
+        from learning_engine.learning_engine_lean import lean_engine
         params = lean_engine.get_next_question(user_id, topic_id, mastery)
         return {
             "difficulty": params.difficulty,
@@ -421,7 +421,7 @@ class UniversalAdapter:
         difficulty: int
     ) -> Dict:
         """Submit an answer"""
-        from services.learning_engine_lean import lean_engine
+        from learning_engine.learning_engine_lean import lean_engine
         result = lean_engine.process_answer(user_id, topic_id, is_correct, response_time, difficulty)
         return {
             "is_correct": is_correct,
@@ -435,7 +435,7 @@ class UniversalAdapter:
 
     def get_user_stats(self, user_id: str) -> Dict:
         """Get user statistics"""
-        from services.learning_engine_lean import lean_engine
+        from learning_engine.learning_engine_lean import lean_engine
         return lean_engine.get_user_stats(user_id)
 
     def health_check(self) -> bool:
@@ -450,7 +450,7 @@ class UniversalAdapter:
         """Get or create the Socratic Tutor instance with Learning Engine connection."""
         if not hasattr(self, '_tutor'):
             from services.socratic_tutor import create_socratic_tutor
-            from services.learning_engine_lean import lean_engine
+            from learning_engine.learning_engine_lean import lean_engine
 
             try:
                 from services.openai_service import openai_service
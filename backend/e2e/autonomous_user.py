@@ -22,6 +22,8 @@ from typing import Dict, List, Optional, TYPE_CHECKING, Callable
 from datetime import datetime, timedelta
 from enum import Enum
 
+from utils import clock
+
 if TYPE_CHECKING:
     from .adapter import UniversalAdapter
 
@@ -2158,7 +2160,7 @@ class AutonomousUser:
 
         Returns a DayLog with all events.
         """
-        date = date or datetime.now().strftime('%Y-%m-%d')
+        date = date or clock.now().strftime('%Y-%m-%d')
         topics = topics or ["conjugaison", "grammaire", "vocabulaire", "orthographe"]
         modules = modules or ["learning", "tasks", "health"]
 
@@ -2333,10 +2335,13 @@ class AutonomousUser:
         if topics is None:
             topics = ["conjugaison", "grammaire", "vocabulaire", "orthographe"]
         modules = modules or ["learning", "tasks", "health"]
-        base_date = datetime.now()
+        base_date = clock.now()
 
         for day in range(1, days + 1):
-            date = (base_date + timedelta(days=day - 1)).strftime('%Y-%m-%d')
+            day_start = base_date + timedelta(days=day - 1)
+            # With a VirtualClock the engine sees the simulated day (no-op in real time)
+            clock.get_clock().advance_to(day_start)
+            date = day_start.strftime('%Y-%m-%d')
             log = self.live_day(adapter, day, date, topics, modules)
 
             if verbose:
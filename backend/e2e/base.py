@@ -157,7 +157,7 @@ class CleanupRegistry:
         # Cleanup users (Learning Engine)
         for user_id in self._user_ids:
             try:
-                from services.learning_engine_lean import lean_engine
+                from learning_engine.learning_engine_lean import lean_engine
                 lean_engine.delete_state(user_id)
             except Exception as e:
                 errors.append(f"User {user_id}: {e}")
@@ -9,6 +9,9 @@ Usage:
     python -m e2e --calibrate --strict      # Strict calibration (tighter ranges)
     python -m e2e --edge-cases              # Edge-case stress tests
     python -m e2e --stress --days 14        # Full stress test (edge + strict cal)
+    python -m e2e --population 1000         # Population calibration across a process pool
+    python -m e2e --retention 1000 --days 90  # Retention on a virtual clock (no waiting)
+    python -m e2e --loadtest --stages 1,4,16  # HTTP load test with latency percentiles
 """
 
 import argparse
@@ -21,6 +24,9 @@ from .autonomous_user import (
     AutonomousUser, PROFILES, CALIBRATION_TARGETS,
     get_calibration_targets, print_user_report
 )
+from .loadtest import LoadTestConfig, LoadTester, check_budget, load_budget
+from .population import PopulationConfig, PopulationSimulator
+from .virtual_time import RetentionConfig, RetentionSimulation
 
 
 def run_edge_case_tests(runner, args):
@@ -294,6 +300,150 @@ def run_calibration(runner, args):
     return 0 if all_passed else 1
 
 
+def run_population(args):
+    """
+    Run population mode: calibrate against thousands of users in parallel.
+
+    Each profile passes when at least --min-pass-rate of its users hit all
+    calibration targets.
+    """
+    config = PopulationConfig(
+        users=args.population,
+        days=args.days,
+        seed=args.seed,
+        workers=args.workers or PopulationConfig().workers,
+        strict=args.strict,
+        min_pass_rate=args.min_pass_rate,
+    )
+    mode_str = "STRICT" if args.strict else "NORMAL"
+
+    print("\n" + "=" * 70)
+    print(f" POPULATION CALIBRATION [{mode_str}]")
+    print("=" * 70)
+    print(f"   Users: {config.users} | Days: {config.days} | Workers: {config.workers} | Seed: {config.seed}")
+    print("-" * 70)
+
+    def on_progress(done, total):
+        if not args.quiet:
+            print(f"\r   Simulated {done}/{total} users", end="", flush=True)
+
+    report = PopulationSimulator(config).run(on_progress=on_progress)
+    data = report.to_dict()
+    if not args.quiet:
+        print()
+
+    for name, profile in data["profiles"].items():
+        status = "PASS" if profile["pass_rate"] >= config.min_pass_rate else "FAIL"
+        print(f"\n   [{status}] {name.upper()} ({profile['users']} users, "
+              f"{profile['pass_rate']:.0%} calibrated, {profile['errors']} errors)")
+        for metric, values in profile["metrics"].items():
+            if metric in ("mastery", "accuracy", "attendance"):
+                fmt = lambda v: f"{v:.1%}"
+            else:
+                fmt = lambda v: f"{v:.1f}"
+            print(f"      {metric}: p10 {fmt(values['p10'])} | p50 {fmt(values['p50'])} | "
+                  f"p90 {fmt(values['p90'])} | in range {values['pass_rate']:.0%} (target: {values['target']})")
+
+    print("\n" + "=" * 70)
+    print(f"   Duration: {report.duration_s:.1f}s ({report.users / max(report.duration_s, 1e-9):.0f} users/s)")
+    print(f"   Status: {'ALL CALIBRATED' if report.all_calibrated else 'NEEDS ADJUSTMENT'}")
+    print("=" * 70 + "\n")
+
+    if args.json:
+        print(json.dumps(data, indent=2, default=str))
+
+    return 0 if report.all_calibrated else 1
+
+
+def run_retention(args):
+    """
+    Run retention mode: spaced repetition over a virtual clock.
+
+    Reviews are discrete events on the engine's own schedule; virtual time
+    jumps from one to the next, so months are simulated in seconds.
+    """
+    config = RetentionConfig(users=args.retention, days=args.days, seed=args.seed)
+
+    print("\n" + "=" * 70)
+    print(" RETENTION SIMULATION [VIRTUAL CLOCK]")
+    print("=" * 70)
+    print(f"   Users: {config.users} | Days: {config.days} | Seed: {config.seed}")
+    print("-" * 70)
+
+    report = RetentionSimulation(config).run()
+    data = report.to_dict()
+
+    print(f"   Reviews: {data['reviews']} ({data['reviews_per_user_day']} per user-day)")
+    print(f"   Accuracy: {data['accuracy']:.1%} | Lapses: {data['lapses']} | "
+          f"Median interval: {data['median_interval_days']} days")
+    print(f"   Retention: final {data['final_retention']:.1%} | mean {data['mean_retention']:.1%}")
+    print("   By week: " + " ".join(f"{r:.0%}" for r in data["retention_by_week"]))
+    print("\n" + "=" * 70)
+    print(f"   Duration: {report.duration_s:.1f}s ({data['events']} events)")
+    print("=" * 70 + "\n")
+
+    if args.json:
+        print(json.dumps(data, indent=2, default=str))
+
+    return 0
+
+
+def run_loadtest(args, modules):
+    """
+    Run load-test mode: AutonomousUsers over HTTP against a uvicorn server.
+
+    Concurrency ramps through --stages; fails when --budget is exceeded.
+    """
+    config = LoadTestConfig(
+        stages=[int(s) for s in args.stages.split(",") if s.strip()],
+        days=args.days,
+        seed=args.seed,
+        profile=args.user,
+        modules=modules,
+        llm_latency_ms=args.llm_latency_ms,
+    )
+    budget = load_budget(args.budget) if args.budget else None
+
+    print("\n" + "=" * 70)
+    print(" LOAD TEST [HTTP]")
+    print("=" * 70)
+    print(f"   Stages: {', '.join(map(str, config.stages))} users | Days: {config.days} | "
+          f"Profile: {config.profile} | LLM latency: {config.llm_latency_ms:.0f}ms")
+    print("-" * 70)
+
+    def on_stage(stage):
+        data = stage.to_dict()
+        overall = data["overall"]
+        print(f"\n   {data['users']} users: {overall['count']} requests in {data['duration_s']:.1f}s "
+              f"({overall['throughput_rps']:.1f} req/s), {overall['errors']} errors")
+        print(f"      overall: p50 {overall['p50_ms']:.0f}ms | p95 {overall['p95_ms']:.0f}ms | "
+              f"p99 {overall['p99_ms']:.0f}ms")
+        if not args.quiet:
+            for route, stats in data["routes"].items():
+                print(f"      {route:<48} n={stats['count']:<5} p50 {stats['p50_ms']:>6.0f}ms | "
+                      f"p95 {stats['p95_ms']:>6.0f}ms | p99 {stats['p99_ms']:>6.0f}ms")
+
+    report = LoadTester(config).run(on_stage=on_stage)
+    data = report.to_dict()
+    violations = check_budget(data, budget) if budget else []
+
+    print("\n" + "=" * 70)
+    print(f"   Duration: {report.duration_s:.1f}s")
+    if report.llm:
+        print(f"   LLM stub: {report.llm['requests']} calls, "
+              f"{report.llm['prompt_tokens'] + report.llm['completion_tokens']} tokens")
+    if budget:
+        for violation in violations:
+            print(f"   [OVER BUDGET] {violation}")
+        print(f"   Status: {'WITHIN BUDGET' if not violations else 'BUDGET EXCEEDED'}")
+    print("=" * 70 + "\n")
+
+    if args.json:
+        print(json.dumps(data, indent=2, default=str))
+
+    return 0 if not violations else 1
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="E2E User Simulator",
@@ -384,6 +534,66 @@ Profiles: human (default), motivated, average, irregular, struggling, expert
         help="Full stress test: calibration (strict) + edge-cases"
     )
 
+    parser.add_argument(
+        "--population",
+        type=int,
+        metavar="N",
+        help="Population mode: simulate N users across a process pool and merge calibration"
+    )
+
+    parser.add_argument(
+        "--retention",
+        type=int,
+        metavar="N",
+        help="Retention mode: N users reviewing on the engine's schedule over a virtual clock"
+    )
+
+    parser.add_argument(
+        "--loadtest",
+        action="store_true",
+        help="Load-test mode: drive --user over HTTP against a uvicorn server with a stub LLM"
+    )
+
+    parser.add_argument(
+        "--stages",
+        default="1,4,16",
+        help="Concurrent users per --loadtest stage, comma-separated (default: 1,4,16)"
+    )
+
+    parser.add_argument(
+        "--budget",
+        metavar="PATH",
+        help="Latency budget JSON for --loadtest; exceeding it exits with 1"
+    )
+
+    parser.add_argument(
+        "--llm-latency-ms",
+        type=float,
+        default=300,
+        help="Stub LLM latency for --loadtest (default: 300)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Worker processes for --population (default: CPU count)"
+    )
+
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Seed for --population, --retention and --loadtest (same seed = same results)"
+    )
+
+    parser.add_argument(
+        "--min-pass-rate",
+        type=float,
+        default=0.8,
+        help="Share of a profile's users that must pass for --population (default: 0.8)"
+    )
+
     parser.add_argument(
         "--quiet", "-q",
         action="store_true",
@@ -481,6 +691,18 @@ Profiles: human (default), motivated, average, irregular, struggling, expert
     if args.calibrate:
         return run_calibration(runner, args)
 
+    # Population mode (runs its own isolated workers, not the runner adapter)
+    if args.population:
+        return run_population(args)
+
+    # Retention mode (own engine on a virtual clock)
+    if args.retention:
+        return run_retention(args)
+
+    # Load-test mode (own server in a subprocess)
+    if args.loadtest:
+        return run_loadtest(args, modules)
+
     # Run simulation
     modules_str = " + ".join(modules)
     ai_str = " [AI MODE]" if use_ai else ""
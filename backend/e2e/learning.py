@@ -196,7 +196,7 @@ class LearningTests:
 
             # Save if direct mode
             if self.config.mode.value == "direct":
-                from services.learning_engine_lean import lean_engine
+                from learning_engine.learning_engine_lean import lean_engine
                 lean_engine.save_state(user_id)
 
             # Session 2: Verify
@@ -0,0 +1,356 @@
+"""
+LLMStub - Deterministic OpenAI-compatible server for offline performance tests.
+
+Every AI path (AIDispatcher, OpenAIService, /api/chat/stream,
+AdaptiveContentGenerator) builds its client with OPENAI_BASE_URL, so pointing
+that setting at this stub runs them without network or API key:
+
+- POST /v1/chat/completions, plain or streamed (SSE chunks, [DONE]), with
+  usage fields (prompt/completion tokens ~ chars / 4);
+- latency drawn from a seeded distribution (fixed, normal or lognormal) and
+  an optional output pace in tokens per second;
+- error injection: 429 rate limits, 500 server errors, and requests held past
+  the client timeout, each with its own rate;
+- canned answers: quiz JSON (STUB_QUESTION) when the prompt asks for JSON,
+  a short message otherwise, or custom (substring, content) pairs.
+
+Same seed, same sequence of latencies and faults: retry, fallback and
+concurrency behavior can be benchmarked reproducibly.
+
+Usage:
+    python -m e2e.llm_stub --port 8100 --latency-ms 300 --rate-limit-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 python -m e2e --user human --with-ai
+
+    with StubServer(LLMStubConfig(latency_ms=50, seed=1)) as stub:
+        client = OpenAI(api_key="sk-local", base_url=stub.base_url)
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+STUB_CORRECT_ANSWER = "Option B"
+
+STUB_QUESTION = {
+    "question": "Quelle option est correcte ?",
+    "options": [
+        {"text": "Option A", "is_correct": False},
+        {"text": STUB_CORRECT_ANSWER, "is_correct": True},
+        {"text": "Option C", "is_correct": False},
+        {"text": "Option D", "is_correct": False},
+    ],
+    "correct_answer": STUB_CORRECT_ANSWER,
+    "explanation": "Réponse de test.",
+    "estimated_time": 30,
+}
+
+STUB_REPLY = "Bien joué, continue comme ça !"
+
+DISTRIBUTIONS = ("fixed", "normal", "lognormal")
+FAULTS = ("rate_limit", "server_error", "timeout")
+
+
+@dataclass
+class LLMStubConfig:
+    """LLM stub configuration"""
+    # Time to first token: latency_ms +/- jitter_ms, drawn from `distribution`
+    latency_ms: float = 300
+    jitter_ms: float = 100
+    distribution: str = "normal"
+    # Output pace after the first token (0 = whole answer at once)
+    tokens_per_s: float = 0
+    # Share of requests answered with 429 / 500 / held for timeout_s
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_s: float = 120
+    seed: int = 0
+    # (prompt substring, answer) pairs checked before the defaults
+    responses: List[Tuple[str, str]] = field(default_factory=list)
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class LLMStub:
+    """
+    The stub itself: draws a latency and a fault per request, then answers.
+
+    Draws happen in arrival order from one seeded RNG.
+    """
+
+    def __init__(self, config: Optional[LLMStubConfig] = None):
+        self.config = config or LLMStubConfig()
+        if self.config.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {self.config.distribution}")
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "streamed": 0,
+            "rate_limit": 0,
+            "server_error": 0,
+            "timeout": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+
+    def _sample_latency_ms(self) -> float:
+        config = self.config
+        if config.distribution == "fixed" or config.jitter_ms <= 0:
+            return config.latency_ms
+        if config.distribution == "normal":
+            return max(0.0, self._rng.gauss(config.latency_ms, config.jitter_ms))
+        # lognormal: median latency_ms, long right tail
+        sigma = config.jitter_ms / max(config.latency_ms, 1e-9)
+        return config.latency_ms * math.exp(self._rng.gauss(0, sigma))
+
+    def _draw(self) -> Tuple[float, Optional[str]]:
+        """Latency and fault (None = success) for the next request."""
+        config = self.config
+        with self._lock:
+            latency_ms = self._sample_latency_ms()
+            roll = self._rng.random()
+            self.stats["requests"] += 1
+            fault = None
+            threshold = 0.0
+            for name, rate in zip(FAULTS, (config.rate_limit_rate, config.server_error_rate, config.timeout_rate)):
+                threshold += rate
+                if roll < threshold:
+                    fault = name
+                    self.stats[name] += 1
+                    break
+        return latency_ms, fault
+
+    def answer(self, messages: List[Dict[str, Any]]) -> str:
+        """Canned content for a conversation."""
+        text = "\n".join(str(m.get("content") or "") for m in messages)
+        for needle, content in self.config.responses:
+            if needle in text:
+                return content
+        if "JSON" in text:
+            return json.dumps(STUB_QUESTION, ensure_ascii=False)
+        return STUB_REPLY
+
+    def app(self):
+        """FastAPI app exposing the OpenAI routes used by the backend."""
+        from fastapi import FastAPI, Request
+        from fastapi.responses import JSONResponse, StreamingResponse
+
+        app = FastAPI(title="LLM stub")
+        config = self.config
+
+        def error(status: int, kind: str, message: str) -> JSONResponse:
+            return JSONResponse(
+                status_code=status,
+                content={"error": {"message": message, "type": kind, "param": None, "code": kind}},
+            )
+
+        @app.get("/v1/models")
+        async def models():
+            return {"object": "list", "data": [
+                {"id": name, "object": "model", "created": 0, "owned_by": "stub"}
+                for name in ("gpt-4o-mini", "gpt-4o")
+            ]}
+
+        @app.get("/stats")
+        async def stats():
+            return self.stats
+
+        @app.post("/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            latency_ms, fault = self._draw()
+
+            if fault == "timeout":
+                # Held past any sane client timeout; the client gives up first
+                await asyncio.sleep(config.timeout_s)
+                return error(504, "timeout", "Stub timeout")
+            await asyncio.sleep(latency_ms / 1000)
+            if fault == "rate_limit":
+                return error(429, "rate_limit_exceeded", "Rate limit reached (stub)")
+            if fault == "server_error":
+                return error(500, "server_error", "Internal error (stub)")
+
+            messages = body.get("messages", [])
+            content = self.answer(messages)
+            finish_reason = "stop"
+            max_tokens = body.get("max_tokens") or body.get("max_completion_tokens")
+            if max_tokens and count_tokens(content) > max_tokens:
+                content = content[:max_tokens * 4]
+                finish_reason = "length"
+
+            usage = {
+                "prompt_tokens": sum(count_tokens(str(m.get("content") or "")) for m in messages),
+                "completion_tokens": count_tokens(content),
+            }
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            with self._lock:
+                self.stats["prompt_tokens"] += usage["prompt_tokens"]
+                self.stats["completion_tokens"] += usage["completion_tokens"]
+
+            completion_id = f"chatcmpl-stub-{next(self._ids)}"
+            model = body.get("model", "gpt-4o-mini")
+
+            if body.get("stream"):
+                with self._lock:
+                    self.stats["streamed"] += 1
+                include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+                return StreamingResponse(
+                    self._stream(completion_id, model, content, finish_reason, usage if include_usage else None),
+                    media_type="text/event-stream",
+                )
+
+            if config.tokens_per_s > 0:
+                await asyncio.sleep(usage["completion_tokens"] / config.tokens_per_s)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": usage,
+            }
+
+        return app
+
+    async def _stream(self, completion_id: str, model: str, content: str, finish_reason: str,
+                      usage: Optional[Dict[str, int]]) -> AsyncIterator[str]:
+        created = int(time.time())
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None, **extra) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                **extra,
+            }
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        yield chunk({"role": "assistant", "content": ""})
+        pause = 1 / self.config.tokens_per_s if self.config.tokens_per_s > 0 else 0
+        for start in range(0, len(content), 4):
+            if pause:
+                await asyncio.sleep(pause)
+            yield chunk({"content": content[start:start + 4]})
+        yield chunk({}, finish_reason)
+        if usage:
+            data = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                    "model": model, "choices": [], "usage": usage}
+            yield f"data: {json.dumps(data)}\n\n"
+        yield "data: [DONE]\n\n"
+
+
+class StubServer:
+    """
+    LLMStub served by uvicorn in a background thread.
+
+    Usage:
+        with StubServer(LLMStubConfig(latency_ms=50)) as stub:
+            os.environ["OPENAI_BASE_URL"] = stub.base_url
+    """
+
+    def __init__(self, config: Optional[LLMStubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.stub = LLMStub(config)
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self.stub.stats)
+
+    def __enter__(self) -> "StubServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def start(self, timeout: float = 10):
+        import uvicorn
+
+        if not self.port:
+            with socket.socket() as s:
+                s.bind((self.host, 0))
+                self.port = s.getsockname()[1]
+
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.stub.app(), host=self.host, port=self.port,
+            log_level="warning", access_log=False,
+        ))
+        self._thread = threading.Thread(target=self._server.run, name="llm-stub", daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"LLM stub did not start on port {self.port}")
+            time.sleep(0.02)
+
+    def stop(self):
+        if self._server:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+            self._server = None
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server for offline tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=300, help="Time to first token (default: 300)")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="Latency spread (default: 100)")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="normal")
+    parser.add_argument("--tokens-per-s", type=float, default=0, help="Output pace (default: instant)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of 429 answers")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Share of 500 answers")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Share of requests that hang")
+    parser.add_argument("--timeout-s", type=float, default=120, help="How long hanging requests hang")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    stub = LLMStub(LLMStubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        distribution=args.distribution,
+        tokens_per_s=args.tokens_per_s,
+        rate_limit_rate=args.rate_limit_rate,
+        server_error_rate=args.server_error_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_s=args.timeout_s,
+        seed=args.seed,
+    ))
+    print(f"LLM stub on http://{args.host}:{args.port}/v1")
+    print(f"   export OPENAI_BASE_URL=http://{args.host}:{args.port}/v1")
+    uvicorn.run(stub.app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
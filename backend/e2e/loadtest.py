@@ -0,0 +1,534 @@
+"""
+LoadTest - AutonomousUser behaviors against the real HTTP API.
+
+UniversalAdapter calls backend functions directly, so it says nothing about
+what uvicorn delivers under concurrency. This module:
+
+- starts `main:app` under uvicorn in a subprocess, on a free port, with its
+  own temp data directory (DATA_DIR) and OPENAI_BASE_URL pointed at an
+  e2e.llm_stub server instead of OpenAI;
+- runs AutonomousUser days through HttpAdapter, which speaks HTTP to
+  /api/learning/*, /api/tasks-db/* and /api/health/*;
+- ramps concurrency stage by stage (e.g. 1, 4, 16 users at once);
+- reports p50/p95/p99 latency, throughput and error rate per route as JSON;
+- checks the report against a regression budget.
+
+The app reaches the stub through the real OpenAI SDK, so routes that generate
+content show the cost of that synchronous call blocking the event loop.
+
+Usage:
+    config = LoadTestConfig(stages=[1, 4, 16], days=1)
+    report = LoadTester(config).run()
+    violations = check_budget(report.to_dict(), load_budget("e2e/loadtest_budget.json"))
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .autonomous_user import PROFILES, AutonomousUser
+from .llm_stub import STUB_CORRECT_ANSWER, LLMStubConfig, StubServer
+from .population import _percentile
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Route templates exercised by AutonomousUser (used to group latencies)
+ROUTE_TEMPLATES = [
+    "/api/learning/start-session",
+    "/api/learning/next-question/{session_id}",
+    "/api/learning/submit-answer/{session_id}",
+    "/api/learning/progress/{session_id}",
+    "/api/tasks-db/projects",
+    "/api/tasks-db/projects/{project_id}",
+    "/api/tasks-db/tasks",
+    "/api/tasks-db/tasks/{task_id}",
+    "/api/tasks-db/tasks/{task_id}/toggle",
+    "/api/tasks-db/pomodoro",
+    "/api/health/weight",
+    "/api/health/meals",
+    "/api/health/hydration",
+]
+
+_TEMPLATE_PATTERNS = [
+    (re.compile("^" + re.sub(r"\{[^/]+\}", "[^/]+", template) + "$"), template)
+    for template in ROUTE_TEMPLATES
+]
+
+
+def route_template(path: str) -> str:
+    """Map a concrete path to its route template (the path itself if unknown)."""
+    path = path.split("?", 1)[0].rstrip("/")
+    for pattern, template in _TEMPLATE_PATTERNS:
+        if pattern.match(path):
+            return template
+    return path
+
+
+# =============================================================================
+# SERVER
+# =============================================================================
+
+def create_app():
+    """uvicorn --factory entry point: main:app with INFO logs off."""
+    logging.disable(logging.INFO)
+
+    from main import app
+    return app
+
+
+class ServerProcess:
+    """uvicorn running main:app (LLM stub via OPENAI_BASE_URL, temp DATA_DIR) in a subprocess."""
+
+    def __init__(self, llm_base_url: Optional[str] = None, startup_timeout: float = 60):
+        self.llm_base_url = llm_base_url
+        self.startup_timeout = startup_timeout
+        self.port: Optional[int] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._data_dir: Optional[str] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "ServerProcess":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def start(self):
+        import httpx
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+
+        self._data_dir = tempfile.mkdtemp(prefix="loadtest_")
+        env = {
+            **os.environ,
+            "DATA_DIR": self._data_dir,
+        }
+        if self.llm_base_url:
+            env["OPENAI_BASE_URL"] = self.llm_base_url
+        self._proc = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "e2e.loadtest:create_app", "--factory",
+                "--host", "127.0.0.1", "--port", str(self.port),
+                "--log-level", "warning", "--no-access-log",
+            ],
+            cwd=str(BACKEND_DIR),
+            env=env,
+        )
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {self._proc.returncode}")
+            try:
+                if httpx.get(f"{self.base_url}/health", timeout=1).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"uvicorn did not start within {self.startup_timeout}s")
+
+    def stop(self):
+        if self._proc and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+        self._proc = None
+        if self._data_dir:
+            shutil.rmtree(self._data_dir, ignore_errors=True)
+            self._data_dir = None
+
+
+# =============================================================================
+# CLIENT SIDE
+# =============================================================================
+
+class LatencyRecorder:
+    """Thread-safe latency samples per route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, route: str, latency_ms: float, ok: bool):
+        with self._lock:
+            self.samples[route].append(latency_ms)
+            if not ok:
+                self.errors[route] += 1
+
+
+class HttpAdapter:
+    """
+    The UniversalAdapter interface used by AutonomousUser, over HTTP.
+
+    Learning goes through the session API: one session per (user, topic),
+    the stub's known answer is sent when the simulated user is right.
+    """
+
+    def __init__(self, base_url: str, recorder: LatencyRecorder, timeout: float = 30):
+        import httpx
+
+        self.client = httpx.Client(base_url=base_url, timeout=timeout)
+        self.recorder = recorder
+        self._sessions: Dict[tuple, str] = {}
+        self._questions: Dict[tuple, Dict] = {}
+        self._mastery: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._last_topic: Dict[str, str] = {}
+
+    def close(self):
+        self.client.close()
+
+    def _request(self, method: str, path: str, data: Dict = None, params: Dict = None,
+                 headers: Dict = None) -> Dict:
+        import httpx
+
+        route = f"{method} {route_template(path)}"
+        start = time.perf_counter()
+        try:
+            response = self.client.request(method, path, json=data, params=params, headers=headers)
+        except httpx.HTTPError as e:
+            self.recorder.add(route, (time.perf_counter() - start) * 1000, ok=False)
+            return {"success": False, "error": f"{type(e).__name__}: {e}"}
+
+        self.recorder.add(route, (time.perf_counter() - start) * 1000, ok=response.status_code < 400)
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.status_code >= 400:
+            return {"success": False, "status": response.status_code, "error": body}
+        return body if isinstance(body, dict) else {"success": True, "data": body}
+
+    # Generic HTTP-like methods (same signatures as UniversalAdapter)
+
+    def call(self, method: str, path: str, data: Dict = None, params: Dict = None) -> Dict:
+        return self._request(method, path.rstrip("/"), data=data, params=params)
+
+    def get(self, path: str, params: Dict = None) -> Dict:
+        return self.call("GET", path, params=params)
+
+    def post(self, path: str, data: Dict = None, params: Dict = None) -> Dict:
+        return self.call("POST", path, data=data, params=params)
+
+    def put(self, path: str, data: Dict = None, params: Dict = None) -> Dict:
+        return self.call("PUT", path, data=data, params=params)
+
+    def delete(self, path: str, params: Dict = None) -> Dict:
+        return self.call("DELETE", path, params=params)
+
+    def health_check(self) -> bool:
+        return self.client.get("/health").status_code == 200
+
+    # Learning engine methods
+
+    def _session(self, user_id: str, topic_id: str) -> Optional[str]:
+        key = (user_id, topic_id)
+        if key not in self._sessions:
+            result = self._request(
+                "POST", "/api/learning/start-session",
+                data={"course_id": "loadtest", "topic_id": topic_id},
+                headers={"X-User-Id": user_id},
+            )
+            if "session_id" not in result:
+                return None
+            self._sessions[key] = result["session_id"]
+        return self._sessions[key]
+
+    def start_session(self, user_id: str, topics: List[str]) -> Dict:
+        """A new day: sessions are opened lazily, one per topic."""
+        for key in [k for k in self._sessions if k[0] == user_id]:
+            del self._sessions[key]
+        return {"success": True, "user_id": user_id}
+
+    def get_next_question(self, user_id: str, topic_id: str, mastery: int) -> Dict:
+        session_id = self._session(user_id, topic_id)
+        if not session_id:
+            return {"difficulty": 2, "topic_id": topic_id}
+
+        question = self._request("GET", f"/api/learning/next-question/{session_id}")
+        self._questions[(user_id, topic_id)] = question
+        advanced = question.get("advanced", {})
+        return {
+            "difficulty": advanced.get("difficulty_level", 2),
+            "topic_id": topic_id,
+            "fsrs_interval": advanced.get("fsrs_interval", 0),
+            "retrievability": advanced.get("retrievability", 100) / 100,
+            "cognitive_load": advanced.get("cognitive_load", "optimal"),
+            "should_take_break": advanced.get("should_take_break", False),
+        }
+
+    def generate_ai_question(self, topic_id: str, difficulty, mastery: int) -> Dict:
+        """Questions come with /next-question over HTTP: nothing extra to generate."""
+        return {"success": False, "topic_id": topic_id}
+
+    def submit_answer(self, user_id: str, topic_id: str, is_correct: bool,
+                      response_time: float, difficulty: int) -> Dict:
+        session_id = self._sessions.get((user_id, topic_id))
+        question = self._questions.pop((user_id, topic_id), None)
+        if not session_id or not question or "question_id" not in question:
+            return {"is_correct": is_correct, "xp_earned": 0, "next_review_days": 1,
+                    "mastery_change": 0, "feedback": "", "should_take_break": False,
+                    "should_reduce_difficulty": False}
+
+        result = self._request(
+            "POST", f"/api/learning/submit-answer/{session_id}",
+            data={
+                "question_id": question["question_id"],
+                "user_answer": STUB_CORRECT_ANSWER if is_correct else "Option A",
+                "time_taken": max(1, int(response_time)),
+            },
+        )
+        self._last_topic[user_id] = topic_id
+        advanced = result.get("advanced_metrics") or {}
+        return {
+            "is_correct": result.get("is_correct", is_correct),
+            "xp_earned": result.get("xp_earned", 0),
+            "next_review_days": advanced.get("next_review_days", 1),
+            "mastery_change": result.get("mastery_change", 0),
+            "feedback": result.get("encouragement", ""),
+            "should_take_break": advanced.get("should_take_break", False),
+            "should_reduce_difficulty": advanced.get("should_reduce_difficulty", False),
+        }
+
+    def get_user_stats(self, user_id: str) -> Dict:
+        """Mastery per topic; only the last answered topic can have changed."""
+        topic = self._last_topic.pop(user_id, None)
+        session_id = self._sessions.get((user_id, topic)) if topic else None
+        if session_id:
+            progress = self._request("GET", f"/api/learning/progress/{session_id}")
+            if "mastery_level" in progress:
+                self._mastery[user_id][topic] = progress["mastery_level"]
+        return {"mastery": dict(self._mastery[user_id])}
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+@dataclass
+class LoadTestConfig:
+    """Load test configuration"""
+    # Concurrent users per stage, run one after the other
+    stages: List[int] = field(default_factory=lambda: [1, 4, 16])
+    days: int = 1
+    seed: int = 42
+    profile: str = "human"
+    modules: List[str] = field(default_factory=lambda: ["learning", "tasks", "health"])
+    llm_latency_ms: float = 300
+    llm_jitter_ms: float = 100
+
+
+def summarize(samples: List[float], errors: int, duration_s: float) -> Dict[str, Any]:
+    values = sorted(samples)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_rps": round(count / duration_s, 2) if duration_s > 0 else 0.0,
+        "mean_ms": round(sum(values) / count, 2) if count else 0.0,
+        "p50_ms": round(_percentile(values, 50), 2),
+        "p95_ms": round(_percentile(values, 95), 2),
+        "p99_ms": round(_percentile(values, 99), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+    }
+
+
+@dataclass
+class StageResult:
+    """Latencies of one concurrency stage"""
+    users: int
+    duration_s: float
+    recorder: LatencyRecorder
+    user_errors: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        all_samples = [v for samples in self.recorder.samples.values() for v in samples]
+        return {
+            "users": self.users,
+            "duration_s": round(self.duration_s, 2),
+            "user_errors": self.user_errors,
+            "overall": summarize(all_samples, sum(self.recorder.errors.values()), self.duration_s),
+            "routes": {
+                route: summarize(samples, self.recorder.errors.get(route, 0), self.duration_s)
+                for route, samples in sorted(self.recorder.samples.items())
+            },
+        }
+
+
+@dataclass
+class LoadReport:
+    """Load test report: one entry per concurrency stage"""
+    config: LoadTestConfig
+    stages: List[StageResult] = field(default_factory=list)
+    duration_s: float = 0.0
+    # Requests, faults and tokens seen by the LLM stub
+    llm: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "config": asdict(self.config),
+            "duration_s": round(self.duration_s, 2),
+            "stages": [stage.to_dict() for stage in self.stages],
+            "llm": self.llm,
+        }
+
+
+# =============================================================================
+# BUDGET
+# =============================================================================
+
+BUDGET_METRICS = ("p50_ms", "p95_ms", "p99_ms", "error_rate")
+
+
+def load_budget(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_budget(report: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    """
+    Compare a report (LoadReport.to_dict()) with a regression budget.
+
+    Budget format (limits are maxima; every key is optional):
+        {
+          "stage": "max",                       # stage to check: "max" or a user count
+          "overall": {"p95_ms": 500, "error_rate": 0.01},
+          "default": {"p99_ms": 2000},          # every route without its own entry
+          "routes": {"POST /api/tasks-db/tasks": {"p95_ms": 100}}
+        }
+
+    Returns the list of violations (empty = within budget).
+    """
+    stages = report["stages"]
+    if not stages:
+        return ["no stage was run"]
+
+    wanted = budget.get("stage", "max")
+    if wanted == "max":
+        stage = max(stages, key=lambda s: s["users"])
+    else:
+        matching = [s for s in stages if s["users"] == int(wanted)]
+        if not matching:
+            return [f"no stage with {wanted} users"]
+        stage = matching[0]
+
+    def compare(name: str, stats: Dict[str, Any], limits: Dict[str, float]) -> List[str]:
+        return [
+            f"{name} @ {stage['users']} users: {metric} {stats[metric]} > {limits[metric]}"
+            for metric in BUDGET_METRICS
+            if metric in limits and stats.get(metric, 0) > limits[metric]
+        ]
+
+    violations = compare("overall", stage["overall"], budget.get("overall", {}))
+    route_limits = budget.get("routes", {})
+    for route, stats in stage["routes"].items():
+        violations += compare(route, stats, route_limits.get(route, budget.get("default", {})))
+    for route in route_limits:
+        if route not in stage["routes"]:
+            violations.append(f"{route} @ {stage['users']} users: no request recorded")
+    return violations
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+class LoadTester:
+    """
+    Ramps AutonomousUser concurrency against a uvicorn server.
+
+    Usage:
+        report = LoadTester(LoadTestConfig(stages=[1, 8])).run()
+    """
+
+    def __init__(self, config: LoadTestConfig, base_url: Optional[str] = None):
+        self.config = config
+        # Existing server to target instead of starting one (stub LLM is then up to it)
+        self.base_url = base_url
+
+    def _run_user(self, base_url: str, recorder: LatencyRecorder, stage: int, index: int) -> bool:
+        config = self.config
+        adapter = HttpAdapter(base_url, recorder)
+        user = AutonomousUser(config.profile, user_id=f"load_{stage}_{index:04d}")
+        try:
+            user.live_week(adapter, days=config.days, modules=config.modules, verbose=False)
+            return True
+        except Exception:
+            return False
+        finally:
+            user.cleanup(adapter)
+            adapter.close()
+
+    def _run_stage(self, base_url: str, users: int) -> StageResult:
+        recorder = LatencyRecorder()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as pool:
+            outcomes = list(pool.map(
+                lambda index: self._run_user(base_url, recorder, users, index), range(users)
+            ))
+        return StageResult(
+            users=users,
+            duration_s=time.perf_counter() - start,
+            recorder=recorder,
+            user_errors=outcomes.count(False),
+        )
+
+    def run(self, on_stage: Optional[Callable[[StageResult], None]] = None) -> LoadReport:
+        """
+        Run every stage and return the report.
+
+        Args:
+            on_stage: Called with each StageResult as it completes
+        """
+        config = self.config
+        if config.profile not in PROFILES:
+            raise ValueError(f"Unknown profile: {config.profile}")
+
+        report = LoadReport(config)
+        # AutonomousUser draws from the global RNG; users share it across threads
+        random.seed(config.seed)
+        start = time.perf_counter()
+
+        def run_stages(base_url: str):
+            for users in config.stages:
+                stage = self._run_stage(base_url, users)
+                report.stages.append(stage)
+                if on_stage:
+                    on_stage(stage)
+
+        if self.base_url:
+            run_stages(self.base_url)
+        else:
+            llm = LLMStubConfig(latency_ms=config.llm_latency_ms, jitter_ms=config.llm_jitter_ms, seed=config.seed)
+            with StubServer(llm) as stub, ServerProcess(llm_base_url=stub.base_url) as server:
+                run_stages(server.base_url)
+            report.llm = stub.stats
+
+        report.duration_s = time.perf_counter() - start
+        return report
@@ -0,0 +1,326 @@
+"""
+PopulationSimulator - Thousands of AutonomousUser instances across a process pool.
+
+Calibration (`--calibrate`) runs one user per profile on one core. This module
+shards a whole population across worker processes so LeanLearningEngine changes
+can be validated against realistic distributions in minutes.
+
+- Each worker gets its own temp database set (learning, tasks, health, tutor
+  profiles, skill graph): no shared SQLite file, no cross-worker locking,
+  nothing left in data/.
+- Each user is simulated with its own seed, derived from the population seed
+  and the user index: results do not depend on the number of workers.
+- Shards stream back as they finish and are merged into one calibration report.
+
+Usage:
+    config = PopulationConfig(users=1000, days=14, workers=8, seed=42)
+    report = PopulationSimulator(config).run()
+    print(report.to_dict())
+"""
+
+import importlib
+import logging
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .autonomous_user import PROFILES, AutonomousUser, get_calibration_targets
+
+# (user index, profile name, seed)
+UserPlan = Tuple[int, str, int]
+
+METRICS = ("mastery", "accuracy", "xp_per_day", "attendance")
+
+
+@dataclass
+class PopulationConfig:
+    """Population simulation configuration"""
+    users: int = 1000
+    days: int = 14
+    seed: int = 42
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    shard_size: int = 25
+    # Relative weight of each profile in the population (default: uniform)
+    profile_weights: Dict[str, float] = field(default_factory=lambda: {name: 1.0 for name in PROFILES})
+    modules: List[str] = field(default_factory=lambda: ["learning"])
+    topics: List[str] = field(default_factory=lambda: [
+        "conjugaison", "grammaire", "vocabulaire", "orthographe"
+    ])
+    strict: bool = False
+    # A profile is calibrated when at least this share of its users pass all targets
+    min_pass_rate: float = 0.8
+
+
+def plan_population(config: PopulationConfig) -> List[UserPlan]:
+    """
+    Assign a profile and a seed to every user.
+
+    Planning happens once, in the parent, from the population seed: the same
+    config always simulates the same users, however they are sharded.
+    """
+    rng = random.Random(config.seed)
+    names = [name for name, weight in config.profile_weights.items() if weight > 0]
+    weights = [config.profile_weights[name] for name in names]
+
+    return [
+        (index, rng.choices(names, weights)[0], rng.getrandbits(64))
+        for index in range(config.users)
+    ]
+
+
+# =============================================================================
+# WORKER SIDE
+# =============================================================================
+
+_worker = {}
+
+
+def _init_worker(root: str):
+    """Point the module-level databases and engine at a private temp directory."""
+    logging.disable(logging.INFO)
+
+    workdir = tempfile.mkdtemp(prefix=f"worker_{os.getpid()}_", dir=root)
+
+    import databases
+    databases.tasks_db = databases.TasksDatabase(os.path.join(workdir, "tasks.db"))
+    databases.health_db = databases.HealthDatabase(os.path.join(workdir, "health.db"))
+
+    # import_module: the package shadows the submodule name with a class alias
+    engine_module = importlib.import_module("learning_engine.learning_engine_lean")
+    engine_module.lean_engine = engine_module.LeanLearningEngine(db_path=os.path.join(workdir, "learning.db"))
+
+    # Module-level stores: their functions read DB_PATH on every connection
+    from databases import skill_graph_db, tutor_profile_db
+    tutor_profile_db.DB_PATH = Path(workdir) / "tutor_profiles.db"
+    skill_graph_db.DB_PATH = Path(workdir) / "skill_graph.db"
+
+    shared = {name: path for name, path in _store_paths().items()
+              if Path(path).resolve().parent != Path(workdir).resolve()}
+    if shared:
+        raise RuntimeError(f"Worker stores outside {workdir}: {shared}")
+
+    from .adapter import UniversalAdapter
+    _worker["adapter"] = UniversalAdapter()
+    _worker["engine"] = engine_module.lean_engine
+
+
+def _store_paths() -> Dict[str, str]:
+    """SQLite file of every store a simulated user can write to."""
+    import databases
+    from databases import skill_graph_db, tutor_profile_db
+    engine = importlib.import_module("learning_engine.learning_engine_lean").lean_engine
+
+    return {
+        "tasks": databases.tasks_db.db_path,
+        "health": databases.health_db.db_path,
+        "learning": engine.db_path,
+        "review_events": engine.review_log.db_path,
+        "tutor_profile": str(tutor_profile_db.DB_PATH),
+        "skill_graph": str(skill_graph_db.DB_PATH),
+    }
+
+
+def _simulate_shard(
+    shard: List[UserPlan],
+    days: int,
+    modules: List[str],
+    topics: List[str],
+    strict: bool
+) -> List[Dict]:
+    """Simulate a shard of users sequentially in this worker."""
+    adapter = _worker["adapter"]
+    engine = _worker["engine"]
+    targets = get_calibration_targets(days=days, strict=strict)
+    results = []
+
+    for index, profile, seed in shard:
+        # The engine and the user both draw from the global RNG
+        random.seed(seed)
+        user = AutonomousUser(profile, user_id=f"pop_{index:06d}")
+        try:
+            stats = user.live_week(adapter, days=days, topics=topics, modules=modules, verbose=False)
+        except Exception as e:
+            results.append({"index": index, "profile": profile, "error": f"{type(e).__name__}: {e}"})
+            continue
+        finally:
+            user.cleanup(adapter)
+            # Keep worker memory flat over thousands of users
+            engine.delete_state(user.user_id)
+
+        check = targets[profile].check(stats, days) if profile in targets else None
+        results.append({
+            "index": index,
+            "profile": profile,
+            "questions": stats["questions"],
+            "calibration": check,
+        })
+
+    return results
+
+
+# =============================================================================
+# PARENT SIDE
+# =============================================================================
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(pct / 100 * (len(values) - 1)))))
+    return values[rank]
+
+
+@dataclass
+class ProfileAggregate:
+    """Merged results for one profile"""
+    profile: str
+    users: int = 0
+    errors: int = 0
+    calibrated_users: int = 0
+    questions: int = 0
+    values: Dict[str, List[float]] = field(default_factory=lambda: {m: [] for m in METRICS})
+    passes: Dict[str, int] = field(default_factory=lambda: {m: 0 for m in METRICS})
+    targets: Dict[str, str] = field(default_factory=dict)
+
+    def add(self, result: Dict):
+        self.users += 1
+        if "error" in result:
+            self.errors += 1
+            return
+
+        self.questions += result["questions"]
+        check = result.get("calibration")
+        if not check:
+            return
+
+        if check["all_pass"]:
+            self.calibrated_users += 1
+        for metric in METRICS:
+            self.values[metric].append(check[metric]["value"])
+            self.passes[metric] += int(check[metric]["pass"])
+            self.targets[metric] = check[metric]["target"]
+
+    @property
+    def pass_rate(self) -> float:
+        checked = self.users - self.errors
+        return self.calibrated_users / checked if checked else 0.0
+
+    def to_dict(self) -> Dict:
+        checked = self.users - self.errors
+        metrics = {}
+        for metric in METRICS:
+            values = sorted(self.values[metric])
+            metrics[metric] = {
+                "mean": round(statistics.fmean(values), 4) if values else 0.0,
+                "p10": round(_percentile(values, 10), 4),
+                "p50": round(_percentile(values, 50), 4),
+                "p90": round(_percentile(values, 90), 4),
+                "pass_rate": round(self.passes[metric] / checked, 4) if checked else 0.0,
+                "target": self.targets.get(metric),
+            }
+        return {
+            "users": self.users,
+            "errors": self.errors,
+            "questions": self.questions,
+            "pass_rate": round(self.pass_rate, 4),
+            "metrics": metrics,
+        }
+
+
+@dataclass
+class PopulationReport:
+    """Merged calibration report for a whole population"""
+    config: PopulationConfig
+    profiles: Dict[str, ProfileAggregate] = field(default_factory=dict)
+    duration_s: float = 0.0
+
+    def add(self, result: Dict):
+        profile = result["profile"]
+        if profile not in self.profiles:
+            self.profiles[profile] = ProfileAggregate(profile)
+        self.profiles[profile].add(result)
+
+    @property
+    def users(self) -> int:
+        return sum(p.users for p in self.profiles.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(p.errors for p in self.profiles.values())
+
+    @property
+    def all_calibrated(self) -> bool:
+        return bool(self.profiles) and all(
+            p.pass_rate >= self.config.min_pass_rate for p in self.profiles.values()
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "users": self.users,
+            "errors": self.errors,
+            "days": self.config.days,
+            "seed": self.config.seed,
+            "workers": self.config.workers,
+            "strict": self.config.strict,
+            "min_pass_rate": self.config.min_pass_rate,
+            "duration_s": round(self.duration_s, 2),
+            "all_calibrated": self.all_calibrated,
+            "profiles": {name: self.profiles[name].to_dict() for name in sorted(self.profiles)},
+        }
+
+
+class PopulationSimulator:
+    """
+    Shards a population of AutonomousUser across a process pool.
+
+    Usage:
+        report = PopulationSimulator(PopulationConfig(users=500, workers=4)).run()
+    """
+
+    def __init__(self, config: PopulationConfig):
+        self.config = config
+
+    def _shards(self) -> List[List[UserPlan]]:
+        plan = plan_population(self.config)
+        size = max(1, self.config.shard_size)
+        return [plan[i:i + size] for i in range(0, len(plan), size)]
+
+    def run(self, on_progress: Optional[Callable[[int, int], None]] = None) -> PopulationReport:
+        """
+        Simulate the population and return the merged report.
+
+        Args:
+            on_progress: Called with (users_done, users_total) as shards complete
+        """
+        config = self.config
+        report = PopulationReport(config)
+        start = time.monotonic()
+        root = tempfile.mkdtemp(prefix="population_")
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max(1, config.workers),
+                initializer=_init_worker,
+                initargs=(root,),
+            ) as pool:
+                futures = [
+                    pool.submit(_simulate_shard, shard, config.days, config.modules, config.topics, config.strict)
+                    for shard in self._shards()
+                ]
+                for future in as_completed(futures):
+                    for result in future.result():
+                        report.add(result)
+                    if on_progress:
+                        on_progress(report.users, config.users)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+        report.duration_s = time.monotonic() - start
+        return report
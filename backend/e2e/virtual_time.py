@@ -0,0 +1,275 @@
+"""
+Virtual-time retention simulation - months of spaced repetition in seconds.
+
+The learning engine schedules reviews days apart, so simulating retention in
+real time is impossible and `live_week` (one call per day) spends most of its
+work on days where nothing is due. This module drives the engine with a
+VirtualClock and a discrete-event queue instead:
+
+- Every card review is an event at a virtual instant; the clock jumps straight
+  from one event to the next, with no sleep and no idle days.
+- The engine schedules the next event itself (FSRS interval of each answer).
+- A daily snapshot event measures true retention across the population.
+
+Each simulated learner has a hidden memory model (recall = 0.9 ** (t / S), with
+S growing on success and shrinking on lapses) built from its AutonomousUser
+profile, so the report shows how well the engine's schedule keeps knowledge
+alive, not just what the engine believes.
+
+Usage:
+    config = RetentionConfig(users=1000, days=90, seed=42)
+    report = RetentionSimulation(config).run()
+    print(report.to_dict())
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from utils.clock import VirtualClock, use_clock
+
+from .autonomous_user import PROFILES, UserProfile
+
+
+class EventScheduler:
+    """
+    Discrete-event loop over a VirtualClock.
+
+    Events run in time order (FIFO for equal times); the clock is moved to
+    each event's time before it runs, and an event may schedule new ones.
+    """
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self._queue: List[Tuple[datetime, int, Callable[[], None]]] = []
+        self._seq = itertools.count()
+        self.processed = 0
+
+    def schedule(self, at: datetime, action: Callable[[], None]):
+        heapq.heappush(self._queue, (at, next(self._seq), action))
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def run(self, until: datetime) -> int:
+        """Run every event scheduled before `until`, then move the clock there."""
+        processed = 0
+        while self._queue and self._queue[0][0] < until:
+            at, _, action = heapq.heappop(self._queue)
+            self.clock.advance_to(at)
+            action()
+            processed += 1
+        self.clock.advance_to(until)
+        self.processed += processed
+        return processed
+
+
+@dataclass
+class RetentionConfig:
+    """Retention simulation configuration"""
+    users: int = 1000
+    days: int = 90
+    seed: int = 42
+    start: datetime = datetime(2025, 1, 6, 0, 0)
+    # Relative weight of each profile in the population (default: uniform)
+    profile_weights: Dict[str, float] = field(default_factory=lambda: {name: 1.0 for name in PROFILES})
+    topics: List[str] = field(default_factory=lambda: [
+        "conjugaison", "grammaire", "vocabulaire", "orthographe"
+    ])
+    # New topics are introduced one every `introduce_every` days
+    introduce_every: int = 3
+
+
+@dataclass
+class MemoryTrace:
+    """Hidden memory state of one learner for one topic"""
+    stability: float          # Days until recall drops to 90%
+    last_review: datetime
+    mastery: int = 0
+    reviews: int = 0
+    lapses: int = 0
+
+    def recall(self, now: datetime) -> float:
+        elapsed = (now - self.last_review).total_seconds() / 86400
+        return 0.9 ** (elapsed / self.stability)
+
+
+class SimulatedLearner:
+    """A learner whose memory follows the profile, reviewed on the engine's schedule."""
+
+    def __init__(self, user_id: str, profile: UserProfile, rng: random.Random):
+        self.user_id = user_id
+        self.profile = profile
+        self.rng = rng
+        self.traces: Dict[str, MemoryTrace] = {}
+
+    @property
+    def initial_stability(self) -> float:
+        return 0.5 + 2.0 * self.profile.skill_level
+
+    @property
+    def growth(self) -> float:
+        """Stability multiplier after a successful review."""
+        return 1.5 + 50 * self.profile.learning_rate
+
+    def study_time(self, day: datetime) -> datetime:
+        """Random moment within the profile's active hours on `day`."""
+        start, end = self.profile.active_hours
+        minutes = self.rng.randrange(start * 60, max(start + 1, end) * 60)
+        return day.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(minutes=minutes)
+
+    def answer(self, topic: str, now: datetime) -> Tuple[bool, float]:
+        """Answer a review of `topic` now; updates the hidden memory."""
+        trace = self.traces.get(topic)
+        if trace is None:
+            # First exposure: the question teaches the topic
+            trace = self.traces[topic] = MemoryTrace(self.initial_stability, now)
+            is_correct = self.rng.random() < self.profile.accuracy_base
+        else:
+            is_correct = self.rng.random() < trace.recall(now)
+            if is_correct:
+                trace.stability *= self.growth
+            else:
+                trace.stability = max(0.3, trace.stability * 0.4)
+                trace.lapses += 1
+            trace.last_review = now
+
+        trace.reviews += 1
+        response_time = max(1.0, self.rng.gauss(self.profile.response_time_base, self.profile.response_time_variance))
+        return is_correct, response_time
+
+
+@dataclass
+class RetentionReport:
+    """Result of a retention simulation"""
+    config: RetentionConfig
+    # Mean true recall of introduced topics at the end of each day
+    retention_by_day: List[float] = field(default_factory=list)
+    reviews: int = 0
+    correct: int = 0
+    lapses: int = 0
+    intervals: List[int] = field(default_factory=list)
+    events: int = 0
+    duration_s: float = 0.0
+
+    def to_dict(self) -> Dict:
+        curve = self.retention_by_day
+        intervals = sorted(self.intervals)
+        return {
+            "users": self.config.users,
+            "days": self.config.days,
+            "seed": self.config.seed,
+            "reviews": self.reviews,
+            "reviews_per_user_day": round(self.reviews / max(1, self.config.users * self.config.days), 3),
+            "accuracy": round(self.correct / self.reviews, 4) if self.reviews else 0.0,
+            "lapses": self.lapses,
+            "median_interval_days": intervals[len(intervals) // 2] if intervals else 0,
+            "final_retention": round(curve[-1], 4) if curve else 0.0,
+            "mean_retention": round(statistics.fmean(curve), 4) if curve else 0.0,
+            "retention_by_week": [round(r, 4) for r in curve[6::7]],
+            "events": self.events,
+            "duration_s": round(self.duration_s, 2),
+        }
+
+
+class RetentionSimulation:
+    """
+    Runs a population through the engine on a virtual clock.
+
+    Usage:
+        report = RetentionSimulation(RetentionConfig(users=200, days=30)).run()
+    """
+
+    def __init__(self, config: RetentionConfig):
+        self.config = config
+
+    def _plan(self, rng: random.Random) -> List[SimulatedLearner]:
+        names = [name for name, weight in self.config.profile_weights.items() if weight > 0]
+        weights = [self.config.profile_weights[name] for name in names]
+        return [
+            SimulatedLearner(
+                f"vt_{index:06d}",
+                PROFILES[rng.choices(names, weights)[0]],
+                random.Random(rng.getrandbits(64)),
+            )
+            for index in range(self.config.users)
+        ]
+
+    def run(self) -> RetentionReport:
+        # Imported here: the engine module creates its default DB on import
+        from learning_engine.learning_engine_lean import LeanLearningEngine
+
+        config = self.config
+        report = RetentionReport(config)
+        rng = random.Random(config.seed)
+        learners = self._plan(rng)
+        # The engine draws from the global RNG (FSRS fuzzing, difficulty jitter)
+        random.seed(config.seed)
+
+        clock = VirtualClock(config.start)
+        scheduler = EventScheduler(clock)
+        workdir = tempfile.mkdtemp(prefix="virtual_time_")
+        started = time.monotonic()
+
+        engine = LeanLearningEngine(db_path=os.path.join(workdir, "learning.db"), clock=clock)
+
+        def review(learner: SimulatedLearner, topic: str):
+            now = clock.now()
+            if learner.rng.random() < learner.profile.skip_probability:
+                # Skipped day: the review slips to tomorrow
+                scheduler.schedule(learner.study_time(now + timedelta(days=1)), lambda: review(learner, topic))
+                return
+
+            mastery = learner.traces[topic].mastery if topic in learner.traces else 0
+            params = engine.get_next_question(learner.user_id, topic, mastery)
+            is_correct, response_time = learner.answer(topic, now)
+            result = engine.process_answer(learner.user_id, topic, is_correct, response_time, params.difficulty)
+
+            trace = learner.traces[topic]
+            trace.mastery = max(0, min(100, trace.mastery + result.mastery_change))
+            report.reviews += 1
+            report.correct += int(is_correct)
+            report.intervals.append(result.next_review_days)
+
+            due = now + timedelta(days=max(1, result.next_review_days))
+            scheduler.schedule(learner.study_time(due), lambda: review(learner, topic))
+
+        def snapshot():
+            now = clock.now()
+            recalls = [
+                trace.recall(now)
+                for learner in learners
+                for trace in learner.traces.values()
+            ]
+            report.retention_by_day.append(statistics.fmean(recalls) if recalls else 0.0)
+
+        for learner in learners:
+            for position, topic in enumerate(config.topics):
+                day = config.start + timedelta(days=position * config.introduce_every)
+                scheduler.schedule(learner.study_time(day), lambda learner=learner, topic=topic: review(learner, topic))
+
+        previous = logging.root.manager.disable
+        logging.disable(logging.INFO)
+        try:
+            with use_clock(clock):
+                for day in range(1, config.days + 1):
+                    report.events += scheduler.run(until=config.start + timedelta(days=day))
+                    snapshot()
+        finally:
+            logging.disable(previous)
+            # Write the pending review events while the workdir still exists
+            engine.review_log.flush()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        report.lapses = sum(t.lapses for learner in learners for t in learner.traces.values())
+        report.duration_s = time.monotonic() - started
+        return report
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-Script pour initialiser la base de données d'apprentissage
+Script pour initialiser les bases de données (tâches, santé, apprentissage)
+et reprendre l'ancienne database.db si elle existe
 """
 
 import sys
@@ -9,38 +10,24 @@ import os
 # Ajouter le dossier backend au path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from database import db
+from databases import tasks_db, health_db, learning_db
+from databases.legacy_migrator import LEGACY_DB_PATH, migrate_legacy_database
 
 def main():
-    print("🚀 Initialisation de la base de données d'apprentissage...")
-    print(f"📁 Fichier DB: {db.db_path}")
-    
-    # La DB est initialisée automatiquement dans __init__
-    # Mais on peut vérifier qu'elle existe
-    
-    if os.path.exists(db.db_path):
-        print("✅ Base de données créée avec succès!")
-        print("\n📊 Tables créées:")
-        print("  • sessions - Stockage des sessions d'apprentissage")
-        print("  • topic_mastery - Maîtrise par topic (SM-2++)")
-        print("  • review_streaks - Streaks de révision")
-        print("\n✨ Prêt à apprendre!")
-    else:
-        print("❌ Erreur lors de la création de la base de données")
-        sys.exit(1)
-
-if __name__ == "__main__":
-    main()
-
-
-
-
-
-
-
-
-
+    print("🚀 Initialisation des bases de données...")
 
+    # Les migrations sont appliquées à la première connexion
+    for store in (tasks_db, health_db, learning_db):
+        store._get_connection().close()
+        print(f"  • {store.db_path}")
 
+    report = migrate_legacy_database()
+    if report:
+        print(f"\n🔄 Reprise de {LEGACY_DB_PATH}:")
+        for label, copied in report.items():
+            print(f"  • {label}: " + ", ".join(f"{table}={count}" for table, count in copied.items()))
 
+    print("\n✨ Prêt à apprendre!")
 
+if __name__ == "__main__":
+    main()
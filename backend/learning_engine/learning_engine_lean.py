@@ -22,13 +22,23 @@ from dataclasses import dataclass
 from pathlib import Path
 
 # Imports essentiels uniquement
-from utils.fsrs_algorithm import FSRS, FSRSCard, Rating
+from databases.review_events import ReviewEventLog
+from databases.schema import Migration, SchemaGuard
+from utils.fsrs_algorithm import FSRS, FSRSCard, Rating, rating_from_response
 from utils.cognitive_load import CognitiveLoadDetector
+from utils.rolling import RollingWindow, RunningStats
+from utils.clock import Clock, get_clock
+from utils.metrics import DB_OPERATION_DURATION, ENGINE_ANSWERS, ENGINE_DURATION, count_queries, timed
+from utils.tracing import traced
+from config import settings
 
 logger = logging.getLogger(__name__)
 
 # Chemin de la base de données
-DB_PATH = Path(__file__).parent.parent / "data" / "learning.db"
+DB_PATH = Path(settings.DATA_DIR) / "learning.db"
+
+# Séries liées une fois : pas de recherche de labels dans le chemin chaud
+_ANSWERS = {True: ENGINE_ANSWERS.labels("true"), False: ENGINE_ANSWERS.labels("false")}
 
 
 @dataclass
@@ -87,6 +97,48 @@ class UserState:
     warning_message: Optional[str] = None  # Message d'alerte
 
 
+class SessionWindows:
+    """
+    Fenêtres glissantes des réponses de la session.
+
+    Mises à jour à chaque réponse : l'évaluation d'état et les stats lisent
+    des sommes courantes au lieu de re-découper state["responses"].
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.correct_total = 0
+        self.error_streak = 0
+        self.response_time = RunningStats()  # Toute la session
+        self.times_10 = RollingWindow(10)
+        self.times_5 = RollingWindow(5)
+        self.correct_5 = RollingWindow(5)
+        self.correct_10 = RollingWindow(10)
+        self.correct_20 = RollingWindow(20)
+        self.difficulty_20 = RollingWindow(20)
+
+    def add(self, response: Dict[str, Any]):
+        correct = 1 if response.get("is_correct", False) else 0
+        response_time = response.get("response_time", 30)
+        self.count += 1
+        self.correct_total += correct
+        self.error_streak = 0 if correct else self.error_streak + 1
+        self.response_time.add(response_time)
+        self.times_10.append(response_time)
+        self.times_5.append(response_time)
+        self.correct_5.append(correct)
+        self.correct_10.append(correct)
+        self.correct_20.append(correct)
+        self.difficulty_20.append(response.get("difficulty", 3))
+
+    @classmethod
+    def from_responses(cls, responses: List[Dict[str, Any]]) -> "SessionWindows":
+        windows = cls()
+        for response in responses:
+            windows.add(response)
+        return windows
+
+
 class LeanLearningEngine:
     """
     Moteur d'apprentissage LEAN v4.8
@@ -130,10 +182,14 @@ class LeanLearningEngine:
         5: {"name": "EXPERT", "display": "Expert", "xp": 50, "target_accuracy": 0.50},
     }
 
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, clock: Optional[Clock] = None,
+                 review_log: Optional[ReviewEventLog] = None):
         # Module 1: FSRS
         self.fsrs = FSRS()
 
+        # Horloge fixe, sinon l'horloge courante (utils.clock) à chaque appel
+        self._clock = clock
+
         # État par utilisateur (cache mémoire)
         self._user_states: Dict[str, Dict[str, Any]] = {}
 
@@ -141,39 +197,51 @@ class LeanLearningEngine:
         self.db_path = db_path or str(DB_PATH)
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
 
-        # Initialiser la table de persistance
-        self._init_db()
+        # Table de persistance créée au premier accès, pas à la construction
+        self._schema = SchemaGuard("engine", [Migration(1, "table lean_user_states", self._init_db)])
+
+        # Journal des réponses (analytics, ajustement FSRS), dans la même base
+        self.review_log = review_log or ReviewEventLog(db_path=self.db_path)
 
         logger.info("🧠 Lean Learning Engine v4.8 initialized")
 
+    @property
+    def clock(self) -> Clock:
+        return self._clock or get_clock()
+
     # =========================================================================
     # PERSISTANCE DB
     # =========================================================================
 
-    def _init_db(self):
-        """Crée la table de persistance si elle n'existe pas"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+    def _init_db(self, conn: sqlite3.Connection):
+        """
+        Crée la table de persistance si elle n'existe pas (migration 1).
 
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS lean_user_states (
-                    user_id TEXT PRIMARY KEY,
-                    fsrs_cards TEXT,
-                    mastery TEXT,
-                    streak INTEGER DEFAULT 0,
-                    last_topic TEXT,
-                    total_xp INTEGER DEFAULT 0,
-                    responses_count INTEGER DEFAULT 0,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+        Appelé une fois par SchemaGuard ; une erreur remonte à l'appelant
+        (save_state / load_state la journalisent) et sera retentée.
+        """
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS lean_user_states (
+                user_id TEXT PRIMARY KEY,
+                fsrs_cards TEXT,
+                mastery TEXT,
+                streak INTEGER DEFAULT 0,
+                last_topic TEXT,
+                total_xp INTEGER DEFAULT 0,
+                responses_count INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
 
-            conn.commit()
-            conn.close()
-            logger.info("✅ Table lean_user_states initialisée")
-        except Exception as e:
-            logger.error(f"❌ Erreur init DB: {e}")
+        conn.commit()
+        logger.info("✅ Table lean_user_states initialisée")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connexion à la base (migrations appliquées au premier appel)"""
+        self._schema.ensure(self.db_path)
+        return count_queries(sqlite3.connect(self.db_path), "engine")
 
     def _serialize_fsrs_cards(self, cards: Dict[str, FSRSCard]) -> str:
         """Sérialise les cartes FSRS en JSON"""
@@ -210,6 +278,8 @@ class LeanLearningEngine:
             logger.error(f"Erreur désérialisation FSRS: {e}")
             return {}
 
+    @traced("db.engine.save_state")
+    @timed(DB_OPERATION_DURATION.labels("engine", "save_state"))
     def save_state(self, user_id: str) -> bool:
         """Sauvegarde l'état d'un utilisateur en DB"""
         if user_id not in self._user_states:
@@ -218,7 +288,7 @@ class LeanLearningEngine:
         state = self._user_states[user_id]
 
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -233,7 +303,7 @@ class LeanLearningEngine:
                 state.get("last_topic"),
                 state.get("total_xp", 0),
                 len(state.get("responses", [])),
-                datetime.now().isoformat()
+                self.clock.now().isoformat()
             ))
 
             conn.commit()
@@ -245,10 +315,12 @@ class LeanLearningEngine:
             logger.error(f"❌ Erreur sauvegarde état {user_id}: {e}")
             return False
 
+    @traced("db.engine.load_state")
+    @timed(DB_OPERATION_DURATION.labels("engine", "load_state"))
     def load_state(self, user_id: str) -> bool:
         """Charge l'état d'un utilisateur depuis la DB"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
 
@@ -264,9 +336,10 @@ class LeanLearningEngine:
 
             # Restaurer l'état
             self._user_states[user_id] = {
-                "cognitive_detector": CognitiveLoadDetector(),
+                "cognitive_detector": CognitiveLoadDetector(clock=self.clock),
                 "fsrs_cards": self._deserialize_fsrs_cards(row["fsrs_cards"]),
                 "responses": [],  # Reset des réponses de session
+                "session_windows": SessionWindows(),
                 "mastery": json.loads(row["mastery"]) if row["mastery"] else {},
                 "last_topic": row["last_topic"],
                 "streak": row["streak"] or 0,
@@ -283,7 +356,7 @@ class LeanLearningEngine:
     def delete_state(self, user_id: str) -> bool:
         """Supprime l'état d'un utilisateur"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             cursor.execute("DELETE FROM lean_user_states WHERE user_id = ?", (user_id,))
             conn.commit()
@@ -307,11 +380,13 @@ class LeanLearningEngine:
                 # Créer un nouvel état
                 self._user_states[user_id] = {
                     # Module 4: Cognitive Load
-                    "cognitive_detector": CognitiveLoadDetector(),
+                    "cognitive_detector": CognitiveLoadDetector(clock=self.clock),
                     # FSRS cards par topic
                     "fsrs_cards": {},
                     # Historique des réponses pour interleaving et stats
                     "responses": [],
+                    # Fenêtres glissantes sur ces réponses (évaluation d'état)
+                    "session_windows": SessionWindows(),
                     # Maîtrise par topic
                     "mastery": {},
                     # Dernier topic (pour interleaving)
@@ -352,17 +427,9 @@ class LeanLearningEngine:
         card = self._get_fsrs_card(state, topic_id)
 
         # Convertir en rating FSRS
-        if is_correct:
-            if response_time < 10:
-                rating = Rating.EASY
-            elif response_time < 30:
-                rating = Rating.GOOD
-            else:
-                rating = Rating.HARD
-        else:
-            rating = Rating.AGAIN
+        rating = rating_from_response(is_correct, response_time)
 
-        new_card, interval = self.fsrs.review(card, rating)
+        new_card, interval = self.fsrs.review(card, rating, now=self.clock.now())
         state["fsrs_cards"][topic_id] = new_card
 
         return new_card, interval
@@ -375,7 +442,7 @@ class LeanLearningEngine:
 
         days_since = 0
         if card.last_review:
-            days_since = (datetime.now() - card.last_review).days
+            days_since = (self.clock.now() - card.last_review).days
 
         return self.fsrs.retrievability(days_since, card.stability)
 
@@ -480,8 +547,8 @@ class LeanLearningEngine:
         if len(responses) < 5:
             return "neutral"
 
-        recent = responses[-10:]
-        accuracy = sum(1 for r in recent if r.get("is_correct", False)) / len(recent)
+        recent_10 = self._session_windows(state).correct_10
+        accuracy = recent_10.mean()
         streak = state.get("streak", 0)
 
         # CELEBRATING: Milestones
@@ -503,7 +570,7 @@ class LeanLearningEngine:
         # FRUSTRATED: Erreurs consécutives, blocage
         if consecutive_errors >= 3:
             return "frustrated"
-        if accuracy < 0.4 and len(recent) >= 5:
+        if accuracy < 0.4 and len(recent_10) >= 5:
             return "frustrated"
 
         # DEMOTIVATED: Baisse de performance
@@ -626,7 +693,7 @@ class LeanLearningEngine:
 
         Retourne: (streak_message: str, streak_protected: bool)
         """
-        today = datetime.now().date()
+        today = self.clock.today()
         last_practice = state.get("last_practice_date")
 
         # Première session
@@ -725,13 +792,26 @@ class LeanLearningEngine:
         return messages
 
 
+    def _session_windows(self, state: Dict) -> SessionWindows:
+        """
+        Fenêtres glissantes de la session.
+
+        Reconstruites depuis state["responses"] si elles ne le suivent plus
+        (état créé sans fenêtres, réponses injectées directement).
+        """
+        responses = state.get("responses", [])
+        windows = state.get("session_windows")
+        if windows is None or windows.count != len(responses):
+            windows = SessionWindows.from_responses(responses)
+            state["session_windows"] = windows
+        return windows
+
     def _get_overall_accuracy(self, state: Dict) -> float:
         """Calcule l'accuracy globale de l'utilisateur"""
-        responses = state.get("responses", [])
-        if len(responses) == 0:
+        windows = self._session_windows(state)
+        if windows.count == 0:
             return 0.0
-        correct = sum(1 for r in responses if r.get("is_correct", False))
-        return correct / len(responses)
+        return windows.correct_total / windows.count
 
     def _detect_mastery_decay(self, state: Dict) -> list:
         """
@@ -758,7 +838,7 @@ class LeanLearningEngine:
             if not last_date or not isinstance(last_date, datetime):
                 continue
 
-            days_since = (datetime.now() - last_date).days
+            days_since = (self.clock.now() - last_date).days
 
             # Warning si pas pratiqué depuis 7+ jours ET mastery était élevée
             if days_since >= 7 and current_mastery >= 70:
@@ -783,11 +863,11 @@ class LeanLearningEngine:
 
         Retourne: UserState avec tous les indicateurs
         """
-        responses = state.get("responses", [])
+        windows = self._session_windows(state)
         user_state = UserState()
 
         # Si pas assez de données, retour état neutre
-        if len(responses) < 5:
+        if windows.count < 5:
             return user_state
 
         # =====================================================================
@@ -804,17 +884,16 @@ class LeanLearningEngine:
         # 2a. Durée de session (>45min = risque élevé - Krueger 1989)
         session_start = state.get("session_start_time")
         if session_start:
-            session_duration = (datetime.now() - session_start).total_seconds() / 60
+            session_duration = (self.clock.now() - session_start).total_seconds() / 60
             if session_duration > 45:
                 user_state.fatigue_level = "moderate"
                 user_state.warning_message = "⏰ Session de 45+ min - Pause recommandée"
                 user_state.should_pause = True
 
         # 2b. Temps de réponse en augmentation (Posner & Petersen 1990)
-        if user_state.fatigue_level == "none" and len(responses) >= 10:
-            recent_10 = responses[-10:]
-            first_5_avg = sum(r.get("response_time", 30) for r in recent_10[:5]) / 5
-            last_5_avg = sum(r.get("response_time", 30) for r in recent_10[5:]) / 5
+        if user_state.fatigue_level == "none" and windows.count >= 10:
+            first_5_avg = (windows.times_10.sum - windows.times_5.sum) / 5
+            last_5_avg = windows.times_5.sum / 5
 
             # Augmentation >30% = signe de fatigue
             if last_5_avg > first_5_avg * 1.3:
@@ -822,10 +901,9 @@ class LeanLearningEngine:
                 user_state.warning_message = "🐌 Temps de réponse en hausse - Fatigue détectée"
 
         # 2c. Pattern correct→erreur soudaine (Lim & Dinges 2008 - micro-sleep)
-        if user_state.fatigue_level == "none" and len(responses) >= 5:
-            recent_5 = responses[-5:]
-            # 3+ correct puis erreur = possible micro-sleep
-            if all(r.get("is_correct", False) for r in recent_5[:-1]) and not recent_5[-1].get("is_correct", True):
+        if user_state.fatigue_level == "none" and windows.count >= 5:
+            # 4 correctes puis erreur = possible micro-sleep
+            if windows.correct_5.sum == 4 and windows.error_streak == 1:
                 user_state.fatigue_level = "early"
                 user_state.warning_message = "⚠️ Erreur inattendue après série correcte - Attention!"
 
@@ -834,10 +912,9 @@ class LeanLearningEngine:
         # =====================================================================
         # Flow = Zone optimale entre difficulté et capacité
 
-        recent_20 = responses[-20:]
-        if len(recent_20) >= 10:
-            accuracy = sum(1 for r in recent_20 if r.get("is_correct", False)) / len(recent_20)
-            avg_difficulty = sum(r.get("difficulty", 3) for r in recent_20) / len(recent_20)
+        if windows.count >= 10:
+            accuracy = windows.correct_20.mean()
+            avg_difficulty = windows.difficulty_20.mean()
 
             # Zone de flow : 60-80% accuracy + difficulté modérée-élevée (3-4)
             if 0.60 <= accuracy <= 0.80 and 2.5 <= avg_difficulty <= 4.5:
@@ -929,8 +1006,7 @@ class LeanLearningEngine:
             return 0.5  # Pas assez de données, défaut moyen
 
         # Accuracy sur les 20 dernières
-        recent = responses[-20:]
-        accuracy = sum(1 for r in recent if r.get("is_correct", False)) / len(recent)
+        accuracy = self._session_windows(state).correct_20.mean()
 
         # Compter les recovery modes (séquences de 3+ erreurs)
         recovery_count = 0
@@ -966,7 +1042,7 @@ class LeanLearningEngine:
         if responses:
             first_response = responses[0].get("timestamp")
             if first_response:
-                days_since_start = (datetime.now() - first_response).days
+                days_since_start = (self.clock.now() - first_response).days
                 return days_since_start <= 7
 
         return False
@@ -1036,6 +1112,8 @@ class LeanLearningEngine:
     # API PRINCIPALE
     # =========================================================================
 
+    @traced("engine.get_next_question")
+    @timed(ENGINE_DURATION.labels("get_next_question"))
     def get_next_question(
         self,
         user_id: str,
@@ -1060,7 +1138,7 @@ class LeanLearningEngine:
 
         # Initialiser session_start_time si première question
         if "session_start_time" not in state or state["session_start_time"] is None:
-            state["session_start_time"] = datetime.now()
+            state["session_start_time"] = self.clock.now()
 
         # =====================================================================
         # ÉVALUATION UNIFIÉE DE L'ÉTAT UTILISATEUR
@@ -1081,8 +1159,7 @@ class LeanLearningEngine:
         retrievability = self._get_retrievability(state, topic_id)
 
         # Stats récentes
-        recent = state["responses"][-10:]
-        recent_accuracy = sum(1 for r in recent if r.get("is_correct", False)) / max(1, len(recent))
+        recent_accuracy = self._session_windows(state).correct_10.mean()
 
         # Niveau de performance utilisateur
         user_performance = self._get_user_performance_level(state)
@@ -1154,6 +1231,8 @@ class LeanLearningEngine:
             interleave_suggested=interleave
         )
 
+    @traced("engine.process_answer")
+    @timed(ENGINE_DURATION.labels("process_answer"))
     def process_answer(
         self,
         user_id: str,
@@ -1175,6 +1254,7 @@ class LeanLearningEngine:
         Returns:
             AnswerResult avec feedback et mises à jour
         """
+        _ANSWERS[bool(is_correct)].inc()
         state = self._get_user_state(user_id)
         difficulty = max(1, min(5, difficulty))  # Clamp 1-5
 
@@ -1254,13 +1334,20 @@ class LeanLearningEngine:
             xp_earned = int(xp_earned * 1.2)  # Bonus streak
 
         # 6. Enregistrer la réponse
-        state["responses"].append({
+        response = {
             "topic_id": topic_id,
             "is_correct": is_correct,
             "response_time": response_time,
             "difficulty": difficulty,
-            "timestamp": datetime.now()
-        })
+            "timestamp": self.clock.now()
+        }
+        windows = self._session_windows(state)
+        state["responses"].append(response)
+        windows.add(response)
+        self.review_log.append(
+            user_id, topic_id, rating_from_response(is_correct, response_time),
+            response_time, difficulty, at=response["timestamp"]
+        )
         state["last_topic"] = topic_id
 
         # 6.1 AI Tutor v2.0: Mettre à jour l'état IA
@@ -1285,8 +1372,7 @@ class LeanLearningEngine:
         state["mastery"][topic_id] = new_mastery
 
         # 7. Stats et feedback
-        recent = state["responses"][-10:]
-        accuracy = sum(1 for r in recent if r.get("is_correct", False)) / max(1, len(recent))
+        accuracy = windows.correct_10.mean()
 
         # Utiliser UserState unifié
         user_state = self._assess_user_state(state)
@@ -1295,14 +1381,9 @@ class LeanLearningEngine:
 
         # RECOVERY MODE v4.2: Enhanced support with Quick Wins
         # Track consecutive errors for recovery mode activation
-        consecutive_errors = 0
-        for r in reversed(state["responses"][-5:]):
-            if not r.get("is_correct", True):
-                consecutive_errors += 1
-            else:
-                break
+        consecutive_errors = min(windows.error_streak, 5)
 
-        in_recovery_mode = consecutive_errors >= 3 or (accuracy < 0.4 and len(recent) >= 5)
+        in_recovery_mode = consecutive_errors >= 3 or (accuracy < 0.4 and len(windows.correct_10) >= 5)
 
         # QUICK WINS: Quand l'utilisateur est en difficulté, on lui donne
         # des questions très faciles pour reconstruire sa confiance
@@ -1403,8 +1484,7 @@ class LeanLearningEngine:
             }
 
         # Recent performance
-        recent = state["responses"][-20:]
-        accuracy = sum(1 for r in recent if r.get("is_correct", False)) / max(1, len(recent))
+        accuracy = self._session_windows(state).correct_20.mean()
 
         user_state = self._assess_user_state(state)
         cognitive_load = user_state.cognitive_load
@@ -1425,9 +1505,10 @@ class LeanLearningEngine:
             self.save_state(user_id)
 
         state = self._get_user_state(user_id)
-        state["cognitive_detector"] = CognitiveLoadDetector()
+        state["cognitive_detector"] = CognitiveLoadDetector(clock=self.clock)
         state["streak"] = 0
         state["responses"] = []  # Reset réponses de session
+        state["session_windows"] = SessionWindows()
 
         # AI Tutor v2.0: Incrémenter le compteur de sessions
         self._increment_session_count(state)
@@ -1477,7 +1558,7 @@ class LeanLearningEngine:
     def get_all_users(self) -> List[str]:
         """Récupère la liste de tous les utilisateurs en DB"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             cursor.execute("SELECT user_id FROM lean_user_states")
             users = [row[0] for row in cursor.fetchall()]
@@ -1,9 +1,16 @@
 """
 Backend FastAPI - Apprentissage Adaptatif avec Gemini
 """
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
+from utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as metrics_registry
+from utils.tracing import TracingMiddleware, configure_otel, perf_registry
 from routes.learning import router as learning_router
 from routes.tasks import router as tasks_router
 from routes.terminal import router as terminal_router
@@ -20,10 +27,26 @@ from routes.tutoring import router as tutoring_router
 from routes.adaptive_content import router as adaptive_content_router
 from routes.skill_graph import router as skill_graph_router
 
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Démarrage : reprise unique de l'ancienne database.db (rien à faire si absente ou déjà reprise)"""
+    from databases.legacy_migrator import migrate_legacy_database
+
+    try:
+        await asyncio.to_thread(migrate_legacy_database)
+    except Exception as e:
+        # Base par domaine inchangée (transaction annulée) : nouvel essai au prochain démarrage
+        logger.error(f"❌ Reprise de database.db impossible: {e}")
+    yield
+
+
 app = FastAPI(
     title="Adaptive Learning API",
     description="Backend Python pour apprentissage adaptatif propulsé par Gemini AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS pour permettre les requêtes depuis le frontend
@@ -35,6 +58,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Traçage : temps par étape (db, engine, llm) en Server-Timing et sur /health/perf
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+    configure_otel()
+
 # Routes
 app.include_router(learning_router, prefix="/api/learning", tags=["Learning"])
 app.include_router(tasks_router, prefix="/api/tasks", tags=["Tasks"])
@@ -113,6 +141,29 @@ async def databases_health():
     }
 
 
+@app.get("/health/perf")
+async def perf_health(limit: int = 20):
+    """
+    Temps par route et par étape (db, engine, llm, app) depuis le démarrage,
+    et les dernières requêtes lentes avec le détail de leurs spans.
+    """
+    return {
+        "enabled": settings.TRACING_ENABLED,
+        **perf_registry.report(limit),
+    }
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """
+        Compteurs et histogrammes au format d'exposition Prometheus :
+        requêtes SQL et connexions par base, appels / latences / tokens LLM,
+        moteur d'apprentissage, exécutions de code, caches et pool.
+        """
+        return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/health/ai")
 async def ai_health():
     """Vérifie l'état du dispatcher AI avec détails et stats"""
@@ -228,7 +279,8 @@ async def ai_recalculate_costs():
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        "main:app",
+        # Hors reload, l'objet app évite de réimporter main (deuxième import complet au démarrage)
+        "main:app" if settings.DEBUG else app,
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG
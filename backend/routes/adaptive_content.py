@@ -9,6 +9,7 @@ Endpoints:
 - POST /content/remediation-plan - Génère un plan de remédiation
 - POST /content/mnemonic - Génère un aide-mémoire
 - GET /content/profile/{user_id} - Profil d'apprentissage
+- GET /content/health - État du service + hit rate du cache
 """
 
 from fastapi import APIRouter, HTTPException
@@ -22,6 +23,7 @@ from services.adaptive_content_generator import (
     LearningStyle,
     GeneratedContent
 )
+from services.content_cache import content_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/content", tags=["adaptive-content"])
@@ -101,6 +103,9 @@ class ProfileResponse(BaseModel):
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
+# Les endpoints de génération sont synchrones: FastAPI les exécute dans son
+# threadpool, ce qui permet au cache de coalescer les requêtes concurrentes
+# identiques au lieu de bloquer la boucle d'événements sur l'appel LLM.
 
 @router.get("/recommendations/{user_id}", response_model=RecommendationsResponse)
 async def get_recommendations(user_id: str, limit: int = 3):
@@ -149,7 +154,7 @@ async def get_learning_profile(user_id: str):
 
 
 @router.post("/micro-lesson", response_model=ContentResponse)
-async def generate_micro_lesson(request: MicroLessonRequest):
+def generate_micro_lesson(request: MicroLessonRequest):
     """
     Génère une micro-leçon personnalisée (3-5 min).
 
@@ -189,7 +194,7 @@ async def generate_micro_lesson(request: MicroLessonRequest):
 
 
 @router.post("/exercises", response_model=ContentResponse)
-async def generate_exercises(request: ExerciseRequest):
+def generate_exercises(request: ExerciseRequest):
     """
     Génère des exercices ciblés sur les erreurs de l'utilisateur.
 
@@ -221,7 +226,7 @@ async def generate_exercises(request: ExerciseRequest):
 
 
 @router.post("/explanation", response_model=ContentResponse)
-async def generate_explanation(request: ExplanationRequest):
+def generate_explanation(request: ExplanationRequest):
     """
     Génère une explication personnalisée pour un concept.
 
@@ -253,7 +258,7 @@ async def generate_explanation(request: ExplanationRequest):
 
 
 @router.post("/remediation-plan", response_model=ContentResponse)
-async def generate_remediation_plan(request: RemediationRequest):
+def generate_remediation_plan(request: RemediationRequest):
     """
     Génère un plan de remédiation personnalisé.
 
@@ -284,7 +289,7 @@ async def generate_remediation_plan(request: RemediationRequest):
 
 
 @router.post("/mnemonic", response_model=ContentResponse)
-async def generate_mnemonic(request: MnemonicRequest):
+def generate_mnemonic(request: MnemonicRequest):
     """
     Génère un aide-mémoire personnalisé pour une règle.
 
@@ -317,11 +322,12 @@ async def generate_mnemonic(request: MnemonicRequest):
 
 @router.get("/health")
 async def health_check():
-    """Vérifie que le service est opérationnel."""
+    """Vérifie que le service est opérationnel (+ stats du cache de contenu)."""
     return {
         "status": "healthy",
         "service": "AdaptiveContentGenerator",
         "version": "1.0.0",
+        "cache": content_store.get_stats(),
         "features": [
             "micro_lessons",
             "targeted_exercises",
@@ -8,9 +8,8 @@ from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import json
 import logging
-from openai import OpenAI
-from config import settings
-from database import db
+from services.openai_client import create_openai_client
+from databases import learning_db as db
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
@@ -136,7 +135,9 @@ async def generate_stream(request: ChatRequest):
     avec contexte SQLite enrichi
     """
     try:
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        client = create_openai_client()
+        if not client:
+            raise ValueError("OPENAI_API_KEY non configurée")
 
         # Charger le contexte SQLite
         learning_context = get_learning_context(request.course_id)
@@ -210,7 +211,9 @@ async def chat_simple(request: ChatRequest):
     Endpoint de chat non-streaming (pour debug/fallback)
     """
     try:
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        client = create_openai_client()
+        if not client:
+            raise ValueError("OPENAI_API_KEY non configurée")
 
         # Charger le contexte SQLite
         learning_context = get_learning_context(request.course_id)
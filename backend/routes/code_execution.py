@@ -2,7 +2,7 @@
 🚀 Code Execution Service - Simple & Élégant
 
 Philosophie :
-- Exécution directe dans Docker (isolation + sécurité)
+- Exécution dans des containers Docker chauds (isolation + sécurité, sans coût de démarrage)
 - Streaming en temps réel (feedback immédiat)
 - Timeout court (pas d'attente infinie)
 - Support multi-langages (Python, JS, etc.)
@@ -11,18 +11,21 @@ Philosophie :
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import docker
 import asyncio
 from typing import Optional, AsyncGenerator
 import json
 
-router = APIRouter(prefix="/api/code", tags=["code-execution"])
+from config import settings
+from services.build_cache import BUILD_SPECS, ArtifactCache, BuildPipeline, build_pool_key
+from services.code_sandbox import ContainerPool, DockerRuntime, ExecResult, LocalProcessRuntime
+from utils.lazy import lazy_import
+from utils.metrics import (
+    CODE_BUILD_DURATION, CODE_EXECUTION_DURATION, CODE_EXECUTIONS, REGISTRY, stats_collector
+)
+
+docker = lazy_import("docker")
 
-# Client Docker
-try:
-    docker_client = docker.from_env()
-except Exception:
-    docker_client = None
+router = APIRouter(prefix="/api/code", tags=["code-execution"])
 
 class CodeExecutionRequest(BaseModel):
     code: str
@@ -34,6 +37,11 @@ class CodeExecutionResult(BaseModel):
     stderr: str
     exit_code: int
     execution_time_ms: int
+    cpu_time_ms: Optional[int] = None
+    peak_memory_kb: Optional[int] = None
+    truncated: bool = False
+    build_time_ms: Optional[int] = None
+    build_cached: Optional[bool] = None
     error: Optional[str] = None
 
 # Configuration des images Docker par langage
@@ -49,19 +57,90 @@ LANGUAGE_IMAGES = {
     "php": "php:latest",
 }
 
-# Commandes d'exécution par langage
+# Commandes d'exécution des langages interprétés (le code est passé en argument)
+# Les langages compilés (java, cpp, rust, go) passent par BUILD_SPECS
 LANGUAGE_COMMANDS = {
     "python": ["python", "-c"],
     "javascript": ["node", "-e"],
     "typescript": ["ts-node", "-e"],  # Nécessite ts-node installé
-    "java": None,  # Nécessite compilation
-    "cpp": None,   # Nécessite compilation
-    "rust": None,  # Nécessite compilation
-    "go": ["go", "run", "/tmp/code.go"],
     "ruby": ["ruby", "-e"],
     "php": ["php", "-r"],
 }
 
+# Containers de compilation : même image, dossier d'artefacts en écriture, plus de mémoire
+BUILD_IMAGES = {build_pool_key(lang): LANGUAGE_IMAGES[lang] for lang in BUILD_SPECS}
+BUILD_LIMITS = {"mem_limit": "1g", "pids_limit": 256}
+
+
+def _create_code_pool() -> Optional[ContainerPool]:
+    """Pool de containers chauds selon le runtime configuré"""
+    if settings.CODE_RUNTIME == "local":
+        runtime = LocalProcessRuntime()
+    else:
+        try:
+            docker_client = docker.from_env()
+        except Exception:
+            return None
+        runtime = DockerRuntime(
+            docker_client,
+            artifact_dir=settings.CODE_ARTIFACT_DIR,
+            writable_languages=set(BUILD_IMAGES),
+            limits={lang: BUILD_LIMITS for lang in BUILD_IMAGES},
+        )
+
+    return ContainerPool(
+        runtime,
+        images={**LANGUAGE_IMAGES, **BUILD_IMAGES},
+        size=settings.CODE_POOL_SIZE,
+        max_runs=settings.CODE_POOL_MAX_RUNS,
+    )
+
+
+# Pool global, créé à la première exécution (client Docker compris) :
+# le démarrage du backend ne contacte pas Docker
+code_pool: Optional[ContainerPool] = None
+# Compilation avec cache d'artefacts (langages compilés)
+code_builder: Optional[BuildPipeline] = None
+_pool_created = False
+
+
+def get_code_pool() -> Optional[ContainerPool]:
+    """Récupère ou crée le pool (et le pipeline de compilation associé)"""
+    global code_pool, code_builder, _pool_created
+    if code_pool is None and not _pool_created:
+        _pool_created = True
+        code_pool = _create_code_pool()
+        if code_pool:
+            code_builder = BuildPipeline(
+                code_pool,
+                ArtifactCache(
+                    settings.CODE_ARTIFACT_DIR,
+                    settings.CODE_ARTIFACT_MAX_ENTRIES,
+                    settings.CODE_TOOLCHAIN_CACHE_MAX_BYTES,
+                ),
+            )
+            _register_pool_metrics(code_pool, code_builder)
+    return code_pool
+
+
+def _register_pool_metrics(pool: ContainerPool, builder: BuildPipeline) -> None:
+    """Pool et cache d'artefacts sur /metrics (profondeur par langage, hits, recyclages)"""
+    REGISTRY.register_collector(stats_collector(
+        "code_pool", "Pool de containers chauds", pool.get_stats,
+        counters=("executions", "warm_hits", "cold_starts", "recycled", "dirty"),
+        gauges=("idle", "in_use"),
+        label="language",
+    ))
+    REGISTRY.register_collector(stats_collector(
+        "code_builds", "Compilations", builder.get_stats,
+        counters=("builds", "failed", "coalesced"),
+    ))
+    REGISTRY.register_collector(stats_collector(
+        "code_artifacts", "Cache d'artefacts de compilation", builder.cache.get_stats,
+        counters=("hits", "misses", "evictions", "toolchain_trims"),
+        gauges=("entries",),
+    ))
+
 
 async def execute_code_in_docker(
     code: str, 
@@ -69,11 +148,12 @@ async def execute_code_in_docker(
     stdin: str = ""
 ) -> AsyncGenerator[str, None]:
     """
-    Exécute du code dans un container Docker isolé
+    Exécute du code dans un container chaud du pool (exec, sans création de container)
     Yield des chunks de résultat en streaming
     """
     
-    if not docker_client:
+    code_pool = get_code_pool()
+    if not code_pool:
         yield json.dumps({
             "type": "error",
             "data": "Docker n'est pas disponible sur ce système"
@@ -89,91 +169,140 @@ async def execute_code_in_docker(
     
     image = LANGUAGE_IMAGES[language]
     command = LANGUAGE_COMMANDS.get(language)
+    compiled = language in BUILD_SPECS
     
-    if command is None:
+    if command is None and not compiled:
         yield json.dumps({
             "type": "error",
-            "data": f"Exécution de {language} nécessite compilation (non implémenté)"
+            "data": f"Langage '{language}' non supporté"
         }) + "\n"
         return
     
     try:
-        # Signal de démarrage
-        yield json.dumps({
-            "type": "status",
-            "data": "Démarrage du container..."
-        }) + "\n"
-        
-        # Créer et démarrer le container
-        container = docker_client.containers.run(
-            image=image,
-            command=command + [code],
-            detach=True,
-            remove=True,
-            mem_limit="128m",  # Limite mémoire
-            cpu_quota=50000,   # Limite CPU
-            network_disabled=True,  # Pas d'accès réseau
-            stdin_open=bool(stdin),
-            stdout=True,
-            stderr=True,
-        )
+        build = None
+        if compiled:
+            # Compilation (ou artefact en cache), mesurée à part de l'exécution
+            yield json.dumps({
+                "type": "status",
+                "data": "Compilation..."
+            }) + "\n"
+            
+            build = await code_builder.build(
+                language,
+                code,
+                timeout=settings.CODE_BUILD_TIMEOUT,
+                max_output_bytes=settings.CODE_MAX_OUTPUT_BYTES
+            )
+            if build.output:
+                yield json.dumps({"type": "build", "data": build.output}) + "\n"
+            
+            if build.timed_out:
+                CODE_EXECUTIONS.labels(language, "build_timeout").inc()
+                yield json.dumps({
+                    "type": "error",
+                    "data": f"Timeout : compilation trop longue (>{settings.CODE_BUILD_TIMEOUT}s)"
+                }) + "\n"
+                return
+            
+            if not build.ok:
+                # Erreur de compilation : rendue comme un résultat (stderr du compilateur)
+                CODE_EXECUTIONS.labels(language, "build_error").inc()
+                yield json.dumps({
+                    "type": "result",
+                    "data": {
+                        "stdout": "",
+                        "stderr": build.output,
+                        "exit_code": build.exit_code,
+                        "execution_time_ms": 0,
+                        "cpu_time_ms": None,
+                        "peak_memory_kb": None,
+                        "truncated": False,
+                        "build_time_ms": build.duration_ms,
+                        "build_cached": False
+                    }
+                }) + "\n"
+                return
+            
+            CODE_BUILD_DURATION.labels(language, str(build.cached).lower()).observe(build.duration_ms / 1000)
+            command = code_builder.run_command(build)
+        else:
+            command = command + [code]
         
         yield json.dumps({
             "type": "status",
             "data": "Exécution en cours..."
         }) + "\n"
         
-        # Attendre l'exécution avec timeout
-        try:
-            result = container.wait(timeout=10)  # 10 secondes max
-            exit_code = result['StatusCode']
-            
-            # Récupérer les logs
-            logs = container.logs(stdout=True, stderr=True).decode('utf-8')
-            
-            # Séparer stdout et stderr (simplifié)
-            stdout = logs
-            stderr = ""
-            
-            if exit_code != 0:
-                stderr = logs
-                stdout = ""
-            
-            # Envoyer le résultat
-            yield json.dumps({
-                "type": "result",
-                "data": {
-                    "stdout": stdout,
-                    "stderr": stderr,
-                    "exit_code": exit_code
-                }
-            }) + "\n"
-            
-        except Exception as timeout_error:
-            # Timeout ou erreur
-            try:
-                container.kill()
-            except:
-                pass
+        timeout = settings.CODE_EXEC_TIMEOUT
+        output = {"stdout": [], "stderr": []}
+        result = None
+        
+        # Sortie streamée au fil de l'eau (stdout et stderr séparés)
+        async for item in code_pool.stream(
+            language,
+            command,
+            stdin=stdin,
+            timeout=timeout,
+            max_output_bytes=settings.CODE_MAX_OUTPUT_BYTES
+        ):
+            if isinstance(item, ExecResult):
+                result = item
+                continue
             
+            stream, text = item
+            output[stream].append(text)
+            yield json.dumps({"type": stream, "data": text}) + "\n"
+        
+        if result.timed_out:
+            CODE_EXECUTIONS.labels(language, "timeout").inc()
             yield json.dumps({
                 "type": "error",
-                "data": f"Timeout : exécution trop longue (>10s)"
+                "data": f"Timeout : exécution trop longue (>{timeout}s)"
             }) + "\n"
-            
+            return
+        
+        CODE_EXECUTIONS.labels(language, "ok" if result.exit_code == 0 else "error").inc()
+        CODE_EXECUTION_DURATION.labels(language).observe(result.duration_ms / 1000)
+
+        # Résultat final : sortie complète (compatibilité) + métriques d'exécution
+        yield json.dumps({
+            "type": "result",
+            "data": {
+                "stdout": "".join(output["stdout"]),
+                "stderr": "".join(output["stderr"]),
+                "exit_code": result.exit_code,
+                "execution_time_ms": result.duration_ms,
+                "cpu_time_ms": result.cpu_time_ms,
+                "peak_memory_kb": result.peak_memory_kb,
+                "truncated": result.truncated,
+                "build_time_ms": build.duration_ms if build else None,
+                "build_cached": build.cached if build else None
+            }
+        }) + "\n"
+        
+    except asyncio.TimeoutError:
+        CODE_EXECUTIONS.labels(language, "timeout").inc()
+        yield json.dumps({
+            "type": "error",
+            "data": f"Timeout : exécution trop longue (>{settings.CODE_EXEC_TIMEOUT}s)"
+        }) + "\n"
+        
     except docker.errors.ImageNotFound:
+        CODE_EXECUTIONS.labels(language, "runtime_error").inc()
         yield json.dumps({
             "type": "error",
             "data": f"Image Docker '{image}' introuvable. Exécutez: docker pull {image}"
         }) + "\n"
         
     except docker.errors.APIError as e:
+        CODE_EXECUTIONS.labels(language, "runtime_error").inc()
         yield json.dumps({
             "type": "error",
             "data": f"Erreur Docker : {str(e)}"
         }) + "\n"
         
     except Exception as e:
+        CODE_EXECUTIONS.labels(language, "runtime_error").inc()
         yield json.dumps({
             "type": "error",
             "data": f"Erreur inattendue : {str(e)}"
@@ -185,9 +314,14 @@ async def execute_code_stream(request: CodeExecutionRequest):
     """
     Exécute du code et stream le résultat en temps réel
     
-    Format de réponse (Server-Sent Events) :
+    Format de réponse (une ligne JSON par événement) :
     - {"type": "status", "data": "message"}
-    - {"type": "result", "data": {...}}
+    - {"type": "build", "data": "sortie du compilateur"}   (langages compilés)
+    - {"type": "stdout", "data": "texte"}   (au fur et à mesure)
+    - {"type": "stderr", "data": "texte"}   (au fur et à mesure)
+    - {"type": "result", "data": {stdout, stderr, exit_code, execution_time_ms,
+                                  cpu_time_ms, peak_memory_kb, truncated,
+                                  build_time_ms, build_cached}}
     - {"type": "error", "data": "message"}
     """
     
@@ -219,6 +353,11 @@ async def execute_code(request: CodeExecutionRequest) -> CodeExecutionResult:
         "stderr": "",
         "exit_code": 1,
         "execution_time_ms": 0,
+        "cpu_time_ms": None,
+        "peak_memory_kb": None,
+        "truncated": False,
+        "build_time_ms": None,
+        "build_cached": None,
         "error": None
     }
     
@@ -235,6 +374,12 @@ async def execute_code(request: CodeExecutionRequest) -> CodeExecutionResult:
                 result_data["stdout"] = event["data"]["stdout"]
                 result_data["stderr"] = event["data"]["stderr"]
                 result_data["exit_code"] = event["data"]["exit_code"]
+                result_data["execution_time_ms"] = event["data"].get("execution_time_ms", 0)
+                result_data["cpu_time_ms"] = event["data"].get("cpu_time_ms")
+                result_data["peak_memory_kb"] = event["data"].get("peak_memory_kb")
+                result_data["truncated"] = event["data"].get("truncated", False)
+                result_data["build_time_ms"] = event["data"].get("build_time_ms")
+                result_data["build_cached"] = event["data"].get("build_cached")
                 
             elif event["type"] == "error":
                 result_data["error"] = event["data"]
@@ -253,8 +398,13 @@ async def get_supported_languages():
     """
     return {
         "languages": [
-            {"id": lang, "name": lang.capitalize(), "supported": cmd is not None}
-            for lang, cmd in LANGUAGE_COMMANDS.items()
+            {
+                "id": lang,
+                "name": lang.capitalize(),
+                "supported": lang in LANGUAGE_COMMANDS or lang in BUILD_SPECS,
+                "compiled": lang in BUILD_SPECS
+            }
+            for lang in LANGUAGE_IMAGES
         ]
     }
 
@@ -262,9 +412,10 @@ async def get_supported_languages():
 @router.get("/health")
 async def health_check():
     """
-    Vérifie que Docker est disponible
+    Vérifie que le runtime d'exécution est disponible (+ stats du pool)
     """
-    if not docker_client:
+    code_pool = get_code_pool()
+    if not code_pool:
         return {
             "status": "error",
             "message": "Docker non disponible",
@@ -272,11 +423,13 @@ async def health_check():
         }
     
     try:
-        docker_client.ping()
+        await asyncio.to_thread(code_pool.runtime.ping)
         return {
             "status": "ok",
             "message": "Service d'exécution opérationnel",
-            "docker_available": True
+            "docker_available": True,
+            "pool": code_pool.get_stats(),
+            "builds": code_builder.get_stats()
         }
     except Exception as e:
         return {
@@ -284,5 +437,3 @@ async def health_check():
             "message": f"Docker inaccessible : {str(e)}",
             "docker_available": False
         }
-
-
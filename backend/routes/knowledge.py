@@ -8,7 +8,7 @@ et l'application du decay temporel (oubli naturel).
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from database import db
+from databases import learning_db as db
 from utils.mastery_decay import apply_decay_to_concepts, get_concepts_needing_review
 import logging
 
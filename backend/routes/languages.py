@@ -2,10 +2,12 @@
 🗣️ API Routes pour l'apprentissage des langues
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from databases import learning_db as db  # Utiliser la nouvelle DB modulaire
+from utils.pagination import decode_cursor, stream_json_page
 import logging
 import uuid
 
@@ -42,6 +44,10 @@ class VocabularyReviewSubmission(BaseModel):
     quality: int  # 0-5 (SM-2 algorithm)
 
 
+class VocabularyReviewBatch(BaseModel):
+    reviews: List[VocabularyReviewSubmission]  # Dans l'ordre des réponses
+
+
 class ExerciseGenerateRequest(BaseModel):
     course_id: str
     user_id: str
@@ -116,49 +122,53 @@ async def archive_language_messages(course_id: str, keep_recent: int = 50):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _page_response(rows: Iterator[Dict[str, Any]], key: str, limit: Optional[int], header: Dict[str, Any]):
+    """Page JSON écrite au fil des lignes (rows fournit limit + 1 lignes)"""
+    return StreamingResponse(stream_json_page(rows, key, limit, header), media_type="application/json")
+
+
+def _cursor_id(cursor: Optional[str]) -> Optional[int]:
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/recent-messages/{course_id}")
-async def get_recent_language_messages(course_id: str, limit: int = 50):
+async def get_recent_language_messages(
+    course_id: str,
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
     """
-    Récupère les messages récents (non-archivés)
+    Récupère les messages récents (non-archivés), du plus récent au plus ancien.
+
+    Paginé par curseur : passer `next_cursor` de la réponse pour la page suivante.
     """
-    try:
-        messages = db.get_recent_language_messages(course_id, limit)
-        
-        return {
-            "course_id": course_id,
-            "messages": messages,
-            "count": len(messages)
-        }
-        
-    except Exception as e:
-        logger.error(f"❌ Error in get_recent_language_messages: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    before_id = _cursor_id(cursor)
+    rows = db.iter_language_messages(course_id, archived=False, before_id=before_id, limit=limit + 1)
+    return _page_response(rows, "messages", limit, {"course_id": course_id})
 
 
 @router.get("/archived-messages/{course_id}")
 async def get_archived_language_messages(
-    course_id: str, 
-    limit: int = 100, 
-    offset: int = 0
+    course_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    offset: Optional[int] = Query(None, include_in_schema=False)
 ):
     """
-    Récupère l'historique archivé (pour consultation)
+    Récupère l'historique archivé (pour consultation), du plus récent au plus ancien.
+
+    Paginé par curseur (coût constant par page, même loin dans l'historique).
+    L'ancien paramètre `offset` est refusé (400) plutôt qu'ignoré : un client
+    qui l'envoie relirait sinon toujours la première page.
     """
-    try:
-        messages = db.get_archived_language_messages(course_id, limit, offset)
-        
-        return {
-            "course_id": course_id,
-            "messages": messages,
-            "count": len(messages),
-            "limit": limit,
-            "offset": offset,
-            "has_more": len(messages) == limit
-        }
-        
-    except Exception as e:
-        logger.error(f"❌ Error in get_archived_language_messages: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if offset is not None:
+        raise HTTPException(status_code=400, detail="offset n'est plus supporté : paginer avec cursor (next_cursor)")
+    before_id = _cursor_id(cursor)
+    rows = db.iter_language_messages(course_id, archived=True, before_id=before_id, limit=limit + 1)
+    return _page_response(rows, "messages", limit, {"course_id": course_id, "limit": limit})
 
 
 @router.get("/message-stats/{course_id}")
@@ -210,22 +220,21 @@ async def add_vocabulary(course_id: str, data: VocabularyWordCreate):
 
 
 @router.get("/vocabulary/{course_id}")
-async def get_vocabulary(course_id: str, user_id: str, limit: Optional[int] = None):
+async def get_vocabulary(
+    course_id: str,
+    user_id: str,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None
+):
     """
-    Récupère tout le vocabulaire d'un cours
+    Récupère le vocabulaire d'un cours, du plus récent au plus ancien.
+
+    Sans limit, tout le vocabulaire est écrit en flux (mémoire constante) ;
+    avec limit, paginé par curseur (`next_cursor`).
     """
-    try:
-        words = db.get_vocabulary(course_id, user_id, limit)
-        
-        return {
-            "course_id": course_id,
-            "words": words,
-            "count": len(words)
-        }
-        
-    except Exception as e:
-        logger.error(f"❌ Error in get_vocabulary: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    before_id = _cursor_id(cursor)
+    rows = db.iter_vocabulary(course_id, user_id, before_id=before_id, limit=limit + 1 if limit else None)
+    return _page_response(rows, "words", limit, {"course_id": course_id})
 
 
 @router.get("/vocabulary/due-for-review/{course_id}")
@@ -276,6 +285,33 @@ async def submit_vocabulary_review(data: VocabularyReviewSubmission):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/vocabulary/submit-reviews")
+async def submit_vocabulary_reviews(data: VocabularyReviewBatch):
+    """
+    Soumet un lot de révisions (session de flashcards) en une transaction
+
+    Retourne le nouveau planning de chaque carte ; les mots inconnus sont
+    listés dans `missing`.
+    """
+    if any(review.quality < 0 or review.quality > 5 for review in data.reviews):
+        raise HTTPException(status_code=400, detail="Quality must be between 0 and 5")
+
+    try:
+        schedule = db.update_vocabulary_reviews([(review.word_id, review.quality) for review in data.reviews])
+        updated = {item["word_id"] for item in schedule}
+
+        return {
+            "success": True,
+            "updated": len(schedule),
+            "missing": sorted({review.word_id for review in data.reviews} - updated),
+            "schedule": schedule
+        }
+
+    except Exception as e:
+        logger.error(f"❌ Error in submit_vocabulary_reviews: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/vocabulary/stats/{course_id}")
 async def get_vocabulary_stats(course_id: str, user_id: str):
     """
@@ -6,6 +6,10 @@ from typing import Dict, Any, Optional, List
 import logging
 from services.ai_dispatcher import ai_dispatcher, TaskType
 from databases import learning_db
+from databases.learning_db import mastery_success_rates, optimal_learning_time
+from databases.review_events import review_events
+from databases.review_queue import review_queue
+from utils import clock
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +23,10 @@ from utils.sm2_algorithm import (
 )
 # 🧠 Import du moteur d'apprentissage LEAN (FSRS, Cognitive Load, AI Tutor, etc.)
 from learning_engine.learning_engine_lean import LeanLearningEngine
+from utils.fsrs_algorithm import rating_from_response
 
-# Initialiser le moteur lean
-learning_engine = LeanLearningEngine()
+# Initialiser le moteur lean (il journalise ses réponses dans review_events)
+learning_engine = LeanLearningEngine(review_log=review_events)
 
 from models.learning import (
     SessionStartRequest,
@@ -38,6 +43,10 @@ router = APIRouter()
 # 🔧 FIX: Constante pour les difficultés valides (évite les typos)
 VALID_DIFFICULTIES = {"easy", "medium", "hard"}
 
+# Le moteur lean raisonne en niveaux 1-5, le dispatcher et la session en easy/medium/hard
+LEVEL_TO_DIFFICULTY = {1: "easy", 2: "easy", 3: "medium", 4: "hard", 5: "hard"}
+DIFFICULTY_TO_LEVEL = {"easy": 2, "medium": 3, "hard": 4}
+
 
 def validate_difficulty(difficulty: str) -> str:
     """Valide et normalise la difficulté. Retourne 'medium' par défaut si invalide."""
@@ -135,7 +144,8 @@ async def get_next_question(session_id: str):
         # On continue mais on note la recommandation
 
     # Utiliser la difficulté calculée par le moteur lean
-    difficulty = question_params.difficulty
+    level = question_params.difficulty
+    difficulty = LEVEL_TO_DIFFICULTY.get(level, "medium")
 
     # Log des paramètres lean
     logger.info(f"🧠 Lean params: difficulty={difficulty}, "
@@ -158,6 +168,7 @@ async def get_next_question(session_id: str):
         current_question = {
             "id": question.id,
             "difficulty": difficulty,
+            "level": level,
             "started_at": datetime.now().isoformat(),
             "correct_answer": question.correct_answer,  # Stocké pour vérification
             "explanation": question.explanation
@@ -178,10 +189,12 @@ async def get_next_question(session_id: str):
             "hints": question.hints,
             # 🧠 NOUVEAU: Infos algorithmes avancés
             "advanced": {
+                "difficulty_level": level,
                 "cognitive_load": question_params.cognitive_load,
                 "should_take_break": question_params.should_take_break,
-                "break_suggestion": question_params.break_suggestion,
-                "transfer_bonus": round(question_params.transfer_bonus * 100, 1),
+                # Plus calculés par le moteur lean (clés conservées pour le frontend)
+                "break_suggestion": None,
+                "transfer_bonus": 0.0,
                 "retrievability": round(question_params.retrievability * 100, 1),
                 "fsrs_interval": round(question_params.fsrs_interval, 1)
             }
@@ -191,7 +204,7 @@ async def get_next_question(session_id: str):
         if question_params.should_take_break:
             response["warning"] = {
                 "type": "cognitive_load",
-                "message": question_params.break_suggestion or "Tu sembles fatigué. Une pause serait bénéfique.",
+                "message": "Tu sembles fatigué. Une pause serait bénéfique.",
                 "severity": question_params.cognitive_load
             }
 
@@ -290,7 +303,7 @@ async def submit_answer(session_id: str, submission: AnswerSubmission):
         topic_id=topic_id,
         is_correct=is_correct,
         response_time=submission.time_taken,
-        difficulty=current_q["difficulty"]
+        difficulty=current_q.get("level") or DIFFICULTY_TO_LEVEL[current_q["difficulty"]]
     )
 
     # Utiliser le mastery_change du moteur lean (FSRS-based)
@@ -354,8 +367,8 @@ async def submit_answer(session_id: str, submission: AnswerSubmission):
         "ease_factor": new_ease,
         "interval": new_interval,
         "repetitions": mastery_data["repetitions"] + (1 if is_correct else 0),
-        "last_reviewed": datetime.now().isoformat(),
-        "next_review": next_review.isoformat() if next_review else None
+        "last_reviewed": clock.to_sql(clock.now()),
+        "next_review": clock.to_sql(next_review) if next_review else None
     })
 
     # Mettre à jour success_by_difficulty pour l'algorithme adaptatif
@@ -646,7 +659,7 @@ async def get_active_recall_question(
     mastery_data = db.get_or_create_mastery(session_user_id, topic_id)
 
     # Récupérer les success rates par difficulté pour une meilleure adaptation
-    success_rates = db.get_success_rates_by_difficulty(session_user_id, topic_id)
+    success_rates = mastery_success_rates(mastery_data)
 
     # 🔧 FIX: Calculer skip_days depuis last_reviewed (comme dans get_next_question)
     skip_days = 0
@@ -654,10 +667,8 @@ async def get_active_recall_question(
         try:
             last_review_str = mastery_data["last_reviewed"]
             if isinstance(last_review_str, str):
-                last_review = datetime.fromisoformat(last_review_str.replace('Z', '+00:00'))
-                if last_review.tzinfo:
-                    last_review = last_review.replace(tzinfo=None)
-                skip_days = max(0, (datetime.now() - last_review).days)
+                last_review = clock.from_sql(last_review_str)
+                skip_days = max(0, (clock.now() - last_review).days)
         except (ValueError, TypeError):
             pass
 
@@ -890,7 +901,7 @@ FORMAT JSON:
             "total_attempts": new_total_attempts,
             "correct_attempts": new_correct_attempts,
             "success_rate": new_success_rate,
-            "last_reviewed": datetime.now().isoformat()
+            "last_reviewed": clock.to_sql(clock.now())
         })
 
         # Mettre à jour success_by_difficulty pour l'algorithme adaptatif
@@ -898,6 +909,13 @@ FORMAT JSON:
         is_correct_for_stats = final_score >= 70
         db.update_success_by_difficulty(user_id, topic_id, question_difficulty, is_correct_for_stats)
 
+        # Journal des réponses
+        recall_time = submission.thinking_time + submission.writing_time
+        review_events.append(
+            user_id, topic_id, rating_from_response(is_correct_for_stats, recall_time),
+            recall_time, DIFFICULTY_TO_LEVEL.get(question_difficulty, 3)
+        )
+
         # Permettre retry si score < 70 et pas déjà 2 retries
         can_retry = final_score < 70 and submission.retry_count < 2
 
@@ -1165,6 +1183,35 @@ async def get_recommended_question_format(user_id: str):
         }
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# 📅 REVIEW QUEUE - Prochaines révisions (topics, vocabulaire, concepts)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@router.get("/review-queue/{user_id}")
+async def get_review_queue(
+    user_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    course_id: Optional[str] = None
+):
+    """
+    Les N prochaines révisions dues, toutes sources confondues, par échéance.
+
+    Topics et vocabulaire de l'utilisateur ; avec course_id, vocabulaire de ce
+    cours et concepts du cours. Une lecture indexée par source, fusionnée.
+    """
+    try:
+        items = review_queue.next_items(user_id, limit=limit, course_id=course_id)
+        return {
+            "user_id": user_id,
+            "course_id": course_id,
+            "count": len(items),
+            "items": [item.to_dict() for item in items]
+        }
+    except Exception as e:
+        logger.error(f"Error getting review queue: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 📊 ENHANCED ANALYTICS - Dashboard data
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1175,47 +1222,39 @@ async def get_learning_analytics(user_id: str):
     Récupère toutes les données analytiques pour le dashboard.
 
     Combine chronotype, learning style, et progression pour
-    donner une vue complète de l'apprentissage.
+    donner une vue complète de l'apprentissage. Lit le snapshot
+    précalculé : une requête, aucune écriture.
     """
     try:
-        chronotype = db.calculate_chronotype(user_id)
-        learning_style = db.get_recommended_format(user_id)
-        optimal_time = db.is_optimal_learning_time(user_id)
-        all_mastery = db.get_user_all_mastery(user_id)
-
-        # Calculer les stats globales
-        total_mastery = sum(m.get("mastery_level", 0) for m in all_mastery)
-        avg_mastery = total_mastery / len(all_mastery) if all_mastery else 0
-        total_attempts = sum(m.get("total_attempts", 0) for m in all_mastery)
-        total_correct = sum(m.get("correct_attempts", 0) for m in all_mastery)
+        # Snapshot précalculé (recalculé en arrière-plan après ANALYTICS_REFRESH_EVERY réponses)
+        snapshot = db.get_analytics_snapshot(user_id)
+        chronotype = snapshot["chronotype"]
+        learning_style = snapshot["learning_style"]
+        stats = snapshot["stats"]
 
         return {
             "user_id": user_id,
 
             # Chronotype
             "chronotype": chronotype,
-            "optimal_time": optimal_time,
+            "optimal_time": optimal_learning_time(
+                chronotype.get("best_hours", []), chronotype.get("worst_hours", []), chronotype.get("confidence", 0)
+            ),
 
             # Learning Style
             "learning_style": learning_style,
 
             # Progression globale
-            "stats": {
-                "topics_studied": len(all_mastery),
-                "average_mastery": round(avg_mastery, 1),
-                "total_attempts": total_attempts,
-                "overall_accuracy": round(total_correct / max(1, total_attempts) * 100, 1)
-            },
+            "stats": stats,
 
             # Top topics
-            "top_topics": sorted(
-                all_mastery,
-                key=lambda x: x.get("mastery_level", 0),
-                reverse=True
-            )[:5],
+            "top_topics": snapshot["top_topics"],
 
             # Insights personnalisés
-            "insights": _generate_insights(chronotype, learning_style, avg_mastery)
+            "insights": _generate_insights(chronotype, learning_style, stats["average_mastery"]),
+
+            # Fraîcheur du snapshot
+            "freshness": snapshot["freshness"]
         }
     except Exception as e:
         logger.error(f"Error getting analytics: {e}")
@@ -1289,7 +1328,7 @@ async def get_generation_effect_question(
 
     # Récupérer la maîtrise
     mastery_data = db.get_or_create_mastery(session_user_id, topic_id)
-    success_rates = db.get_success_rates_by_difficulty(session_user_id, topic_id)
+    success_rates = mastery_success_rates(mastery_data)
 
     # Calculer skip_days
     skip_days = 0
@@ -1297,10 +1336,8 @@ async def get_generation_effect_question(
         try:
             last_review_str = mastery_data["last_reviewed"]
             if isinstance(last_review_str, str):
-                last_review = datetime.fromisoformat(last_review_str.replace('Z', '+00:00'))
-                if last_review.tzinfo:
-                    last_review = last_review.replace(tzinfo=None)
-                skip_days = max(0, (datetime.now() - last_review).days)
+                last_review = clock.from_sql(last_review_str)
+                skip_days = max(0, (clock.now() - last_review).days)
         except (ValueError, TypeError):
             pass
 
@@ -1574,11 +1611,15 @@ async def submit_selection_phase(
         "total_attempts": new_total_attempts,
         "correct_attempts": new_correct_attempts,
         "success_rate": new_success_rate,
-        "last_reviewed": datetime.now().isoformat()
+        "last_reviewed": clock.to_sql(clock.now())
     })
 
     # Mettre à jour success_by_difficulty
     db.update_success_by_difficulty(user_id, topic_id, difficulty, is_correct)
+    review_events.append(
+        user_id, topic_id, rating_from_response(is_correct, total_time), total_time,
+        DIFFICULTY_TO_LEVEL.get(difficulty, 3)
+    )
 
     # Enregistrer la réponse Generation Effect complète
     db.record_generation_response(
@@ -1771,7 +1812,7 @@ async def get_next_interleaving_question(session_id: str):
 
     # Récupérer la maîtrise pour ce topic
     mastery_data = db.get_or_create_mastery(user_id, topic_id)
-    success_rates = db.get_success_rates_by_difficulty(user_id, topic_id)
+    success_rates = mastery_success_rates(mastery_data)
 
     # Déterminer la difficulté
     difficulty = determine_difficulty(
@@ -1902,11 +1943,15 @@ async def submit_interleaving_answer(session_id: str, submission: AnswerSubmissi
         "total_attempts": new_total_attempts,
         "correct_attempts": new_correct_attempts,
         "success_rate": new_success_rate,
-        "last_reviewed": datetime.now().isoformat()
+        "last_reviewed": clock.to_sql(clock.now())
     })
 
     # Mettre à jour success_by_difficulty
     db.update_success_by_difficulty(user_id, topic_id, difficulty, is_correct)
+    review_events.append(
+        user_id, topic_id, rating_from_response(is_correct, submission.time_taken), submission.time_taken,
+        DIFFICULTY_TO_LEVEL.get(difficulty, 3)
+    )
 
     # Enregistrer pour chronotype
     db.record_session_performance(
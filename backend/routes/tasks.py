@@ -6,9 +6,11 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List, Literal
 from services.openai_service import openai_service
+from utils.lazy import lazy_import
 from datetime import datetime, timedelta
 import logging
-import openai
+
+openai = lazy_import("openai")
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
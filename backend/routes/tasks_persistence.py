@@ -425,8 +425,8 @@ async def get_tasks_stats():
 @router.get("/stats/daily")
 async def get_daily_stats(days: int = 7):
     """Statistiques journalières"""
-    # TODO: Implémenter get_daily_stats dans tasks_db
-    return {"success": True, "stats": []}
+    stats = db.get_daily_stats(days=days)
+    return {"success": True, "stats": stats}
 
 
 # ═══════════════════════════════════════════════════════════════
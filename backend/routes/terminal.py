@@ -1,18 +1,32 @@
 """
 Route WebSocket pour le terminal interactif avec Docker
+
+Transport asyncio natif : le socket attaché au conteneur est non-bloquant et
+lu via loop.sock_recv, sans thread de lecture ni boucle de polling. Les
+rafales de sortie sont regroupées en frames, et les sessions inactives sont
+arrêtées (conteneur supprimé) après TERMINAL_IDLE_TIMEOUT.
 """
 import asyncio
-import docker
-from docker.errors import NotFound, APIError
+import codecs
+import socket
+import time
+from typing import Awaitable, Callable, Optional
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import threading
-import queue
+
+from config import settings
+from utils.lazy import lazy_import
+
+docker = lazy_import("docker")
 
 router = APIRouter()
 
 # Client Docker global
 docker_client = None
 
+IDLE_NOTICE = "\r\n\033[33m● Session fermée après inactivité\033[0m\r\n"
+
+
 def get_docker_client():
     """Récupère ou crée le client Docker"""
     global docker_client
@@ -23,33 +37,34 @@ def get_docker_client():
 
 class DockerTerminalSession:
     """Gère une session terminal dans un conteneur Docker"""
-    
+
     DEFAULT_IMAGE = "ubuntu:22.04"
-    
+
     def __init__(self, session_id: str):
         self.session_id = session_id
         self.container = None
         self.exec_instance = None
-        self.output_queue = queue.Queue()
-        self.input_queue = queue.Queue()
+        self.sock: Optional[socket.socket] = None
         self._running = False
-        self._reader_thread = None
-    
+        self._attached = False
+        self._stop_requested = asyncio.Event()
+        self.last_activity = time.monotonic()
+
     def start(self) -> str:
-        """Démarre le conteneur Docker et ouvre un shell interactif"""
+        """Démarre le conteneur Docker et ouvre un shell interactif (bloquant)"""
         client = get_docker_client()
         container_name = f"terminal-{self.session_id}"
-        
+
         # Supprimer l'ancien conteneur s'il existe
         try:
             old_container = client.containers.get(container_name)
             old_container.stop(timeout=1)
             old_container.remove(force=True)
-        except NotFound:
+        except docker.errors.NotFound:
             pass
         except Exception:
             pass
-        
+
         # Créer un nouveau conteneur
         self.container = client.containers.run(
             self.DEFAULT_IMAGE,
@@ -72,72 +87,124 @@ class DockerTerminalSession:
                 "session": self.session_id
             }
         )
-        
-        # Attacher au conteneur pour I/O
+
+        # Attacher au conteneur pour I/O (TTY : flux brut, pas d'en-têtes de multiplexage)
         self.exec_instance = self.container.attach_socket(
             params={'stdin': True, 'stdout': True, 'stderr': True, 'stream': True}
         )
-        
-        self._running = True
-        
-        # Thread pour lire l'output du conteneur
-        self._reader_thread = threading.Thread(target=self._read_output, daemon=True)
-        self._reader_thread.start()
-        
+        self._attach(self.exec_instance._sock)
+
         return "\033[32m● Conteneur Docker Ubuntu connecté\033[0m\r\n\r\n"
-    
-    def _read_output(self):
-        """Thread qui lit l'output du conteneur"""
+
+    def _attach(self, sock: socket.socket):
+        """Passe le socket en non-bloquant pour la boucle d'événements"""
+        sock.setblocking(False)
+        self.sock = sock
+        self._running = True
+        self.touch()
+
+    def touch(self):
+        """Marque une activité (entrée ou sortie)"""
+        self.last_activity = time.monotonic()
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_activity
+
+    def request_stop(self):
+        """Demande à run_session de se terminer (le nettoyage reste à son appelant)"""
+        self._stop_requested.set()
+
+    async def read_frames(self, frame_interval: float = None, max_frame_bytes: int = None):
+        """
+        Yield la sortie du conteneur au fil de l'eau.
+
+        Après le premier octet reçu, on laisse frame_interval au shell pour
+        compléter la rafale, puis on vide le socket sans attendre : une frame
+        par rafale plutôt qu'un message par recv.
+        """
+        if frame_interval is None:
+            frame_interval = settings.TERMINAL_FRAME_INTERVAL_MS / 1000
+        if max_frame_bytes is None:
+            max_frame_bytes = settings.TERMINAL_MAX_FRAME_BYTES
+
+        loop = asyncio.get_running_loop()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
         try:
             while self._running:
                 try:
-                    data = self.exec_instance._sock.recv(4096)
-                    if data:
-                        self.output_queue.put(data.decode('utf-8', errors='replace'))
-                    else:
+                    data = await loop.sock_recv(self.sock, max_frame_bytes)
+                except OSError:
+                    break
+                if not data:
+                    break
+
+                buffer = bytearray(data)
+                eof = False
+                if len(buffer) < max_frame_bytes and frame_interval > 0:
+                    await asyncio.sleep(frame_interval)
+                while len(buffer) < max_frame_bytes:
+                    try:
+                        more = self.sock.recv(max_frame_bytes - len(buffer))
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    except OSError:
+                        eof = True
+                        break
+                    if not more:
+                        eof = True
                         break
-                except Exception:
+                    buffer += more
+
+                self.touch()
+                text = decoder.decode(bytes(buffer))
+                if text:
+                    yield text
+                if eof:
                     break
+
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
         finally:
             self._running = False
-    
+
+    async def write(self, data: str):
+        """Écrit des données dans le terminal"""
+        if self.sock and self._running:
+            try:
+                await asyncio.get_running_loop().sock_sendall(self.sock, data.encode())
+                self.touch()
+            except OSError:
+                self._running = False
+
     def resize(self, rows: int, cols: int):
-        """Redimensionne le terminal"""
+        """Redimensionne le terminal (bloquant)"""
         if self.container:
             try:
                 self.container.resize(height=rows, width=cols)
             except Exception:
                 pass
-    
-    def write(self, data: str):
-        """Écrit des données dans le terminal"""
-        if self.exec_instance and self._running:
-            try:
-                self.exec_instance._sock.send(data.encode())
-            except Exception:
-                self._running = False
-    
-    def read(self) -> str:
-        """Lit les données du terminal (non-bloquant)"""
-        output = ""
-        try:
-            while not self.output_queue.empty():
-                output += self.output_queue.get_nowait()
-        except queue.Empty:
-            pass
-        return output
-    
+
     def stop(self):
-        """Arrête et supprime le conteneur"""
+        """Arrête et supprime le conteneur (bloquant)"""
         self._running = False
-        
+
         if self.exec_instance:
             try:
                 self.exec_instance.close()
             except Exception:
                 pass
             self.exec_instance = None
-        
+
+        if self.sock:
+            try:
+                self.sock.close()
+            except Exception:
+                pass
+            self.sock = None
+
         if self.container:
             try:
                 self.container.stop(timeout=2)
@@ -145,7 +212,7 @@ class DockerTerminalSession:
             except Exception:
                 pass
             self.container = None
-    
+
     @property
     def is_running(self) -> bool:
         return self._running
@@ -155,54 +222,124 @@ class DockerTerminalSession:
 active_sessions: dict[str, DockerTerminalSession] = {}
 
 
+async def run_session(
+    session: DockerTerminalSession,
+    send_json: Callable[[dict], Awaitable[None]],
+    receive_json: Callable[[], Awaitable[dict]],
+    idle_timeout: float = None,
+) -> str:
+    """
+    Relie une session à un client jusqu'à ce que l'un des côtés se termine.
+
+    Tâches : sortie conteneur -> client, entrées client -> conteneur, un
+    minuteur d'inactivité qui ne se réveille qu'à l'échéance, et l'attente
+    d'un arrêt demandé via request_stop().
+    Retourne la raison de fin : "exited", "idle", "stopped" ou "disconnected".
+    """
+    if idle_timeout is None:
+        idle_timeout = settings.TERMINAL_IDLE_TIMEOUT
+
+    async def pump_output():
+        async for frame in session.read_frames():
+            await send_json({"type": "output", "data": frame})
+
+    async def pump_input():
+        while True:
+            message = await receive_json()
+            session.touch()
+            if message.get("type") == "input":
+                await session.write(message.get("data", ""))
+            elif message.get("type") == "resize":
+                rows = message.get("rows", 24)
+                cols = message.get("cols", 80)
+                await asyncio.to_thread(session.resize, rows, cols)
+
+    async def reap_when_idle():
+        while True:
+            remaining = idle_timeout - session.idle_seconds
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    output_task = asyncio.create_task(pump_output())
+    input_task = asyncio.create_task(pump_input())
+    idle_task = asyncio.create_task(reap_when_idle())
+    stop_task = asyncio.create_task(session._stop_requested.wait())
+    tasks = {output_task, input_task, idle_task, stop_task}
+
+    session._attached = True
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        session._attached = False
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if stop_task in done:
+        return "stopped"
+
+    if idle_task in done:
+        try:
+            await send_json({"type": "output", "data": IDLE_NOTICE})
+        except Exception:
+            pass
+        return "idle"
+    if input_task in done:
+        exc = input_task.exception()
+        if exc is not None and not isinstance(exc, WebSocketDisconnect):
+            raise exc
+        return "disconnected"
+    exc = output_task.exception()
+    if exc is not None and not isinstance(exc, WebSocketDisconnect):
+        raise exc
+    return "exited"
+
+
+async def _stop_session(session: DockerTerminalSession):
+    """
+    Arrête une session. Si un WebSocket la sert encore, on lui demande de
+    se terminer : c'est lui qui ferme le socket une fois la lecture annulée.
+    """
+    if session._attached:
+        session.request_stop()
+    else:
+        await asyncio.to_thread(session.stop)
+
+
 @router.websocket("/ws/terminal/{session_id}")
 async def terminal_websocket(websocket: WebSocket, session_id: str):
     """WebSocket endpoint pour le terminal Docker"""
     await websocket.accept()
-    
+
     session = None
-    
+
     try:
-        # Créer la session
-        if session_id in active_sessions:
-            active_sessions[session_id].stop()
-            del active_sessions[session_id]
-        
+        # Remplacer une session existante du même id
+        previous = active_sessions.pop(session_id, None)
+        if previous:
+            await _stop_session(previous)
+
+        if len(active_sessions) >= settings.TERMINAL_MAX_SESSIONS:
+            await websocket.send_json({"type": "error", "message": "Trop de sessions terminal actives"})
+            await websocket.close()
+            return
+
         session = DockerTerminalSession(session_id)
-        welcome_msg = session.start()
         active_sessions[session_id] = session
-        
+        welcome_msg = await asyncio.to_thread(session.start)
+
         await websocket.send_json({"type": "output", "data": welcome_msg})
-        
-        # Boucle principale
-        while session.is_running:
-            # Lire l'output
-            output = session.read()
-            if output:
-                await websocket.send_json({"type": "output", "data": output})
-            
-            # Vérifier les messages du client
-            try:
-                message = await asyncio.wait_for(
-                    websocket.receive_json(),
-                    timeout=0.05
-                )
-                
-                if message.get("type") == "input":
-                    session.write(message.get("data", ""))
-                elif message.get("type") == "resize":
-                    rows = message.get("rows", 24)
-                    cols = message.get("cols", 80)
-                    session.resize(rows, cols)
-                    
-            except asyncio.TimeoutError:
-                pass
-            
-            await asyncio.sleep(0.02)
-            
+
+        reason = await run_session(session, websocket.send_json, websocket.receive_json)
+        if reason == "disconnected":
+            print(f"Terminal {session_id} disconnected")
+        elif reason in ("idle", "stopped"):
+            await websocket.close()
+
     except WebSocketDisconnect:
         print(f"Terminal {session_id} disconnected")
-    except APIError as e:
+    except docker.errors.APIError as e:
         try:
             await websocket.send_json({"type": "error", "message": f"Docker: {e}"})
         except:
@@ -214,23 +351,29 @@ async def terminal_websocket(websocket: WebSocket, session_id: str):
         except:
             pass
     finally:
-        if session_id in active_sessions:
-            active_sessions[session_id].stop()
-            del active_sessions[session_id]
+        if session is not None:
+            if active_sessions.get(session_id) is session:
+                del active_sessions[session_id]
+            await asyncio.to_thread(session.stop)
 
 
 @router.get("/sessions")
 async def list_sessions():
     """Liste les sessions actives"""
-    return {"sessions": list(active_sessions.keys()), "count": len(active_sessions)}
+    return {
+        "sessions": list(active_sessions.keys()),
+        "count": len(active_sessions),
+        "max": settings.TERMINAL_MAX_SESSIONS,
+        "idle_seconds": {sid: round(s.idle_seconds, 1) for sid, s in active_sessions.items()},
+    }
 
 
 @router.delete("/sessions/{session_id}")
 async def stop_session(session_id: str):
     """Arrête une session"""
-    if session_id in active_sessions:
-        active_sessions[session_id].stop()
-        del active_sessions[session_id]
+    session = active_sessions.pop(session_id, None)
+    if session:
+        await _stop_session(session)
         return {"status": "stopped"}
     return {"status": "not_found"}
 
@@ -240,7 +383,7 @@ async def terminal_health():
     """Vérifie Docker"""
     try:
         client = get_docker_client()
-        client.ping()
-        return {"status": "healthy", "docker": "connected"}
+        await asyncio.to_thread(client.ping)
+        return {"status": "healthy", "docker": "connected", "active_sessions": len(active_sessions)}
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
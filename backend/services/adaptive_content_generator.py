@@ -29,7 +29,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
-from services.ai_dispatcher import AIDispatcher, TaskType, ModelTier
+from services.ai_dispatcher import AIDispatcher, DispatchResult, TaskType, ModelTier
+from services.content_cache import ContentStore, content_store, make_fingerprint, template_version
 from services.socratic_tutor import create_socratic_tutor
 from databases import tutor_profile_db as profile_db
 
@@ -73,6 +74,14 @@ def extract_json(text: str) -> dict:
     raise json.JSONDecodeError("No valid JSON found", text, 0)
 
 
+class UnparsedContentError(ValueError):
+    """Réponse du modèle sans objet JSON exploitable (jamais mise en cache)"""
+
+    def __init__(self, message: str, result: DispatchResult):
+        super().__init__(message)
+        self.result = result
+
+
 class ContentType(str, Enum):
     """Types de contenu générables"""
     MICRO_LESSON = "micro_lesson"       # Leçon courte ciblée (3-5 min)
@@ -132,16 +141,75 @@ class AdaptiveContentGenerator:
     ses faiblesses, et son style d'apprentissage.
     """
 
-    def __init__(self, ai_dispatcher: AIDispatcher = None):
+    def __init__(self, ai_dispatcher: AIDispatcher = None, store: ContentStore = None):
         """Initialise le générateur."""
         self.ai = ai_dispatcher or AIDispatcher()
         self.tutor = create_socratic_tutor()
 
-        # Templates de prompts par type de contenu
+        # Cache partagé du contenu généré (clé = empreinte de la requête)
+        self.store = store or content_store
+
+        # Templates de prompts par type de contenu (+ version pour invalider le cache)
         self._prompts = self._load_prompt_templates()
+        self._prompt_versions = {
+            content_type: template_version(template)
+            for content_type, template in self._prompts.items()
+        }
 
         logger.info("🎨 AdaptiveContentGenerator initialisé")
 
+    def _dispatch_cached(
+        self,
+        content_type: ContentType,
+        task_type: TaskType,
+        prompt: str,
+        system_prompt: str,
+        temperature: float,
+        difficulty: Optional[str] = None
+    ) -> Tuple[DispatchResult, Dict[str, Any]]:
+        """
+        Dispatch vers l'IA avec cache et coalescence.
+
+        Le prompt rendu contient déjà tous les paramètres (topic, style,
+        difficulté...), donc deux requêtes qui produisent le même prompt
+        partagent le même contenu, même entre utilisateurs.
+
+        La réponse est parsée avant d'être stockée : une sortie sans objet
+        JSON lève UnparsedContentError (avec le résultat brut, pour un repli
+        éventuel) et n'est pas mise en cache : nouvel appel au prochain essai
+        au lieu de resservir une réponse inutilisable.
+
+        Returns:
+            (résultat du dispatch, objet JSON extrait)
+        """
+        key = make_fingerprint(
+            content_type=content_type,
+            template_version=self._prompt_versions.get(content_type),
+            task_type=task_type,
+            prompt=prompt,
+            system_prompt=system_prompt,
+            difficulty=difficulty,
+            temperature=temperature,
+        )
+
+        def compute() -> Tuple[DispatchResult, Dict[str, Any]]:
+            result = self.ai.dispatch(
+                task_type=task_type,
+                prompt=prompt,
+                system_prompt=system_prompt,
+                difficulty=difficulty,
+                temperature=temperature
+            )
+            try:
+                content_data = extract_json(result.content)
+            except json.JSONDecodeError as e:
+                raise UnparsedContentError(f"Réponse sans JSON valide: {e}", result) from e
+            if not isinstance(content_data, dict):
+                raise UnparsedContentError(f"Objet JSON attendu, reçu {type(content_data).__name__}", result)
+            return result, content_data
+
+        return self.store.get_or_compute(key, compute)
+
     def _load_prompt_templates(self) -> Dict[ContentType, str]:
         """Charge les templates de prompts."""
         return {
@@ -400,7 +468,8 @@ FORMAT JSON:
         )
 
         try:
-            result = self.ai.dispatch(
+            result, content_data = self._dispatch_cached(
+                ContentType.MICRO_LESSON,
                 task_type=TaskType.EXPLANATION,
                 prompt=prompt,
                 system_prompt="Tu es un expert pédagogue. Réponds UNIQUEMENT en JSON valide.",
@@ -408,8 +477,6 @@ FORMAT JSON:
                 temperature=0.7
             )
 
-            content_data = extract_json(result.content)
-
             return GeneratedContent(
                 type=ContentType.MICRO_LESSON,
                 topic=topic,
@@ -427,42 +494,17 @@ FORMAT JSON:
                     "model_used": result.model_used
                 }
             )
-        except json.JSONDecodeError as e:
-            logger.warning(f"JSON parsing failed, extracting from content: {e}")
-            # Essayer d'extraire le JSON du contenu (souvent wrapped dans ```json```)
-            content_text = result.content if 'result' in locals() else ""
-            try:
-                # Chercher le JSON dans le contenu
-                import re
-                json_match = re.search(r'\{[\s\S]*\}', content_text)
-                if json_match:
-                    content_data = json.loads(json_match.group())
-                    return GeneratedContent(
-                        type=ContentType.MICRO_LESSON,
-                        topic=topic,
-                        title=content_data.get("title", f"Leçon: {topic}"),
-                        content=content_data.get("explanation", content_text),
-                        key_points=content_data.get("key_points", []),
-                        exercises=[],
-                        estimated_duration_minutes=5,
-                        difficulty=profile.optimal_difficulty,
-                        metadata={
-                            "hook": content_data.get("hook"),
-                            "examples": content_data.get("examples", []),
-                            "practice_hint": content_data.get("practice_hint"),
-                            "style_used": style.value
-                        }
-                    )
-            except:
-                pass
-            # Fallback: retourner le contenu brut
+        except UnparsedContentError as e:
+            # Prose ou JSON tronqué : leçon en texte brut, servie mais pas mise en cache
+            logger.warning(f"JSON parsing failed, returning raw content: {e}")
             return GeneratedContent(
                 type=ContentType.MICRO_LESSON,
                 topic=topic,
                 title=f"Leçon: {topic}",
-                content=content_text,
+                content=e.result.content,
                 key_points=[],
-                difficulty=profile.optimal_difficulty
+                difficulty=profile.optimal_difficulty,
+                metadata={"style_used": style.value, "model_used": e.result.model_used}
             )
         except Exception as e:
             logger.error(f"Erreur génération micro-leçon: {e}")
@@ -492,7 +534,8 @@ FORMAT JSON:
         )
 
         try:
-            result = self.ai.dispatch(
+            result, content_data = self._dispatch_cached(
+                ContentType.EXERCISE_SET,
                 task_type=TaskType.QUIZ,
                 prompt=prompt,
                 system_prompt="Tu es un créateur d'exercices. Réponds UNIQUEMENT en JSON valide.",
@@ -500,8 +543,6 @@ FORMAT JSON:
                 temperature=0.6
             )
 
-            content_data = extract_json(result.content)
-
             return GeneratedContent(
                 type=ContentType.EXERCISE_SET,
                 topic=topic,
@@ -553,7 +594,8 @@ FORMAT JSON:
         )
 
         try:
-            result = self.ai.dispatch(
+            result, content_data = self._dispatch_cached(
+                ContentType.EXPLANATION,
                 task_type=TaskType.EXPLANATION,
                 prompt=prompt,
                 system_prompt="Tu es un tuteur patient. Réponds UNIQUEMENT en JSON valide.",
@@ -561,8 +603,6 @@ FORMAT JSON:
                 temperature=0.5
             )
 
-            content_data = extract_json(result.content)
-
             full_content = content_data.get("intro", "") + "\n\n"
             full_content += content_data.get("explanation", "") + "\n\n"
             if content_data.get("analogy"):
@@ -612,15 +652,14 @@ FORMAT JSON:
         )
 
         try:
-            result = self.ai.dispatch(
+            result, content_data = self._dispatch_cached(
+                ContentType.REMEDIATION,
                 task_type=TaskType.PLANNING,
                 prompt=prompt,
                 system_prompt="Tu es un spécialiste en remédiation. Réponds UNIQUEMENT en JSON valide.",
                 temperature=0.4
             )
 
-            content_data = extract_json(result.content)
-
             # Construire le contenu lisible
             content = f"📊 Diagnostic: {content_data.get('diagnosis', '')}\n\n"
             content += "📌 Priorités:\n"
@@ -672,15 +711,14 @@ FORMAT JSON:
         )
 
         try:
-            result = self.ai.dispatch(
+            result, content_data = self._dispatch_cached(
+                ContentType.MNEMONIC,
                 task_type=TaskType.EXPLANATION,
                 prompt=prompt,
                 system_prompt="Tu es expert en mnémotechnique. Réponds UNIQUEMENT en JSON valide.",
                 temperature=0.8  # Plus créatif pour les mnémoniques
             )
 
-            content_data = extract_json(result.content)
-
             content = f"🧠 {content_data.get('mnemonic', '')}\n\n"
             if content_data.get("visual"):
                 content += f"👁️ Visualise: {content_data['visual']}\n\n"
@@ -3,7 +3,6 @@ AI Dispatcher - Routage intelligent vers le modèle optimal
 Logique de sélection basée sur la complexité et le type de tâche
 Avec retry automatique et fallback gracieux
 """
-import os
 import json
 import logging
 import time
@@ -11,8 +10,10 @@ from datetime import datetime
 from enum import Enum
 from typing import Dict, Any, Optional, List, Literal
 from dataclasses import dataclass
-from openai import OpenAI
 from config import settings
+from services.openai_client import LazyOpenAIClient, is_transient_error
+from utils.metrics import LLM_COST, LLM_DURATION, LLM_FALLBACKS, LLM_REQUESTS, LLM_TOKENS
+from utils.tracing import traced
 from models.learning import Question, QuestionOption
 from databases.learning_db import learning_db
 import uuid
@@ -20,10 +21,9 @@ from tenacity import (
     retry,
     stop_after_attempt,
     wait_exponential,
-    retry_if_exception_type,
+    retry_if_exception,
     before_sleep_log
 )
-import openai
 
 logger = logging.getLogger(__name__)
 
@@ -153,15 +153,11 @@ class AIDispatcher:
     4. Tracking des coûts et latences
     """
 
+    # Créé au premier appel IA (le SDK openai n'est pas chargé au démarrage)
+    client = LazyOpenAIClient()
+
     def __init__(self):
         """Initialise le dispatcher"""
-        api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            logger.warning("⚠️ OPENAI_API_KEY non configurée - dispatcher en mode dégradé")
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=api_key)
-
         # Stats de session
         self.session_stats = {
             "total_requests": 0,
@@ -217,15 +213,11 @@ class AIDispatcher:
         logger.info(f"🎯 Routage {task_key} (base) → {base_tier.value} ({MODELS[base_tier].name})")
         return base_tier
 
+    @traced("llm.call_model")
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=2, min=2, max=10),
-        retry=retry_if_exception_type((
-            openai.APIError,
-            openai.APIConnectionError,
-            openai.RateLimitError,
-            openai.APITimeoutError
-        )),
+        retry=retry_if_exception(is_transient_error),
         before_sleep=before_sleep_log(logger, logging.WARNING)
     )
     def _call_model(
@@ -262,15 +254,25 @@ class AIDispatcher:
 
         start_time = time.time()
 
-        response = self.client.chat.completions.create(
-            model=model_config.name,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens or model_config.max_tokens,
-            timeout=timeout
-        )
+        try:
+            response = self.client.chat.completions.create(
+                model=model_config.name,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens or model_config.max_tokens,
+                timeout=timeout
+            )
+        except Exception as e:
+            # Chaque tentative compte (le retry rappelle cette méthode)
+            LLM_REQUESTS.labels(model_config.name, type(e).__name__).inc()
+            raise
 
-        latency = int((time.time() - start_time) * 1000)
+        elapsed = time.time() - start_time
+        latency = int(elapsed * 1000)
+        LLM_REQUESTS.labels(model_config.name, "ok").inc()
+        LLM_DURATION.labels(model_config.name).observe(elapsed)
+        LLM_TOKENS.labels(model_config.name, "input").inc(response.usage.prompt_tokens)
+        LLM_TOKENS.labels(model_config.name, "output").inc(response.usage.completion_tokens)
 
         return {
             "content": response.choices[0].message.content,
@@ -338,6 +340,7 @@ class AIDispatcher:
                 fallback_tier = ModelTier.FAST
                 fallback_config = MODELS[fallback_tier]
                 logger.warning(f"⚠️ Fallback vers {fallback_config.name}")
+                LLM_FALLBACKS.labels(model_config.name).inc()
 
                 try:
                     result = self._call_model(
@@ -366,6 +369,7 @@ class AIDispatcher:
         # Mettre à jour les stats de session
         self.session_stats["total_requests"] += 1
         self.session_stats["total_cost"] += cost_estimate
+        LLM_COST.labels(model_config.name).inc(cost_estimate)
         self.session_stats["requests_by_tier"][target_tier.value] += 1
 
         # Persister dans la base de données pour historique
@@ -0,0 +1,383 @@
+"""
+Build Cache - Compilation des langages compilés avec cache d'artefacts
+
+Philosophie :
+- Compiler une fois, exécuter souvent : un exercice est resoumis tel quel très souvent
+- Artefacts indexés par empreinte (langage + image + commande de build + source)
+- Compilation dans un container `<langage>:build` du pool, exécution dans un container
+  du langage qui ne voit le dossier d'artefacts qu'en lecture seule
+- Compilations identiques simultanées partagées (une seule compilation)
+- Temps de build mesuré à part du temps d'exécution
+
+Le dossier d'artefacts vit sur l'hôte ; DockerRuntime le monte sur /cache.
+Les caches des compilateurs (GOCACHE) y vivent aussi, sous _toolchain/ : /tmp est
+un tmpfs de 64m vidé par SANDBOX_RESET après chaque exécution, le cache y serait
+reconstruit (bibliothèque standard comprise) à chaque compilation.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.code_sandbox import ContainerPool
+
+logger = logging.getLogger(__name__)
+
+# Suffixe des langages du pool dédiés à la compilation
+BUILD_SUFFIX = ":build"
+
+# Les fichiers créés par le compilateur (uid du sandbox) doivent rester supprimables par l'hôte
+_UMASK_PREFIX = ["sh", "-c", 'umask 0 && exec "$@"', "sh"]
+
+
+def build_pool_key(language: str) -> str:
+    """Langage du pool utilisé pour compiler `language`."""
+    return f"{language}{BUILD_SUFFIX}"
+
+
+@dataclass(frozen=True)
+class BuildSpec:
+    """
+    Recette de compilation d'un langage.
+
+    `build` et `run` sont des gabarits : {out} est le dossier de l'artefact
+    (vu depuis le container), {entry} le nom du point d'entrée.
+    """
+    extension: str
+    build: Tuple[str, ...]
+    run: Tuple[str, ...]
+    entry_pattern: Optional[str] = None   # Regex qui capture le point d'entrée dans la source
+    default_entry: str = "main"
+    cache_env: Optional[str] = None       # Variable du cache du compilateur, gardé entre compilations
+
+    def entry(self, code: str) -> str:
+        if self.entry_pattern:
+            match = re.search(self.entry_pattern, code)
+            if match:
+                return match.group(1)
+        return self.default_entry
+
+    def source_name(self, code: str) -> str:
+        return f"{self.entry(code)}.{self.extension}"
+
+    def build_command(self, out: str, entry: str, cache: Optional[str] = None) -> List[str]:
+        env = ["env", f"{self.cache_env}={cache}"] if self.cache_env and cache else []
+        return _UMASK_PREFIX + env + [part.format(out=out, entry=entry) for part in self.build]
+
+    def run_command(self, out: str, entry: str) -> List[str]:
+        return [part.format(out=out, entry=entry) for part in self.run]
+
+
+BUILD_SPECS: Dict[str, BuildSpec] = {
+    "cpp": BuildSpec(
+        extension="cpp",
+        build=("g++", "-O2", "-std=c++17", "-o", "{out}/{entry}", "{out}/{entry}.cpp"),
+        run=("{out}/{entry}",),
+    ),
+    "rust": BuildSpec(
+        extension="rs",
+        build=("rustc", "-O", "-o", "{out}/{entry}", "{out}/{entry}.rs"),
+        run=("{out}/{entry}",),
+    ),
+    "go": BuildSpec(
+        extension="go",
+        build=("go", "build", "-o", "{out}/{entry}", "{out}/{entry}.go"),
+        run=("{out}/{entry}",),
+        cache_env="GOCACHE",
+    ),
+    "java": BuildSpec(
+        extension="java",
+        build=("javac", "-d", "{out}", "{out}/{entry}.java"),
+        run=("java", "-cp", "{out}", "{entry}"),
+        # javac impose que le fichier porte le nom de la classe publique
+        entry_pattern=r"public\s+(?:final\s+|abstract\s+)*class\s+(\w+)",
+        default_entry="Main",
+    ),
+}
+
+
+@dataclass
+class BuildResult:
+    """Résultat d'une compilation (ou d'un hit du cache)"""
+    language: str
+    key: str
+    entry: str
+    artifact_dir: Optional[str]   # Dossier hôte de l'artefact, None si la compilation a échoué
+    exit_code: int
+    output: str                   # Sortie du compilateur (erreurs, warnings)
+    duration_ms: int              # 0 si l'artefact était en cache
+    cached: bool = False
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.artifact_dir is not None
+
+
+class ArtifactCache:
+    """
+    Cache disque des artefacts de compilation, borné en nombre d'entrées (LRU).
+
+    Chaque artefact est un dossier `<root>/<empreinte>` ; il n'apparaît qu'une fois
+    la compilation réussie (dossier temporaire renommé), donc un hit est toujours
+    complet. L'ordre LRU suit la date de modification, mise à jour à chaque hit.
+
+    `<root>/_toolchain/<langage>` garde le cache du compilateur (hors LRU), vidé
+    en entier au-delà de max_toolchain_bytes : le compilateur le reconstruit.
+    """
+
+    LOG_FILE = ".build.log"
+    TOOLCHAIN_DIR = "_toolchain"
+
+    def __init__(self, root: str, max_entries: int = 256, max_toolchain_bytes: int = 512 * 1024 * 1024):
+        self.root = os.path.abspath(root)
+        self.max_entries = max_entries
+        self.max_toolchain_bytes = max_toolchain_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+        # Dossiers temporaires d'une compilation interrompue (redémarrage)
+        for name in os.listdir(self.root):
+            if name.startswith("."):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "toolchain_trims": 0}
+
+    def key(self, language: str, code: str, spec: BuildSpec, image: str = "") -> str:
+        """Empreinte de l'artefact : change avec la source, la recette ou l'image."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([language, image, spec.extension, spec.build, spec.run]).encode())
+        digest.update(b"\0")
+        digest.update(code.encode())
+        return digest.hexdigest()[:40]
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Dossier de l'artefact s'il existe (et le marque récemment utilisé)."""
+        path = self.path(key)
+        if os.path.isdir(path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.stats["hits"] += 1
+            return path
+        self.stats["misses"] += 1
+        return None
+
+    def read_log(self, key: str) -> str:
+        try:
+            with open(os.path.join(self.path(key), self.LOG_FILE), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    def reserve(self, key: str) -> str:
+        """Dossier temporaire où le compilateur (autre uid) peut écrire."""
+        tmp = tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.root)
+        os.chmod(tmp, 0o777)
+        return tmp
+
+    def commit(self, key: str, tmp: str, log: str = "") -> str:
+        """Publie l'artefact compilé dans `tmp` sous son empreinte."""
+        with open(os.path.join(tmp, self.LOG_FILE), "w", encoding="utf-8") as f:
+            f.write(log)
+        os.chmod(tmp, 0o755)
+
+        final = self.path(key)
+        try:
+            os.rename(tmp, final)
+        except OSError:
+            # Déjà publié par une autre compilation
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._evict()
+        return final
+
+    def discard(self, tmp: str) -> None:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    def toolchain_dir(self, language: str) -> str:
+        """Cache du compilateur de `language`, où le compilateur (autre uid) peut écrire."""
+        path = os.path.join(self.root, self.TOOLCHAIN_DIR, language)
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
+            os.chmod(path, 0o777)
+        return path
+
+    def trim_toolchains(self) -> None:
+        """Vide les caches de compilateur plus gros que max_toolchain_bytes."""
+        root = os.path.join(self.root, self.TOOLCHAIN_DIR)
+        if not os.path.isdir(root):
+            return
+        for entry in os.scandir(root):
+            if entry.is_dir() and _tree_size(entry.path) > self.max_toolchain_bytes:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                self.stats["toolchain_trims"] += 1
+
+    def _entries(self) -> List[os.DirEntry]:
+        return [
+            e for e in os.scandir(self.root)
+            if e.is_dir() and not e.name.startswith(".") and e.name != self.TOOLCHAIN_DIR
+        ]
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries()),
+            "max_entries": self.max_entries,
+            "hit_rate": round(self.stats["hits"] / total, 3) if total else 0.0,
+        }
+
+
+def _tree_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class BuildPipeline:
+    """
+    Compile-puis-exécute pour les langages de BUILD_SPECS.
+
+    build() retourne l'artefact (cache ou compilation dans le pool) ;
+    run_command() donne la commande à exécuter dans un container du langage.
+    """
+
+    def __init__(self, pool: ContainerPool, cache: ArtifactCache, specs: Optional[Dict[str, BuildSpec]] = None):
+        self.pool = pool
+        self.cache = cache
+        self.specs = specs or BUILD_SPECS
+        self._building: Dict[str, asyncio.Future] = {}
+        self.stats = {"builds": 0, "failed": 0, "coalesced": 0}
+
+    def supports(self, language: str) -> bool:
+        return language in self.specs
+
+    async def build(
+        self,
+        language: str,
+        code: str,
+        timeout: int = 30,
+        max_output_bytes: Optional[int] = None
+    ) -> BuildResult:
+        """Retourne l'artefact de `code`, en ne compilant que si nécessaire."""
+        spec = self.specs[language]
+        image = self.pool.images.get(build_pool_key(language), "")
+        key = self.cache.key(language, code, spec, image)
+        entry = spec.entry(code)
+
+        path = self.cache.lookup(key)
+        if path:
+            return BuildResult(
+                language=language,
+                key=key,
+                entry=entry,
+                artifact_dir=path,
+                exit_code=0,
+                output=self.cache.read_log(key),
+                duration_ms=0,
+                cached=True,
+            )
+
+        # Même source déjà en compilation : on attend son résultat
+        pending = self._building.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._building[key] = future
+        try:
+            result = await self._compile(language, key, entry, code, spec, timeout, max_output_bytes)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # Évite "exception never retrieved" sans attente
+            raise
+        finally:
+            self._building.pop(key, None)
+
+    async def _compile(
+        self,
+        language: str,
+        key: str,
+        entry: str,
+        code: str,
+        spec: BuildSpec,
+        timeout: int,
+        max_output_bytes: Optional[int]
+    ) -> BuildResult:
+        tmp = self.cache.reserve(key)
+        try:
+            with open(os.path.join(tmp, f"{entry}.{spec.extension}"), "w", encoding="utf-8") as f:
+                f.write(code)
+
+            out = self.pool.runtime.container_path(tmp)
+            cache = self.pool.runtime.container_path(self.cache.toolchain_dir(language)) if spec.cache_env else None
+            result = await self.pool.run(
+                build_pool_key(language),
+                spec.build_command(out, entry, cache),
+                timeout=timeout,
+                max_output_bytes=max_output_bytes,
+            )
+        except BaseException:
+            self.cache.discard(tmp)
+            raise
+
+        self.stats["builds"] += 1
+        # Seulement sans autre compilation en cours : elle écrit peut-être dans ce cache
+        if spec.cache_env and len(self._building) == 1:
+            self.cache.trim_toolchains()
+        output = result.stdout + result.stderr
+        succeeded = result.exit_code == 0 and not result.timed_out and not result.truncated
+        if succeeded:
+            artifact_dir = self.cache.commit(key, tmp, log=output)
+        else:
+            self.stats["failed"] += 1
+            self.cache.discard(tmp)
+            artifact_dir = None
+
+        return BuildResult(
+            language=language,
+            key=key,
+            entry=entry,
+            artifact_dir=artifact_dir,
+            exit_code=result.exit_code,
+            output=output,
+            duration_ms=result.duration_ms,
+            timed_out=result.timed_out,
+        )
+
+    def run_command(self, build: BuildResult) -> List[str]:
+        """Commande d'exécution de l'artefact, vue depuis le container du langage."""
+        spec = self.specs[build.language]
+        return spec.run_command(self.pool.runtime.container_path(build.artifact_dir), build.entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "artifacts": self.cache.get_stats()}
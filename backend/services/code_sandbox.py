@@ -0,0 +1,775 @@
+"""
+Code Sandbox - Pool de containers chauds pour l'exécution de code
+
+Philosophie :
+- Containers pré-démarrés par langage (pas de création/démarrage à chaque snippet)
+- Exécution via `exec` dans un container isolé (réseau coupé, caps supprimées, /tmp seul inscriptible)
+- Recyclage après N exécutions ou si l'état est sale (timeout, kill, erreur, sortie tronquée)
+- Remise à zéro avant réutilisation : processus restants tués, /tmp vidé (sinon recyclage)
+- Appels Docker hors de la boucle d'événements (threads + file asyncio bornée)
+- Sortie streamée au fil de l'eau, stdout/stderr séparés, avec plafond d'octets
+- Métriques par exécution : temps mur, temps CPU, pic mémoire
+
+Le runtime est abstrait (SandboxRuntime) :
+- DockerRuntime : production
+- LocalProcessRuntime : sous-processus locaux, pour les tests et le dev sans Docker (AUCUNE isolation)
+"""
+import asyncio
+import codecs
+import concurrent.futures
+import hashlib
+import io
+import itertools
+import logging
+import os
+import re
+import selectors
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Code de sortie de `timeout` quand la limite est atteinte
+TIMEOUT_EXIT_CODE = 124
+
+# Marqueur des métriques écrites en fin de stderr par le wrapper (retiré du flux)
+METRICS_MARKER = b"\x1eMARS_METRICS "
+
+# Lancé dans le container via `sh -c` : stdin de l'exec (socket Docker) transmis tel
+# quel, workdir jetable, timeout dur (SIGTERM puis SIGKILL 1s après), puis métriques
+# sur stderr : pic mémoire en Ko et `times` (temps CPU des processus enfants).
+# Le pic vient de GNU time (%M : RSS max du plus gros processus de l'exécution,
+# comme wait4 en local), installé dans l'image dérivée (SANDBOX_DOCKERFILE). Sans
+# /usr/bin/time : -1 (None). Le memory.peak du cgroup n'est pas utilisable : pic de
+# toute la vie du container chaud, non réinitialisable sous l'uid du sandbox
+SANDBOX_WRAPPER = (
+    'd=$(mktemp -d) && m=$(mktemp) && cd "$d" || exit 1; '
+    'set -- timeout -k 1 "$MARS_TIMEOUT" "$@"; '
+    '[ -x /usr/bin/time ] && set -- /usr/bin/time -f %M -o "$m" "$@"; '
+    '"$@"; rc=$?; '
+    'peak=$(tail -n 1 "$m" 2>/dev/null); '
+    'cd / && rm -rf "$d" "$m"; '
+    'printf "\\036MARS_METRICS %s\\n" "${peak:--1}" >&2; times >&2; exit $rc'
+)
+
+# Lancé avant de remettre un container dans le pool, sous le même uid que le code :
+# kill -1 tue tout sauf le PID 1 (keep-alive) et le shell lui-même, puis /tmp est vidé.
+# `sleep infinity` ne récolte pas ses orphelins : un processus tué reste zombie (il
+# occupe un pid) -> code de sortie non nul, le container est recyclé
+SANDBOX_RESET = (
+    'kill -9 -1 2>/dev/null; '
+    'rm -rf /tmp/* /tmp/.[!.]* /tmp/..?* 2>/dev/null; '
+    'for p in /proc/[0-9]*; do p=${p#/proc/}; [ "$p" = 1 ] || [ "$p" = $$ ] || exit 1; done; '
+    '[ -z "$(ls -A /tmp)" ]'
+)
+
+# Image du langage + GNU time, construite une fois par image (DockerRuntime.sandbox_image).
+# Les images de LANGUAGE_IMAGES sont des Debian (apt) ; apk/microdnf pour les autres
+SANDBOX_DOCKERFILE = """FROM {image}
+USER root
+RUN if command -v apt-get >/dev/null; then \\
+        apt-get update && apt-get install -y --no-install-recommends time && rm -rf /var/lib/apt/lists/*; \\
+    elif command -v apk >/dev/null; then apk add --no-cache time; \\
+    else microdnf install -y time; fi
+"""
+
+_TIMES_RE = re.compile(r"(\d+)m([\d.]+)s")
+
+
+@dataclass
+class StreamChunk:
+    """Morceau de sortie brut produit par un runtime"""
+    stream: str   # "stdout" | "stderr"
+    data: bytes
+
+
+@dataclass
+class ExecResult:
+    """Résultat d'une exécution dans le sandbox"""
+    stdout: str
+    stderr: str
+    exit_code: int
+    duration_ms: int                        # Temps mur
+    timed_out: bool = False
+    cpu_time_ms: Optional[int] = None       # user + sys des processus lancés
+    peak_memory_kb: Optional[int] = None    # RSS max de l'exécution (None si non mesurable)
+    truncated: bool = False                 # Sortie coupée au plafond d'octets
+
+
+@dataclass
+class SandboxContainer:
+    """Container chaud géré par le pool"""
+    id: str
+    language: str
+    handle: Any                      # Objet propre au runtime (Container docker, dossier local...)
+    runs: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class SandboxRuntime(ABC):
+    """Interface minimale d'un runtime de containers (appels bloquants)"""
+
+    @abstractmethod
+    def start(self, language: str, image: str) -> SandboxContainer:
+        """Démarre un container inactif prêt à recevoir des `exec`."""
+
+    @abstractmethod
+    def exec_stream(
+        self,
+        container: SandboxContainer,
+        command: List[str],
+        stdin: str = "",
+        timeout: int = 10
+    ) -> Iterator[Union[StreamChunk, ExecResult]]:
+        """
+        Exécute une commande et yield la sortie au fil de l'eau.
+
+        Yield des StreamChunk puis un ExecResult final (stdout/stderr vides,
+        code de sortie + métriques). Fermer l'itérateur avant la fin doit
+        interrompre la lecture.
+        """
+
+    @abstractmethod
+    def reset(self, container: SandboxContainer) -> bool:
+        """
+        Remet le container à l'état initial avant réutilisation.
+
+        Tue les processus laissés par l'exécution (ex: `sleep 999 &`) et vide
+        l'espace de travail. Retourne False si l'état propre n'est pas garanti.
+        """
+
+    @abstractmethod
+    def remove(self, container: SandboxContainer) -> None:
+        """Détruit le container."""
+
+    @abstractmethod
+    def ping(self) -> bool:
+        """Vérifie que le runtime est joignable."""
+
+    def container_path(self, host_path: str) -> str:
+        """Chemin, vu depuis le container, d'un fichier du dossier d'artefacts partagé."""
+        return host_path
+
+
+class _MetricsSplitter:
+    """Sépare le stderr du programme des métriques ajoutées par le wrapper."""
+
+    def __init__(self):
+        self._pending = b""
+        self._metrics: Optional[bytes] = None
+
+    def feed(self, data: bytes) -> bytes:
+        """Retourne la partie de `data` appartenant au programme."""
+        if self._metrics is not None:
+            self._metrics += data
+            return b""
+
+        buffer = self._pending + data
+        index = buffer.find(METRICS_MARKER)
+        if index >= 0:
+            self._metrics = buffer[index + len(METRICS_MARKER):]
+            self._pending = b""
+            return buffer[:index]
+
+        # Garder en réserve un éventuel début de marqueur coupé entre deux chunks
+        hold = 0
+        for size in range(min(len(METRICS_MARKER) - 1, len(buffer)), 0, -1):
+            if METRICS_MARKER.startswith(buffer[-size:]):
+                hold = size
+                break
+        self._pending = buffer[len(buffer) - hold:]
+        return buffer[:len(buffer) - hold]
+
+    def flush(self) -> bytes:
+        data, self._pending = self._pending, b""
+        return data
+
+    def parse(self) -> Tuple[Optional[int], Optional[int]]:
+        """(cpu_time_ms, peak_memory_kb) depuis la fin du stderr."""
+        if not self._metrics:
+            return None, None
+
+        lines = self._metrics.decode("utf-8", errors="replace").strip().splitlines()
+        peak_memory_kb = None
+        try:
+            peak = int(lines[0])
+            peak_memory_kb = peak if peak >= 0 else None
+        except (IndexError, ValueError):
+            pass
+
+        # Dernière ligne de `times` : user et sys des processus enfants
+        cpu_time_ms = None
+        if len(lines) >= 3:
+            values = _TIMES_RE.findall(lines[-1])
+            if len(values) == 2:
+                cpu_time_ms = int(sum(int(m) * 60 + float(sec) for m, sec in values) * 1000)
+
+        return cpu_time_ms, peak_memory_kb
+
+
+class DockerRuntime(SandboxRuntime):
+    """
+    Runtime Docker : containers `sleep infinity` durcis, code lancé par exec.
+
+    Si `artifact_dir` est fourni, ce dossier de l'hôte est monté sur /cache :
+    en écriture pour les langages de `writable_languages` (compilation), en
+    lecture seule pour les autres (exécution des binaires en cache).
+    `limits` surcharge les limites par langage (ex: compilateurs plus gourmands).
+
+    Les containers tournent sur une image dérivée avec GNU time (pic mémoire par
+    exécution), construite au premier démarrage ; si la construction échoue,
+    l'image d'origine est utilisée et peak_memory_kb vaut None.
+    Le stdin passe par le socket de l'exec (pas de limite de taille, absent de
+    l'environnement des processus).
+    """
+
+    LABEL = "newmars-code-pool"
+    ARTIFACT_MOUNT = "/cache"
+
+    def __init__(
+        self,
+        client,
+        mem_limit: str = "128m",
+        cpu_quota: int = 50000,
+        pids_limit: int = 64,
+        artifact_dir: Optional[str] = None,
+        writable_languages: Optional[set] = None,
+        limits: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        self.client = client
+        self.mem_limit = mem_limit
+        self.cpu_quota = cpu_quota
+        self.pids_limit = pids_limit
+        self.artifact_dir = artifact_dir
+        self.writable_languages = writable_languages or set()
+        self.limits = limits or {}
+        # image d'origine -> image dérivée (ou d'origine si la construction a échoué)
+        self._images: Dict[str, str] = {}
+        self._images_lock = threading.Lock()
+
+    def sandbox_image(self, image: str) -> str:
+        """Image dérivée avec GNU time (construite une fois, puis réutilisée)"""
+        with self._images_lock:
+            if image in self._images:
+                return self._images[image]
+
+            dockerfile = SANDBOX_DOCKERFILE.format(image=image)
+            tag = f"{self.LABEL}:{hashlib.sha256(dockerfile.encode()).hexdigest()[:12]}"
+            try:
+                self.client.images.get(tag)
+            except Exception:
+                try:
+                    self.client.images.build(fileobj=io.BytesIO(dockerfile.encode()), tag=tag, rm=True)
+                    logger.info(f"🐳 Image sandbox {tag} construite depuis {image}")
+                except Exception as e:
+                    logger.warning(f"⚠️ Image sandbox depuis {image} impossible ({e}) : pic mémoire indisponible")
+                    tag = image
+            self._images[image] = tag
+            return tag
+
+    def start(self, language: str, image: str) -> SandboxContainer:
+        options = {
+            "mem_limit": self.mem_limit,
+            "cpu_quota": self.cpu_quota,
+            "pids_limit": self.pids_limit,
+            **self.limits.get(language, {}),
+        }
+        if self.artifact_dir:
+            mode = "rw" if language in self.writable_languages else "ro"
+            options["volumes"] = {self.artifact_dir: {"bind": self.ARTIFACT_MOUNT, "mode": mode}}
+
+        container = self.client.containers.run(
+            image=self.sandbox_image(image),
+            command=["sleep", "infinity"],
+            detach=True,
+            network_disabled=True,
+            cap_drop=["ALL"],
+            security_opt=["no-new-privileges"],
+            read_only=True,
+            tmpfs={"/tmp": "rw,exec,size=64m"},
+            user="65534:65534",
+            working_dir="/tmp",
+            environment={"HOME": "/tmp"},
+            labels={"app": self.LABEL, "language": language},
+            **options,
+        )
+        return SandboxContainer(id=container.id[:12], language=language, handle=container)
+
+    def container_path(self, host_path: str) -> str:
+        if not self.artifact_dir:
+            raise RuntimeError("Aucun dossier d'artefacts monté")
+        relative = os.path.relpath(host_path, self.artifact_dir)
+        if relative.startswith(".."):
+            raise ValueError(f"{host_path} hors du dossier d'artefacts")
+        return f"{self.ARTIFACT_MOUNT}/{relative}"
+
+    def exec_stream(
+        self,
+        container: SandboxContainer,
+        command: List[str],
+        stdin: str = "",
+        timeout: int = 10
+    ) -> Iterator[Union[StreamChunk, ExecResult]]:
+        from docker.utils.socket import STDOUT, frames_iter
+
+        api = self.client.api
+        start = time.monotonic()
+        exec_id = api.exec_create(
+            container.handle.id,
+            cmd=["sh", "-c", SANDBOX_WRAPPER, "sh"] + command,
+            environment={"MARS_TIMEOUT": str(timeout)},
+            stdin=True,
+        )["Id"]
+
+        # Socket brut : stdin écrit dans un thread (le programme peut écrire avant
+        # de tout lire), sortie lue en frames multiplexées au rythme du consommateur
+        sock = api.exec_start(exec_id, socket=True)
+        raw = getattr(sock, "_sock", sock)
+
+        def feed_stdin():
+            try:
+                if stdin:
+                    raw.sendall(stdin.encode())
+                raw.shutdown(socket.SHUT_WR)  # EOF côté programme
+            except OSError:
+                pass  # Programme terminé sans tout lire
+
+        threading.Thread(target=feed_stdin, daemon=True).start()
+        splitter = _MetricsSplitter()
+        try:
+            for stream, data in frames_iter(sock, tty=False):
+                if stream == STDOUT:
+                    yield StreamChunk("stdout", data)
+                else:
+                    data = splitter.feed(data)
+                    if data:
+                        yield StreamChunk("stderr", data)
+        finally:
+            sock.close()
+            raw.close()  # SocketIO.close() laisse le socket ouvert
+
+        tail = splitter.flush()
+        if tail:
+            yield StreamChunk("stderr", tail)
+
+        exit_code = api.exec_inspect(exec_id)["ExitCode"]
+        cpu_time_ms, peak_memory_kb = splitter.parse()
+        yield ExecResult(
+            stdout="",
+            stderr="",
+            exit_code=exit_code,
+            duration_ms=int((time.monotonic() - start) * 1000),
+            timed_out=exit_code == TIMEOUT_EXIT_CODE,
+            cpu_time_ms=cpu_time_ms,
+            peak_memory_kb=peak_memory_kb,
+        )
+
+    def reset(self, container: SandboxContainer) -> bool:
+        api = self.client.api
+        exec_id = api.exec_create(container.handle.id, cmd=["sh", "-c", SANDBOX_RESET])["Id"]
+        api.exec_start(exec_id)
+        return api.exec_inspect(exec_id)["ExitCode"] == 0
+
+    def remove(self, container: SandboxContainer) -> None:
+        container.handle.remove(force=True)
+
+    def ping(self) -> bool:
+        return bool(self.client.ping())
+
+
+class LocalProcessRuntime(SandboxRuntime):
+    """
+    Runtime de substitution basé sur des sous-processus locaux.
+
+    Un "container" est un dossier temporaire servant de cwd.
+    Métriques exactes via wait4 (rusage du processus).
+    Chaque exécution a son groupe de processus, tué en bloc par reset.
+    Pour les tests et le développement uniquement : aucune isolation.
+    """
+
+    def __init__(self, executables: Optional[Dict[str, str]] = None):
+        # Remplace argv[0] (ex: "python" → interpréteur courant)
+        self.executables = {"python": sys.executable, **(executables or {})}
+        self._ids = itertools.count(1)
+        # container.id -> groupe de processus de la dernière exécution
+        self._groups: Dict[str, int] = {}
+
+    def start(self, language: str, image: str) -> SandboxContainer:
+        workdir = tempfile.mkdtemp(prefix=f"sandbox_{language}_")
+        return SandboxContainer(id=f"local-{next(self._ids)}", language=language, handle=workdir)
+
+    def _resolve(self, command: List[str]) -> List[str]:
+        return [self.executables.get(command[0], command[0])] + command[1:]
+
+    def exec_stream(
+        self,
+        container: SandboxContainer,
+        command: List[str],
+        stdin: str = "",
+        timeout: int = 10
+    ) -> Iterator[Union[StreamChunk, ExecResult]]:
+        start = time.monotonic()
+        deadline = start + timeout
+
+        with tempfile.TemporaryFile() as stdin_file:
+            stdin_file.write((stdin or "").encode())
+            stdin_file.seek(0)
+            proc = subprocess.Popen(
+                self._resolve(command),
+                stdin=stdin_file,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=container.handle,
+                start_new_session=True,  # Permet de tuer tout le groupe
+            )
+        self._groups[container.id] = proc.pid
+
+        selector = selectors.DefaultSelector()
+        selector.register(proc.stdout, selectors.EVENT_READ, "stdout")
+        selector.register(proc.stderr, selectors.EVENT_READ, "stderr")
+        timed_out = False
+        try:
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                for key, _ in selector.select(timeout=remaining):
+                    data = os.read(key.fileobj.fileno(), 4096)
+                    if data:
+                        yield StreamChunk(key.data, data)
+                    else:
+                        selector.unregister(key.fileobj)
+        finally:
+            # Sortie non terminée (timeout ou lecteur fermé) : tuer tout le groupe.
+            # Pas de proc.poll() ici : il récolterait le processus avant wait4.
+            if selector.get_map():
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            selector.close()
+            proc.stdout.close()
+            proc.stderr.close()
+
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss : Ko sous Linux, octets sous macOS
+        peak_memory_kb = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+        yield ExecResult(
+            stdout="",
+            stderr="",
+            exit_code=TIMEOUT_EXIT_CODE if timed_out else proc.returncode,
+            duration_ms=int((time.monotonic() - start) * 1000),
+            timed_out=timed_out,
+            cpu_time_ms=int((usage.ru_utime + usage.ru_stime) * 1000),
+            peak_memory_kb=peak_memory_kb,
+        )
+
+    def reset(self, container: SandboxContainer) -> bool:
+        pgid = self._groups.pop(container.id, None)
+        if pgid is not None:
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass  # Groupe vide : rien n'a survécu à l'exécution
+            except PermissionError:
+                return False
+
+        for entry in os.scandir(container.handle):
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+        return True
+
+    def remove(self, container: SandboxContainer) -> None:
+        self._groups.pop(container.id, None)
+        shutil.rmtree(container.handle, ignore_errors=True)
+
+    def ping(self) -> bool:
+        return True
+
+
+# Fin de flux poussée par le thread producteur
+_STREAM_END = object()
+
+
+def _put_blocking(loop, queue: asyncio.Queue, item: Any, stop: threading.Event) -> bool:
+    """
+    Depuis un thread : pousse dans la file asyncio bornée en attendant de la place
+    (backpressure). Retourne False si le consommateur a abandonné.
+    """
+    future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+    while True:
+        try:
+            future.result(timeout=0.1)
+            return True
+        except concurrent.futures.TimeoutError:
+            if stop.is_set():
+                future.cancel()
+                return False
+
+
+class ContainerPool:
+    """
+    Pool de containers chauds par langage.
+
+    - acquire : réutilise un container inactif ou en démarre un
+    - release : remet le container dans le pool (après reset : processus tués,
+      /tmp vidé), ou le recycle s'il est sale / usé / non réinitialisable
+    - réapprovisionnement en tâche de fond jusqu'à `size` containers par langage
+      (inactifs + en cours d'utilisation + en démarrage)
+    """
+
+    def __init__(
+        self,
+        runtime: SandboxRuntime,
+        images: Dict[str, str],
+        size: int = 2,
+        max_runs: int = 20,
+        queue_size: int = 16
+    ):
+        self.runtime = runtime
+        self.images = images
+        self.size = size
+        self.max_runs = max_runs
+        # Chunks en attente entre le thread lecteur et le client (backpressure)
+        self.queue_size = queue_size
+
+        self._idle: Dict[str, Deque[SandboxContainer]] = {}
+        self._starting: Dict[str, int] = {}
+        self._in_use: Dict[str, int] = {}
+        self._background: set = set()
+
+        self.stats = {
+            "executions": 0,
+            "warm_hits": 0,
+            "cold_starts": 0,
+            "recycled": 0,
+            "dirty": 0,
+        }
+
+    def _spawn(self, coro) -> None:
+        """Lance une tâche de fond en gardant une référence (sinon GC)."""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _start_container(self, language: str) -> SandboxContainer:
+        self._starting[language] = self._starting.get(language, 0) + 1
+        try:
+            return await asyncio.to_thread(self.runtime.start, language, self.images[language])
+        finally:
+            self._starting[language] -= 1
+
+    def _total(self, language: str) -> int:
+        """Containers existants pour un langage (inactifs, utilisés, en démarrage)."""
+        return (
+            len(self._idle.get(language, ()))
+            + self._in_use.get(language, 0)
+            + self._starting.get(language, 0)
+        )
+
+    async def _replenish(self, language: str) -> None:
+        """Redémarre des containers jusqu'à atteindre la taille cible."""
+        idle = self._idle.setdefault(language, deque())
+        while self._total(language) < self.size:
+            try:
+                container = await self._start_container(language)
+            except Exception as e:
+                logger.warning(f"⚠️ Warm-up {language} impossible: {e}")
+                return
+            idle.append(container)
+
+    async def _discard(self, container: SandboxContainer) -> None:
+        try:
+            await asyncio.to_thread(self.runtime.remove, container)
+        except Exception as e:
+            logger.debug(f"Suppression container {container.id} échouée: {e}")
+
+    async def acquire(self, language: str) -> SandboxContainer:
+        """Récupère un container chaud (ou en démarre un à froid)."""
+        idle = self._idle.setdefault(language, deque())
+        if idle:
+            container = idle.popleft()
+            self.stats["warm_hits"] += 1
+        else:
+            container = await self._start_container(language)
+            self.stats["cold_starts"] += 1
+
+        self._in_use[language] = self._in_use.get(language, 0) + 1
+        self._spawn(self._replenish(language))
+        return container
+
+    async def release(self, container: SandboxContainer, dirty: bool = False) -> None:
+        """Remet le container dans le pool ou le recycle."""
+        if not dirty and container.runs + 1 < self.max_runs:
+            # Processus en arrière-plan et fichiers ne doivent pas atteindre l'exécution suivante
+            try:
+                dirty = not await asyncio.to_thread(self.runtime.reset, container)
+            except Exception as e:
+                logger.warning(f"⚠️ Reset container {container.id} impossible: {e}")
+                dirty = True
+
+        container.runs += 1
+        self._in_use[container.language] -= 1
+        idle = self._idle.setdefault(container.language, deque())
+
+        # Au-delà de `size` (rafale de requêtes), les containers en trop sont détruits
+        if dirty or container.runs >= self.max_runs or self._total(container.language) >= self.size:
+            self.stats["recycled"] += 1
+            if dirty:
+                self.stats["dirty"] += 1
+            self._spawn(self._discard(container))
+            self._spawn(self._replenish(container.language))
+        else:
+            idle.append(container)
+
+    async def stream(
+        self,
+        language: str,
+        command: List[str],
+        stdin: str = "",
+        timeout: int = 10,
+        max_output_bytes: Optional[int] = None
+    ) -> AsyncIterator[Union[Tuple[str, str], ExecResult]]:
+        """
+        Exécute une commande et yield sa sortie au fur et à mesure.
+
+        Yield des tuples ("stdout" | "stderr", texte) puis l'ExecResult final
+        (sans la sortie, avec code de sortie et métriques). Le thread lecteur
+        est bloqué quand la file est pleine : un client lent ralentit le
+        programme au lieu de faire grossir la mémoire. Au-delà de
+        `max_output_bytes`, la sortie est coupée et le container recyclé.
+        """
+        container = await self.acquire(language)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        dirty = True
+
+        def produce():
+            items = self.runtime.exec_stream(container, command, stdin, timeout)
+            try:
+                for item in items:
+                    if not _put_blocking(loop, queue, item, stop):
+                        return
+            except Exception as e:
+                _put_blocking(loop, queue, e, stop)
+            finally:
+                items.close()
+            _put_blocking(loop, queue, _STREAM_END, stop)
+
+        loop.run_in_executor(None, produce)
+
+        decoders = {
+            name: codecs.getincrementaldecoder("utf-8")(errors="replace")
+            for name in ("stdout", "stderr")
+        }
+        start = time.monotonic()
+        # Marge au-delà du timeout interne : un exec qui ne rend pas la main est sale
+        deadline = start + timeout + 5
+        emitted = 0
+        truncated = False
+        result = None
+
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), timeout=max(0.0, deadline - time.monotonic()))
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if isinstance(item, ExecResult):
+                    result = item
+                    continue
+
+                data = item.data
+                if max_output_bytes is not None and emitted + len(data) > max_output_bytes:
+                    data = data[:max_output_bytes - emitted]
+                    truncated = True
+                emitted += len(data)
+
+                text = decoders[item.stream].decode(data)
+                if text:
+                    yield item.stream, text
+                if truncated:
+                    break
+
+            for name, decoder in decoders.items():
+                text = decoder.decode(b"", final=True)
+                if text:
+                    yield name, text
+
+            if truncated:
+                # Programme interrompu : ni code de sortie ni métriques fiables
+                result = ExecResult(
+                    stdout="",
+                    stderr="",
+                    exit_code=-1,
+                    duration_ms=int((time.monotonic() - start) * 1000),
+                    truncated=True,
+                )
+            elif result is None:
+                raise RuntimeError("Exécution terminée sans résultat")
+
+            # Timeout, kill (OOM, signal) ou sortie coupée : des processus peuvent traîner
+            dirty = result.timed_out or result.exit_code >= 128 or result.truncated
+            self.stats["executions"] += 1
+            yield result
+        finally:
+            stop.set()
+            await self.release(container, dirty=dirty)
+
+    async def run(
+        self,
+        language: str,
+        command: List[str],
+        stdin: str = "",
+        timeout: int = 10,
+        max_output_bytes: Optional[int] = None
+    ) -> ExecResult:
+        """Exécute une commande dans un container chaud et retourne la sortie complète."""
+        output = {"stdout": [], "stderr": []}
+        result = None
+        async for item in self.stream(language, command, stdin, timeout, max_output_bytes):
+            if isinstance(item, ExecResult):
+                result = item
+            else:
+                output[item[0]].append(item[1])
+
+        result.stdout = "".join(output["stdout"])
+        result.stderr = "".join(output["stderr"])
+        return result
+
+    async def prewarm(self, languages: Optional[List[str]] = None) -> None:
+        """Démarre les containers de chaque langage à l'avance."""
+        await asyncio.gather(*(self._replenish(lang) for lang in (languages or self.images)))
+
+    async def shutdown(self) -> None:
+        """Détruit tous les containers inactifs."""
+        for idle in self._idle.values():
+            while idle:
+                await self._discard(idle.popleft())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du pool."""
+        return {
+            **self.stats,
+            "size_per_language": self.size,
+            "max_runs": self.max_runs,
+            "idle": {lang: len(idle) for lang, idle in self._idle.items()},
+            "in_use": dict(self._in_use),
+        }
@@ -0,0 +1,192 @@
+"""
+Content Cache - Stockage et déduplication du contenu IA généré
+
+Évite de rappeler le modèle pour des requêtes identiques:
+- Clé = empreinte canonique de la requête (type, version du template, prompt rendu, paramètres)
+- Éviction TTL + LRU (taille bornée)
+- Coalescence des requêtes en vol: N appels concurrents identiques → 1 seul appel LLM
+- Stats (hits, misses, coalesced) exposées sur /api/content/health
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+from utils.metrics import REGISTRY, stats_collector
+
+logger = logging.getLogger(__name__)
+
+
+def template_version(template: str) -> str:
+    """Version d'un template de prompt (hash court de son texte)."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+
+def make_fingerprint(**parts: Any) -> str:
+    """
+    Empreinte canonique d'une requête de génération.
+
+    Les chaînes sont normalisées (espaces) et le JSON trié par clé,
+    pour que deux requêtes équivalentes donnent la même clé.
+    """
+    def _normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if hasattr(value, "value"):  # Enum
+            return value.value
+        return value
+
+    canonical = json.dumps(
+        {key: _normalize(value) for key, value in parts.items()},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ContentStore:
+    """
+    Cache LRU + TTL thread-safe avec coalescence des calculs en vol.
+
+    Usage:
+        result = store.get_or_compute(key, lambda: ai.dispatch(...))
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (expires_at, value), ordre = récence d'accès
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # key -> Future partagée par les appels concurrents
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "errors": 0,
+        }
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retourne la valeur en cache (None si absente ou expirée)."""
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._stats["expirations"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Stocke une valeur et évince les entrées les moins récentes."""
+        with self._lock:
+            self._put_locked(key, value)
+
+    def _put_locked(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Retourne la valeur en cache ou la calcule une seule fois.
+
+        Si un calcul est déjà en cours pour la même clé, attend son
+        résultat au lieu de relancer un appel LLM. Les erreurs ne sont
+        pas mises en cache (propagées à tous les appelants en attente) :
+        `compute` doit valider la sortie du modèle (parsing JSON...) et
+        lever une exception si elle est inutilisable.
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self._stats["hits"] += 1
+                return value
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                owner = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                self._stats["misses"] += 1
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                self._stats["errors"] += 1
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._put_locked(key, value)
+            self._in_flight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key: str) -> bool:
+        """Supprime une entrée du cache."""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Vide le cache (les calculs en vol continuent)."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du cache (hit rate incluant les requêtes coalescées)."""
+        with self._lock:
+            served = self._stats["hits"] + self._stats["coalesced"]
+            total = served + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "in_flight": len(self._in_flight),
+                "hit_rate": round(served / total, 4) if total else 0.0,
+            }
+
+
+# Instance globale partagée par les générateurs de contenu
+content_store = ContentStore(
+    max_entries=settings.CONTENT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CONTENT_CACHE_TTL_SECONDS,
+)
+
+# Exposé sur /metrics : lu au scrape, rien dans le chemin chaud
+REGISTRY.register_collector(stats_collector(
+    "content_cache", "Cache du contenu IA généré", content_store.get_stats,
+    counters=("hits", "misses", "coalesced", "evictions", "expirations", "errors"),
+    gauges=("size", "in_flight"),
+))
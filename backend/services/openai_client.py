@@ -0,0 +1,91 @@
+"""
+OpenAI Client - Construction centralisée des clients OpenAI
+
+Tous les appels IA (dispatcher, service, chat) passent par create_openai_client():
+- OPENAI_BASE_URL redirige vers un serveur compatible (ex: stub local e2e.llm_stub)
+- OPENAI_MAX_RETRIES règle les retries internes du SDK (0 = seul tenacity retente)
+
+Avec un serveur local, la clé API devient facultative : les tests de performance
+et le mode e2e use_ai=True tournent hors ligne.
+
+Le SDK n'est chargé qu'au premier appel IA (utils.lazy) : les services
+déclarent `client = LazyOpenAIClient()` et retentent via is_transient_error.
+"""
+import logging
+import os
+from typing import TYPE_CHECKING, Optional
+
+from config import settings
+from utils.lazy import lazy_import
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+openai = lazy_import("openai")
+
+logger = logging.getLogger(__name__)
+
+# Clé factice acceptée par un serveur local (le SDK en exige une)
+LOCAL_API_KEY = "sk-local"
+
+
+def resolve_api_key() -> Optional[str]:
+    """Clé API effective (None si aucune et pas de serveur local)."""
+    api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+    if not api_key and settings.OPENAI_BASE_URL:
+        return LOCAL_API_KEY
+    return api_key
+
+
+def create_openai_client(api_key: Optional[str] = None) -> Optional["OpenAI"]:
+    """
+    Client OpenAI configuré depuis settings.
+
+    Returns:
+        Le client, ou None si aucune clé n'est disponible
+    """
+    api_key = api_key or resolve_api_key()
+    if not api_key:
+        return None
+    return openai.OpenAI(
+        api_key=api_key,
+        base_url=settings.OPENAI_BASE_URL or None,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+    )
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Erreurs OpenAI à retenter (prédicat tenacity retry_if_exception)."""
+    return isinstance(exc, (
+        openai.APIError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.APITimeoutError,
+    ))
+
+
+class LazyOpenAIClient:
+    """
+    Attribut `client` créé au premier accès, par instance.
+
+    Remplace `self.client = create_openai_client()` dans __init__ : construire
+    le service ne charge plus le SDK. L'attribut reste assignable (tests).
+    """
+
+    def __set_name__(self, owner, name):
+        self.attr = f"_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if self.attr not in obj.__dict__:
+            client = create_openai_client()
+            if not client:
+                logger.warning(f"⚠️ OPENAI_API_KEY non configurée - {type(obj).__name__} en mode dégradé")
+            elif settings.OPENAI_BASE_URL:
+                logger.info(f"🔀 OpenAI redirigé vers {settings.OPENAI_BASE_URL}")
+            obj.__dict__[self.attr] = client
+        return obj.__dict__[self.attr]
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.attr] = value
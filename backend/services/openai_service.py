@@ -5,9 +5,11 @@ Avec retry automatique et gestion d'erreurs robuste
 """
 import json
 import logging
-from openai import OpenAI
 from typing import Dict, Any, Optional, List
 from config import settings
+from services.openai_client import LazyOpenAIClient, is_transient_error
+from utils.lazy import lazy_import
+from utils.tracing import traced
 from models.learning import Question, QuestionOption
 import uuid
 from datetime import datetime
@@ -15,10 +17,11 @@ from tenacity import (
     retry,
     stop_after_attempt,
     wait_exponential,
-    retry_if_exception_type,
+    retry_if_exception,
     before_sleep_log
 )
-import openai
+
+openai = lazy_import("openai")
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -30,22 +33,20 @@ logging.basicConfig(
 
 class OpenAIService:
     """Service pour interagir avec OpenAI GPT avec retry automatique"""
-    
+
+    # Créé au premier appel IA (le SDK openai n'est pas chargé au démarrage)
+    client = LazyOpenAIClient()
+
     def __init__(self):
         """Initialise le service OpenAI"""
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = "gpt-4o-mini"  # Modèle rapide et économique
         logger.info(f"✅ OpenAI Service initialisé avec modèle: {self.model}")
     
+    @traced("llm.generate_content")
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=2, min=2, max=10),
-        retry=retry_if_exception_type((
-            openai.APIError,
-            openai.APIConnectionError,
-            openai.RateLimitError,
-            openai.APITimeoutError
-        )),
+        retry=retry_if_exception(is_transient_error),
         before_sleep=before_sleep_log(logger, logging.WARNING)
     )
     def generate_content(self, prompt: str, timeout: int = 45) -> str:
@@ -64,6 +65,9 @@ class OpenAIService:
             openai.RateLimitError: Rate limit atteint
             openai.APITimeoutError: Timeout après 3 tentatives
         """
+        if not self.client:
+            raise ValueError("Client OpenAI non initialisé")
+
         try:
             logger.info(f"🤖 Génération GPT (tentative, timeout={timeout}s)")
             
@@ -117,7 +117,7 @@ def average_user(user_simulator):
 @pytest.fixture
 def mock_openai():
     """Mock OpenAI API calls."""
-    with patch("services.openai_service.OpenAI") as mock:
+    with patch("openai.OpenAI") as mock:
         mock_instance = MagicMock()
         mock_instance.chat.completions.create.return_value = MagicMock(
             choices=[MagicMock(message=MagicMock(content="Mocked AI response"))]
@@ -0,0 +1,37 @@
+"""
+Unit tests for the benchmark baseline comparison.
+Tests regression detection and calibration-based normalization.
+"""
+from benchmarks.compare import CALIBRATION, compare, summarize
+
+
+def run(**mins):
+    return {"benchmarks": {name: {"min_us": value} for name, value in mins.items()}}
+
+
+class TestCompare:
+    """Test the comparison report."""
+
+    def test_statuses(self):
+        baseline = run(fast=10.0, slow=10.0, same=10.0, gone=5.0)
+        current = run(fast=5.0, slow=14.0, same=11.0, added=3.0)
+        status = {row["name"]: row["status"] for row in compare(baseline, current, threshold=0.25)}
+
+        assert status == {"fast": "faster", "slow": "regression", "same": "ok", "gone": "missing", "added": "new"}
+
+    def test_machine_speed_is_factored_out(self):
+        """Everything twice as slow on a machine twice as slow is not a regression."""
+        baseline = run(**{CALIBRATION: 100.0, "engine": 10.0})
+        current = run(**{CALIBRATION: 200.0, "engine": 20.0})
+        (row,) = compare(baseline, current)
+
+        assert row["name"] == "engine"
+        assert row["change"] == 0
+        assert row["status"] == "ok"
+
+    def test_summarize_pytest_benchmark_json(self):
+        stats = {"min": 1e-6, "median": 2e-6, "mean": 2.5e-6, "rounds": 10}
+        data = summarize({"benchmarks": [{"name": "b", "stats": stats}], "machine_info": {"python_version": "3.11"}})
+
+        assert data["benchmarks"]["b"] == {"min_us": 1.0, "median_us": 2.0, "mean_us": 2.5, "rounds": 10}
+        assert data["machine"]["python"] == "3.11"
@@ -0,0 +1,178 @@
+"""
+Unit tests for the compile-then-run pipeline.
+Compiles C++ with the local g++ through LocalProcessRuntime.
+"""
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+
+from services.build_cache import BUILD_SPECS, ArtifactCache, BuildPipeline, build_pool_key
+from services.code_sandbox import ContainerPool, LocalProcessRuntime
+
+pytestmark = pytest.mark.skipif(shutil.which("g++") is None, reason="g++ non disponible")
+
+HELLO = '#include <iostream>\nint main() { std::string s; std::cin >> s; std::cout << "hi " << s << std::endl; }\n'
+
+
+@pytest.fixture
+def builder(tmp_path):
+    """Pipeline backed by local subprocesses and a temporary artifact dir."""
+    pool = ContainerPool(
+        LocalProcessRuntime(),
+        images={"cpp": "gcc:latest", build_pool_key("cpp"): "gcc:latest"},
+        size=1,
+    )
+    yield BuildPipeline(pool, ArtifactCache(str(tmp_path / "artifacts"), max_entries=8))
+    asyncio.run(pool.shutdown())
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestBuildPipeline:
+    """Test compilation, caching and coalescing."""
+
+    def test_compile_then_run(self, builder):
+        """A C++ program should compile and its artifact run in the pool."""
+        async def scenario():
+            build = await builder.build("cpp", HELLO)
+            result = await builder.pool.run("cpp", builder.run_command(build), stdin="mars\n")
+            return build, result
+
+        build, result = run(scenario())
+        assert build.ok and not build.cached
+        assert build.duration_ms > 0
+        assert result.stdout == "hi mars\n"
+
+    def test_identical_source_skips_compilation(self, builder):
+        """Resubmitting the same code should reuse the cached artifact."""
+        async def scenario():
+            first = await builder.build("cpp", HELLO)
+            second = await builder.build("cpp", HELLO)
+            return first, second
+
+        first, second = run(scenario())
+        assert second.cached is True
+        assert second.duration_ms == 0
+        assert second.artifact_dir == first.artifact_dir
+        assert builder.stats["builds"] == 1
+
+    def test_concurrent_builds_are_coalesced(self, builder):
+        """Identical submissions in flight should share one compilation."""
+        async def scenario():
+            return await asyncio.gather(*(builder.build("cpp", HELLO) for _ in range(3)))
+
+        results = run(scenario())
+        assert all(r.ok for r in results)
+        assert builder.stats["builds"] == 1
+        assert builder.stats["coalesced"] == 2
+
+    def test_compile_error_is_reported(self, builder):
+        """A compile error should return the compiler output and no artifact."""
+        build = run(builder.build("cpp", "int main() { return undefined_name; }\n"))
+
+        assert not build.ok
+        assert build.exit_code != 0
+        assert "undefined_name" in build.output
+        assert builder.cache.get_stats()["entries"] == 0
+
+    @pytest.mark.skipif(shutil.which("go") is None, reason="go non disponible")
+    def test_go_cache_outlives_the_sandbox_tmp(self, tmp_path):
+        """GOCACHE should live in the artifact dir, not in the /tmp wiped by each reset."""
+        pool = ContainerPool(LocalProcessRuntime(), images={build_pool_key("go"): "golang:latest"}, size=1)
+        builder = BuildPipeline(pool, ArtifactCache(str(tmp_path / "artifacts")))
+        command = BUILD_SPECS["go"].build_command("/cache/k", "main", "/cache/_toolchain/go")
+        assert "GOCACHE=/cache/_toolchain/go" in command
+
+        async def scenario():
+            try:
+                return await builder.build("go", 'package main\nfunc main() { println("hi") }\n', timeout=120)
+            finally:
+                await pool.shutdown()
+
+        build = run(scenario())
+        assert build.ok, build.output
+        assert os.listdir(builder.cache.toolchain_dir("go"))
+        assert builder.cache.get_stats()["entries"] == 1
+
+    def test_java_entry_follows_public_class(self):
+        """javac needs the file to be named after the public class."""
+        spec = BUILD_SPECS["java"]
+        assert spec.source_name("public final class Solution { }") == "Solution.java"
+        assert spec.source_name("class Helper { }") == "Main.java"
+
+
+class TestArtifactCache:
+    """Test the on-disk artifact index."""
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        """Beyond max_entries, the least recently used artifact is removed."""
+        cache = ArtifactCache(str(tmp_path), max_entries=2)
+        for index, key in enumerate(("a", "b")):
+            cache.commit(key, cache.reserve(key))
+            os.utime(cache.path(key), (index, index))
+
+        cache.lookup("a")
+        cache.commit("c", cache.reserve("c"))
+
+        assert cache.lookup("a") and cache.lookup("c")
+        assert cache.lookup("b") is None
+        assert cache.stats["evictions"] == 1
+
+    def test_oversized_toolchain_cache_is_trimmed(self, tmp_path):
+        """A compiler cache beyond its bound is emptied; artifacts and restarts keep it otherwise."""
+        cache = ArtifactCache(str(tmp_path), max_toolchain_bytes=100)
+        cache.commit("a", cache.reserve("a"))
+        with open(os.path.join(cache.toolchain_dir("go"), "entry"), "wb") as f:
+            f.write(b"x" * 60)
+
+        cache = ArtifactCache(str(tmp_path), max_toolchain_bytes=100)
+        cache.trim_toolchains()
+        assert os.listdir(cache.toolchain_dir("go")) == ["entry"]
+        assert cache.get_stats()["entries"] == 1
+
+        with open(os.path.join(cache.toolchain_dir("go"), "more"), "wb") as f:
+            f.write(b"x" * 60)
+        cache.trim_toolchains()
+        assert os.listdir(cache.toolchain_dir("go")) == []
+        assert cache.stats["toolchain_trims"] == 1 and cache.lookup("a")
+
+    def test_interrupted_builds_are_cleaned(self, tmp_path):
+        """Temporary build dirs left by a crash are removed on startup."""
+        cache = ArtifactCache(str(tmp_path))
+        tmp = cache.reserve("k")
+
+        ArtifactCache(str(tmp_path))
+        assert not os.path.exists(tmp)
+
+
+class TestExecuteRoute:
+    """Test the execution generator for a compiled language."""
+
+    def test_result_reports_build_time(self, builder, monkeypatch):
+        """The result should carry build time separately from run time."""
+        from routes import code_execution
+
+        monkeypatch.setattr(code_execution, "code_pool", builder.pool)
+        monkeypatch.setattr(code_execution, "code_builder", builder)
+
+        async def collect():
+            events = []
+            for _ in range(2):
+                events.append([
+                    json.loads(e)
+                    async for e in code_execution.execute_code_in_docker(HELLO, "cpp", "route\n")
+                ])
+            return events
+
+        first, second = run(collect())
+        assert first[-1]["type"] == "result"
+        assert first[-1]["data"]["stdout"] == "hi route\n"
+        assert first[-1]["data"]["build_cached"] is False
+        assert first[-1]["data"]["build_time_ms"] > 0
+        assert second[-1]["data"]["build_cached"] is True
+        assert second[-1]["data"]["build_time_ms"] == 0
@@ -0,0 +1,172 @@
+"""
+Unit tests for the injectable clock.
+Tests the virtual clock, its use by the engine and databases, and the
+discrete-event retention simulation.
+"""
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils import clock
+from utils.clock import SystemClock, VirtualClock, use_clock
+
+START = datetime(2025, 3, 10, 9, 0)
+
+
+class TestVirtualClock:
+    """Test the clock itself."""
+
+    def test_advance_and_no_rewind(self):
+        """The virtual clock only moves forward."""
+        sim = VirtualClock(START)
+        sim.advance(days=2, hours=3)
+        sim.advance_to(START)
+
+        assert sim.now() == START + timedelta(days=2, hours=3)
+        with pytest.raises(ValueError):
+            sim.advance(days=-1)
+
+    def test_use_clock_is_scoped(self):
+        """use_clock() should only replace the clock inside the block."""
+        sim = VirtualClock(START)
+        with use_clock(sim):
+            assert clock.now() == START
+            assert clock.today() == START.date()
+            assert clock.sql_now() == "2025-03-10 09:00:00"
+        assert isinstance(clock.get_clock(), SystemClock)
+
+
+class TestEngineOnVirtualTime:
+    """Test that the engine reads time from the clock."""
+
+    def test_fsrs_sees_elapsed_virtual_days(self, tmp_path):
+        """Reviews and retrievability should follow virtual time."""
+        from learning_engine.learning_engine_lean import LeanLearningEngine
+
+        sim = VirtualClock(START)
+        engine = LeanLearningEngine(db_path=str(tmp_path / "engine.db"), clock=sim)
+        engine.process_answer("u1", "grammaire", True, 15.0, 3)
+        state = engine._get_user_state("u1")
+
+        assert state["fsrs_cards"]["grammaire"].last_review == START
+        assert engine._get_retrievability(state, "grammaire") == 1.0
+
+        sim.advance(days=30)
+        assert engine._get_retrievability(state, "grammaire") < 0.9
+
+    def test_engine_follows_ambient_clock(self, tmp_path):
+        """Without an explicit clock the engine uses the current one."""
+        from learning_engine.learning_engine_lean import LeanLearningEngine
+
+        engine = LeanLearningEngine(db_path=str(tmp_path / "engine.db"))
+        with use_clock(VirtualClock(START)):
+            engine.process_answer("u1", "grammaire", True, 15.0, 3)
+
+        assert engine._get_user_state("u1")["last_practice_date"] == START.date()
+
+
+class TestDatabasesOnVirtualTime:
+    """Test SQL date comparisons and decay against the clock."""
+
+    def test_due_vocabulary_follows_virtual_time(self, tmp_path):
+        """A reviewed word should only become due once its interval has passed."""
+        from databases.learning_db import LearningDatabase
+
+        db = LearningDatabase(str(tmp_path / "learning.db"))
+        sim = VirtualClock(START)
+        with use_clock(sim):
+            db.add_vocabulary_word("c1", "u1", {"word": "chat", "translation": "cat"})
+            (word,) = db.get_due_vocabulary("c1", "u1")
+            db.update_vocabulary_review(word["id"], 5)
+
+            assert db.get_due_vocabulary("c1", "u1") == []
+            sim.advance(days=2)
+            assert [w["word"] for w in db.get_due_vocabulary("c1", "u1")] == ["chat"]
+
+    @pytest.fixture
+    def paris_time(self, monkeypatch):
+        """Run with a local timezone ahead of UTC."""
+        monkeypatch.setenv("TZ", "Europe/Paris")
+        time.tzset()
+        yield
+        monkeypatch.undo()
+        time.tzset()
+
+    def test_sql_now_is_utc(self, tmp_path, paris_time):
+        """sql_now() should be comparable with CURRENT_TIMESTAMP whatever the local timezone."""
+        from databases.learning_db import LearningDatabase
+
+        with use_clock(VirtualClock(START)):  # 09:00 in Paris (CET) = 08:00 UTC
+            assert clock.sql_now() == "2025-03-10 08:00:00"
+
+        conn = sqlite3.connect(":memory:")
+        drift = conn.execute("SELECT (julianday(?) - julianday('now')) * 86400", (clock.sql_now(),)).fetchone()[0]
+        assert abs(drift) < 5
+
+        # Next review written and compared on the same UTC basis
+        db = LearningDatabase(str(tmp_path / "learning.db"))
+        sim = VirtualClock(START)
+        with use_clock(sim):
+            db.add_vocabulary_word("c1", "u1", {"word": "chat", "translation": "cat"})
+            (word,) = db.get_due_vocabulary("c1", "u1")
+            (item,) = db.update_vocabulary_reviews([(word["id"], 5)])
+            assert item["next_review"] == "2025-03-11 08:00:00"
+            sim.advance(hours=23, minutes=59)
+            assert db.get_due_vocabulary("c1", "u1") == []
+            sim.advance(minutes=1)
+            assert [w["word"] for w in db.get_due_vocabulary("c1", "u1")] == ["chat"]
+
+    def test_sql_text_round_trips_to_local_time(self, paris_time):
+        """to_sql()/from_sql() should convert between local clock time and UTC SQL text."""
+        assert clock.to_sql(START) == "2025-03-10 08:00:00"
+        assert clock.from_sql(clock.to_sql(START)) == START
+
+        (stamp,) = sqlite3.connect(":memory:").execute("SELECT CURRENT_TIMESTAMP").fetchone()
+        assert abs((clock.from_sql(stamp) - datetime.now()).total_seconds()) < 5
+
+    def test_skill_decay_uses_clock(self):
+        """Decayed mastery should depend on virtual days since practice."""
+        from databases.skill_graph_db import UserSkill, calculate_decayed_mastery
+
+        skill = UserSkill("u1", "s1", mastery=80, last_practiced=START)
+        with use_clock(VirtualClock(START)):
+            assert calculate_decayed_mastery(skill) == 80
+        with use_clock(VirtualClock(START + timedelta(days=5))):
+            assert calculate_decayed_mastery(skill) < 80
+
+
+class TestRetentionSimulation:
+    """Test the discrete-event driver."""
+
+    def test_events_run_in_time_order(self):
+        """Events should run in time order, with the clock at each event's time."""
+        from e2e.virtual_time import EventScheduler
+
+        sim = VirtualClock(START)
+        scheduler = EventScheduler(sim)
+        seen = []
+        for hours in (5, 1, 3):
+            scheduler.schedule(START + timedelta(hours=hours), lambda: seen.append(sim.now()))
+
+        assert scheduler.run(until=START + timedelta(hours=4)) == 2
+        assert seen == [START + timedelta(hours=1), START + timedelta(hours=3)]
+        assert sim.now() == START + timedelta(hours=4)
+        assert len(scheduler) == 1
+
+    def test_simulation_is_reproducible(self):
+        """Same seed, same report; weeks of virtual time in well under a minute."""
+        from e2e.virtual_time import RetentionConfig, RetentionSimulation
+
+        def simulate():
+            data = RetentionSimulation(RetentionConfig(users=20, days=21, seed=5)).run().to_dict()
+            data.pop("duration_s")
+            return data
+
+        first = simulate()
+        assert first == simulate()
+        assert first["reviews"] > 0
+        assert len(first["retention_by_week"]) == 3
+        assert 0 < first["final_retention"] <= 1
+        assert isinstance(clock.get_clock(), SystemClock)
@@ -0,0 +1,298 @@
+"""
+Unit tests for the warm container pool.
+Runs against LocalProcessRuntime (subprocess stand-in for Docker).
+"""
+import asyncio
+import json
+import socket
+import struct
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services.code_sandbox import (
+    METRICS_MARKER, ContainerPool, DockerRuntime, ExecResult, LocalProcessRuntime,
+    _MetricsSplitter
+)
+
+
+@pytest.fixture
+def pool():
+    """Pool backed by local subprocesses."""
+    pool = ContainerPool(LocalProcessRuntime(), images={"python": "python:3.11-slim"}, size=1, max_runs=3)
+    yield pool
+    asyncio.run(pool.shutdown())
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestContainerPool:
+    """Test pool reuse, recycling and result separation."""
+
+    def test_stdout_and_stderr_are_separated(self, pool):
+        """stdout and stderr should come back on their own channels."""
+        code = "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"
+        result = run(pool.run("python", ["python", "-c", code]))
+
+        assert result.stdout.strip() == "out"
+        assert result.stderr.strip() == "err"
+        assert result.exit_code == 3
+
+    def test_stdin_is_forwarded(self, pool):
+        """stdin should be readable by the program."""
+        result = run(pool.run("python", ["python", "-c", "print(input()[::-1])"], stdin="mars\n"))
+        assert result.stdout.strip() == "sram"
+
+    def test_containers_are_reused(self, pool):
+        """Consecutive runs should hit a warm container."""
+        async def scenario():
+            await pool.run("python", ["python", "-c", "pass"])
+            await pool.run("python", ["python", "-c", "pass"])
+
+        run(scenario())
+        stats = pool.get_stats()
+        assert stats["cold_starts"] == 1
+        assert stats["warm_hits"] == 1
+
+    def test_recycled_after_max_runs(self, pool):
+        """A container should be recycled once it reaches max_runs."""
+        async def scenario():
+            for _ in range(3):
+                await pool.run("python", ["python", "-c", "pass"])
+
+        run(scenario())
+        assert pool.get_stats()["recycled"] >= 1
+
+    def test_background_processes_and_files_do_not_survive(self, pool):
+        """A reused container should start without leftovers from the previous run."""
+        code = (
+            "import os, subprocess; open('leftover.txt', 'w').write('x'); "
+            "print(subprocess.Popen(['sleep', '30'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).pid)"
+        )
+
+        async def scenario():
+            first = await pool.run("python", ["python", "-c", code])
+            second = await pool.run("python", ["python", "-c", "import os; print(os.listdir('.'))"])
+            return first, second
+
+        first, second = run(scenario())
+        pid = int(first.stdout)
+        for _ in range(50):  # Killed by the reset, reaped asynchronously by init
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    if f.read().split(") ")[1][0] == "Z":
+                        break
+            except FileNotFoundError:
+                break
+            time.sleep(0.05)
+        else:
+            pytest.fail("background process survived the run")
+
+        assert second.stdout.strip() == "[]"
+        assert pool.get_stats()["warm_hits"] == 1 and pool.get_stats()["dirty"] == 0
+
+    def test_failed_reset_marks_container_dirty(self, pool, monkeypatch):
+        """A container that cannot be reset should not go back to the pool."""
+        monkeypatch.setattr(pool.runtime, "reset", lambda container: False)
+        run(pool.run("python", ["python", "-c", "pass"]))
+
+        assert pool.get_stats()["dirty"] == 1
+
+    def test_timeout_marks_container_dirty(self, pool):
+        """A timed-out run should be reported and its container discarded."""
+        result = run(pool.run("python", ["python", "-c", "import time; time.sleep(5)"], timeout=1))
+
+        assert result.timed_out is True
+        assert pool.get_stats()["dirty"] == 1
+
+
+class TestStreaming:
+    """Test incremental output, byte cap and run metrics."""
+
+    def test_chunks_arrive_before_program_ends(self, pool):
+        """The first line should be received while the program is still running."""
+        code = "import time; print('first', flush=True); time.sleep(0.5); print('second')"
+
+        async def scenario():
+            start = time.monotonic()
+            arrivals = []
+            async for item in pool.stream("python", ["python", "-c", code]):
+                if not isinstance(item, ExecResult):
+                    arrivals.append((item[1], time.monotonic() - start))
+            return arrivals
+
+        arrivals = run(scenario())
+        first_text, first_at = arrivals[0]
+        assert first_text.startswith("first")
+        assert first_at < arrivals[-1][1]
+        assert "second" in "".join(text for text, _ in arrivals)
+
+    def test_output_is_capped(self, pool):
+        """Output beyond the cap should be cut and the container recycled."""
+        code = "while True: print('x' * 1000)"
+        result = run(pool.run("python", ["python", "-c", code], max_output_bytes=10_000))
+
+        assert result.truncated is True
+        assert len(result.stdout) == 10_000
+        assert pool.get_stats()["dirty"] == 1
+
+    def test_metrics_are_reported(self, pool):
+        """The final result should carry wall time, CPU time and peak memory."""
+        code = "x = bytearray(20 * 1024 * 1024); sum(range(10 ** 6))"
+        result = run(pool.run("python", ["python", "-c", code]))
+
+        assert result.exit_code == 0
+        assert result.duration_ms > 0
+        assert result.cpu_time_ms is not None and result.cpu_time_ms > 0
+        assert result.peak_memory_kb is not None and result.peak_memory_kb > 20 * 1024
+
+    def test_wrapper_metrics_are_parsed(self):
+        """The wrapper reports the run's peak RSS in KB, -1 when it cannot measure it."""
+        splitter = _MetricsSplitter()
+        tail = b"\x1eMARS_METRICS 2048\n0m0.01s 0m0.00s\n0m0.25s 0m0.05s\n"
+        assert splitter.feed(b"err\n" + tail) == b"err\n"
+        assert splitter.parse() == (300, 2048)
+
+        splitter = _MetricsSplitter()
+        splitter.feed(tail.replace(b"2048", b"-1"))
+        assert splitter.parse() == (300, None)
+
+
+class TestExecuteRoute:
+    """Test the execution generator against the local runtime."""
+
+    def test_result_event(self, pool, monkeypatch):
+        """The route should emit a result event with timing."""
+        from routes import code_execution
+
+        monkeypatch.setattr(code_execution, "code_pool", pool)
+
+        async def collect():
+            return [json.loads(e) async for e in code_execution.execute_code_in_docker("print(6 * 7)", "python")]
+
+        events = run(collect())
+        streamed = "".join(e["data"] for e in events if e["type"] == "stdout")
+        assert streamed == "42\n"
+
+        result = events[-1]
+        assert result["type"] == "result"
+        assert result["data"]["stdout"].strip() == "42"
+        assert result["data"]["exit_code"] == 0
+        assert result["data"]["execution_time_ms"] >= 0
+        assert result["data"]["cpu_time_ms"] is not None
+        assert result["data"]["truncated"] is False
+
+
+class FakeDockerClient:
+    """Records image builds/runs; the exec API talks over a socketpair."""
+
+    def __init__(self, build_error=None):
+        self.built, self.runs, self.exec_kwargs = [], [], {}
+        self.build_error = build_error
+        self.images = SimpleNamespace(get=self._get_image, build=self._build)
+        self.containers = SimpleNamespace(run=self._run)
+        self.api = SimpleNamespace(exec_create=self._exec_create, exec_start=self._exec_start,
+                                   exec_inspect=lambda exec_id: {"ExitCode": 0})
+        self.server = None  # Thread playing the daemon, started by exec_start
+        self.daemon_output = (b"", b"")
+
+    def _get_image(self, tag):
+        if tag not in self.built:
+            raise LookupError(tag)
+
+    def _build(self, fileobj, tag, rm):
+        if self.build_error:
+            raise self.build_error
+        self.built.append(tag)
+        self.dockerfile = fileobj.read().decode()
+
+    def _run(self, image, **options):
+        self.runs.append(image)
+        return SimpleNamespace(id="c0ffee0000000000")
+
+    def _exec_create(self, container_id, **kwargs):
+        self.exec_kwargs = kwargs
+        return {"Id": "exec1"}
+
+    def _exec_start(self, exec_id, socket):
+        client_end, server_end = globals()["socket"].socketpair()
+        self.server = threading.Thread(target=serve_exec, args=(server_end, *self.daemon_output))
+        self.server.start()
+        return client_end
+
+
+def serve_exec(server, stdout: bytes, metrics: bytes):
+    """Plays the daemon: reads stdin to EOF, then sends multiplexed frames."""
+    received = bytearray()
+    while chunk := server.recv(65536):
+        received += chunk
+    for stream, data in ((1, stdout % len(received)), (2, b"warn\n" + METRICS_MARKER + metrics)):
+        server.sendall(struct.pack(">BxxxL", stream, len(data)) + data)
+    server.close()
+
+
+class TestDockerRuntime:
+    """Test DockerRuntime against a fake client (no daemon needed)."""
+
+    def test_containers_run_on_the_derived_image_with_gnu_time(self):
+        client = FakeDockerClient()
+        runtime = DockerRuntime(client)
+        runtime.start("python", "python:3.11-slim")
+        runtime.start("python", "python:3.11-slim")
+
+        assert len(client.built) == 1 and client.runs == client.built * 2
+        assert client.dockerfile.startswith("FROM python:3.11-slim") and "install -y --no-install-recommends time" in client.dockerfile
+
+    def test_failed_build_falls_back_to_the_base_image(self):
+        client = FakeDockerClient(build_error=RuntimeError("offline"))
+        DockerRuntime(client).start("python", "python:3.11-slim")
+        assert client.runs == ["python:3.11-slim"]
+
+    def test_stdin_goes_through_the_exec_socket(self):
+        client = FakeDockerClient()
+        runtime = DockerRuntime(client)
+        container = runtime.start("python", "python:3.11-slim")
+        stdin = "x" * (300 * 1024)  # Above the 128 KiB limit of one environment string
+
+        client.daemon_output = (b"%d\n", b"2048\n0m0.01s 0m0.00s\n0m0.25s 0m0.05s\n")
+        items = list(runtime.exec_stream(container, ["python", "-c", "pass"], stdin=stdin))
+        client.server.join(timeout=5)
+
+        assert client.exec_kwargs["stdin"] is True
+        assert set(client.exec_kwargs["environment"]) == {"MARS_TIMEOUT"}
+        chunks, result = items[:-1], items[-1]
+        assert b"".join(c.data for c in chunks if c.stream == "stdout") == b"%d\n" % len(stdin)
+        assert b"".join(c.data for c in chunks if c.stream == "stderr") == b"warn\n"
+        assert result.peak_memory_kb == 2048 and result.cpu_time_ms == 300
+
+
+def _docker_client():
+    try:
+        import docker
+
+        client = docker.from_env()
+        client.ping()
+        return client
+    except Exception:
+        return None
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(_docker_client() is None, reason="Docker daemon not available")
+class TestDockerIntegration:
+    """Runs the real wrapper in a python:3.11-slim container."""
+
+    def test_peak_memory_and_large_stdin(self):
+        pool = ContainerPool(DockerRuntime(_docker_client()), images={"python": "python:3.11-slim"}, size=1)
+        code = "import sys; x = bytearray(20 * 1024 * 1024); print(len(sys.stdin.read()))"
+        try:
+            result = run(pool.run("python", ["python", "-c", code], stdin="x" * (300 * 1024), timeout=30))
+        finally:
+            run(pool.shutdown())
+
+        assert result.stdout.strip() == str(300 * 1024)
+        assert result.peak_memory_kb is not None and result.peak_memory_kb > 20 * 1024
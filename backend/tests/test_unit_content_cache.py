@@ -0,0 +1,180 @@
+"""
+Unit tests for the adaptive content cache.
+Tests fingerprinting, LRU/TTL eviction, in-flight coalescing and that
+unparseable model output is never cached.
+"""
+import threading
+import time
+
+import pytest
+
+from services.adaptive_content_generator import (
+    AdaptiveContentGenerator, LearnerProfile, LearningStyle
+)
+from services.ai_dispatcher import DispatchResult, ModelTier
+from services.content_cache import ContentStore, make_fingerprint, template_version
+
+
+class TestFingerprint:
+    """Test canonical request fingerprints."""
+
+    def test_whitespace_and_key_order_are_ignored(self):
+        """Equivalent requests should share the same key."""
+        a = make_fingerprint(topic="Subjonctif", prompt="Explique  le\nsubjonctif", temperature=0.7)
+        b = make_fingerprint(temperature=0.7, prompt="Explique le subjonctif", topic="Subjonctif")
+        assert a == b
+
+    def test_different_params_give_different_keys(self):
+        """Any parameter change should change the key."""
+        a = make_fingerprint(topic="Subjonctif", difficulty=2)
+        b = make_fingerprint(topic="Subjonctif", difficulty=3)
+        assert a != b
+
+    def test_template_version_changes_with_text(self):
+        """Editing a template should invalidate cached content."""
+        assert template_version("SUJET: {topic}") != template_version("SUJET : {topic}")
+
+
+class TestContentStore:
+    """Test LRU/TTL store behaviour."""
+
+    def test_hit_after_miss(self):
+        """Second identical request should not recompute."""
+        store = ContentStore(max_entries=10, ttl_seconds=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "lesson"
+
+        assert store.get_or_compute("k", compute) == "lesson"
+        assert store.get_or_compute("k", compute) == "lesson"
+        assert len(calls) == 1
+
+        stats = store.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        """Least recently used entry should be evicted first."""
+        store = ContentStore(max_entries=2, ttl_seconds=60)
+        store.put("a", 1)
+        store.put("b", 2)
+        store.get("a")
+        store.put("c", 3)
+
+        assert store.get("a") == 1
+        assert store.get("b") is None
+        assert store.get_stats()["evictions"] == 1
+
+    def test_ttl_expiration(self):
+        """Expired entries should be recomputed."""
+        store = ContentStore(max_entries=10, ttl_seconds=0.01)
+        store.put("k", "old")
+        time.sleep(0.02)
+
+        assert store.get("k") is None
+        assert store.get_stats()["expirations"] == 1
+
+    def test_errors_are_not_cached(self):
+        """A failed generation should be retried on the next request."""
+        store = ContentStore(max_entries=10, ttl_seconds=60)
+
+        def failing():
+            raise RuntimeError("rate limit")
+
+        with pytest.raises(RuntimeError):
+            store.get_or_compute("k", failing)
+
+        assert store.get_or_compute("k", lambda: "ok") == "ok"
+        assert store.get_stats()["errors"] == 1
+
+    def test_concurrent_requests_share_one_call(self):
+        """Concurrent identical requests should trigger a single LLM call."""
+        store = ContentStore(max_entries=10, ttl_seconds=60)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_compute():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=2)
+            return "shared"
+
+        results = []
+        owner = threading.Thread(target=lambda: results.append(store.get_or_compute("k", slow_compute)))
+        owner.start()
+        started.wait(timeout=2)
+
+        waiters = [
+            threading.Thread(target=lambda: results.append(store.get_or_compute("k", slow_compute)))
+            for _ in range(5)
+        ]
+        for t in waiters:
+            t.start()
+        # Let the waiters block on the in-flight future before releasing
+        time.sleep(0.05)
+        release.set()
+
+        owner.join(timeout=2)
+        for t in waiters:
+            t.join(timeout=2)
+
+        assert len(calls) == 1
+        assert results == ["shared"] * 6
+        assert store.get_stats()["coalesced"] == 5
+
+
+class FakeDispatcher:
+    """Returns the queued model outputs in order."""
+
+    def __init__(self, *outputs):
+        self.outputs = list(outputs)
+        self.calls = 0
+
+    def dispatch(self, **kwargs):
+        self.calls += 1
+        return DispatchResult(
+            content=self.outputs.pop(0), model_used="fake", tier_used=ModelTier.FAST,
+            latency_ms=1, tokens_input=1, tokens_output=1, cost_estimate=0.0,
+        )
+
+
+class TestGeneratorCache:
+    """Test that generators only cache parsed model output."""
+
+    @pytest.fixture
+    def make_generator(self, monkeypatch):
+        profile = LearnerProfile(
+            user_id="u1", weak_topics={}, error_patterns=[], learning_style=LearningStyle.EXAMPLE_BASED,
+            optimal_difficulty=3, needs_encouragement=False, prefers_examples=True,
+            cognitive_state="fresh", recent_mistakes=[],
+        )
+        monkeypatch.setattr(AdaptiveContentGenerator, "get_learner_profile", lambda self, user_id: profile)
+        return lambda ai: AdaptiveContentGenerator(ai_dispatcher=ai, store=ContentStore(max_entries=10, ttl_seconds=60))
+
+    def test_unparseable_output_is_retried(self, make_generator):
+        """A prose answer is served as raw text without poisoning the cache."""
+        valid = '```json\n{"title": "Le subjonctif", "explanation": "...", "key_points": ["que + subj"]}\n```'
+        ai = FakeDispatcher("Désolé, voici la leçon sans JSON.", valid)
+        generator = make_generator(ai)
+
+        raw = generator.generate_micro_lesson("u1", "subjonctif")
+        assert raw.title == "Leçon: subjonctif" and raw.content == "Désolé, voici la leçon sans JSON."
+        assert generator.store.get_stats()["size"] == 0
+
+        lesson = generator.generate_micro_lesson("u1", "subjonctif")
+        assert lesson.title == "Le subjonctif" and lesson.key_points == ["que + subj"]
+        assert generator.generate_micro_lesson("u1", "subjonctif").title == "Le subjonctif"
+        assert ai.calls == 2
+        assert generator.store.get_stats()["errors"] == 1
+
+    def test_non_object_json_is_rejected(self, make_generator):
+        """JSON that is not an object cannot feed a generator."""
+        generator = make_generator(FakeDispatcher('["a", "b"]'))
+
+        with pytest.raises(ValueError):
+            generator.generate_mnemonic("u1", "accords", "rule")
+        assert generator.store.get_stats()["size"] == 0
@@ -0,0 +1,153 @@
+"""
+Unit tests for deferred initialization.
+Tests the versioned schema guard, lazy managers, lazy imports and OpenAI clients,
+and the import-time profile parser.
+"""
+import sqlite3
+import sys
+import threading
+
+from benchmarks.startup import parse_importtime, summarize
+from databases.schema import Migration, SchemaGuard, get_schema_version
+from databases.tasks_db import TasksDatabase
+from services import openai_client
+from services.openai_client import LazyOpenAIClient
+from utils.lazy import lazy_import
+
+
+class TestSchemaGuard:
+    """Test one-time, versioned schema application."""
+
+    def make_guard(self, version=1, calls=None):
+        calls = calls if calls is not None else []
+
+        def make_step(step_version):
+            def apply(conn):
+                calls.append(step_version)
+                conn.execute(f"CREATE TABLE IF NOT EXISTS items_v{step_version} (id INTEGER PRIMARY KEY)")
+            return Migration(step_version, f"step {step_version}", apply)
+
+        return SchemaGuard("items", [make_step(v) for v in range(1, version + 1)]), calls
+
+    def test_applied_once_and_recorded(self, tmp_path):
+        db_path = str(tmp_path / "x.db")
+        guard, calls = self.make_guard()
+        guard.ensure(db_path)
+        guard.ensure(db_path)
+        assert calls == [1]
+
+        # A new process (new guard) only reads the version table
+        restarted, calls_after_restart = self.make_guard()
+        restarted.ensure(db_path)
+        assert calls_after_restart == []
+        with sqlite3.connect(db_path) as conn:
+            assert get_schema_version(conn, "items") == 1
+
+    def test_new_migration_applies_only_the_pending_step(self, tmp_path):
+        db_path = str(tmp_path / "x.db")
+        self.make_guard(version=1)[0].ensure(db_path)
+        guard, calls = self.make_guard(version=2)
+        guard.ensure(db_path)
+        assert calls == [2]
+        with sqlite3.connect(db_path) as conn:
+            assert get_schema_version(conn, "items") == 2
+
+    def test_failed_apply_is_retried(self, tmp_path):
+        db_path = str(tmp_path / "x.db")
+        attempts = []
+
+        def apply(conn):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("disk I/O error")
+
+        guard = SchemaGuard("flaky", [Migration(1, "flaky", apply)])
+        try:
+            guard.ensure(db_path)
+        except sqlite3.OperationalError:
+            pass
+        guard.ensure(db_path)
+        assert len(attempts) == 2
+
+    def test_concurrent_first_access_applies_once(self, tmp_path):
+        db_path = str(tmp_path / "x.db")
+        guard, calls = self.make_guard()
+        threads = [threading.Thread(target=guard.ensure, args=(db_path,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert calls == [1]
+
+
+class TestLazyManagers:
+    """Test that constructing a manager does no I/O until first use."""
+
+    def test_tasks_db_schema_on_first_access(self, tmp_path):
+        db_path = tmp_path / "tasks.db"
+        db = TasksDatabase(db_path=str(db_path))
+        assert not db_path.exists()
+
+        assert db.get_tasks() == []
+        with sqlite3.connect(db_path) as conn:
+            assert get_schema_version(conn, "tasks") == db._schema.version
+
+
+class TestLazyImports:
+    """Test deferred module execution and lazily created clients."""
+
+    def test_module_runs_on_first_attribute(self, tmp_path, monkeypatch):
+        (tmp_path / "heavy_demo_module.py").write_text("import builtins\nbuiltins._heavy_demo_loaded = True\nVALUE = 42\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.delitem(sys.modules, "heavy_demo_module", raising=False)
+        import builtins
+
+        module = lazy_import("heavy_demo_module")
+        try:
+            assert not getattr(builtins, "_heavy_demo_loaded", False)
+            assert module.VALUE == 42
+            assert builtins._heavy_demo_loaded
+        finally:
+            sys.modules.pop("heavy_demo_module", None)
+            builtins.__dict__.pop("_heavy_demo_loaded", None)
+
+    def test_openai_client_created_on_first_access(self, monkeypatch):
+        created = []
+        monkeypatch.setattr(openai_client, "create_openai_client", lambda: created.append(1) or "client")
+
+        class Service:
+            client = LazyOpenAIClient()
+
+        service = Service()
+        assert created == []
+        assert service.client == "client"
+        assert service.client == "client"
+        assert created == [1]
+
+        service.client = None  # Still assignable (tests, degraded mode)
+        assert service.client is None
+
+
+class TestStartupProfile:
+    """Test the -X importtime parser."""
+
+    def test_summary(self):
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |     routes.helpers",
+            "import time:       200 |       5300 |   fastapi",
+            "import time:       300 |        400 |   routes.learning",
+            "import time:        10 |        410 |   routes",
+            "import time:         5 |        420 |   routes.learning",
+            "import time:       900 |       6800 | main",
+            "INFO something else",
+        ])
+        records = parse_importtime(output)
+        summary = summarize(records, top=5)
+
+        assert [r.depth for r in records] == [2, 1, 1, 1, 1, 0]
+        assert summary["import_ms"] == 6.8
+        assert [row["name"] for row in summary["first_party"]] == ["routes.learning", "routes", "routes.helpers"]
+        assert summary["first_party"][0]["cumulative_us"] == 420
+        assert summary["third_party"] == [{"name": "fastapi", "cumulative_us": 5300}]
+        assert summary["eager_deferred"] == []
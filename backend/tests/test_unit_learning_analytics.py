@@ -0,0 +1,83 @@
+"""
+Unit tests for the precomputed learning-analytics snapshot.
+Tests the background refresh cadence, the answer watermark, the single-read
+GET path and the snapshot of users who answered before the migration.
+"""
+import asyncio
+import importlib
+import sqlite3
+
+import pytest
+
+from config import settings
+from databases.learning_db import LearningDatabase
+from utils.metrics import add_statement_listener, remove_statement_listener
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYTICS_REFRESH_EVERY", 5)
+    database = LearningDatabase(db_path=str(tmp_path / "learning.db"))
+    database.get_or_create_mastery("u1", "python")
+    yield database
+    database.wait_background_jobs()
+
+
+def answer(db, count, is_correct=True):
+    for _ in range(count):
+        db.record_session_performance("u1", is_correct=is_correct, response_time=12, mastery_change=3)
+
+
+class TestAnalyticsSnapshot:
+    """Test the snapshot row and its refresh policy."""
+
+    def test_refresh_runs_after_enough_new_answers(self, db):
+        answer(db, 1)  # First answer: first snapshot
+        db.wait_background_jobs()
+        first = db.get_analytics_snapshot("u1")
+        assert first["stats"]["topics_studied"] == 1
+        assert first["freshness"]["pending_answers"] == 0 and first["freshness"]["computed_at"]
+
+        answer(db, 3)
+        assert not db._background_jobs
+        assert db.get_analytics_snapshot("u1")["freshness"]["pending_answers"] == 3
+
+        answer(db, 2)  # 5 answers past the watermark
+        db.wait_background_jobs()
+        assert db.get_analytics_snapshot("u1")["freshness"]["pending_answers"] == 0
+
+    def test_get_is_a_single_read(self, db):
+        answer(db, 1)
+        db.wait_background_jobs()
+
+        statements = []
+        listener = lambda label, sql: statements.append(sql.strip())
+        add_statement_listener(listener)
+        try:
+            db.get_analytics_snapshot("u1")
+        finally:
+            remove_statement_listener(listener)
+
+        assert len(statements) == 1 and statements[0].startswith("SELECT")
+
+    def test_answers_before_the_migration_are_computed_on_first_read(self, db):
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute("INSERT INTO learning_analytics (user_id, answers) VALUES ('u2', 40)")
+
+        cold = db.get_analytics_snapshot("u2")
+        assert cold["chronotype"]["chronotype"] == "unknown" and cold["freshness"]["pending_answers"] == 40
+
+        db.wait_background_jobs()
+        assert db.get_analytics_snapshot("u2")["freshness"]["pending_answers"] == 0
+        assert db.get_analytics_snapshot("nobody")["freshness"] == {"computed_at": None, "pending_answers": 0}
+
+    def test_route_serves_the_snapshot(self, db, monkeypatch):
+        routes = importlib.import_module("routes.learning")
+        monkeypatch.setattr(routes, "db", db)
+        answer(db, 1)
+        db.wait_background_jobs()
+
+        result = asyncio.run(routes.get_learning_analytics("u1"))
+        assert result["stats"] == db.get_analytics_snapshot("u1")["stats"]
+        assert result["optimal_time"]["is_optimal"] is True
+        assert result["insights"] and result["freshness"]["pending_answers"] == 0
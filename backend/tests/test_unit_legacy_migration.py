@@ -0,0 +1,156 @@
+"""
+Unit tests for the consolidation of the legacy Database onto the split stores.
+Tests the one-shot merge of database.db (ids, references, archived messages,
+conflicts, idempotence), the import at app startup, the compatibility shim
+and the daily task stats.
+"""
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from database import Database
+from databases import health_db, learning_db, legacy_migrator, tasks_db
+from databases.health_db import HealthDatabase
+from databases.learning_db import LearningDatabase
+from databases.legacy_migrator import migrate_legacy_database
+from databases.tasks_db import TasksDatabase
+from utils.clock import VirtualClock, use_clock
+
+# Subset of the schema the legacy Database created in database.db
+LEGACY_SCHEMA = """
+    CREATE TABLE projects (id TEXT PRIMARY KEY, user_id TEXT DEFAULT 'default', name TEXT NOT NULL,
+                           status TEXT DEFAULT 'active', archived BOOLEAN DEFAULT 0);
+    CREATE TABLE tasks (id TEXT PRIMARY KEY, user_id TEXT DEFAULT 'default', title TEXT NOT NULL,
+                        completed BOOLEAN DEFAULT 0, effort TEXT DEFAULT 'S', project_id TEXT,
+                        completed_at TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE meals (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT DEFAULT 'default',
+                        name TEXT, date TEXT NOT NULL, time TEXT NOT NULL, meal_type TEXT NOT NULL);
+    CREATE TABLE meal_foods (id INTEGER PRIMARY KEY AUTOINCREMENT, meal_id INTEGER NOT NULL,
+                             food_id TEXT NOT NULL, food_name TEXT NOT NULL, grams REAL NOT NULL);
+    CREATE TABLE concepts (id INTEGER PRIMARY KEY AUTOINCREMENT, course_id TEXT NOT NULL, concept TEXT NOT NULL,
+                           mastery_level INTEGER DEFAULT 0, UNIQUE(course_id, concept));
+    CREATE TABLE language_messages (id INTEGER PRIMARY KEY AUTOINCREMENT, course_id TEXT NOT NULL,
+                                    user_id TEXT NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL,
+                                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, archived BOOLEAN DEFAULT 0);
+    INSERT INTO projects (id, name) VALUES ('p1', 'Legacy project');
+    INSERT INTO tasks (id, title, effort, project_id) VALUES ('t1', 'Legacy task', 'XL', 'p1');
+    INSERT INTO meals (name, date, time, meal_type) VALUES ('Breakfast', '2026-05-01', '08:00', 'breakfast');
+    INSERT INTO meal_foods (meal_id, food_id, food_name, grams) VALUES (1, 'oats', 'Oats', 60);
+    INSERT INTO concepts (course_id, concept, mastery_level) VALUES ('python', 'loops', 10), ('python', 'closures', 40);
+    INSERT INTO language_messages (course_id, user_id, role, content, archived) VALUES
+        ('spanish', 'u1', 'user', 'viejo', 1), ('spanish', 'u1', 'user', 'nuevo', 0);
+"""
+
+
+@pytest.fixture
+def legacy_path(tmp_path):
+    path = str(tmp_path / "database.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+    return path
+
+
+@pytest.fixture
+def stores(tmp_path):
+    return {
+        "tasks": TasksDatabase(db_path=str(tmp_path / "tasks.db")),
+        "health": HealthDatabase(db_path=str(tmp_path / "health.db")),
+        "learning": LearningDatabase(db_path=str(tmp_path / "learning.db")),
+    }
+
+
+class TestLegacyMigrator:
+    """Test the one-shot merge of database.db."""
+
+    def test_merges_every_domain(self, legacy_path, stores):
+        tasks, health, learning = stores["tasks"], stores["health"], stores["learning"]
+        meal_id = health.add_meal({"name": "Existing", "date": "2026-05-01", "time": "12:00", "meal_type": "lunch",
+                                   "foods": [{"food_id": "rice", "food_name": "Rice", "grams": 100}]})
+        learning.add_concept("python", "loops")  # Same concept already in the split store
+
+        report = migrate_legacy_database(legacy_path, stores)
+        assert report["tasks"] == {"projects": 1, "tasks": 1, "subtasks": 0, "task_relations": 0,
+                                   "categories": 0, "pomodoro_sessions": 0}
+        assert report["learning"]["concepts"] == 1 and report["learning"]["language_messages"] == 2
+
+        task = tasks.get_task("t1")
+        assert task["project_id"] == "p1" and task["level"] == 5
+
+        meals = {m["name"]: m for m in health.get_meals(date="2026-05-01")}
+        assert meals["Breakfast"]["id"] > meal_id
+        assert [f["food_name"] for f in meals["Breakfast"]["foods"]] == ["Oats"]
+        assert [f["food_name"] for f in meals["Existing"]["foods"]] == ["Rice"]
+
+        assert {c["concept"] for c in learning.get_concepts("python")} == {"loops", "closures"}
+        assert [m["content"] for m in learning.get_recent_language_messages("spanish")] == ["nuevo"]
+        assert [m["content"] for m in learning.get_archived_language_messages("spanish")] == ["viejo"]
+
+    def test_older_schema_flags_archived_messages_with_is_archived(self, tmp_path, stores):
+        path = str(tmp_path / "old.db")
+        with sqlite3.connect(path) as conn:
+            conn.execute("""
+                CREATE TABLE language_messages (id INTEGER PRIMARY KEY, course_id TEXT, user_id TEXT, role TEXT,
+                                                content TEXT, translation TEXT, is_archived BOOLEAN DEFAULT 0)
+            """)
+            conn.execute("""
+                INSERT INTO language_messages (course_id, user_id, role, content, is_archived)
+                VALUES ('spanish', 'u1', 'user', 'viejo', 1), ('spanish', 'u1', 'user', 'nuevo', 0)
+            """)
+
+        assert migrate_legacy_database(path, stores)["learning"]["language_messages"] == 2
+        assert [m["content"] for m in stores["learning"].get_archived_language_messages("spanish")] == ["viejo"]
+        assert [m["content"] for m in stores["learning"].get_recent_language_messages("spanish")] == ["nuevo"]
+
+    def test_runs_once(self, legacy_path, stores):
+        assert migrate_legacy_database(legacy_path, stores)
+        assert migrate_legacy_database(legacy_path, stores) == {}
+        assert len(stores["learning"].get_concepts("python")) == 2
+        assert migrate_legacy_database(legacy_path + ".missing", stores) == {}
+
+
+def test_app_startup_imports_legacy_data(legacy_path, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    monkeypatch.setattr(legacy_migrator, "LEGACY_DB_PATH", legacy_path)
+    for store in (tasks_db, health_db, learning_db):
+        monkeypatch.setattr(store, "db_path", str(tmp_path / Path(store.db_path).name))
+
+    with TestClient(main.app) as client:  # Runs the lifespan
+        concepts = client.get("/api/knowledge/python").json()["concepts"]
+        assert {c["concept"] for c in concepts} == {"loops", "closures"}
+        context = client.get("/api/chat/context/python").json()["context"]
+        assert context["mastery_stats"]["total_concepts"] == 2
+        messages = client.get("/api/languages/recent-messages/spanish").json()["messages"]
+        assert [m["content"] for m in messages] == ["nuevo"]
+        assert client.get("/api/tasks-db/tasks/t1").json()["task"]["title"] == "Legacy task"
+
+
+class TestCompatibilityShim:
+    """Test that the old Database API runs on the split stores."""
+
+    def test_delegates_to_the_domain_stores(self, legacy_path, stores):
+        db = Database(db_path=legacy_path, stores=stores)
+        assert db.get_task("t1")["title"] == "Legacy task"  # Merged on first call
+        assert db.add_concept("python", "generators") and len(stores["learning"].get_concepts("python")) == 3
+        assert db.get_tasks_stats()["total_tasks"] == 1
+        assert [m["content"] for m in db.get_archived_language_messages("spanish", limit=5, offset=0)] == ["viejo"]
+        assert db.get_archived_language_messages("spanish", offset=1) == []
+        with pytest.raises(AttributeError):
+            db.get_everything()
+
+
+def test_daily_task_stats(stores):
+    tasks = stores["tasks"]
+    with use_clock(VirtualClock(datetime(2026, 5, 10, 18, 0))):
+        for title in ("a", "b"):
+            tasks.toggle_task(tasks.add_task({"title": title}))
+        tasks.add_pomodoro_session({"date": "2026-05-09", "duration": 25, "actual_duration": 25})
+        stats = tasks.get_daily_stats(days=3)
+
+    assert [day["date"] for day in stats] == ["2026-05-10", "2026-05-09", "2026-05-08"]
+    assert [day["tasks_completed"] for day in stats] == [2, 0, 0]
+    assert [day["focus_minutes"] for day in stats] == [0, 25, 0]
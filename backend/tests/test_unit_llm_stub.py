@@ -0,0 +1,111 @@
+"""
+Unit tests for the OpenAI-compatible LLM stub.
+Tests completions, streaming, error injection and config-driven redirection.
+"""
+import json
+
+import pytest
+
+openai = pytest.importorskip("openai")
+pytest.importorskip("uvicorn")
+
+from e2e.llm_stub import STUB_QUESTION, LLMStub, LLMStubConfig, StubServer
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(**options):
+        server = StubServer(LLMStubConfig(**{"latency_ms": 0, "jitter_ms": 0, **options}))
+        server.start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def client_for(server, **options):
+    return openai.OpenAI(api_key="sk-local", base_url=server.base_url, max_retries=0, **options)
+
+
+class TestLLMStub:
+    """Test the stub over the real OpenAI SDK."""
+
+    def test_completion_with_usage(self, stub_server):
+        """JSON prompts get the canned question, with usage fields."""
+        server = stub_server()
+        response = client_for(server).chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "system", "content": "Réponds en JSON"}, {"role": "user", "content": "Une question"}],
+        )
+
+        assert json.loads(response.choices[0].message.content) == STUB_QUESTION
+        assert response.usage.prompt_tokens > 0
+        assert response.usage.total_tokens == response.usage.prompt_tokens + response.usage.completion_tokens
+        assert server.stats["requests"] == 1
+
+    def test_streaming(self, stub_server):
+        """Streamed chunks should rebuild the full answer."""
+        server = stub_server(responses=[("bonjour", "Salut, on révise ?")])
+        stream = client_for(server).chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "bonjour"}],
+            stream=True,
+        )
+        text = "".join(chunk.choices[0].delta.content or "" for chunk in stream)
+
+        assert text == "Salut, on révise ?"
+        assert server.stats["streamed"] == 1
+
+    def test_error_injection(self, stub_server):
+        """Injected 429s and 500s surface as the SDK's own exceptions."""
+        with pytest.raises(openai.RateLimitError):
+            client_for(stub_server(rate_limit_rate=1.0)).chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}]
+            )
+        with pytest.raises(openai.InternalServerError):
+            client_for(stub_server(server_error_rate=1.0)).chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}]
+            )
+
+    def test_timeout_injection(self, stub_server):
+        server = stub_server(timeout_rate=1.0, timeout_s=1)
+        with pytest.raises(openai.APITimeoutError):
+            client_for(server, timeout=0.2).chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}]
+            )
+
+    def test_draws_are_seeded(self):
+        """Same seed, same latencies and faults."""
+        def draws(seed):
+            stub = LLMStub(LLMStubConfig(distribution="lognormal", rate_limit_rate=0.3, seed=seed))
+            return [stub._draw() for _ in range(50)]
+
+        assert draws(7) == draws(7)
+        assert draws(7) != draws(8)
+        assert any(fault == "rate_limit" for _, fault in draws(7))
+
+
+class TestRedirection:
+    """Test pointing the backend at the stub through config."""
+
+    def test_dispatcher_uses_base_url(self, stub_server, monkeypatch, tmp_path):
+        """No API key needed: usage tokens come from the stub."""
+        from config import settings
+        from databases.learning_db import LearningDatabase
+        from services.ai_dispatcher import AIDispatcher, TaskType
+
+        server = stub_server()
+        monkeypatch.setattr("services.ai_dispatcher.learning_db", LearningDatabase(str(tmp_path / "learning.db")))
+        monkeypatch.setattr(settings, "OPENAI_API_KEY", None)
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        monkeypatch.setattr(settings, "OPENAI_BASE_URL", server.base_url)
+
+        result = AIDispatcher().dispatch(TaskType.CHAT, "Salut")
+
+        assert result.content == "Bien joué, continue comme ça !"
+        assert result.tokens_input == server.stats["prompt_tokens"]
+        assert server.stats["requests"] == 1
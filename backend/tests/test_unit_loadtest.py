@@ -0,0 +1,92 @@
+"""
+Unit tests for the HTTP load-testing harness.
+Tests route grouping, latency summaries, budget checks and a short live run.
+"""
+import pytest
+
+from e2e.loadtest import LoadTestConfig, LoadTester, check_budget, route_template, summarize
+
+
+def make_report(p95_by_route, users=4, errors=0):
+    routes = {
+        route: summarize([p95] * 20, errors, 1.0)
+        for route, p95 in p95_by_route.items()
+    }
+    samples = [stats["p95_ms"] for stats in routes.values()] * 20
+    return {"stages": [
+        {"users": 1, "overall": summarize([1.0], 0, 1.0), "routes": {}},
+        {"users": users, "overall": summarize(samples, errors, 1.0), "routes": routes},
+    ]}
+
+
+class TestReporting:
+    """Test latency grouping and percentiles."""
+
+    def test_route_template(self):
+        """Concrete paths should be grouped under their route template."""
+        assert route_template("/api/learning/submit-answer/abc-123") == "/api/learning/submit-answer/{session_id}"
+        assert route_template("/api/tasks-db/tasks/42/toggle") == "/api/tasks-db/tasks/{task_id}/toggle"
+        assert route_template("/api/tasks-db/tasks") == "/api/tasks-db/tasks"
+        assert route_template("/api/unknown/7") == "/api/unknown/7"
+
+    def test_summarize_percentiles(self):
+        """Percentiles should use the nearest rank over the samples."""
+        stats = summarize([float(v) for v in range(201)], errors=2, duration_s=4.0)
+
+        assert stats["count"] == 201
+        assert stats["p50_ms"] == 100
+        assert stats["p95_ms"] == 190
+        assert stats["p99_ms"] == 198
+        assert stats["max_ms"] == 200
+        assert stats["error_rate"] == 0.01
+        assert stats["throughput_rps"] == 50.25
+
+
+class TestBudget:
+    """Test the regression budget."""
+
+    def test_within_budget(self):
+        report = make_report({"POST /api/tasks-db/tasks": 40.0})
+        budget = {"overall": {"p95_ms": 100}, "routes": {"POST /api/tasks-db/tasks": {"p95_ms": 50}}}
+        assert check_budget(report, budget) == []
+
+    def test_violations_are_reported(self):
+        """Slow routes, errors and missing routes should all be violations."""
+        report = make_report({"POST /api/tasks-db/tasks": 80.0, "GET /api/health/weight": 300.0}, errors=1)
+        budget = {
+            "default": {"p95_ms": 200},
+            "overall": {"error_rate": 0.01},
+            "routes": {
+                "POST /api/tasks-db/tasks": {"p95_ms": 50},
+                "POST /api/health/hydration": {"p95_ms": 50},
+            },
+        }
+        violations = check_budget(report, budget)
+
+        assert len(violations) == 4
+        assert any(v.startswith("overall @ 4 users: error_rate") for v in violations)
+        assert any(v.startswith("GET /api/health/weight") for v in violations)
+        assert any("no request recorded" in v for v in violations)
+
+    def test_stage_selection(self):
+        """The budget can target a specific stage instead of the largest."""
+        report = make_report({"POST /api/tasks-db/tasks": 80.0})
+        assert check_budget(report, {"stage": 1, "overall": {"p95_ms": 10}}) == []
+        assert check_budget(report, {"stage": 8}) == ["no stage with 8 users"]
+
+
+class TestLoadTester:
+    """Test a short run against a real uvicorn server."""
+
+    def test_short_run(self):
+        pytest.importorskip("httpx")
+        pytest.importorskip("uvicorn")
+        config = LoadTestConfig(stages=[2], days=1, modules=["tasks", "health"], llm_latency_ms=0, llm_jitter_ms=0)
+        data = LoadTester(config).run().to_dict()
+
+        (stage,) = data["stages"]
+        assert stage["users"] == 2
+        assert stage["user_errors"] == 0
+        assert stage["overall"]["count"] > 0
+        assert stage["overall"]["errors"] == 0
+        assert "POST /api/tasks-db/tasks" in stage["routes"]
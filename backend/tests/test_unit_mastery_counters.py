@@ -0,0 +1,67 @@
+"""
+Unit tests for the per-difficulty success counters of user_mastery.
+Tests the JSON backfill migration, atomic increments under concurrency and
+the read-only success-rate lookup.
+"""
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from databases.learning_db import MIGRATIONS, LearningDatabase, mastery_success_rates
+from databases.schema import Migration, SchemaGuard
+
+
+@pytest.fixture
+def db(tmp_path):
+    return LearningDatabase(db_path=str(tmp_path / "learning.db"))
+
+
+class TestSuccessCounters:
+    """Test the counter columns replacing the success_by_difficulty JSON."""
+
+    def test_migration_backfills_from_json(self, tmp_path):
+        path = str(tmp_path / "learning.db")
+        legacy = LearningDatabase(db_path=path)
+        before_counters = [m for m in MIGRATIONS if m.version < 5]
+        SchemaGuard("learning", [Migration(1, "schéma initial", legacy._init_db), *before_counters]).ensure(path)
+
+        stats = {"easy": {"correct": 4, "total": 5}, "medium": {"correct": 1, "total": 3}, "hard": {"correct": 0, "total": 2}}
+        with sqlite3.connect(path) as conn:
+            conn.execute("INSERT INTO user_mastery (user_id, topic_id, success_by_difficulty) VALUES ('u1', 'python', ?)",
+                         (json.dumps(stats),))
+            conn.execute("INSERT INTO user_mastery (user_id, topic_id, success_by_difficulty) VALUES ('u1', 'sql', '{broken')")
+            conn.execute("INSERT INTO user_mastery (user_id, topic_id, success_by_difficulty) VALUES ('u1', 'git', ?)",
+                         (json.dumps({"easy": {"correct": 2, "total": 2}}),))
+
+        db = LearningDatabase(db_path=path)
+        assert db.get_or_create_mastery("u1", "python")["success_by_difficulty"] == stats
+        assert db.get_success_rates_by_difficulty("u1", "python") == {"easy": 0.8, "medium": 1 / 3, "hard": 0.0}
+        assert db.get_success_rates_by_difficulty("u1", "sql") == {"easy": 0.0, "medium": 0.0, "hard": 0.0}
+        assert db.get_success_rates_by_difficulty("u1", "git")["easy"] == 1.0
+
+    def test_concurrent_increments_are_not_lost(self, db):
+        db.get_or_create_mastery("u1", "python")
+
+        def answer(correct):
+            for _ in range(50):
+                db.update_success_by_difficulty("u1", "python", "medium", correct)
+
+        threads = [threading.Thread(target=answer, args=(i % 2 == 0,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        mastery = db.get_or_create_mastery("u1", "python")
+        assert mastery["success_by_difficulty"]["medium"] == {"correct": 100, "total": 200}
+        assert mastery_success_rates(mastery) == {"easy": 0.0, "medium": 0.5, "hard": 0.0}
+
+    def test_rates_lookup_does_not_create_mastery(self, db):
+        assert db.update_success_by_difficulty("u1", "rust", "easy", True) == {"easy": 0.0, "medium": 0.0, "hard": 0.0}
+        assert db.get_success_rates_by_difficulty("u1", "rust") == {"easy": 0.0, "medium": 0.0, "hard": 0.0}
+        assert db.get_user_all_mastery("u1") == []
+
+        with pytest.raises(ValueError):
+            db.update_success_by_difficulty("u1", "rust", "extreme", True)
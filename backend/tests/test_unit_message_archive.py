@@ -0,0 +1,119 @@
+"""
+Unit tests for the hot/cold split of language messages.
+Tests the set-based move to the compressed archive table, archived reads,
+the stats, the background compaction cadence and the migration of rows
+flagged archived by older versions.
+"""
+import sqlite3
+import zlib
+
+import pytest
+
+from config import settings
+from databases.learning_db import LearningDatabase
+from databases.schema import set_schema_version
+from utils.metrics import add_statement_listener, remove_statement_listener
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = LearningDatabase(db_path=str(tmp_path / "learning.db"))
+    yield database
+    database.wait_background_jobs()
+
+
+def save(db, count, course_id="spanish", start=0):
+    db.save_language_messages_bulk(
+        course_id, "u1", [{"role": "user", "content": f"mensaje {i} ñ"} for i in range(start, start + count)]
+    )
+
+
+class TestArchive:
+    """Test the move from the hot table to the archive table."""
+
+    def test_keeps_the_newest_messages_hot(self, db):
+        save(db, 30)
+        save(db, 5, course_id="german")
+
+        assert db.archive_old_language_messages("spanish", keep_recent=10) == 20
+        assert db.archive_old_language_messages("spanish", keep_recent=10) == 0
+
+        hot = db.get_recent_language_messages("spanish", limit=100)
+        assert [m["content"] for m in hot] == [f"mensaje {i} ñ" for i in range(29, 19, -1)]
+        assert db.get_language_message_stats("spanish") == {"total": 30, "recent": 10, "archived": 20}
+        assert db.get_language_message_stats("german") == {"total": 5, "recent": 5, "archived": 0}
+
+    def test_archive_is_compressed_and_reads_back(self, db):
+        save(db, 30)
+        db.archive_old_language_messages("spanish", keep_recent=10)
+
+        with sqlite3.connect(db.db_path) as conn:
+            blob = conn.execute("SELECT content FROM language_messages_archive ORDER BY id LIMIT 1").fetchone()[0]
+        assert isinstance(blob, bytes) and zlib.decompress(blob).decode() == "mensaje 0 ñ"
+
+        archived = db.get_archived_language_messages("spanish", limit=15)
+        assert [m["content"] for m in archived] == [f"mensaje {i} ñ" for i in range(19, 4, -1)]
+        assert all(m["archived"] == 1 and m["user_id"] == "u1" for m in archived)
+        older = db.get_archived_language_messages("spanish", before_id=archived[-1]["id"])
+        assert [m["content"] for m in older] == [f"mensaje {i} ñ" for i in range(4, -1, -1)]
+
+    def test_hot_read_does_not_depend_on_archive_size(self, db):
+        save(db, 3000)
+        db.archive_old_language_messages("spanish", keep_recent=50)
+
+        conn = db._get_connection()
+        try:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM language_messages "
+                "WHERE course_id = ? AND archived = 0 AND id < ? ORDER BY id DESC LIMIT ?", ("spanish", 10**9, 20)
+            ))
+            hot_rows = conn.execute("SELECT COUNT(*) FROM language_messages").fetchone()[0]
+        finally:
+            conn.close()
+        assert "USING INDEX" in plan and "TEMP B-TREE" not in plan
+        assert hot_rows == 50
+
+
+class TestCompaction:
+    """Test the background compaction triggered by writes."""
+
+    def test_compacts_every_n_writes(self, db, monkeypatch):
+        monkeypatch.setattr(settings, "MESSAGE_HOT_KEEP", 10)
+        monkeypatch.setattr(settings, "MESSAGE_COMPACTION_EVERY", 25)
+
+        save(db, 24)
+        assert not db._background_jobs
+        db.save_language_message("spanish", "u1", {"role": "assistant", "content": "vingt-cinq"})
+        db.wait_background_jobs()
+        assert db.get_language_message_stats("spanish") == {"total": 25, "recent": 10, "archived": 15}
+
+        save(db, 24, start=100)
+        db.wait_background_jobs()
+        assert db.get_language_message_stats("spanish")["recent"] == 34
+
+    def test_compaction_is_two_set_statements(self, db):
+        save(db, 200)
+        statements = []
+        listener = lambda label, sql: statements.append(" ".join(sql.split()))
+        add_statement_listener(listener)
+        try:
+            db.archive_old_language_messages("spanish", keep_recent=20)
+        finally:
+            remove_statement_listener(listener)
+        assert sum(sql.startswith(("INSERT", "DELETE")) for sql in statements) == 2
+
+
+def test_migration_moves_flagged_rows(tmp_path):
+    path = str(tmp_path / "learning.db")
+    LearningDatabase(db_path=path)._get_connection().close()
+    with sqlite3.connect(path) as conn:
+        conn.execute("DROP TABLE IF EXISTS language_messages_archive")
+        conn.executemany(
+            "INSERT INTO language_messages (course_id, user_id, role, content, archived) VALUES (?, ?, ?, ?, ?)",
+            [("spanish", "u1", "user", f"old {i}", 1) for i in range(3)] + [("spanish", "u1", "user", "new", 0)],
+        )
+        set_schema_version(conn, "learning", 7)
+
+    fresh = LearningDatabase(db_path=path)
+    assert fresh.get_language_message_stats("spanish") == {"total": 4, "recent": 1, "archived": 3}
+    assert [m["content"] for m in fresh.get_archived_language_messages("spanish")] == ["old 2", "old 1", "old 0"]
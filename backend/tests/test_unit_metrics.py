@@ -0,0 +1,116 @@
+"""
+Unit tests for the Prometheus metrics registry.
+Tests the exposition format, histogram buckets, collectors and DB/engine instrumentation.
+"""
+import importlib
+import re
+
+import pytest
+
+from utils.metrics import (
+    Counter, DB_CONNECTIONS, DB_QUERIES, ENGINE_ANSWERS, ENGINE_DURATION, Gauge, Histogram,
+    Registry, stats_collector, time_methods,
+)
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? \S+$')
+
+
+def sample_value(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not in output")
+
+
+class TestRegistry:
+    """Test metric types and the text exposition format."""
+
+    def test_exposition_format(self):
+        registry = Registry()
+        requests = Counter("demo_requests_total", "Demo requests", ["route"], registry=registry)
+        inflight = Gauge("demo_inflight", "In flight", registry=registry)
+        requests.labels("/a").inc()
+        requests.labels(route='/b"quoted"').inc(2)
+        inflight.set(3)
+        inflight.dec()
+
+        text = registry.render()
+        assert "# TYPE demo_requests_total counter" in text
+        assert "# TYPE demo_inflight gauge" in text
+        assert sample_value(text, 'demo_requests_total{route="/a"}') == 1
+        assert sample_value(text, 'demo_requests_total{route="/b\\"quoted\\""}') == 2
+        assert sample_value(text, "demo_inflight") == 2
+        for line in text.splitlines():
+            assert line.startswith("#") or SAMPLE.match(line), line
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = Histogram("demo_seconds", "Latency", ["op"], buckets=(0.1, 1.0), registry=registry)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.labels("read").observe(value)
+
+        text = registry.render()
+        assert sample_value(text, 'demo_seconds_bucket{op="read",le="0.1"}') == 2
+        assert sample_value(text, 'demo_seconds_bucket{op="read",le="1.0"}') == 3
+        assert sample_value(text, 'demo_seconds_bucket{op="read",le="+Inf"}') == 4
+        assert sample_value(text, 'demo_seconds_count{op="read"}') == 4
+        assert sample_value(text, 'demo_seconds_sum{op="read"}') == pytest.approx(3.65)
+
+    def test_misuse_is_rejected(self):
+        registry = Registry()
+        counter = Counter("demo_total", "Demo", ["a", "b"], registry=registry)
+        with pytest.raises(ValueError):
+            counter.labels("only-one")
+        with pytest.raises(ValueError):
+            counter.inc()
+        with pytest.raises(ValueError):
+            Counter("demo_total", "Duplicate", registry=registry)
+
+    def test_collectors_and_time_methods(self):
+        registry = Registry()
+        stats = {"hits": 3, "size": 7, "idle": {"python": 2, "go": 0}}
+        registry.register_collector(stats_collector(
+            "demo_cache", "Demo cache", lambda: stats, counters=("hits",), gauges=("size", "idle"), label="language"))
+        registry.register_collector(lambda: 1 / 0)  # A broken collector does not break the scrape
+        calls = Histogram("demo_call_seconds", "Calls", ["db", "operation"], registry=registry)
+
+        @time_methods(calls, "demo")
+        class Store:
+            def get(self):
+                return self._helper()
+
+            def _helper(self):
+                return 42
+
+        assert Store().get() == 42
+        text = registry.render()
+        assert sample_value(text, "demo_cache_hits_total") == 3
+        assert sample_value(text, "demo_cache_size") == 7
+        assert sample_value(text, 'demo_cache_idle{language="python"}') == 2
+        assert sample_value(text, 'demo_call_seconds_count{db="demo",operation="get"}') == 1
+        assert "_helper" not in text
+
+
+class TestInstrumentation:
+    """Test the shared metrics fed by the databases and the engine."""
+
+    def test_db_connections_and_queries_are_counted(self, tmp_path):
+        from databases.tasks_db import TasksDatabase
+
+        db = TasksDatabase(db_path=str(tmp_path / "tasks.db"))
+        db.get_health_check()  # First access applies the schema
+        connections = DB_CONNECTIONS.labels("tasks").value
+        queries = DB_QUERIES.labels("tasks").value
+        db.get_health_check()
+        assert DB_CONNECTIONS.labels("tasks").value == connections + 1
+        assert DB_QUERIES.labels("tasks").value > queries
+
+    def test_engine_answers_and_latency(self, tmp_path):
+        lean = importlib.import_module("learning_engine.learning_engine_lean")
+        engine = lean.LeanLearningEngine(db_path=str(tmp_path / "engine.db"))
+        correct = ENGINE_ANSWERS.labels("true").value
+        observed = ENGINE_DURATION.labels("process_answer").snapshot()[0]
+
+        engine.process_answer("metrics-user", "python", True, 12.0, 3)
+        assert ENGINE_ANSWERS.labels("true").value == correct + 1
+        assert sum(ENGINE_DURATION.labels("process_answer").snapshot()[0]) == sum(observed) + 1
@@ -0,0 +1,111 @@
+"""
+Unit tests for the versioned schema migrations.
+Tests the runner, legacy databases that predate a column, and the added indexes.
+"""
+import sqlite3
+
+import pytest
+
+from databases import skill_graph_db
+from databases.health_db import HealthDatabase
+from databases.learning_db import LearningDatabase
+from databases.schema import Migration, SchemaGuard, add_column, get_schema_version, set_schema_version
+from databases.tasks_db import TasksDatabase
+
+
+def index_names(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def column_names(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+class TestRunner:
+    """Test ordering, validation and downgrade protection."""
+
+    def test_migrations_must_be_numbered_in_order(self):
+        noop = lambda conn: None
+        with pytest.raises(ValueError):
+            SchemaGuard("bad", [])
+        with pytest.raises(ValueError):
+            SchemaGuard("bad", [Migration(1, "a", noop), Migration(3, "b", noop)])
+
+    def test_newer_database_is_left_untouched(self, tmp_path):
+        db_path = str(tmp_path / "x.db")
+        with sqlite3.connect(db_path) as conn:
+            set_schema_version(conn, "items", 5)
+        calls = []
+        SchemaGuard("items", [Migration(1, "a", calls.append)]).ensure(db_path)
+        assert calls == []
+        with sqlite3.connect(db_path) as conn:
+            assert get_schema_version(conn, "items") == 5
+
+    def test_add_column_is_idempotent(self, tmp_path):
+        with sqlite3.connect(tmp_path / "x.db") as conn:
+            conn.execute("CREATE TABLE t (id INTEGER)")
+            assert add_column(conn, "t", "extra", "TEXT") is True
+            assert add_column(conn, "t", "extra", "TEXT") is False
+
+
+class TestManagers:
+    """Test the migrations declared by the database managers."""
+
+    def test_fresh_databases_reach_latest_version(self, tmp_path):
+        for name, manager in (("tasks", TasksDatabase), ("health", HealthDatabase), ("learning", LearningDatabase)):
+            db_path = str(tmp_path / f"{name}.db")
+            db = manager(db_path=db_path)
+            db._get_connection().close()
+            with sqlite3.connect(db_path) as conn:
+                assert get_schema_version(conn, name) == db._schema.version > 1
+
+    def test_legacy_tasks_db_gets_level_from_effort(self, tmp_path):
+        db_path = str(tmp_path / "tasks.db")
+        with sqlite3.connect(db_path) as conn:
+            # tasks table as created before the level column existed
+            conn.execute("""
+                CREATE TABLE tasks (
+                    id TEXT PRIMARY KEY, user_id TEXT, project_id TEXT, title TEXT, effort TEXT, created_at TEXT
+                )
+            """)
+            conn.execute("INSERT INTO tasks VALUES ('t1', 'default', NULL, 'Old task', 'XL', '2024-01-01')")
+
+        db = TasksDatabase(db_path=db_path)
+        conn = db._get_connection()
+        assert conn.execute("SELECT level FROM tasks WHERE id = 't1'").fetchone()[0] == 5
+        conn.close()
+        assert "idx_tasks_user_created" in index_names(db_path)
+
+    def test_learning_indexes(self, tmp_path):
+        db_path = str(tmp_path / "learning.db")
+        LearningDatabase(db_path=db_path).get_user_sessions("u1")
+        indexes = index_names(db_path)
+        assert {"idx_sessions_user_started", "idx_language_messages_course_ts"} <= indexes
+        assert not {"idx_sessions_user", "idx_mastery_user"} & indexes
+
+        with sqlite3.connect(db_path) as conn:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM learning_sessions WHERE user_id = ? ORDER BY started_at DESC LIMIT 20",
+                ("u1",),
+            ))
+        assert "idx_sessions_user_started" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_legacy_skill_graph_gets_tier_and_domain(self, tmp_path, monkeypatch):
+        db_path = tmp_path / "skill_graph.db"
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""
+                CREATE TABLE skills (
+                    id TEXT PRIMARY KEY, name TEXT NOT NULL, category TEXT NOT NULL,
+                    level INTEGER DEFAULT 1, description TEXT, keywords TEXT, created_at TEXT
+                )
+            """)
+        monkeypatch.setattr(skill_graph_db, "DB_PATH", db_path)
+
+        skill_graph_db.init_db()
+        assert {"tier", "domain"} <= column_names(db_path, "skills")
+        assert "idx_skills_domain" in index_names(db_path)
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM skills").fetchone()[0] > 0
@@ -0,0 +1,110 @@
+"""
+Unit tests for the persisted difficulty calibration store.
+Tests the packed attempt history, the compact encoding, restart survival,
+write-behind batching and LRU eviction.
+"""
+import random
+import sqlite3
+
+import pytest
+
+from utils.optimal_difficulty import (
+    CalibrationStore, DifficultyLevel, OptimalDifficultyEngine, PackedRing,
+)
+
+
+def answer_many(engine, user_id, count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        engine.process_answer(
+            user_id, DifficultyLevel(rng.randint(1, 5)), rng.random() < 0.6,
+            rng.uniform(3, 200), confidence=rng.choice([None, 0.2, 0.5, 0.9]),
+        )
+
+
+class TestPackedRing:
+    """Test the bit-packed attempt ring."""
+
+    def test_window_counts_match_a_list(self):
+        rng = random.Random(3)
+        ring = PackedRing(50, 10)
+        history = []
+        for _ in range(173):
+            attempt = (rng.random() < 0.5, rng.randint(0, 300))
+            ring.append(*attempt)
+            history.append(attempt)
+
+        assert len(ring) == 50
+        for window in (1, 7, 20, 50, None):
+            recent = history[-window:] if window else history[-50:]
+            assert ring.correct_count(window) == sum(ok for ok, _ in recent)
+            assert ring.value_sum(window) == pytest.approx(sum(t for _, t in recent))
+
+        restored, used = PackedRing.from_bytes(50, 10, memoryview(ring.to_bytes()))
+        assert used == len(ring.to_bytes()) == 2 + 7 + 100
+        assert restored.correct_count() == ring.correct_count() and restored.value_sum(20) == ring.value_sum(20)
+
+    def test_values_are_clamped(self):
+        ring = PackedRing(4, 10)
+        ring.append(True, 10_000)
+        ring.append(False, -3)
+        assert ring.value_sum() == pytest.approx(6553.5)
+
+
+class TestCalibrationStore:
+    """Test persistence, batching and eviction."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "learning.db")
+
+    def test_calibration_survives_restart(self, db_path):
+        engine = OptimalDifficultyEngine(CalibrationStore(db_path))
+        answer_many(engine, "u1", 200)
+        engine.flush()
+        before = engine.get_user_profile("u1")
+
+        restarted = OptimalDifficultyEngine(CalibrationStore(db_path))
+        assert restarted.get_user_profile("u1") == before
+
+        with sqlite3.connect(db_path) as conn:
+            size = conn.execute("SELECT length(data) FROM difficulty_calibrations WHERE user_id = 'u1'").fetchone()[0]
+        assert size < 700
+
+    def test_writes_are_batched(self, db_path):
+        store = CalibrationStore(db_path, flush_every=10)
+        engine = OptimalDifficultyEngine(store)
+        answer_many(engine, "u1", 9)
+
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM difficulty_calibrations").fetchone()[0] == 0
+        answer_many(engine, "u2", 1)
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM difficulty_calibrations").fetchone()[0] == 2
+        assert store.flush() == 0
+
+    def test_lru_eviction_writes_dirty_entries(self, db_path):
+        store = CalibrationStore(db_path, max_users=2, flush_every=1000)
+        engine = OptimalDifficultyEngine(store)
+        answer_many(engine, "u1", 25)
+        attempts = engine.get_user_profile("u1")["performance_by_level"]
+
+        answer_many(engine, "u2", 5)
+        answer_many(engine, "u3", 5)  # Evicts u1, written on the way out
+        assert list(store._entries) == ["u2", "u3"]
+
+        assert engine.get_user_profile("u1")["performance_by_level"] == attempts
+
+    def test_update_survives_eviction_before_mark_dirty(self, db_path):
+        store = CalibrationStore(db_path, max_users=1, flush_every=1000)
+        engine = OptimalDifficultyEngine(store)
+        calibration, tracker = store.get("u1")
+        calibration.record_attempt(level=3, is_correct=True, response_time=10.0, confidence=0.8)
+
+        store.get("u2")  # Another request evicts u1 mid-update
+        store.mark_dirty("u1", calibration, tracker)
+        assert list(store._entries) == ["u1"]  # Re-cached: reads see the update
+        assert store.flush() == 1
+
+        restarted = OptimalDifficultyEngine(CalibrationStore(db_path))
+        assert restarted.get_user_profile("u1")["performance_by_level"][3]["attempts"] == 1
@@ -0,0 +1,120 @@
+"""
+Unit tests for keyset pagination and streamed JSON pages.
+Tests the opaque cursors, the page-by-page iterators (stable under inserts,
+one indexed query per page) and the language routes end to end.
+"""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config import settings
+from databases.learning_db import KEYSET_PAGE_SIZE, LearningDatabase
+from utils.metrics import add_statement_listener, remove_statement_listener
+from utils.pagination import decode_cursor, encode_cursor, stream_json_page
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MESSAGE_COMPACTION_EVERY", 10_000)  # Whole history kept hot
+    database = LearningDatabase(db_path=str(tmp_path / "learning.db"))
+    database.save_language_messages_bulk(
+        "spanish", "u1", [{"role": "user", "content": f"message {i}"} for i in range(1200)]
+    )
+    return database
+
+
+class TestCursors:
+    """Test cursor encoding and the incremental JSON writer."""
+
+    def test_cursor_round_trip(self):
+        assert decode_cursor(encode_cursor(1234)) == 1234
+        assert decode_cursor(None) is None and decode_cursor("") is None
+        for bad in ("not-base64!", "cGFnZTo1", "aWQ6LTE"):  # garbage, "page:5", "id:-1"
+            with pytest.raises(ValueError):
+                decode_cursor(bad)
+
+    def test_stream_is_valid_json(self):
+        rows = [{"id": i, "text": f"é{i}"} for i in (9, 7, 4)]
+        page = json.loads("".join(stream_json_page(iter(rows), "items", 2, {"course_id": "c"})))
+        assert page["items"] == rows[:2] and page["count"] == 2 and page["has_more"] is True
+        assert decode_cursor(page["next_cursor"]) == 7
+
+        last = json.loads("".join(stream_json_page(iter(rows[2:]), "items", 2, {"course_id": "c"})))
+        assert last["count"] == 1 and last["has_more"] is False and last["next_cursor"] is None
+
+
+class TestKeysetIterators:
+    """Test the page-by-page iterators of the learning database."""
+
+    def test_pages_are_stable_when_messages_arrive(self, db):
+        first = db.get_recent_language_messages("spanish", limit=10)
+        db.save_language_message("spanish", "u1", {"role": "assistant", "content": "new"})
+        rest = list(db.iter_language_messages("spanish", before_id=first[-1]["id"]))
+
+        ids = [m["id"] for m in first + rest]
+        assert len(ids) == 1200 and len(set(ids)) == 1200 and ids == sorted(ids, reverse=True)
+
+    def test_one_query_per_page(self, db):
+        statements = []
+        listener = lambda label, sql: statements.append(sql)
+        add_statement_listener(listener)
+        try:
+            count = sum(1 for _ in db.iter_language_messages("spanish"))
+        finally:
+            remove_statement_listener(listener)
+        assert count == 1200
+        assert sum("ORDER BY id DESC" in sql for sql in statements) == 1200 // KEYSET_PAGE_SIZE + 1
+
+    def test_archived_messages_and_vocabulary(self, db):
+        db.archive_old_language_messages("spanish", keep_recent=100)
+        archived = db.get_archived_language_messages("spanish", limit=50)
+        assert len(archived) == 50 and all(m["archived"] for m in archived)
+        older = db.get_archived_language_messages("spanish", limit=50, before_id=archived[-1]["id"])
+        assert older[0]["id"] < archived[-1]["id"]
+
+        for word in ("uno", "dos", "tres"):
+            db.add_vocabulary_word("spanish", "u1", {"word": word, "translation": word})
+        assert [w["word"] for w in db.get_vocabulary("spanish", "u1", limit=2)] == ["tres", "dos"]
+
+
+class TestLanguageRoutes:
+    """Test the streamed, cursor-paginated endpoints."""
+
+    @pytest.fixture
+    def client(self, db, monkeypatch):
+        from routes import languages
+
+        monkeypatch.setattr(languages, "db", db)
+        app = FastAPI()
+        app.include_router(languages.router)
+        return TestClient(app)
+
+    def test_walk_history_with_cursors(self, client):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 400, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/languages/recent-messages/spanish", params=params)
+            assert response.status_code == 200 and response.headers["content-type"] == "application/json"
+            page = response.json()
+            seen += [m["id"] for m in page["messages"]]
+            cursor = page["next_cursor"]
+            if not page["has_more"]:
+                break
+        assert len(seen) == 1200 and len(set(seen)) == 1200
+
+        assert client.get("/api/languages/recent-messages/spanish", params={"cursor": "bogus"}).status_code == 400
+
+    def test_archived_history_rejects_offset(self, client):
+        response = client.get("/api/languages/archived-messages/spanish", params={"offset": 100})
+        assert response.status_code == 400 and "cursor" in response.json()["detail"]
+        assert client.get("/api/languages/archived-messages/spanish").status_code == 200
+
+    def test_vocabulary_streams_everything_without_limit(self, client, db):
+        for i in range(30):
+            db.add_vocabulary_word("spanish", "u1", {"word": f"w{i}", "translation": "t"})
+        page = client.get("/api/languages/vocabulary/spanish", params={"user_id": "u1"}).json()
+        assert page["count"] == 30 and page["has_more"] is False and page["words"][0]["word"] == "w29"
+        assert client.get("/api/languages/archived-messages/spanish").json()["messages"] == []
+
@@ -0,0 +1,62 @@
+"""
+Unit tests for the e2e population simulator.
+Tests seeded planning, merged reports, independence from sharding and
+per-worker databases.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from e2e.population import PopulationConfig, PopulationSimulator, _init_worker, _store_paths, plan_population
+
+
+class TestPlanning:
+    """Test population planning."""
+
+    def test_plan_is_reproducible(self):
+        """Same seed should give the same profiles and user seeds."""
+        config = PopulationConfig(users=50, seed=3)
+        assert plan_population(config) == plan_population(config)
+        assert plan_population(config) != plan_population(PopulationConfig(users=50, seed=4))
+
+    def test_profile_weights_are_respected(self):
+        """Profiles with zero weight should not be simulated."""
+        config = PopulationConfig(users=40, profile_weights={"expert": 1.0, "struggling": 0.0})
+        assert {profile for _, profile, _ in plan_population(config)} == {"expert"}
+
+
+class TestPopulationSimulator:
+    """Test parallel simulation and report merging."""
+
+    def test_report_does_not_depend_on_workers(self):
+        """Sharding across more workers should not change the results."""
+        def simulate(workers, shard_size):
+            config = PopulationConfig(users=12, days=3, seed=11, workers=workers, shard_size=shard_size)
+            data = PopulationSimulator(config).run().to_dict()
+            data.pop("duration_s")
+            data.pop("workers")
+            return data
+
+        single = simulate(workers=1, shard_size=12)
+        sharded = simulate(workers=2, shard_size=3)
+
+        assert single == sharded
+        assert single["users"] == 12
+        assert single["errors"] == 0
+
+    def test_progress_is_streamed(self):
+        """Progress should be reported as each shard completes."""
+        progress = []
+        config = PopulationConfig(users=6, days=2, workers=2, shard_size=2)
+        PopulationSimulator(config).run(on_progress=lambda done, total: progress.append((done, total)))
+
+        assert progress[-1] == (6, 6)
+        assert len(progress) == 3
+
+    def test_worker_stores_live_in_its_temp_dir(self, tmp_path):
+        """No store should point at the shared data/ files inside a worker."""
+        with ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(str(tmp_path),)) as pool:
+            paths = pool.submit(_store_paths).result()
+
+        assert {"tasks", "health", "learning", "tutor_profile", "skill_graph"} <= set(paths)
+        for name, path in paths.items():
+            assert Path(path).parent.parent == tmp_path, (name, path)
@@ -0,0 +1,114 @@
+"""
+Unit tests for the query-plan regression checker.
+Tests fingerprinting, plan classification, baseline comparison and seeding, and
+exercises the hot learning queries so the statement capture sees them.
+"""
+import sqlite3
+
+import pytest
+
+from benchmarks.query_plans import (
+    StatementCapture, build_database, compare, explain, fingerprint, plan_issues, table_aliases,
+)
+from databases.learning_db import LearningDatabase
+from utils.metrics import add_statement_listener, remove_statement_listener
+
+
+class TestQueryPlanTool:
+    """Test the checker on small in-memory databases."""
+
+    def test_fingerprint_normalizes_literals(self):
+        a = fingerprint("SELECT * FROM t WHERE user_id = 'it''s'  AND n IN (1, 2, 3)\n LIMIT 20")
+        b = fingerprint("SELECT * FROM t WHERE user_id = 'bob' AND n IN (7,8) LIMIT 5")
+        assert a == b == "SELECT * FROM t WHERE user_id = ? AND n IN (?...) LIMIT ?"
+        assert fingerprint("SELECT * FROM items_v2") == "SELECT * FROM items_v2"
+        assert fingerprint("INSERT INTO t VALUES (1, NULL, 4.35e-06)") == fingerprint("INSERT INTO t VALUES (2, 'x', 0.5)")
+        assert fingerprint("SELECT * FROM t WHERE a IS NULL") == "SELECT * FROM t WHERE a IS NULL"
+
+    def test_full_scans_and_temp_btrees_are_flagged(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, user_id TEXT, at TEXT)")
+        conn.execute("CREATE INDEX idx_events_user_at ON events (user_id, at)")
+        large = {"events"}
+
+        indexed = "SELECT * FROM events WHERE user_id = 'u' ORDER BY at DESC LIMIT 5"
+        assert plan_issues(explain(conn, indexed), indexed, large) == []
+
+        unindexed = "SELECT * FROM events e WHERE e.at > '2024' ORDER BY e.at"
+        issues = plan_issues(explain(conn, unindexed), unindexed, large)
+        assert "full scan events" in issues
+        assert any(issue.startswith("temp b-tree") for issue in issues)
+        assert plan_issues(explain(conn, unindexed), unindexed, set()) == []
+
+    def test_table_aliases(self):
+        sql = "SELECT dms.tier, s.* FROM domain_map_skills dms JOIN skills AS s ON dms.skill_id = s.id WHERE 1"
+        assert table_aliases(sql) == {
+            "domain_map_skills": "domain_map_skills", "dms": "domain_map_skills", "skills": "skills", "s": "skills",
+        }
+
+    def test_compare_with_baseline(self):
+        baseline = {
+            "q_ok": {"issues": []},
+            "q_known": {"issues": ["full scan t"]},
+            "q_fixed": {"issues": ["full scan t"]},
+        }
+        current = {
+            "q_ok": {"db": "x", "count": 9, "issues": ["temp b-tree for order by"]},
+            "q_known": {"db": "x", "count": 5, "issues": ["full scan t"]},
+            "q_fixed": {"db": "x", "count": 3, "issues": []},
+            "q_new": {"db": "x", "count": 2, "issues": ["full scan t"]},
+            "q_broken": {"db": "x", "count": 1, "error": "no such table: t"},
+        }
+        status = {row["fingerprint"]: row["status"] for row in compare(baseline, current)}
+        assert status == {"q_ok": "regression", "q_known": "known", "q_fixed": "fixed", "q_new": "new", "q_broken": "error"}
+
+    def test_seeded_database_uses_real_migrations(self, tmp_path):
+        path = str(tmp_path / "learning.db")
+        sizes = build_database("learning", path, rows=300, pools={"user_id": ["default"]})
+        assert sizes["learning_sessions"] == 300
+        assert sizes["user_interleaving_stats"] <= 300
+        with sqlite3.connect(path) as conn:
+            plan = explain(conn, "SELECT * FROM learning_sessions WHERE user_id = 'default' ORDER BY started_at DESC LIMIT 20")
+            defaults = conn.execute("SELECT COUNT(*) FROM learning_sessions WHERE user_id = 'default'").fetchone()[0]
+        assert any("idx_sessions_user_started" in detail for detail in plan)
+        assert defaults > 0
+
+
+class TestHotQueries:
+    """Test the hot learning queries named by the plan check."""
+
+    @pytest.fixture
+    def db(self, tmp_path):
+        capture = StatementCapture()
+        add_statement_listener(capture)
+        yield LearningDatabase(db_path=str(tmp_path / "learning.db"))
+        remove_statement_listener(capture)
+        # Everything these tests run is visible to the plan check
+        assert capture.statements["learning"]
+
+    def test_due_topics_and_sessions(self, db):
+        db.get_or_create_mastery("u1", "python")
+        db.get_or_create_mastery("u1", "sql")
+        db.create_session("s1", "u1", topic_id="python")
+        db.create_session("s2", "u1", topic_id="sql")
+
+        assert {row["topic_id"] for row in db.get_topics_due_for_review("u1")} == {"python", "sql"}
+        assert [s["id"] for s in db.get_user_sessions("u1")] and len(db.get_user_sessions("u1", limit=1)) == 1
+        assert db.get_user_sessions("other") == []
+
+    def test_concepts_and_ai_usage(self, db):
+        db.add_concept("c1", "Closures", definition="Fonction qui capture son environnement", keywords=["scope"])
+        db.add_concept("c1", "Generators", keywords=["yield"])
+        assert [c["concept"] for c in db.search_concepts("c1", "yield")] == ["Generators"]
+
+        db.log_ai_usage("quiz", "gpt-4o-mini", "fast", 100, 50, 0.001)
+        db.log_ai_usage("quiz", "gpt-4o-mini", "fast", 200, 80, 0.002)
+        by_type = db.get_ai_usage_by_task_type()
+        assert by_type[0]["task_type"] == "quiz" and by_type[0]["total_requests"] == 2
+        assert len(db.get_ai_recent_calls(limit=1)) == 1
+
+    def test_interleaving_lookups(self, db):
+        db.create_interleaving_session("i1", "u1", "c1", ["python", "sql"])
+        db.record_interleaving_answer("i1", "python", True)
+        assert db.get_interleaving_session("i1")["questions_answered"] == 1
+        assert db.get_next_interleaving_topic("i1")["topic_id"] == "python"
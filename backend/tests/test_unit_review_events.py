@@ -0,0 +1,98 @@
+"""
+Unit tests for the append-only review event log.
+Tests write batching, columnar scans with user/date filters, the raw column
+export and the engine wiring.
+"""
+import importlib
+import json
+import sqlite3
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from databases.review_events import COLUMNS, ReviewEventLog
+from utils.clock import VirtualClock
+from utils.fsrs_algorithm import Rating, rating_from_response
+
+START = datetime(2026, 3, 2, 9, 0)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "learning.db")
+
+
+def fill(log, count, user_id="u1"):
+    for i in range(count):
+        log.append(user_id, f"topic{i % 3}", rating=1 + i % 4, response_time=2.5 + i,
+                   difficulty=1 + i % 5, at=START + timedelta(minutes=i))
+
+
+class TestReviewEventLog:
+    """Test batching, scans and export."""
+
+    def test_events_are_written_in_batches(self, db_path):
+        log = ReviewEventLog(db_path, batch_size=5, flush_seconds=3600)
+        fill(log, 4)
+        assert log.pending == 4
+        assert not Path(db_path).exists()  # Nothing touched the database yet
+
+        fill(log, 1)
+        assert log.pending == 0
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM review_events").fetchone()[0] == 5
+        fill(log, 2)
+        # Reads flush first, so callers always see their own answers
+        assert log.count() == 7 and log.pending == 0
+
+    def test_scan_filters_by_user_and_date(self, db_path):
+        log = ReviewEventLog(db_path, batch_size=1000)
+        fill(log, 10, "u1")
+        fill(log, 4, "u2")
+
+        columns = log.scan(user_id="u1", since=START + timedelta(minutes=6))
+        assert len(columns) == 4
+        assert list(columns.rating) == [3, 4, 1, 2]
+        assert list(columns.response_ms) == [8500, 9500, 10500, 11500]
+        assert columns.ts[0] == int((START + timedelta(minutes=6)).timestamp() * 1000)
+        assert {columns.names[key] for key in columns.user} == {"u1"}
+        assert {columns.names[key] for key in columns.topic} == {"topic0", "topic1", "topic2"}
+
+        assert len(log.scan()) == 14 and log.count("u2") == 4
+        assert len(log.scan(user_id="nobody")) == 0 and log.count("nobody") == 0
+
+    def test_export_round_trip(self, db_path, tmp_path):
+        log = ReviewEventLog(db_path, batch_size=1000)
+        fill(log, 25)
+        manifest = log.export_columns(tmp_path / "export", user_id="u1")
+        expected = log.scan(user_id="u1")
+
+        assert manifest["rows"] == 25
+        assert json.loads((tmp_path / "export" / "manifest.json").read_text()) == manifest
+        for name, (typecode, dtype) in COLUMNS.items():
+            assert manifest["columns"][name]["dtype"] == dtype
+            values = array(typecode)
+            values.frombytes((tmp_path / "export" / f"{name}.bin").read_bytes())
+            assert values == getattr(expected, name)
+        assert set(manifest["keys"].values()) == {"u1", "topic0", "topic1", "topic2"}
+
+
+class TestEngineLogging:
+    """Test that the engine records every answer with its FSRS rating."""
+
+    def test_process_answer_appends_events(self, db_path):
+        lean = importlib.import_module("learning_engine.learning_engine_lean")
+        log = ReviewEventLog(db_path, batch_size=1000)
+        engine = lean.LeanLearningEngine(db_path=db_path, clock=VirtualClock(START), review_log=log)
+
+        engine.process_answer("u1", "python", True, 8.0, 3)
+        engine.process_answer("u1", "python", False, 40.0, 4)
+        engine.process_answer("u1", "sql", True, 45.0, 2)
+
+        columns = log.scan(user_id="u1")
+        assert list(columns.rating) == [Rating.EASY, Rating.AGAIN, Rating.HARD]
+        assert list(columns.difficulty) == [3, 4, 2]
+        assert [columns.names[key] for key in columns.topic] == ["python", "python", "sql"]
+        assert rating_from_response(True, 12) == Rating.GOOD
@@ -0,0 +1,134 @@
+"""
+Unit tests for the unified due-review queue.
+Tests the merged ordering across topics, vocabulary and concepts, the
+course scoping, the index-only plans and the non-mutating topic selection.
+"""
+import asyncio
+import importlib
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from databases.learning_db import LearningDatabase
+from databases.review_queue import _SOURCES, ReviewQueue
+from databases.schema import set_schema_version
+from utils.clock import VirtualClock, to_sql, use_clock
+from utils.interleaving import select_interleaved_topics
+
+NOW = datetime(2026, 5, 10, 12, 0)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    db = LearningDatabase(db_path=str(tmp_path / "learning.db"))
+    db._schema.ensure(db.db_path)
+    with sqlite3.connect(db.db_path) as conn:
+        conn.executemany("INSERT INTO user_mastery (user_id, topic_id, mastery_level, next_review) VALUES (?, ?, ?, ?)", [
+            ("u1", "python", 40, to_sql(datetime(2026, 5, 1, 9))),
+            ("u1", "sql", 70, to_sql(datetime(2026, 5, 9, 9))),
+            ("u1", "rust", 0, None),                      # Never reviewed: first
+            ("u1", "git", 90, to_sql(datetime(2026, 6, 1, 9))),    # Not due
+            ("u2", "python", 10, to_sql(datetime(2026, 4, 1, 9))),  # Other user
+        ])
+        conn.executemany("INSERT INTO vocabulary (course_id, user_id, word, translation, next_review) VALUES (?, ?, ?, ?, ?)", [
+            ("spanish", "u1", "hola", "bonjour", "2026-05-05 10:00:00"),
+            ("spanish", "u1", "gato", "chat", "2026-05-20 10:00:00"),
+            ("german", "u1", "Hund", "chien", "2026-05-03 10:00:00"),
+        ])
+        # Due = last_referenced + max(1, mastery / 10) days
+        conn.executemany("INSERT INTO concepts (course_id, concept, mastery_level, last_referenced) VALUES (?, ?, ?, ?)", [
+            ("spanish", "ser vs estar", 50, "2026-05-02 12:00:00"),   # Due 05-07
+            ("spanish", "subjonctif", 90, "2026-05-08 12:00:00"),     # Due 05-17
+            ("spanish", "jamais vu", 0, None),
+        ])
+    with use_clock(VirtualClock(NOW)):
+        yield ReviewQueue(db)
+
+
+class TestReviewQueue:
+    """Test the merged due queue."""
+
+    def test_merges_sources_by_due_date(self, queue):
+        items = queue.next_items("u1", limit=10, course_id="spanish")
+        assert [(item.kind, item.label) for item in items] == [
+            ("topic", "rust"), ("topic", "python"), ("vocabulary", "hola"),
+            ("concept", "ser vs estar"), ("topic", "sql"),
+        ]
+        assert items[0].due is None and items[1].overdue_days == pytest.approx(9.125)
+
+    def test_course_scoping_and_limit(self, queue):
+        labels = [item.label for item in queue.next_items("u1", limit=10)]
+        assert labels == ["rust", "python", "Hund", "hola", "sql"]
+        assert [item.label for item in queue.next_items("u1", limit=2)] == ["rust", "python"]
+        assert queue.next_items("nobody") == []
+
+    def test_each_source_reads_its_index_in_order(self, queue):
+        params = {"user_id": "u1", "course_id": "spanish", "now": "2026-05-10 12:00:00", "limit": 5}
+        conn = queue.db._get_connection()
+        try:
+            for kind, sql in _SOURCES.items():
+                plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+                assert "USING INDEX" in plan and "TEMP B-TREE" not in plan, (kind, plan)
+        finally:
+            conn.close()
+
+    def test_same_day_topics_are_due_until_now(self, queue):
+        with sqlite3.connect(queue.db.db_path) as conn:
+            conn.executemany("INSERT INTO user_mastery (user_id, topic_id, mastery_level, next_review) VALUES (?, ?, ?, ?)", [
+                ("u1", "docker", 20, to_sql(NOW - timedelta(hours=4))),
+                ("u1", "linux", 20, to_sql(NOW + timedelta(hours=3))),    # Later today: not due yet
+            ])
+        items = queue.next_items("u1", limit=10, course_id="spanish")
+        assert [item.label for item in items] == ["rust", "python", "hola", "ser vs estar", "sql", "docker"]
+        assert items[-1].overdue_days == pytest.approx(4 / 24, abs=1e-3)
+
+    def test_route_returns_items(self, queue, monkeypatch):
+        routes = importlib.import_module("routes.learning")
+        monkeypatch.setattr(routes, "review_queue", queue)
+        result = asyncio.run(routes.get_review_queue("u1", limit=3, course_id="spanish"))
+        assert result["count"] == 3 and result["items"][2]["kind"] == "vocabulary"
+
+
+def test_interleaving_does_not_mutate_mastery():
+    mastery = {"python": {"mastery_level": 30, "ease_factor": 2.5, "interval": 1, "success_rate": 0.5,
+                          "total_attempts": 10, "next_review": "2026-05-01 09:00:00"}}
+    with use_clock(VirtualClock(NOW)):
+        selected = select_interleaved_topics(mastery, ["python", "sql", "git"])
+    assert list(mastery) == ["python"]
+    assert {topic["topic_id"] for topic in selected} <= {"python", "sql", "git"} and len(selected) >= 2
+
+
+@pytest.fixture
+def paris_tz(monkeypatch):
+    monkeypatch.setenv("TZ", "Europe/Paris")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_migration_converts_local_mastery_dates_to_utc(tmp_path, paris_tz):
+    path = str(tmp_path / "learning.db")
+    LearningDatabase(db_path=path)._get_connection().close()
+    with sqlite3.connect(path) as conn:
+        # Former writer: datetime.now().isoformat(), local time (UTC+2 in May)
+        conn.executemany("INSERT INTO user_mastery (user_id, topic_id, next_review, last_reviewed) VALUES (?, ?, ?, ?)", [
+            ("u1", "python", "2026-05-10T11:30:00.123456", "2026-05-09T10:00:00.5"),
+            ("u1", "sql", "2026-05-10 09:00:00", None),     # Already SQL UTC: untouched
+        ])
+        set_schema_version(conn, "learning", 8)
+
+    migrated = LearningDatabase(db_path=path)
+    migrated._get_connection().close()
+    with sqlite3.connect(path) as conn:
+        rows = dict((row[0], row[1:]) for row in conn.execute(
+            "SELECT topic_id, next_review, last_reviewed FROM user_mastery"))
+    assert rows == {"python": ("2026-05-10 09:30:00", "2026-05-09 08:00:00"),
+                    "sql": ("2026-05-10 09:00:00", None)}
+
+    # 11:30 Paris is due at 12:00 Paris the same day
+    with use_clock(VirtualClock(NOW)):
+        labels = [item.label for item in ReviewQueue(migrated).next_items("u1")]
+    assert labels == ["sql", "python"]
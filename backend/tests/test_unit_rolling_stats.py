@@ -0,0 +1,178 @@
+"""
+Unit tests for the incremental session statistics.
+Tests the rolling window and Welford primitives, and checks that the cognitive load
+detector and the engine's state assessment match a recompute from the full history.
+"""
+import importlib
+import random
+import statistics
+
+import pytest
+
+from utils.clock import VirtualClock
+from utils.cognitive_load import CognitiveLoadDetector
+from utils.rolling import RollingWindow, RunningStats
+
+
+def reference_indicators(history):
+    """Indicator values recomputed from the whole history (the pre-rolling implementation)."""
+    times = [r["response_time"] for r in history]
+    correct = [r["is_correct"] for r in history]
+    confidences = [r["confidence"] for r in history if r["confidence"] is not None]
+    expected = {}
+
+    if len(times) >= 5:
+        ratio = statistics.mean(times[-5:]) / max(statistics.mean(times[:5]), 1)
+        if ratio >= 1.5:
+            expected["response_time"] = ratio
+    if len(correct) >= 5:
+        error_rate = 1 - sum(correct[-5:]) / 5
+        if error_rate >= 0.6:
+            expected["error_rate"] = error_rate
+    if len(correct) >= 3 and not any(correct[-3:]):
+        last_10 = correct[-10:]
+        expected["consecutive_errors"] = len(last_10) - max((i + 1 for i, c in enumerate(last_10) if c), default=0)
+    if len(confidences) >= 5:
+        drop = statistics.mean(confidences[:5]) - statistics.mean(confidences[-3:])
+        if drop >= 0.3:
+            expected["confidence_drop"] = drop
+    if len(correct) >= 8:
+        last_8 = correct[-8:]
+        switches = sum(1 for i in range(1, 8) if last_8[i] != last_8[i - 1])
+        if switches >= 6:
+            expected["erratic_pattern"] = switches
+    return expected
+
+
+class TestRollingPrimitives:
+    """Test the ring buffer and the running statistics."""
+
+    def test_window_keeps_last_values_and_sum(self):
+        window = RollingWindow(3)
+        assert len(window) == 0 and window.mean() == 0.0 and window.last() is None
+
+        evicted = [window.append(v) for v in [4, 8, 15, 16, 23]]
+        assert evicted == [None, None, None, 4, 8]
+        assert list(window) == [15, 16, 23]
+        assert window.full and window.sum == 54 and window.mean() == 18 and window.last() == 23
+
+        with pytest.raises(ValueError):
+            RollingWindow(0)
+
+    def test_running_stats_match_statistics(self):
+        rng = random.Random(7)
+        values = [rng.uniform(2, 120) for _ in range(500)]
+        stats = RunningStats()
+        for value in values:
+            stats.add(value)
+
+        assert stats.count == 500
+        assert stats.mean == pytest.approx(statistics.mean(values))
+        assert stats.stdev == pytest.approx(statistics.stdev(values))
+
+        single = RunningStats()
+        single.add(3.0)
+        assert single.variance == 0.0
+
+
+class TestCognitiveLoadDetector:
+    """Test that the O(1) detector matches a full-history recompute."""
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_matches_full_history(self, seed):
+        rng = random.Random(seed)
+        detector = CognitiveLoadDetector(clock=VirtualClock())
+        history = []
+
+        for _ in range(300):
+            # Alternate calm and struggling phases so every indicator fires at some point
+            struggling = rng.random() < 0.4
+            response = {
+                "response_time": rng.randint(30, 150) if struggling else rng.randint(5, 40),
+                "is_correct": rng.random() < (0.3 if struggling else 0.8),
+                "confidence": None if rng.random() < 0.3 else rng.choice([0.1, 0.3, 0.5, 0.7, 0.9]),
+            }
+            history.append(response)
+            detector.add_response(response["response_time"], response["is_correct"], confidence=response["confidence"])
+
+            actual = {
+                ind.indicator_type: ind.value
+                for ind in detector.assess().indicators
+                if ind.indicator_type != "session_length"
+            }
+            expected = reference_indicators(history)
+            assert actual.keys() == expected.keys()
+            for name, value in expected.items():
+                assert actual[name] == pytest.approx(value)
+
+    def test_memory_is_bounded(self):
+        detector = CognitiveLoadDetector(clock=VirtualClock())
+        for i in range(5000):
+            detector.add_response(20 + i % 7, i % 3 != 0, confidence=0.5)
+
+        assert detector.response_count == 5000
+        assert not hasattr(detector, "responses")
+        sizes = [len(v._values) for v in vars(detector).values() if isinstance(v, RollingWindow)]
+        assert sizes and max(sizes) <= 10
+
+
+class TestEngineSessionWindows:
+    """Test the engine's rolling session windows against state["responses"]."""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        lean = importlib.import_module("learning_engine.learning_engine_lean")
+        return lean.LeanLearningEngine(db_path=str(tmp_path / "engine.db"), clock=VirtualClock())
+
+    @staticmethod
+    def reference_state(responses):
+        """Fatigue and flow fields recomputed by slicing the response list."""
+        fatigue, flow = "none", "below"
+        if len(responses) >= 10:
+            recent_10 = responses[-10:]
+            if sum(r["response_time"] for r in recent_10[5:]) > sum(r["response_time"] for r in recent_10[:5]) * 1.3:
+                fatigue = "early"
+        if fatigue == "none" and len(responses) >= 5:
+            recent_5 = responses[-5:]
+            if all(r["is_correct"] for r in recent_5[:-1]) and not recent_5[-1]["is_correct"]:
+                fatigue = "early"
+        recent_20 = responses[-20:]
+        if len(recent_20) >= 10:
+            accuracy = sum(r["is_correct"] for r in recent_20) / len(recent_20)
+            avg_difficulty = sum(r["difficulty"] for r in recent_20) / len(recent_20)
+            if 0.60 <= accuracy <= 0.80 and 2.5 <= avg_difficulty <= 4.5:
+                flow = "in_flow"
+            elif accuracy > 0.80:
+                flow = "below"
+            else:
+                flow = "above"
+        return fatigue, flow
+
+    def test_assessment_matches_response_history(self, engine):
+        rng = random.Random(11)
+        topics = ["python", "sql", "git"]
+
+        for _ in range(120):
+            engine.process_answer(
+                "u1", rng.choice(topics), rng.random() < 0.7, float(rng.randint(5, 90)), rng.randint(1, 5)
+            )
+            state = engine._get_user_state("u1")
+            responses = state["responses"]
+            if len(responses) < 5:
+                continue
+
+            user_state = engine._assess_user_state(state)
+            assert (user_state.fatigue_level, user_state.flow_state) == self.reference_state(responses)
+            correct = sum(r["is_correct"] for r in responses)
+            assert engine._get_overall_accuracy(state) == correct / len(responses)
+
+    def test_windows_follow_injected_and_reset_responses(self, engine):
+        state = engine._get_user_state("u2")
+        state["responses"] = [
+            {"topic_id": "python", "is_correct": i % 4 != 0, "response_time": 10, "difficulty": 3} for i in range(12)
+        ]
+        assert engine._get_overall_accuracy(state) == 9 / 12
+        assert engine.get_user_stats("u2")["recent_accuracy"] == 9 / 12
+
+        engine.reset_session("u2", save=False)
+        assert engine._get_overall_accuracy(engine._get_user_state("u2")) == 0.0
@@ -0,0 +1,175 @@
+"""
+Unit tests for the asyncio terminal transport.
+A socketpair stands in for the socket attached to the container.
+"""
+import asyncio
+import socket
+import threading
+
+from routes.terminal import IDLE_NOTICE, DockerTerminalSession, run_session
+
+
+class PairSession(DockerTerminalSession):
+    """Session whose 'container' is the other end of a socketpair."""
+
+    def start(self) -> str:
+        ours, self.peer = socket.socketpair()
+        self._attach(ours)
+        return ""
+
+    def stop(self):
+        super().stop()
+        self.peer.close()
+
+
+class FakeWebSocket:
+    """Minimal send_json/receive_json pair backed by asyncio queues."""
+
+    def __init__(self):
+        self.sent = []
+        self.inbox = asyncio.Queue()
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def receive_json(self):
+        return await self.inbox.get()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestReadFrames:
+    """Test output framing."""
+
+    def test_burst_is_coalesced_into_one_frame(self):
+        """Several small writes within the frame window should give one frame."""
+        async def scenario():
+            session = PairSession("burst")
+            session.start()
+            for part in (b"a", b"b", b"c"):
+                session.peer.sendall(part)
+            session.peer.close()
+            frames = [frame async for frame in session.read_frames(frame_interval=0.05)]
+            session.stop()
+            return frames
+
+        assert run(scenario()) == ["abc"]
+
+    def test_split_utf8_is_decoded(self):
+        """A multi-byte character split across frames should not be mangled."""
+        async def scenario():
+            session = PairSession("utf8")
+            session.start()
+            encoded = "é".encode()
+            loop = asyncio.get_running_loop()
+
+            session.peer.sendall(encoded[:1])
+            loop.call_later(0.05, session.peer.sendall, encoded[1:])
+            loop.call_later(0.1, session.peer.close)
+            frames = [frame async for frame in session.read_frames(frame_interval=0.001)]
+            session.stop()
+            return frames
+
+        assert "".join(run(scenario())) == "é"
+
+    def test_frames_respect_max_size(self):
+        """Large output should be split into frames of bounded size."""
+        async def scenario():
+            session = PairSession("big")
+            session.start()
+            session.peer.sendall(b"x" * 10_000)
+            session.peer.close()
+            frames = [frame async for frame in session.read_frames(frame_interval=0.01, max_frame_bytes=4096)]
+            session.stop()
+            return frames
+
+        frames = run(scenario())
+        assert "".join(frames) == "x" * 10_000
+        assert max(len(frame) for frame in frames) <= 4096
+
+
+class TestRunSession:
+    """Test the WebSocket <-> container bridge."""
+
+    def test_input_and_output_are_relayed(self):
+        """Client input should reach the container and its echo come back."""
+        async def scenario():
+            session = PairSession("echo")
+            session.start()
+            ws = FakeWebSocket()
+            task = asyncio.create_task(run_session(session, ws.send_json, ws.receive_json, idle_timeout=5))
+
+            await ws.inbox.put({"type": "input", "data": "ls\n"})
+            loop = asyncio.get_running_loop()
+            session.peer.setblocking(False)
+            received = await loop.sock_recv(session.peer, 64)
+            await loop.sock_sendall(session.peer, b"file.txt\r\n")
+            await asyncio.sleep(0.1)
+            session.peer.close()
+
+            reason = await task
+            session.stop()
+            return received, ws.sent, reason
+
+        received, sent, reason = run(scenario())
+        assert received == b"ls\n"
+        assert {"type": "output", "data": "file.txt\r\n"} in sent
+        assert reason == "exited"
+
+    def test_idle_session_is_reaped(self):
+        """A session without activity should end after the idle timeout."""
+        async def scenario():
+            session = PairSession("idle")
+            session.start()
+            ws = FakeWebSocket()
+            reason = await run_session(session, ws.send_json, ws.receive_json, idle_timeout=0.1)
+            session.stop()
+            return reason, ws.sent
+
+        reason, sent = run(scenario())
+        assert reason == "idle"
+        assert sent[-1] == {"type": "output", "data": IDLE_NOTICE}
+
+    def test_request_stop_ends_session(self):
+        """request_stop() should end the bridge without closing the socket under it."""
+        async def scenario():
+            session = PairSession("stop")
+            session.start()
+            ws = FakeWebSocket()
+            asyncio.get_running_loop().call_later(0.05, session.request_stop)
+            reason = await run_session(session, ws.send_json, ws.receive_json, idle_timeout=5)
+            session.stop()
+            return reason
+
+        assert run(scenario()) == "stopped"
+
+    def test_sessions_do_not_use_threads(self):
+        """Many concurrent sessions should not spawn one thread each."""
+        async def scenario():
+            sessions = [PairSession(f"s{i}") for i in range(200)]
+            for s in sessions:
+                s.start()
+            threads_before = threading.active_count()
+            websockets = [FakeWebSocket() for _ in sessions]
+            tasks = [
+                asyncio.create_task(run_session(s, ws.send_json, ws.receive_json, idle_timeout=5))
+                for s, ws in zip(sessions, websockets)
+            ]
+            await asyncio.sleep(0.05)
+            for s in sessions:
+                s.peer.sendall(b"ok")
+            await asyncio.sleep(0.1)
+            threads_during = threading.active_count()
+            for s in sessions:
+                s.peer.close()
+            reasons = await asyncio.gather(*tasks)
+            for s in sessions:
+                s.stop()
+            return threads_before, threads_during, reasons, websockets
+
+        before, during, reasons, websockets = run(scenario())
+        assert during == before
+        assert set(reasons) == {"exited"}
+        assert all({"type": "output", "data": "ok"} in ws.sent for ws in websockets)
@@ -0,0 +1,112 @@
+"""
+Unit tests for request tracing.
+Tests span accounting, method wrapping, the ASGI middleware and /health/perf data.
+"""
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils import tracing
+from utils.tracing import PerfRegistry, Trace, TracingMiddleware, span, trace_methods
+
+
+def parse_server_timing(header):
+    return {
+        part.split(";")[0].strip(): float(part.split("dur=")[1])
+        for part in header.split(",")
+    }
+
+
+class TestSpans:
+    """Test stage accounting."""
+
+    def test_self_time_per_stage(self):
+        """Child spans are deducted from their parent: stages add up to the total."""
+        trace = Trace("GET", "/x")
+        token = tracing._current_trace.set(trace)
+        try:
+            with span("engine.process_answer"):
+                time.sleep(0.01)
+                with span("db.engine.save_state"):
+                    time.sleep(0.02)
+        finally:
+            tracing._current_trace.reset(token)
+        trace.finish()
+        stages = trace.stages()
+
+        assert [s.name for s in trace.spans] == ["db.engine.save_state", "engine.process_answer"]
+        assert stages["db"] >= 20
+        assert 10 <= stages["engine"] < 20
+        assert abs(stages["db"] + stages["engine"] + stages["app"] - stages["total"]) < 0.01
+
+    def test_span_outside_request_is_noop(self):
+        with span("db.anything"):
+            pass
+        assert tracing.current_trace() is None
+
+    def test_trace_methods_wraps_public_methods(self):
+        @trace_methods("db.demo")
+        class Demo:
+            def get(self):
+                return self._helper()
+
+            def _helper(self):
+                return 42
+
+        trace = Trace("GET", "/x")
+        token = tracing._current_trace.set(trace)
+        try:
+            assert Demo().get() == 42
+        finally:
+            tracing._current_trace.reset(token)
+        assert [s.name for s in trace.spans] == ["db.demo.get"]
+
+
+class TestMiddleware:
+    """Test Server-Timing and the perf registry."""
+
+    def make_client(self, registry):
+        app = FastAPI()
+        app.add_middleware(TracingMiddleware, registry=registry)
+
+        @app.get("/items/{item_id}")
+        def get_item(item_id: str):
+            with span("db.items.get"):
+                time.sleep(0.005)
+            with span("llm.call_model"):
+                time.sleep(0.01)
+            return {"id": item_id}
+
+        return TestClient(app)
+
+    def test_server_timing_header(self):
+        client = self.make_client(PerfRegistry())
+        response = client.get("/items/abc")
+        timing = parse_server_timing(response.headers["server-timing"])
+
+        assert set(timing) == {"db", "llm", "app", "total"}
+        assert timing["db"] >= 5 and timing["llm"] >= 10
+
+    def test_registry_groups_routes_and_keeps_slow_requests(self):
+        registry = PerfRegistry(capacity=2, slow_ms=0)
+        client = self.make_client(registry)
+        for item in ("a", "b", "c"):
+            client.get(f"/items/{item}")
+        client.get("/unknown/path")
+        report = registry.report()
+
+        assert report["routes"]["GET /items/{item_id}"]["count"] == 3
+        assert report["routes"]["GET /items/{item_id}"]["stages_mean_ms"]["llm"] >= 10
+        assert "GET <unmatched>" in report["routes"]
+        # Ring buffer: newest first, capacity respected
+        assert [r["path"] for r in report["slow_requests"]] == ["/unknown/path", "/items/c"]
+        assert report["slow_requests"][1]["spans"][0]["name"] == "db.items.get"
+
+    def test_route_label_is_the_declared_template(self):
+        registry = PerfRegistry()
+        client = self.make_client(registry)
+        client.get("/items/items")  # Value equal to a path segment
+        client.get("/items/a%20b")  # Encoded value
+
+        assert set(registry.report()["routes"]) == {"GET /items/{item_id}"}
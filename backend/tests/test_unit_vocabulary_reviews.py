@@ -0,0 +1,104 @@
+"""
+Unit tests for batched vocabulary reviews (SM-2++).
+Tests that a batch schedules exactly like word-by-word reviews, repeated
+words within a batch, the statement count and the batch endpoint.
+"""
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from databases.learning_db import LearningDatabase, sm2_review
+from utils.clock import VirtualClock, use_clock
+from utils.metrics import add_statement_listener, remove_statement_listener
+
+NOW = datetime(2026, 5, 10, 12, 0)
+QUALITIES = [5, 4, 3, 2, 5, 0, 4, 5]
+
+
+def make_db(path):
+    db = LearningDatabase(db_path=str(path))
+    for i in range(len(QUALITIES)):
+        db.add_vocabulary_word("spanish", "u1", {"word": f"w{i}", "translation": "t"})
+    return db
+
+
+def words(db):
+    return {w["word"]: w for w in db.get_vocabulary("spanish", "u1")}
+
+
+@pytest.fixture
+def db(tmp_path):
+    with use_clock(VirtualClock(NOW)):
+        yield make_db(tmp_path / "learning.db")
+
+
+class TestBatchReviews:
+    """Test the batched SM-2 update."""
+
+    def test_batch_matches_one_by_one(self, db, tmp_path):
+        reference = make_db(tmp_path / "reference.db")
+        ids = {w["word"]: w["id"] for w in words(db).values()}
+        reviews = [(ids[f"w{i}"], q) for i, q in enumerate(QUALITIES)] * 3  # Three passes over the deck
+
+        for word_id, quality in reviews:
+            assert reference.update_vocabulary_review(str(word_id), quality)
+        schedule = db.update_vocabulary_reviews(reviews)
+
+        assert len(schedule) == len(reviews)
+        columns = ("ease_factor", "interval", "repetitions", "mastery_level", "next_review", "last_reviewed")
+        expected, actual = words(reference), words(db)
+        for word in expected:
+            assert {c: actual[word][c] for c in columns} == {c: expected[word][c] for c in columns}
+
+    def test_repeated_word_is_updated_in_order(self, db):
+        word_id = str(words(db)["w0"]["id"])
+        schedule = db.update_vocabulary_reviews([(word_id, 5), (word_id, 5), (word_id, 5)])
+        assert [item["interval"] for item in schedule] == [1, 6, int(6 * schedule[2]["ease_factor"])]
+        assert words(db)["w0"]["repetitions"] == 3
+
+    def test_one_read_and_one_write(self, db):
+        reviews = [(str(w["id"]), 4) for w in words(db).values()] + [("999", 5)]
+        statements = []
+        listener = lambda label, sql: statements.append(sql.strip())
+        add_statement_listener(listener)
+        try:
+            schedule = db.update_vocabulary_reviews(reviews)
+        finally:
+            remove_statement_listener(listener)
+
+        assert len(schedule) == len(QUALITIES) and "999" not in {item["word_id"] for item in schedule}
+        # One read, then the executemany rows inside a single transaction
+        verbs = [sql.split()[0] for sql in statements]
+        assert verbs == ["SELECT", "BEGIN"] + ["UPDATE"] * len(QUALITIES) + ["COMMIT"]
+        assert db.update_vocabulary_reviews([]) == []
+
+    def test_sm2_review(self):
+        assert sm2_review(2.5, 0, 0, 5) == (2.6, 1, 1, 40)
+        assert sm2_review(1.3, 6, 2, 0) == (1.3, 0, 0, 0)
+
+
+class TestBatchRoute:
+    """Test POST /vocabulary/submit-reviews."""
+
+    @pytest.fixture
+    def client(self, db, monkeypatch):
+        from routes import languages
+
+        monkeypatch.setattr(languages, "db", db)
+        app = FastAPI()
+        app.include_router(languages.router)
+        return TestClient(app)
+
+    def test_returns_new_schedule(self, client, db):
+        word_id = str(words(db)["w1"]["id"])
+        body = {"reviews": [{"word_id": word_id, "quality": 4}, {"word_id": "999", "quality": 3}]}
+        result = client.post("/api/languages/vocabulary/submit-reviews", json=body).json()
+
+        assert result["updated"] == 1 and result["missing"] == ["999"]
+        assert result["schedule"][0]["word_id"] == word_id and result["schedule"][0]["interval"] == 1
+        assert result["schedule"][0]["next_review"].startswith("2026-05-11")
+
+        bad = {"reviews": [{"word_id": word_id, "quality": 6}]}
+        assert client.post("/api/languages/vocabulary/submit-reviews", json=bad).status_code == 400
@@ -0,0 +1,141 @@
+"""
+⏱️ Clock - Horloge injectable (réelle ou virtuelle)
+
+Tout le code métier lit l'heure via ce module plutôt que `datetime.now()` :
+- En production : SystemClock, l'heure réelle
+- En simulation : VirtualClock, une heure qu'on avance à la main, sans sleep
+
+L'horloge courante est portée par une ContextVar : `use_clock()` la remplace
+pour un bloc (un test, une simulation) sans toucher aux autres threads/tâches.
+
+Usage:
+    from utils import clock
+
+    now = clock.now()
+
+    sim = clock.VirtualClock(datetime(2025, 1, 1, 9))
+    with clock.use_clock(sim):
+        engine.process_answer(...)   # horodaté le 1er janvier à 9h
+        sim.advance(days=3)
+        engine.process_answer(...)   # trois jours plus tard
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+
+# Format des colonnes TEXT comparées à datetime('now') en SQL
+SQL_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def to_sql(moment: datetime) -> str:
+    """
+    Heure de l'horloge (naïve, locale) -> texte UTC au format SQL.
+
+    SQLite stocke CURRENT_TIMESTAMP et calcule datetime('now') en UTC :
+    tout instant écrit ou comparé en SQL doit l'être aussi.
+    """
+    return moment.astimezone(timezone.utc).strftime(SQL_FORMAT)
+
+
+def from_sql(text: str) -> datetime:
+    """Texte SQL UTC (to_sql, CURRENT_TIMESTAMP) -> datetime naïf local, comme clock.now()."""
+    moment = datetime.fromisoformat(text)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone().replace(tzinfo=None)
+
+
+class Clock:
+    """Source de temps. Les sous-classes implémentent now()."""
+
+    def now(self) -> datetime:
+        raise NotImplementedError
+
+    def today(self) -> date:
+        return self.now().date()
+
+    def sql_now(self) -> str:
+        """Équivalent de datetime('now') pour les requêtes SQLite (UTC)."""
+        return to_sql(self.now())
+
+    def advance_to(self, moment: datetime) -> None:
+        """Avance jusqu'à `moment`. L'heure réelle avance toute seule : rien à faire."""
+
+
+class SystemClock(Clock):
+    """Heure réelle (locale, naïve, comme datetime.now())"""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def __repr__(self) -> str:
+        return "SystemClock()"
+
+
+class VirtualClock(Clock):
+    """
+    Heure virtuelle : figée entre deux appels à advance()/advance_to().
+
+    Le temps ne recule jamais : advance_to() vers le passé est ignoré, pour
+    qu'un événement en retard ne réécrive pas l'historique.
+    """
+
+    def __init__(self, start: Optional[datetime] = None):
+        self._now = start or datetime.now().replace(microsecond=0)
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance(self, **delta) -> datetime:
+        """Avance d'une durée (mêmes arguments que timedelta)."""
+        step = timedelta(**delta)
+        if step < timedelta(0):
+            raise ValueError("VirtualClock ne recule pas")
+        self._now += step
+        return self._now
+
+    def advance_to(self, moment: datetime) -> None:
+        if moment > self._now:
+            self._now = moment
+
+    def __repr__(self) -> str:
+        return f"VirtualClock({self._now.isoformat()})"
+
+
+SYSTEM_CLOCK = SystemClock()
+
+_current: ContextVar[Clock] = ContextVar("clock", default=SYSTEM_CLOCK)
+
+
+def get_clock() -> Clock:
+    """Horloge courante."""
+    return _current.get()
+
+
+def set_clock(clock: Optional[Clock]) -> None:
+    """Remplace l'horloge du contexte courant (None = heure réelle)."""
+    _current.set(clock or SYSTEM_CLOCK)
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    """Utilise `clock` le temps d'un bloc."""
+    token = _current.set(clock)
+    try:
+        yield clock
+    finally:
+        _current.reset(token)
+
+
+def now() -> datetime:
+    return _current.get().now()
+
+
+def today() -> date:
+    return _current.get().today()
+
+
+def sql_now() -> str:
+    return _current.get().sql_now()
@@ -18,8 +18,9 @@ Basé sur la recherche de Sweller (1988) et Paas (1992)
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
-from statistics import mean, stdev
-from collections import deque
+
+from .clock import Clock, get_clock
+from .rolling import RollingWindow
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -34,6 +35,8 @@ SESSION_FATIGUE_MINUTES = 25  # Après 25 min, suggérer une pause (Pomodoro)
 MAX_SESSION_MINUTES = 45  # Après 45 min, fortement recommander une pause
 CONSECUTIVE_ERRORS_ALERT = 3  # 3 erreurs consécutives = alerte
 CONFIDENCE_DROP_THRESHOLD = 0.3  # Chute de confiance de 30% = alerte
+ERRATIC_WINDOW = 8  # Alternances correct/incorrect comptées sur les 8 dernières réponses
+MAX_COUNTED_STREAK = 10  # Série d'erreurs plafonnée (valeur affichée)
 
 
 @dataclass
@@ -68,12 +71,20 @@ class CognitiveLoadDetector:
         assessment = detector.assess()
     """
 
-    def __init__(self, session_start: datetime = None):
-        self.session_start = session_start or datetime.now()
-        self.responses: List[Dict[str, Any]] = []
-        self.response_times: deque = deque(maxlen=20)  # Derniers 20 temps de réponse
-        self.correctness: deque = deque(maxlen=10)  # Dernières 10 réponses
-        self.confidences: deque = deque(maxlen=10)  # Dernières 10 confiances
+    def __init__(self, session_start: datetime = None, clock: Optional[Clock] = None):
+        self.clock = clock or get_clock()
+        self.session_start = session_start or self.clock.now()
+        # Fenêtres à somme courante : chaque check est en O(1), mémoire bornée
+        # quelle que soit la longueur de la session
+        self.response_count = 0
+        self.last_response: Optional[Dict[str, Any]] = None
+        self.recent_times = RollingWindow(5)
+        self.recent_correct = RollingWindow(ERROR_RATE_WINDOW)
+        self.recent_switches = RollingWindow(ERRATIC_WINDOW - 1)  # Changements correct/incorrect
+        self.error_streak = 0
+        self.confidence_count = 0
+        self.first_confidences = RollingWindow(5)
+        self.recent_confidences = RollingWindow(3)
         self.baseline_response_time: Optional[float] = None
         self.baseline_confidence: Optional[float] = None
 
@@ -86,37 +97,42 @@ class CognitiveLoadDetector:
         perceived_difficulty: str = None
     ):
         """Ajoute une réponse pour analyse"""
-        response = {
-            "timestamp": datetime.now(),
+        previous = self.last_response
+        self.last_response = {
+            "timestamp": self.clock.now(),
             "response_time": response_time,
             "is_correct": is_correct,
             "difficulty": difficulty,
             "confidence": confidence,
             "perceived_difficulty": perceived_difficulty
         }
-        self.responses.append(response)
-        self.response_times.append(response_time)
-        self.correctness.append(is_correct)
+        self.response_count += 1
+        self.recent_times.append(response_time)
+        self.recent_correct.append(1 if is_correct else 0)
+        if previous is not None:
+            self.recent_switches.append(1 if bool(is_correct) != bool(previous["is_correct"]) else 0)
+        self.error_streak = 0 if is_correct else self.error_streak + 1
 
         if confidence is not None:
-            self.confidences.append(confidence)
+            self.confidence_count += 1
+            self.recent_confidences.append(confidence)
+            if self.confidence_count <= 5:
+                self.first_confidences.append(confidence)
 
         # Établir baseline après 5 réponses
-        if len(self.response_times) == 5 and self.baseline_response_time is None:
-            self.baseline_response_time = mean(self.response_times)
+        if self.response_count == 5 and self.baseline_response_time is None:
+            self.baseline_response_time = self.recent_times.mean()
 
-        if len(self.confidences) == 5 and self.baseline_confidence is None:
-            self.baseline_confidence = mean(self.confidences)
+        if self.confidence_count == 5 and self.baseline_confidence is None:
+            self.baseline_confidence = self.first_confidences.mean()
 
     def _check_response_time(self) -> Optional[CognitiveLoadIndicator]:
         """Vérifie si les temps de réponse sont anormaux"""
-        if len(self.response_times) < 5:
+        if self.response_count < 5:
             return None
 
-        recent_times = list(self.response_times)[-5:]
-        recent_avg = mean(recent_times)
-
-        baseline = self.baseline_response_time or mean(list(self.response_times)[:5])
+        recent_avg = self.recent_times.mean()
+        baseline = self.baseline_response_time
 
         ratio = recent_avg / max(baseline, 1)
 
@@ -157,11 +173,10 @@ class CognitiveLoadDetector:
 
     def _check_error_rate(self) -> Optional[CognitiveLoadIndicator]:
         """Vérifie le taux d'erreur récent"""
-        if len(self.correctness) < ERROR_RATE_WINDOW:
+        if self.response_count < ERROR_RATE_WINDOW:
             return None
 
-        recent = list(self.correctness)[-ERROR_RATE_WINDOW:]
-        error_rate = 1 - (sum(recent) / len(recent))
+        error_rate = 1 - self.recent_correct.mean()
 
         if error_rate >= 0.8:
             return CognitiveLoadIndicator(
@@ -192,19 +207,8 @@ class CognitiveLoadDetector:
 
     def _check_consecutive_errors(self) -> Optional[CognitiveLoadIndicator]:
         """Vérifie les erreurs consécutives"""
-        if len(self.correctness) < CONSECUTIVE_ERRORS_ALERT:
-            return None
-
-        recent = list(self.correctness)[-CONSECUTIVE_ERRORS_ALERT:]
-
-        if not any(recent):  # Toutes fausses
-            streak = CONSECUTIVE_ERRORS_ALERT
-
-            # Compter la vraie streak
-            for i in range(len(self.correctness) - 1, -1, -1):
-                if list(self.correctness)[i]:
-                    break
-                streak = len(self.correctness) - i
+        if self.error_streak >= CONSECUTIVE_ERRORS_ALERT:
+            streak = min(self.error_streak, MAX_COUNTED_STREAK)
 
             if streak >= 5:
                 return CognitiveLoadIndicator(
@@ -235,7 +239,7 @@ class CognitiveLoadDetector:
 
     def _check_session_length(self) -> Optional[CognitiveLoadIndicator]:
         """Vérifie la durée de la session"""
-        session_minutes = (datetime.now() - self.session_start).seconds / 60
+        session_minutes = (self.clock.now() - self.session_start).seconds / 60
 
         if session_minutes >= MAX_SESSION_MINUTES:
             return CognitiveLoadIndicator(
@@ -258,10 +262,10 @@ class CognitiveLoadDetector:
 
     def _check_confidence_drop(self) -> Optional[CognitiveLoadIndicator]:
         """Vérifie la chute de confiance"""
-        if len(self.confidences) < 5 or self.baseline_confidence is None:
+        if self.confidence_count < 5 or self.baseline_confidence is None:
             return None
 
-        recent_confidence = mean(list(self.confidences)[-3:])
+        recent_confidence = self.recent_confidences.mean()
         drop = self.baseline_confidence - recent_confidence
 
         if drop >= 0.5:
@@ -285,11 +289,10 @@ class CognitiveLoadDetector:
 
     def _check_erratic_pattern(self) -> Optional[CognitiveLoadIndicator]:
         """Vérifie les patterns erratiques (alternance rapide correct/incorrect)"""
-        if len(self.correctness) < 8:
+        if self.response_count < ERRATIC_WINDOW:
             return None
 
-        recent = list(self.correctness)[-8:]
-        switches = sum(1 for i in range(1, len(recent)) if recent[i] != recent[i-1])
+        switches = int(self.recent_switches.sum)
 
         # Plus de 5 changements sur 8 = pattern erratique
         if switches >= 6:
@@ -362,7 +365,7 @@ class CognitiveLoadDetector:
             recommendation = "✅ Continuez, votre concentration est bonne"
 
         # Estimer le focus restant
-        session_minutes = (datetime.now() - self.session_start).seconds / 60
+        session_minutes = (self.clock.now() - self.session_start).seconds / 60
         base_focus = max(0, 45 - session_minutes)
 
         if overall_load == "overload":
@@ -397,8 +400,8 @@ class CognitiveLoadDetector:
             return "easier"
 
         # Si optimal et bon taux de réussite, peut augmenter
-        if assessment.overall_load == "optimal" and len(self.correctness) >= 5:
-            recent_success = sum(list(self.correctness)[-5:]) / 5
+        if assessment.overall_load == "optimal" and self.response_count >= 5:
+            recent_success = self.recent_correct.mean()
             if recent_success >= 0.8:
                 return "harder"
 
@@ -20,6 +20,8 @@ from dataclasses import dataclass
 from math import exp, log, pow
 import json
 
+from . import clock
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONSTANTES FSRS (paramètres optimisés sur 500M+ reviews)
@@ -59,6 +61,17 @@ class Rating:
     EASY = 4   # Trop facile
 
 
+def rating_from_response(is_correct: bool, response_time: float) -> int:
+    """Rating FSRS déduit d'une réponse QCM (justesse + temps en secondes)"""
+    if not is_correct:
+        return Rating.AGAIN
+    if response_time < 10:
+        return Rating.EASY
+    if response_time < 30:
+        return Rating.GOOD
+    return Rating.HARD
+
+
 @dataclass
 class FSRSCard:
     """État d'une carte FSRS"""
@@ -234,7 +247,7 @@ class FSRS:
         Returns:
             (new_card, interval_days)
         """
-        now = now or datetime.now()
+        now = now or clock.now()
 
         # Calcul du temps écoulé
         if card.last_review:
@@ -407,7 +420,7 @@ def fsrs_calculate_next_review(
     new_card, interval = fsrs.review(card, rating)
 
     # Date de prochaine révision
-    next_review = datetime.now() + timedelta(days=interval)
+    next_review = clock.now() + timedelta(days=interval)
 
     return new_card.to_dict(), interval, next_review
 
@@ -604,6 +617,7 @@ __all__ = [
     "fsrs_determine_difficulty",
     "convert_quality_to_rating",
     "convert_response_to_rating",
+    "rating_from_response",
     "estimate_retention_at_time",
     "get_optimal_review_time",
     "optimize_parameters_for_user",
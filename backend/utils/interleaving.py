@@ -12,6 +12,8 @@ Stratégie:
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime, timedelta
 
+from . import clock
+
 
 def select_interleaved_topics(
     user_mastery: Dict[str, Any],
@@ -39,34 +41,26 @@ def select_interleaved_topics(
         Liste de topics avec leurs métadonnées triées par priorité
     """
     
-    # Initialiser les topics manquants
-    for topic_id in available_topics:
-        if topic_id not in user_mastery:
-            user_mastery[topic_id] = {
-                "mastery_level": 0,
-                "ease_factor": 2.5,
-                "interval": 1,
-                "repetitions": 0,
-                "success_rate": 0.0,
-                "consecutive_skips": 0,
-                "total_attempts": 0,
-                "correct_attempts": 0,
-                "last_practiced": None,
-                "next_review": datetime.now()
-            }
-    
+    # Topics jamais pratiqués : valeurs par défaut (sans modifier user_mastery)
+    default_data = {
+        "mastery_level": 0,
+        "ease_factor": 2.5,
+        "interval": 1,
+        "success_rate": 0.0,
+        "total_attempts": 0,
+    }
+
     # Récupérer les topics avec métadonnées
     topics_with_data = []
-    now = datetime.now()
-    
-    for topic_id, data in user_mastery.items():
-        if topic_id not in available_topics:
-            continue
-            
+    now = clock.now()
+
+    for topic_id in dict.fromkeys(available_topics):
+        data = user_mastery.get(topic_id, default_data)
+
         # Calculer la priorité de révision
-        next_review = data.get("next_review", now)
+        next_review = data.get("next_review") or now
         if isinstance(next_review, str):
-            next_review = datetime.fromisoformat(next_review)
+            next_review = clock.from_sql(next_review)
         
         days_until_review = (next_review - now).days
         
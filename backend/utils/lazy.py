@@ -0,0 +1,43 @@
+"""
+⏳ Lazy - Import différé des dépendances lourdes
+
+Le backend démarre avec le shell desktop (Tauri) qui l'attend : chaque import
+coûteux fait à l'import de main.py se voit à l'écran. Mesuré ici :
+openai ~0,7 s, docker ~0,13 s.
+
+lazy_import() rend le module tout de suite et ne l'exécute qu'au premier
+accès à un attribut (recette importlib.util.LazyLoader de la stdlib).
+Les usages restent inchangés :
+
+    openai = lazy_import("openai")
+
+    try:
+        ...
+    except openai.RateLimitError:   # le SDK n'est chargé qu'ici
+        ...
+
+Attention : lire un attribut au chargement du module (décorateur, valeur par
+défaut) charge le module immédiatement et annule le gain.
+"""
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Module `name`, exécuté au premier accès à l'un de ses attributs."""
+    with _lock:
+        if name in sys.modules:
+            return sys.modules[name]
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
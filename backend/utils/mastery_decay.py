@@ -13,6 +13,8 @@ from typing import List, Dict, Any
 import math
 import logging
 
+from . import clock
+
 logger = logging.getLogger(__name__)
 
 
@@ -131,7 +133,7 @@ def apply_decay_to_concepts(
         Nombre de concepts dont la mastery a été mise à jour
     """
     if current_date is None:
-        current_date = datetime.now()
+        current_date = clock.now()
     
     updated_concepts = []
     stats = {
@@ -232,7 +234,7 @@ def get_concepts_needing_review(
     2. Importance du concept (times_referenced)
     3. Niveau de maîtrise actuel
     """
-    current_date = datetime.now()
+    current_date = clock.now()
     
     scored_concepts = []
     
@@ -0,0 +1,421 @@
+"""
+📈 Metrics - Compteurs et histogrammes au format Prometheus
+
+Là où /health/* renvoie des stats JSON ad hoc, ce module expose des séries
+agrégées depuis le démarrage, lisibles par Prometheus / Grafana sur /metrics :
+- Counter : total monotone (requêtes SQL, connexions ouvertes, appels LLM...)
+- Gauge : valeur instantanée
+- Histogram : distribution en buckets (latences)
+- Collecteurs : fonctions appelées au scrape, pour exposer des stats déjà
+  tenues ailleurs (cache de contenu, pool de containers) sans coût par appel
+
+Coût dans le chemin chaud : un incrément ou un observe = un lock non contesté
+et, pour l'histogramme, une recherche dichotomique dans les buckets (< 1 µs).
+Lier les labels une fois (metric.labels(...)) au chargement du module évite
+même la recherche du label à chaque appel.
+
+Usage:
+    from utils.metrics import Counter, ENGINE_DURATION, timed
+
+    SYNCS = Counter("withings_syncs_total", "Synchronisations Withings", ["outcome"])
+    SYNCS.labels("ok").inc()
+
+    @timed(ENGINE_DURATION.labels("process_answer"))
+    def process_answer(...): ...
+"""
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latences de quelques µs (moteur) à quelques dizaines de secondes (LLM, code)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+@dataclass
+class MetricFamily:
+    """Une métrique et ses échantillons, telle que rendue au scrape."""
+    name: str
+    kind: str  # counter, gauge, histogram
+    help: str
+    # (suffixe du nom, labels, valeur)
+    samples: List[Tuple[str, Dict[str, str], float]] = field(default_factory=list)
+
+    def add(self, value: float, suffix: str = "", **labels):
+        self.samples.append((suffix, labels, value))
+        return self
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render(families: Iterable[MetricFamily]) -> str:
+    """Format d'exposition texte Prometheus 0.0.4."""
+    lines = []
+    for family in families:
+        help_text = family.help.replace("\\", "\\\\").replace("\n", "\\n")
+        lines.append(f"# HELP {family.name} {help_text}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for suffix, labels, value in family.samples:
+            if labels:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{family.name}{suffix}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{family.name}{suffix} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class _Metric:
+    """Base commune : nom, aide, labels et enfants par valeurs de labels."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: "Registry" = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        """Série pour ces valeurs de labels (créée au premier appel)."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: labels attendus {self.labelnames}, reçu {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name}: labels requis {self.labelnames}")
+        return self._children[()]
+
+    def _labeled(self) -> List[Tuple[Dict[str, str], object]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in sorted(items)]
+
+    def collect(self) -> MetricFamily:
+        raise NotImplementedError
+
+
+class _Value:
+    """Valeur scalaire thread-safe (enfant de Counter / Gauge)."""
+
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = float(value)
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Counter(_Metric):
+    """Total monotone depuis le démarrage (suffixe _total par convention)."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Un compteur ne peut que croître")
+        self._default().inc(amount)
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.kind, self.documentation)
+        for labels, child in self._labeled():
+            family.add(child.value, **labels)
+        return family
+
+
+class Gauge(Counter):
+    """Valeur instantanée, peut monter et descendre."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+    def set(self, value: float):
+        self._default().set(value)
+
+
+class _HistogramValue:
+    """Comptes par bucket (non cumulés), somme et nombre d'observations."""
+
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)  # Dernier = +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class Histogram(_Metric):
+    """Distribution d'observations (secondes pour les latences)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: "Registry" = None):
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.kind, self.documentation)
+        for labels, child in self._labeled():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                family.add(cumulative, "_bucket", **labels, le=_format_value(bound))
+            family.add(total, "_sum", **labels)
+            family.add(cumulative, "_count", **labels)
+        return family
+
+
+class Registry:
+    """Métriques déclarées et collecteurs appelés au scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrique déjà déclarée : {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        """Ajoute une fonction qui renvoie des MetricFamily à chaque scrape."""
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+
+    def collect(self) -> List[MetricFamily]:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+            collectors = list(self._collectors)
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                # Un collecteur en panne ne doit pas casser tout le scrape
+                continue
+        return families
+
+    def render(self) -> str:
+        return render(self.collect())
+
+
+REGISTRY = Registry()
+
+
+def timed(histogram_child) -> Callable:
+    """Décorateur : observe la durée de chaque appel (exceptions comprises) en secondes."""
+    observe = histogram_child.observe
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class _LazyChild:
+    """Série créée à la première observation (pas de séries vides au scrape)."""
+
+    __slots__ = ("_metric", "_labels", "_child")
+
+    def __init__(self, metric: _Metric, labels: Tuple[str, ...]):
+        self._metric = metric
+        self._labels = labels
+        self._child = None
+
+    def observe(self, value: float):
+        if self._child is None:
+            self._child = self._metric.labels(*self._labels)
+        self._child.observe(value)
+
+
+def time_methods(histogram: Histogram, *labels: str) -> Callable[[type], type]:
+    """
+    Décorateur de classe : chaque méthode publique est chronométrée dans
+    histogram.labels(*labels, nom_de_la_méthode).
+    """
+    def decorator(cls: type) -> type:
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not callable(value) or isinstance(value, (staticmethod, classmethod, type)):
+                continue
+            setattr(cls, attr, timed(_LazyChild(histogram, labels + (attr,)))(value))
+        return cls
+    return decorator
+
+
+# ═══════════════════════════════════════════════════════════════
+# MÉTRIQUES PARTAGÉES
+# ═══════════════════════════════════════════════════════════════
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requêtes HTTP par route et statut", ["method", "route", "status"])
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "Durée des requêtes HTTP", ["method", "route"])
+
+DB_CONNECTIONS = Counter(
+    "db_connections_opened_total", "Connexions SQLite ouvertes", ["db"])
+DB_QUERIES = Counter(
+    "db_queries_total", "Instructions SQL exécutées", ["db"])
+DB_OPERATION_DURATION = Histogram(
+    "db_operation_duration_seconds", "Durée des opérations des managers de base", ["db", "operation"])
+
+LLM_REQUESTS = Counter(
+    "llm_requests_total", "Appels au modèle (chaque tentative) par issue", ["model", "outcome"])
+LLM_DURATION = Histogram(
+    "llm_request_duration_seconds", "Latence des appels au modèle réussis", ["model"])
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Tokens consommés", ["model", "direction"])
+LLM_COST = Counter(
+    "llm_cost_usd_total", "Coût estimé des appels au modèle (USD)", ["model"])
+LLM_FALLBACKS = Counter(
+    "llm_fallbacks_total", "Bascules vers le tier rapide après échec", ["from_model"])
+
+ENGINE_DURATION = Histogram(
+    "engine_operation_duration_seconds", "Durée des calculs du moteur d'apprentissage", ["operation"])
+ENGINE_ANSWERS = Counter(
+    "engine_answers_total", "Réponses traitées par le moteur", ["correct"])
+
+CODE_EXECUTIONS = Counter(
+    "code_executions_total", "Exécutions de code par langage et issue", ["language", "outcome"])
+CODE_EXECUTION_DURATION = Histogram(
+    "code_execution_duration_seconds", "Durée d'exécution du code utilisateur", ["language"])
+CODE_BUILD_DURATION = Histogram(
+    "code_build_duration_seconds", "Durée de compilation (artefact en cache ou non)", ["language", "cached"])
+
+
+# Observateurs (db, sql) des instructions SQL : outils de diagnostic
+# (benchmarks/query_plans). Vide en production : coût d'une boucle vide.
+_statement_listeners: List[Callable[[str, str], None]] = []
+
+
+def add_statement_listener(listener: Callable[[str, str], None]):
+    _statement_listeners.append(listener)
+
+
+def remove_statement_listener(listener: Callable[[str, str], None]):
+    if listener in _statement_listeners:
+        _statement_listeners.remove(listener)
+
+
+def count_queries(conn, db: str):
+    """Compte chaque instruction SQL exécutée sur cette connexion."""
+    DB_CONNECTIONS.labels(db).inc()
+    queries = DB_QUERIES.labels(db)
+
+    def trace(statement: str):
+        queries.inc()
+        for listener in _statement_listeners:
+            listener(db, statement)
+
+    conn.set_trace_callback(trace)
+    return conn
+
+
+def stats_collector(prefix: str, documentation: str, get_stats: Callable[[], Dict],
+                    counters: Sequence[str] = (), gauges: Sequence[str] = (),
+                    label: str = "key") -> Callable[[], List[MetricFamily]]:
+    """
+    Collecteur qui expose les clés d'un dict de stats existant (get_stats()).
+
+    Les valeurs dict ({"python": 2}) deviennent une série par clé (label `label`).
+    """
+    def collect() -> List[MetricFamily]:
+        stats = get_stats()
+        families = []
+        for kind, keys in (("counter", counters), ("gauge", gauges)):
+            for key in keys:
+                if key not in stats:
+                    continue
+                name = f"{prefix}_{key}_total" if kind == "counter" else f"{prefix}_{key}"
+                family = MetricFamily(name, kind, f"{documentation} ({key})")
+                value = stats[key]
+                if isinstance(value, dict):
+                    for name_, item in sorted(value.items()):
+                        family.add(item, **{label: name_})
+                else:
+                    family.add(value)
+                families.append(family)
+        return families
+    return collect
@@ -7,6 +7,7 @@ Améliorations par rapport à v1:
 2. Calibration personnalisée par utilisateur
 3. Desirable Difficulty (Bjork, 2011)
 4. Tracking de la confiance subjective
+5. Calibrations persistées (SQLite, chargement à la demande, cache LRU)
 
 Références scientifiques:
 - Bjork, R.A. (2011) - "Desirable difficulties perspective on learning"
@@ -15,13 +16,26 @@ Références scientifiques:
 - Dunlosky et al. (2013) - "Improving students' learning"
 """
 
+import atexit
 import logging
+import sqlite3
+import struct
+import sys
+import threading
+from array import array
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field
 from enum import IntEnum
 import math
 
+from config import settings
+from databases.schema import Migration, SchemaGuard
+from . import clock
+from .metrics import count_queries
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,6 +63,82 @@ LEGACY_TO_LEVEL = {
     "hard": DifficultyLevel.HARD
 }
 
+DB_PATH = Path(settings.DATA_DIR) / "learning.db"
+
+HISTORY_SIZE = 50  # Tentatives gardées par niveau
+CONFIDENCE_WINDOW = 30  # Réponses utilisées pour le biais de confiance
+TIME_SCALE = 10  # Temps de réponse stockés en dixièmes de seconde
+CONFIDENCE_SCALE = 1000  # Confiance stockée en pour-mille
+LEARNING_STYLES = ("cautious", "balanced", "aggressive")
+
+
+class PackedRing:
+    """
+    Les `size` derniers couples (réussite, valeur) en tableaux compacts.
+
+    Réussites en bits (bytearray), valeurs en uint16 (valeur × scale, bornée) :
+    50 tentatives tiennent en ~107 octets au lieu de 50 dicts avec datetime.
+    """
+
+    __slots__ = ("size", "scale", "count", "_bits", "_values")
+
+    def __init__(self, size: int, scale: int):
+        self.size = size
+        self.scale = scale
+        self.count = 0  # Total ajouté depuis la création (ou le chargement)
+        self._bits = bytearray((size + 7) // 8)
+        self._values = array("H", [0]) * size
+
+    def append(self, is_correct: bool, value: float):
+        i = self.count % self.size
+        if is_correct:
+            self._bits[i >> 3] |= 1 << (i & 7)
+        else:
+            self._bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+        self._values[i] = min(0xFFFF, max(0, round(value * self.scale)))
+        self.count += 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.size)
+
+    def _recent(self, window: Optional[int]) -> range:
+        n = len(self) if window is None else min(window, len(self))
+        return range(self.count - n, self.count)
+
+    def correct_count(self, window: Optional[int] = None) -> int:
+        """Réussites parmi les `window` dernières entrées (toutes si None)."""
+        return sum((self._bits[(i % self.size) >> 3] >> ((i % self.size) & 7)) & 1 for i in self._recent(window))
+
+    def value_sum(self, window: Optional[int] = None) -> float:
+        return sum(self._values[i % self.size] for i in self._recent(window)) / self.scale
+
+    def to_bytes(self) -> bytes:
+        """Entrées présentes, de la plus ancienne à la plus récente."""
+        positions = [i % self.size for i in self._recent(None)]
+        bits = bytearray((len(positions) + 7) // 8)
+        for k, i in enumerate(positions):
+            if (self._bits[i >> 3] >> (i & 7)) & 1:
+                bits[k >> 3] |= 1 << (k & 7)
+        values = array("H", (self._values[i] for i in positions))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return struct.pack("<H", len(positions)) + bytes(bits) + values.tobytes()
+
+    @classmethod
+    def from_bytes(cls, size: int, scale: int, data: memoryview) -> Tuple["PackedRing", int]:
+        """Relit un ring ; retourne (ring, octets consommés)."""
+        ring = cls(size, scale)
+        (n,) = struct.unpack_from("<H", data)
+        offset = 2 + (n + 7) // 8
+        values = array("H")
+        values.frombytes(bytes(data[offset:offset + 2 * n]))
+        if sys.byteorder == "big":
+            values.byteswap()
+        for k in range(n):
+            ring.append((data[2 + (k >> 3)] >> (k & 7)) & 1, 0)
+            ring._values[k % size] = values[k]
+        return ring, offset + 2 * n
+
 
 @dataclass
 class UserCalibration:
@@ -79,9 +169,9 @@ class UserCalibration:
         5: (0.45, 0.55),  # EXPERT: 45-55% (challenging)
     })
 
-    # Historique des performances par niveau
-    performance_history: Dict[int, List[Dict]] = field(default_factory=lambda: {
-        1: [], 2: [], 3: [], 4: [], 5: []
+    # Historique des performances par niveau (50 dernières tentatives)
+    performance_history: Dict[int, PackedRing] = field(default_factory=lambda: {
+        level: PackedRing(HISTORY_SIZE, TIME_SCALE) for level in range(1, 6)
     })
 
     # Facteur de "desirable difficulty" (0-1)
@@ -92,34 +182,24 @@ class UserCalibration:
     learning_style: str = "balanced"  # "cautious", "balanced", "aggressive"
 
     # Dernière calibration
-    last_calibration: datetime = field(default_factory=datetime.now)
+    last_calibration: datetime = field(default_factory=clock.now)
     calibration_count: int = 0
 
     def record_attempt(self, level: int, is_correct: bool, response_time: float,
                        confidence: Optional[float] = None):
-        """Enregistre une tentative pour calibration"""
+        """Enregistre une tentative pour calibration (la confiance est suivie par ConfidenceTracker)"""
         if level not in self.performance_history:
-            self.performance_history[level] = []
-
-        self.performance_history[level].append({
-            "timestamp": datetime.now(),
-            "is_correct": is_correct,
-            "response_time": response_time,
-            "confidence": confidence
-        })
+            self.performance_history[level] = PackedRing(HISTORY_SIZE, TIME_SCALE)
 
-        # Garder seulement les 50 dernières tentatives par niveau
-        if len(self.performance_history[level]) > 50:
-            self.performance_history[level] = self.performance_history[level][-50:]
+        self.performance_history[level].append(is_correct, response_time)
 
     def get_success_rate(self, level: int, window: int = 20) -> Optional[float]:
         """Calcule le success rate récent pour un niveau"""
-        history = self.performance_history.get(level, [])
-        if len(history) < 3:
+        history = self.performance_history.get(level)
+        if history is None or len(history) < 3:
             return None
 
-        recent = history[-window:]
-        return sum(1 for h in recent if h["is_correct"]) / len(recent)
+        return history.correct_count(window) / min(window, len(history))
 
     def recalibrate(self):
         """
@@ -156,7 +236,7 @@ class UserCalibration:
         self._detect_learning_style()
 
         if adjustments_made:
-            self.last_calibration = datetime.now()
+            self.last_calibration = clock.now()
             self.calibration_count += 1
 
     def _detect_learning_style(self):
@@ -177,6 +257,42 @@ class UserCalibration:
                 self.learning_style = "balanced"
                 self.desirable_difficulty_factor = 0.3
 
+    _HEADER = struct.Struct("<B5fdBId")  # version, seuils, facteur DD, style, nb calibrations, date
+    _VERSION = 1
+
+    def to_bytes(self) -> bytes:
+        """Forme compacte persistée (seuils, style et historiques ; cibles = constantes)."""
+        header = self._HEADER.pack(
+            self._VERSION,
+            *(self.mastery_thresholds[level] for level in range(1, 6)),
+            self.desirable_difficulty_factor,
+            LEARNING_STYLES.index(self.learning_style),
+            self.calibration_count,
+            self.last_calibration.timestamp(),
+        )
+        return header + b"".join(self.performance_history[level].to_bytes() for level in range(1, 6))
+
+    @classmethod
+    def from_bytes(cls, user_id: str, data: memoryview) -> Tuple["UserCalibration", int]:
+        """Relit une calibration ; retourne (calibration, octets consommés)."""
+        version, t1, t2, t3, t4, t5, factor, style, count, last = cls._HEADER.unpack_from(data)
+        if version != cls._VERSION:
+            raise ValueError(f"unsupported calibration format v{version}")
+        calibration = cls(
+            user_id=user_id,
+            mastery_thresholds={1: t1, 2: t2, 3: t3, 4: t4, 5: t5},
+            desirable_difficulty_factor=factor,
+            learning_style=LEARNING_STYLES[style],
+            last_calibration=datetime.fromtimestamp(last),
+            calibration_count=count,
+        )
+        offset = cls._HEADER.size
+        for level in range(1, 6):
+            ring, used = PackedRing.from_bytes(HISTORY_SIZE, TIME_SCALE, data[offset:])
+            calibration.performance_history[level] = ring
+            offset += used
+        return calibration, offset
+
 
 @dataclass
 class ConfidenceTracker:
@@ -187,8 +303,8 @@ class ConfidenceTracker:
     sont plus informatives et devraient impacter plus l'apprentissage.
     """
 
-    # Historique: (confidence, is_correct, impact_multiplier)
-    history: List[Dict] = field(default_factory=list)
+    # Dernières réponses: (is_correct, confidence)
+    history: PackedRing = field(default_factory=lambda: PackedRing(CONFIDENCE_WINDOW, CONFIDENCE_SCALE))
 
     # Calibration de la confiance (overconfidence vs underconfidence)
     confidence_bias: float = 0.0  # Positif = overconfident, négatif = underconfident
@@ -201,35 +317,7 @@ class ConfidenceTracker:
             confidence: 0.0 (pas sûr) à 1.0 (certain)
             is_correct: Réponse correcte?
         """
-        # Calculer l'impact multiplier
-        # Erreur avec haute confiance = très informatif (hypercorrection)
-        # Succès avec basse confiance = encourageant
-
-        if is_correct:
-            if confidence < 0.3:
-                impact = 1.5  # "Tu savais plus que tu croyais!"
-            elif confidence > 0.8:
-                impact = 1.0  # Normal
-            else:
-                impact = 1.2
-        else:
-            if confidence > 0.8:
-                impact = 2.0  # Hypercorrection effect - très important
-            elif confidence < 0.3:
-                impact = 0.8  # "Tu savais que tu ne savais pas"
-            else:
-                impact = 1.3
-
-        self.history.append({
-            "timestamp": datetime.now(),
-            "confidence": confidence,
-            "is_correct": is_correct,
-            "impact_multiplier": impact
-        })
-
-        # Garder les 100 dernières
-        if len(self.history) > 100:
-            self.history = self.history[-100:]
+        self.history.append(is_correct, confidence)
 
         # Mettre à jour le biais
         self._update_bias()
@@ -239,11 +327,10 @@ class ConfidenceTracker:
         if len(self.history) < 10:
             return
 
-        recent = self.history[-30:]
-
-        # Comparer confiance moyenne avec success rate réel
-        avg_confidence = sum(h["confidence"] for h in recent) / len(recent)
-        actual_success = sum(1 for h in recent if h["is_correct"]) / len(recent)
+        # Comparer confiance moyenne avec success rate réel (30 dernières)
+        n = len(self.history)
+        avg_confidence = self.history.value_sum() / n
+        actual_success = self.history.correct_count() / n
 
         self.confidence_bias = avg_confidence - actual_success
 
@@ -282,6 +369,157 @@ class ConfidenceTracker:
                 return "❌ Pas grave, on révise et on continue."
 
 
+class CalibrationStore:
+    """
+    Calibrations et trackers de confiance persistés dans SQLite.
+
+    - Chargés à la demande (premier accès d'un utilisateur), pas au démarrage
+    - Cache LRU borné : au-delà de max_users, le moins récent est évincé
+      (écrit d'abord s'il a été modifié)
+    - Write-behind : une réponse marque l'utilisateur modifié ; les écritures
+      sont groupées toutes les flush_every réponses, à l'éviction et à l'arrêt
+    - Les objets modifiés sont gardés avec la marque : une entrée évincée entre
+      la lecture et mark_dirty est quand même écrite (et remise en cache)
+    """
+
+    def __init__(self, db_path: str = None, max_users: int = None, flush_every: int = None):
+        self.db_path = db_path or str(DB_PATH)
+        self.max_users = max_users or settings.CALIBRATION_CACHE_MAX_USERS
+        self.flush_every = flush_every or settings.CALIBRATION_FLUSH_EVERY
+
+        # user_id -> (calibration, tracker), ordre = récence d'accès
+        self._entries: "OrderedDict[str, Tuple[UserCalibration, ConfidenceTracker]]" = OrderedDict()
+        # user_id -> objets modifiés à écrire (même évincés du cache entre-temps)
+        self._dirty: Dict[str, Tuple[UserCalibration, ConfidenceTracker]] = {}
+        self._pending = 0
+        self._lock = threading.RLock()
+        self._exit_hook = False
+
+        # Table créée au premier accès, pas à la construction
+        self._schema = SchemaGuard(
+            "difficulty_calibration", [Migration(1, "table difficulty_calibrations", self._create_table)]
+        )
+
+    @staticmethod
+    def _create_table(conn: sqlite3.Connection):
+        """Table des calibrations (migration 1)"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS difficulty_calibrations (
+                user_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._schema.ensure(self.db_path)
+        return count_queries(sqlite3.connect(self.db_path), "difficulty")
+
+    @staticmethod
+    def encode(calibration: UserCalibration, tracker: ConfidenceTracker) -> bytes:
+        return calibration.to_bytes() + tracker.history.to_bytes()
+
+    @staticmethod
+    def decode(user_id: str, data: bytes) -> Tuple[UserCalibration, ConfidenceTracker]:
+        view = memoryview(data)
+        calibration, offset = UserCalibration.from_bytes(user_id, view)
+        tracker = ConfidenceTracker()
+        tracker.history, _ = PackedRing.from_bytes(CONFIDENCE_WINDOW, CONFIDENCE_SCALE, view[offset:])
+        tracker._update_bias()
+        return calibration, tracker
+
+    def get(self, user_id: str) -> Tuple[UserCalibration, ConfidenceTracker]:
+        """Calibration et tracker d'un utilisateur (chargés ou créés au premier accès)"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                return entry
+
+            # Modifications pas encore écrites (écriture à l'éviction échouée) avant la base
+            entry = (
+                self._dirty.get(user_id)
+                or self._load(user_id)
+                or (UserCalibration(user_id=user_id), ConfidenceTracker())
+            )
+            self._insert(user_id, entry)
+            return entry
+
+    def _insert(self, user_id: str, entry: Tuple[UserCalibration, ConfidenceTracker]):
+        """Met en cache (le plus récent) et écrit les entrées modifiées évincées"""
+        self._entries[user_id] = entry
+        self._entries.move_to_end(user_id)
+
+        evicted = []
+        while len(self._entries) > self.max_users:
+            old_id, _ = self._entries.popitem(last=False)
+            if old_id in self._dirty:
+                evicted.append((old_id, self._dirty.pop(old_id)))
+        if evicted:
+            self._write(evicted)
+
+    def _load(self, user_id: str) -> Optional[Tuple[UserCalibration, ConfidenceTracker]]:
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT data FROM difficulty_calibrations WHERE user_id = ?", (user_id,)
+                ).fetchone()
+            finally:
+                conn.close()
+            return self.decode(user_id, row[0]) if row else None
+        except (sqlite3.Error, ValueError, struct.error) as e:
+            logger.error(f"❌ Erreur chargement calibration {user_id}: {e}")
+            return None
+
+    def mark_dirty(self, user_id: str, calibration: UserCalibration, tracker: ConfidenceTracker):
+        """Note une modification ; écrit les calibrations modifiées toutes les flush_every réponses"""
+        with self._lock:
+            entry = (calibration, tracker)
+            cached = self._entries.get(user_id)
+            if cached is None or cached[0] is not calibration or cached[1] is not tracker:
+                # Évincée (ou rechargée) pendant la modification : ces objets font foi
+                self._insert(user_id, entry)
+            self._dirty[user_id] = entry
+            self._pending += 1
+            if not self._exit_hook:
+                atexit.register(self.flush)
+                self._exit_hook = True
+            if self._pending >= self.flush_every:
+                self.flush()
+
+    def flush(self) -> int:
+        """Écrit toutes les calibrations modifiées ; retourne le nombre écrit"""
+        with self._lock:
+            batch = list(self._dirty.items())
+            self._dirty.clear()
+            self._pending = 0
+            if batch:
+                self._write(batch)
+            return len(batch)
+
+    def _write(self, batch: List[Tuple[str, Tuple[UserCalibration, ConfidenceTracker]]]):
+        now = clock.now().isoformat()
+        rows = [(user_id, self.encode(*entry), now) for user_id, entry in batch]
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany("""
+                    INSERT INTO difficulty_calibrations (user_id, data, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+                """, rows)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # Gardées en mémoire : réessayées au prochain flush
+            logger.error(f"❌ Erreur sauvegarde calibrations: {e}")
+            for user_id, entry in batch:
+                self._dirty.setdefault(user_id, entry)
+
+
 class OptimalDifficultyEngine:
     """
     Moteur de difficulté optimale v2.0
@@ -293,24 +531,23 @@ class OptimalDifficultyEngine:
     - Confidence tracking
     """
 
-    def __init__(self):
-        # Calibrations par utilisateur
-        self._user_calibrations: Dict[str, UserCalibration] = {}
-        self._confidence_trackers: Dict[str, ConfidenceTracker] = {}
+    def __init__(self, store: Optional[CalibrationStore] = None):
+        # Calibrations par utilisateur (SQLite + cache LRU)
+        self.store = store or CalibrationStore()
 
         logger.info("🎯 Optimal Difficulty Engine v2.0 initialized")
 
     def get_calibration(self, user_id: str) -> UserCalibration:
         """Récupère ou crée la calibration d'un utilisateur"""
-        if user_id not in self._user_calibrations:
-            self._user_calibrations[user_id] = UserCalibration(user_id=user_id)
-        return self._user_calibrations[user_id]
+        return self.store.get(user_id)[0]
 
     def get_confidence_tracker(self, user_id: str) -> ConfidenceTracker:
         """Récupère ou crée le tracker de confiance"""
-        if user_id not in self._confidence_trackers:
-            self._confidence_trackers[user_id] = ConfidenceTracker()
-        return self._confidence_trackers[user_id]
+        return self.store.get(user_id)[1]
+
+    def flush(self) -> int:
+        """Écrit les calibrations modifiées (sinon fait par lots et à l'arrêt)"""
+        return self.store.flush()
 
     def determine_optimal_level(
         self,
@@ -428,7 +665,8 @@ class OptimalDifficultyEngine:
         Returns:
             Dict avec impact_multiplier, feedback, calibration_update
         """
-        calibration = self.get_calibration(user_id)
+        # Calibration et tracker lus ensemble : le même couple est modifié puis marqué
+        calibration, tracker = self.store.get(user_id)
         result = {
             "impact_multiplier": 1.0,
             "feedback": None,
@@ -446,7 +684,6 @@ class OptimalDifficultyEngine:
 
         # Traitement de la confiance
         if confidence is not None:
-            tracker = self.get_confidence_tracker(user_id)
             tracker.record(confidence, is_correct)
 
             result["impact_multiplier"] = tracker.get_impact_multiplier(confidence, is_correct)
@@ -461,6 +698,7 @@ class OptimalDifficultyEngine:
             result["new_thresholds"] = calibration.mastery_thresholds.copy()
             result["learning_style"] = calibration.learning_style
 
+        self.store.mark_dirty(user_id, calibration, tracker)
         return result
 
     def get_user_profile(self, user_id: str) -> Dict[str, Any]:
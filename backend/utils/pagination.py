@@ -0,0 +1,69 @@
+"""
+Pagination - Curseurs opaques et réponses JSON en flux
+
+Les listes longues (historique de conversation, vocabulaire) sont paginées
+par curseur (dernier id vu) plutôt que par OFFSET, et écrites en JSON au fil
+des lignes : ni la liste complète ni la réponse ne sont construites en mémoire.
+
+Usage:
+    before_id = decode_cursor(cursor)  # ValueError si invalide
+    rows = db.iter_vocabulary(course_id, user_id, before_id=before_id, limit=limit + 1)
+    return StreamingResponse(stream_json_page(rows, "words", limit, {"course_id": course_id}),
+                             media_type="application/json")
+"""
+import base64
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+_PREFIX = "id:"
+_CHUNK_ROWS = 100  # Lignes par morceau écrit
+
+
+def encode_cursor(last_id: int) -> str:
+    """Curseur opaque pour la page suivant `last_id`"""
+    return base64.urlsafe_b64encode(f"{_PREFIX}{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Id du curseur (None si absent). ValueError si le curseur est invalide."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
+    if not raw.startswith(_PREFIX) or not raw[len(_PREFIX):].isdigit():
+        raise ValueError(f"Curseur invalide: {cursor}")
+    return int(raw[len(_PREFIX):])
+
+
+def stream_json_page(
+    rows: Iterable[Dict[str, Any]],
+    key: str,
+    limit: Optional[int],
+    header: Dict[str, Any]
+) -> Iterator[str]:
+    """
+    Écrit `{**header, key: [...], "count", "has_more", "next_cursor"}` au fil des lignes.
+
+    `rows` doit fournir jusqu'à limit + 1 lignes : la ligne en trop indique
+    qu'une page suivante existe (elle n'est pas écrite).
+    """
+    opening = json.dumps(header, ensure_ascii=False)[:-1]
+    parts = [f'{opening}{", " if header else ""}"{key}": [']
+    count, last_id, has_more = 0, None, False
+
+    for row in rows:
+        if limit is not None and count == limit:
+            has_more = True
+            break
+        parts.append(("," if count else "") + json.dumps(row, ensure_ascii=False, default=str))
+        count += 1
+        last_id = row["id"]
+        if len(parts) >= _CHUNK_ROWS:
+            yield "".join(parts)
+            parts = []
+
+    next_cursor = encode_cursor(last_id) if has_more else None
+    parts.append(f'], "count": {count}, "has_more": {json.dumps(has_more)}, "next_cursor": {json.dumps(next_cursor)}}}')
+    yield "".join(parts)
@@ -0,0 +1,97 @@
+"""
+Rolling - Statistiques incrémentales en temps et mémoire constants
+
+Les évaluations faites à chaque réponse (charge cognitive, fatigue, flow)
+portent sur les N dernières réponses. Plutôt que de reconstruire des listes
+et de recalculer moyennes et sommes à chaque appel :
+- RollingWindow : buffer circulaire de taille fixe + somme courante,
+  mean() en O(1)
+- RunningStats : moyenne et variance sur tout le flux (Welford 1962),
+  sans garder les valeurs
+
+Usage:
+    recent = RollingWindow(5)
+    recent.append(42)
+    if recent.full:
+        print(recent.mean())
+"""
+import math
+from typing import Iterator, List, Optional
+
+
+class RollingWindow:
+    """Les `maxlen` dernières valeurs et leur somme, mise à jour à chaque ajout."""
+
+    __slots__ = ("maxlen", "_values", "_next", "_count", "_sum")
+
+    def __init__(self, maxlen: int):
+        if maxlen < 1:
+            raise ValueError("maxlen must be >= 1")
+        self.maxlen = maxlen
+        self._values: List[float] = [0.0] * maxlen
+        self._next = 0
+        self._count = 0
+        self._sum = 0.0
+
+    def append(self, value: float) -> Optional[float]:
+        """Ajoute une valeur ; retourne celle qui sort de la fenêtre (None si pas pleine)."""
+        evicted = self._values[self._next] if self._count == self.maxlen else None
+        if evicted is not None:
+            self._sum -= evicted
+        else:
+            self._count += 1
+        self._values[self._next] = value
+        self._sum += value
+        self._next = (self._next + 1) % self.maxlen
+        return evicted
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def full(self) -> bool:
+        return self._count == self.maxlen
+
+    def mean(self) -> float:
+        """Moyenne de la fenêtre (0.0 si vide)."""
+        return self._sum / self._count if self._count else 0.0
+
+    def last(self) -> Optional[float]:
+        """Valeur la plus récente."""
+        return self._values[self._next - 1] if self._count else None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[float]:
+        """De la plus ancienne à la plus récente (O(maxlen), pour l'inspection)."""
+        start = self._next - self._count
+        for offset in range(self._count):
+            yield self._values[(start + offset) % self.maxlen]
+
+
+class RunningStats:
+    """Nombre, moyenne et variance d'un flux de valeurs (algorithme de Welford)."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Variance d'échantillon (0.0 avant deux valeurs)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from typing import Tuple
 from config import settings
 
+from . import clock
+
 
 def calculate_next_review(
     quality: int,  # 0-5 (0=échec total, 5=facile parfait)
@@ -74,7 +76,7 @@ def calculate_next_review(
     new_interval = max(1, min(365, new_interval))
 
     # Date de prochaine révision
-    next_review = datetime.now() + timedelta(days=new_interval)
+    next_review = clock.now() + timedelta(days=new_interval)
     
     return new_ease_factor, new_interval, next_review
 
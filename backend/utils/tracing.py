@@ -0,0 +1,316 @@
+"""
+🔎 Tracing - Chronométrage par étape des requêtes HTTP
+
+Un handler comme submit_answer mélange accès base, calcul moteur et appel LLM.
+Ce module mesure où passe le temps, requête par requête :
+- TracingMiddleware (ASGI) ouvre une trace par requête HTTP
+- span("db.learning.get_concept") / @traced / @trace_methods chronomètrent une étape
+- Le préfixe du nom (db, engine, llm) est l'étape ; chaque span compte en
+  temps propre (enfants déduits), donc db + engine + llm + app = total
+- Réponse : en-tête Server-Timing (visible dans l'onglet Network du navigateur)
+- Requêtes lentes : ring buffer en mémoire, exposé sur /health/perf
+- Compteur et histogramme par route pour /metrics (utils.metrics)
+- OpenTelemetry en option (OTEL_EXPORTER_OTLP_ENDPOINT + SDK installé)
+
+Hors requête (tests, simulations), span() ne fait rien : coût quasi nul.
+
+Usage:
+    from utils.tracing import span, traced, trace_methods
+
+    with span("llm.generate", model="gpt-4o-mini"):
+        ...
+
+    @trace_methods("db.tasks")
+    class TasksDatabase: ...
+"""
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config import settings
+from utils.metrics import HTTP_DURATION, HTTP_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SpanRecord:
+    """Une étape chronométrée"""
+    name: str
+    start_ms: float      # Depuis le début de la requête
+    duration_ms: float
+    self_ms: float       # Durée moins celle des spans enfants
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def stage(self) -> str:
+        return self.name.split(".", 1)[0]
+
+
+class Trace:
+    """Spans d'une requête, avec la pile des spans ouverts."""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.spans: List[SpanRecord] = []
+        # Durée cumulée des enfants de chaque span ouvert
+        self._children_ms: List[float] = []
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def finish(self):
+        self.duration_ms = self.elapsed_ms()
+
+    def stages(self) -> Dict[str, float]:
+        """Temps propre par étape, plus "app" (le reste) et "total"."""
+        totals: Dict[str, float] = {}
+        for record in self.spans:
+            totals[record.stage] = totals.get(record.stage, 0.0) + record.self_ms
+        total = self.duration_ms if self.duration_ms is not None else self.elapsed_ms()
+        totals["app"] = max(0.0, total - sum(totals.values()))
+        totals["total"] = total
+        return totals
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{stage};dur={ms:.1f}" for stage, ms in self.stages().items())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms or 0.0, 2),
+            "stages": {stage: round(ms, 2) for stage, ms in self.stages().items()},
+            "spans": [
+                {
+                    "name": r.name,
+                    "start_ms": round(r.start_ms, 2),
+                    "duration_ms": round(r.duration_ms, 2),
+                    **({"attrs": r.attrs} if r.attrs else {}),
+                }
+                for r in self.spans
+            ],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+# Tracer OpenTelemetry (None = export désactivé)
+_otel_tracer = None
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[None]:
+    """Chronomètre un bloc comme étape de la requête en cours."""
+    trace = _current_trace.get()
+    if trace is None and _otel_tracer is None:
+        yield
+        return
+
+    otel_span = _otel_tracer.start_as_current_span(name, attributes=attrs) if _otel_tracer else None
+    if otel_span:
+        otel_span.__enter__()
+    if trace is not None:
+        trace._children_ms.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        if trace is not None:
+            children_ms = trace._children_ms.pop()
+            if trace._children_ms:
+                trace._children_ms[-1] += duration_ms
+            trace.spans.append(SpanRecord(
+                name=name,
+                start_ms=(start - trace._start) * 1000,
+                duration_ms=duration_ms,
+                self_ms=max(0.0, duration_ms - children_ms),
+                attrs=attrs,
+            ))
+        if otel_span:
+            otel_span.__exit__(None, None, None)
+
+
+def traced(name: str) -> Callable:
+    """Décorateur : chaque appel est un span `name`."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_methods(prefix: str) -> Callable[[type], type]:
+    """Décorateur de classe : chaque méthode publique devient un span `prefix.méthode`."""
+    def decorator(cls: type) -> type:
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not callable(value) or isinstance(value, (staticmethod, classmethod, type)):
+                continue
+            setattr(cls, attr, traced(f"{prefix}.{attr}")(value))
+        return cls
+    return decorator
+
+
+class PerfRegistry:
+    """
+    Agrégats par route et ring buffer des requêtes lentes.
+
+    Thread-safe : les routes sync tournent dans le threadpool de starlette.
+    """
+
+    def __init__(self, capacity: int = 100, slow_ms: float = 500):
+        self.slow_ms = slow_ms
+        self._slow: deque = deque(maxlen=capacity)
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, trace: Trace):
+        stages = trace.stages()
+        # Sans route (404), un seul agrégat : les chemins inconnus ne font pas grossir le registre
+        key = f"{trace.method} {trace.route or '<unmatched>'}"
+        with self._lock:
+            entry = self._routes.setdefault(key, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "stages_ms": {}})
+            entry["count"] += 1
+            entry["total_ms"] += stages["total"]
+            entry["max_ms"] = max(entry["max_ms"], stages["total"])
+            for stage, ms in stages.items():
+                if stage != "total":
+                    entry["stages_ms"][stage] = entry["stages_ms"].get(stage, 0.0) + ms
+            if stages["total"] >= self.slow_ms:
+                self._slow.append(trace.to_dict())
+
+    def report(self, limit: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            routes = {
+                key: {
+                    "count": entry["count"],
+                    "mean_ms": round(entry["total_ms"] / entry["count"], 2),
+                    "max_ms": round(entry["max_ms"], 2),
+                    "stages_mean_ms": {
+                        stage: round(ms / entry["count"], 2) for stage, ms in entry["stages_ms"].items()
+                    },
+                }
+                for key, entry in sorted(self._routes.items())
+            }
+            slow = list(self._slow)[-limit:][::-1] if limit > 0 else []
+        return {
+            "slow_threshold_ms": self.slow_ms,
+            "routes": routes,
+            "slow_requests": slow,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._slow.clear()
+            self._routes.clear()
+
+
+perf_registry = PerfRegistry(
+    capacity=settings.TRACING_BUFFER_SIZE,
+    slow_ms=settings.TRACING_SLOW_MS,
+)
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI : une trace par requête HTTP, en-tête Server-Timing.
+
+    ASGI pur (pas BaseHTTPMiddleware) pour ne pas bufferiser les réponses
+    en streaming (/api/chat/stream, sortie de code).
+    """
+
+    def __init__(self, app, registry: PerfRegistry = None):
+        self.app = app
+        self.registry = registry or perf_registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope["method"], scope["path"])
+        token = _current_trace.set(trace)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        root = (
+            _otel_tracer.start_as_current_span(f"{scope['method']} {scope['path']}", attributes={"http.method": scope["method"]})
+            if _otel_tracer else None
+        )
+        if root:
+            root.__enter__()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            trace.finish()
+            # Gabarit déclaré par la route (/api/learning/next-question/{session_id}) :
+            # jamais les valeurs, donc un nombre borné de labels
+            route = scope.get("route")
+            if route is not None:
+                trace.route = getattr(route, "path", None)
+            _current_trace.reset(token)
+            if root:
+                root.__exit__(None, None, None)
+            self.registry.record(trace)
+            route = trace.route or "<unmatched>"
+            HTTP_REQUESTS.labels(trace.method, route, trace.status or 500).inc()
+            HTTP_DURATION.labels(trace.method, route).observe(trace.duration_ms / 1000)
+
+
+def configure_otel(endpoint: Optional[str] = None) -> bool:
+    """
+    Active l'export OpenTelemetry (OTLP/HTTP) vers un collecteur local.
+
+    Dépendances optionnelles : opentelemetry-sdk et
+    opentelemetry-exporter-otlp-proto-http. Sans elles, seul le traçage
+    en mémoire reste actif.
+    """
+    global _otel_tracer
+
+    endpoint = endpoint or settings.OTEL_EXPORTER_OTLP_ENDPOINT
+    if not endpoint:
+        return False
+    try:
+        from opentelemetry import trace as otel_trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("⚠️ OpenTelemetry SDK non installé - export OTLP désactivé")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=f"{endpoint.rstrip('/')}/v1/traces")))
+    otel_trace.set_tracer_provider(provider)
+    _otel_tracer = otel_trace.get_tracer("newmars.backend")
+    logger.info(f"🔭 Export OpenTelemetry vers {endpoint}")
+    return True
@@ -34,7 +34,7 @@ export function ArchiveManager({ courseId }: ArchiveManagerProps) {
   
   const handleViewArchived = async () => {
     setIsLoadingArchived(true)
-    const messages = await loadArchivedMessages(0, 50)
+    const { messages } = await loadArchivedMessages(null, 50)
     setArchivedMessages(messages)
     setShowArchived(true)
     setIsLoadingArchived(false)
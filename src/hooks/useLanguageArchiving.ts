@@ -19,9 +19,14 @@ interface ArchiveStats {
   archived: number
 }
 
+interface ArchivedPage {
+  messages: LanguageMessage[]
+  nextCursor: string | null  // À repasser pour la page suivante (null = fin)
+}
+
 interface UseLanguageArchivingReturn {
   archiveOldMessages: () => Promise<number>
-  loadArchivedMessages: (offset?: number, limit?: number) => Promise<LanguageMessage[]>
+  loadArchivedMessages: (cursor?: string | null, limit?: number) => Promise<ArchivedPage>
   getMessageStats: () => Promise<ArchiveStats | null>
   isArchiving: boolean
   needsArchiving: boolean
@@ -113,12 +118,14 @@ export function useLanguageArchiving(courseId: string): UseLanguageArchivingRetu
    * Charge les messages archivés depuis SQLite
    */
   const loadArchivedMessages = useCallback(async (
-    offset: number = 0, 
+    cursor: string | null = null, 
     limit: number = 100
-  ): Promise<LanguageMessage[]> => {
+  ): Promise<ArchivedPage> => {
     try {
+      const params = new URLSearchParams({ limit: String(limit) })
+      if (cursor) params.set('cursor', cursor)
       const response = await fetch(
-        `${API_BASE_URL}/archived-messages/${courseId}?limit=${limit}&offset=${offset}`
+        `${API_BASE_URL}/archived-messages/${courseId}?${params}`
       )
       
       if (!response.ok) {
@@ -126,11 +133,11 @@ export function useLanguageArchiving(courseId: string): UseLanguageArchivingRetu
       }
       
       const result = await response.json()
-      return result.messages
+      return { messages: result.messages, nextCursor: result.next_cursor }
       
     } catch (error) {
       console.error('❌ Erreur chargement messages archivés:', error)
-      return []
+      return { messages: [], nextCursor: null }
     }
   }, [courseId])
   
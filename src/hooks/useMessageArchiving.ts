@@ -22,9 +22,14 @@ interface ArchiveStats {
   archived: number
 }
 
+interface ArchivedPage {
+  messages: Message[]
+  nextCursor: string | null  // À repasser pour la page suivante (null = fin)
+}
+
 interface UseMessageArchivingReturn {
   archiveOldMessages: () => Promise<number>
-  loadArchivedMessages: (offset?: number, limit?: number) => Promise<Message[]>
+  loadArchivedMessages: (cursor?: string | null, limit?: number) => Promise<ArchivedPage>
   getMessageStats: () => Promise<ArchiveStats | null>
   isArchiving: boolean
   needsArchiving: boolean
@@ -116,12 +121,14 @@ export function useMessageArchiving(courseId: string): UseMessageArchivingReturn
    * Charge les messages archivés depuis SQLite (pour consultation)
    */
   const loadArchivedMessages = useCallback(async (
-    offset: number = 0, 
+    cursor: string | null = null, 
     limit: number = 100
-  ): Promise<Message[]> => {
+  ): Promise<ArchivedPage> => {
     try {
+      const params = new URLSearchParams({ limit: String(limit) })
+      if (cursor) params.set('cursor', cursor)
       const response = await fetch(
-        `${API_BASE_URL}/archived-messages/${courseId}?limit=${limit}&offset=${offset}`
+        `${API_BASE_URL}/archived-messages/${courseId}?${params}`
       )
       
       if (!response.ok) {
@@ -129,11 +136,11 @@ export function useMessageArchiving(courseId: string): UseMessageArchivingReturn
       }
       
       const result = await response.json()
-      return result.messages
+      return { messages: result.messages, nextCursor: result.next_cursor }
       
     } catch (error) {
       console.error('❌ Erreur chargement messages archivés:', error)
-      return []
+      return { messages: [], nextCursor: null }
     }
   }, [courseId])
   